@@ -3,6 +3,7 @@
 from starkware.cairo.common.alloc import alloc
 from starkware.cairo.common.cairo_builtins import HashBuiltin
 from starkware.cairo.common.math_cmp import is_le
+from contracts.DataTypes import ABRAccumulator, ABRSample
 from contracts.Math_64x61 import (
     Math64x61_add,
     Math64x61_div,
@@ -60,22 +61,28 @@ func calculate_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_p
 
     // Calculate the middle band
     let (avg_array: felt*) = alloc();
-    movavg(reduced_array_length, mark_prices, reduced_array_length, mark_prices, 8, avg_array, 0);
+    movavg(
+        reduced_array_length, mark_prices, reduced_array_length, mark_prices, 8, avg_array, 0, 0
+    );
 
     // Calculate the upper & lower band
     let (upper_array: felt*) = alloc();
     let (lower_array: felt*) = alloc();
+    let (squares: felt*) = alloc();
 
     calc_bollinger(
         reduced_array_length,
         upper_array,
         lower_array,
-        reduced_array_length,
+        mark_prices,
         mark_prices,
         avg_array,
+        squares,
         8,
         0,
         boll_width_,
+        0,
+        0,
     );
 
     // Calculate the diff b/w index and mark
@@ -84,7 +91,7 @@ func calculate_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_p
 
     // Calculate the premium
     let (ABRdyn: felt*) = alloc();
-    movavg(reduced_array_length, diff, reduced_array_length, diff, 8, ABRdyn, 0);
+    movavg(reduced_array_length, diff, reduced_array_length, diff, 8, ABRdyn, 0, 0);
 
     // Add the jump to the premium price
     let (ABRdyn_jump: felt*) = alloc();
@@ -108,6 +115,110 @@ func calculate_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_p
     return (rate, last_price);
 }
 
+// @notice Function to add a reduced sample to the running ABR sums of an epoch
+// @param accumulator_ - Running sums of the samples pushed so far
+// @param leaving_sample_ - Sample leaving the sliding window; zero while the window is not full
+// @param index_price_ - Reduced index price of the sample
+// @param mark_price_ - Reduced mark price of the sample
+// @param boll_width_ - Width of the boll band
+// @returns accumulator - Running sums including the new sample
+// @returns sample - Sample to be stored in the sliding window
+@view
+func accumulate_abr_sample{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    accumulator_: ABRAccumulator,
+    leaving_sample_: ABRSample,
+    index_price_: felt,
+    mark_price_: felt,
+    boll_width_: felt,
+) -> (accumulator: ABRAccumulator, sample: ABRSample) {
+    alloc_locals;
+
+    // Calculate the square of the mark price and the diff b/w index and mark
+    let (mark_price_sq) = Math64x61_mul(mark_price_, mark_price_);
+    let (diff_sub) = Math64x61_sub(mark_price_, index_price_);
+    let (diff) = Math64x61_div(diff_sub, index_price_);
+
+    // Move the sliding window sums forward
+    let (mark_sum_temp) = Math64x61_add(accumulator_.mark_sum, mark_price_);
+    let (mark_sum) = Math64x61_sub(mark_sum_temp, leaving_sample_.mark_price);
+    let (mark_sq_sum_temp) = Math64x61_add(accumulator_.mark_sq_sum, mark_price_sq);
+    let (mark_sq_sum) = Math64x61_sub(mark_sq_sum_temp, leaving_sample_.mark_price_sq);
+    let (diff_sum_temp) = Math64x61_add(accumulator_.diff_sum, diff);
+    let (diff_sum) = Math64x61_sub(diff_sum_temp, leaving_sample_.diff);
+
+    // The window grows until it holds 8 samples
+    local samples_count = accumulator_.samples_count + 1;
+    local window_size;
+    let is_boundary = is_le(samples_count, 7);
+    if (is_boundary == 1) {
+        window_size = samples_count;
+    } else {
+        window_size = 8;
+    }
+
+    // Calculate the middle band and the std deviation of the window
+    let (curr_window_size) = Math64x61_fromIntFelt(window_size);
+    let (mean) = Math64x61_div(mark_sum, curr_window_size);
+    let (std_deviation) = find_rolling_std_sum(mark_sum, mark_sq_sum, curr_window_size);
+
+    local curr_window;
+    if (window_size == 1) {
+        curr_window = 1;
+    } else {
+        curr_window = curr_window_size - Math64x61_ONE;
+    }
+
+    let (std_temp) = Math64x61_div(std_deviation, curr_window);
+    let (movstd) = Math64x61_sqrt(std_temp);
+    let (movstd_const) = Math64x61_mul(movstd, boll_width_);
+
+    let (lower) = Math64x61_sub(mean, movstd_const);
+    let (upper) = Math64x61_add(mean, movstd_const);
+
+    // Calculate the premium and add the jump to it
+    let (ABRdyn) = Math64x61_div(diff_sum, curr_window_size);
+    let (ABRdyn_jump) = find_jump(
+        mark_price_=mark_price_,
+        index_price_=index_price_,
+        upper_=upper,
+        lower_=lower,
+        ABRdyn_=ABRdyn,
+    );
+
+    // Add the effective rate of the sample (without the base rate) to the sum
+    let (rate) = Math64x61_div(ABRdyn_jump, NUM_8);
+    let (rate_sum) = Math64x61_add(accumulator_.rate_sum, rate);
+
+    let accumulator = ABRAccumulator(
+        samples_count=samples_count,
+        mark_sum=mark_sum,
+        mark_sq_sum=mark_sq_sum,
+        diff_sum=diff_sum,
+        rate_sum=rate_sum,
+        last_price=accumulator_.last_price,
+    );
+    let sample = ABRSample(mark_price=mark_price_, mark_price_sq=mark_price_sq, diff=diff);
+    return (accumulator, sample);
+}
+
+// @notice Function to calculate the ABR from the running sums of an epoch
+// @param accumulator_ - Running sums of the samples pushed in the epoch
+// @param base_abr_ - Base ABR value
+// @returns abr_value - ABR of the pushed samples
+// @returns abr_last_price - Last mark price of the pushed samples
+@view
+func calculate_abr_from_accumulator{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(accumulator_: ABRAccumulator, base_abr_: felt) -> (abr_value: felt, abr_last_price: felt) {
+    let (array_size) = Math64x61_fromIntFelt(accumulator_.samples_count);
+
+    // Adding the base rate once per sample is exact, so it is added in bulk here
+    let (base_abr_sum) = Math64x61_mul(base_abr_, array_size);
+    let (rate_sum) = Math64x61_add(accumulator_.rate_sum, base_abr_sum);
+    let (rate) = Math64x61_div(rate_sum, array_size);
+    return (rate, accumulator_.last_price);
+}
+
 // /////////////////////
 // Internal Functions //
 // /////////////////////
@@ -162,53 +273,7 @@ func find_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     return find_abr(array_len_ - 1, array_ + 1, curr_sum, base_abr_);
 }
 
-// @notice Function to calculate the sum of a given array window
-// @param array_len_ - Length of the array
-// @param array_ - Array for which to calculate the sum
-// @param window_size_ - Size of the window
-// @param sum_ - Current sum of the array
-// @returns sum - Final sum of the array
-func find_window_sum{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
-    array_len_: felt, array_: felt*, window_size_: felt, sum_: felt
-) -> (sum: felt) {
-    // If reached the end of the array, return
-    if (window_size_ == 0) {
-        return (sum_,);
-    }
-
-    // Calculate the current sum
-    let (sum_temp) = Math64x61_add(sum_, [array_]);
-
-    // Recursively call the next array element
-    return find_window_sum(array_len_, array_ + 1, window_size_ - 1, sum_temp);
-}
-
-// @notice Function to calculate the sum of standard deviation
-// @param array_len_ - Length of the array
-// @param array_ - Array for which to calculate the std
-// @param mean_ - Mean of the window
-// @param window_size_ - Window size of the array
-// @param sum_ - Current sum of the stds
-// @returns sum - Final sum of the stds
-func find_std_sum{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
-    array_len_: felt, array_: felt*, mean_: felt, window_size_: felt, sum_: felt
-) -> (sum: felt) {
-    // If reached the end of the array, return
-    if (window_size_ == 0) {
-        return (sum_,);
-    }
-
-    // Calculates the difference between the array element and the mean
-    let (diff) = Math64x61_sub([array_], mean_);
-
-    // Calculates the square root of the difference
-    let (diff_sq) = Math64x61_mul(diff, diff);
-
-    // Recursively call the next array element
-    return find_std_sum(array_len_, array_ + 1, mean_, window_size_ - 1, sum_ + diff_sq);
-}
-
-// @notice Function to calculate the moving average
+// @notice Function to calculate the moving average using a rolling window sum
 // @param tail_window_len_ - Length of the tail window array
 // @param tail_window_ - Tail window array, start of a window
 // @param head_window_len_ - Length of the head window array
@@ -216,6 +281,7 @@ func find_std_sum{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_pt
 // @param window_size_ - Window size of the array
 // @param avg_array_ - Current average array
 // @param iterator_- iterator for the arrays
+// @param window_sum_ - Sum of the elements in the window preceding the head element
 func movavg{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     tail_window_len_: felt,
     tail_window_: felt*,
@@ -224,6 +290,7 @@ func movavg{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     window_size_: felt,
     avg_array_: felt*,
     iterator_: felt,
+    window_sum_: felt,
 ) {
     alloc_locals;
 
@@ -232,13 +299,15 @@ func movavg{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
         return ();
     }
 
+    // Add the element entering the window to the rolling sum
+    let (window_sum) = Math64x61_add(window_sum_, [head_window_]);
+
     // Check if the iterator is on the left boundary of the window
     let is_boundary = is_le(iterator_, window_size_ - 2);
 
     if (is_boundary == 1) {
         // Calculate the mean of the window
         let (curr_window_size) = Math64x61_fromIntFelt(iterator_ + 1);
-        let (window_sum) = find_window_sum(tail_window_len_, tail_window_, iterator_ + 1, 0);
         let (mean_window) = Math64x61_div(window_sum, curr_window_size);
 
         // Store the mean in the avg_array
@@ -253,16 +322,19 @@ func movavg{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
             window_size_,
             avg_array_,
             iterator_ + 1,
+            window_sum,
         );
     } else {
         // Calculate the mean of the window
         let (curr_window_size) = Math64x61_fromIntFelt(window_size_);
-        let (window_sum) = find_window_sum(tail_window_len_, tail_window_, window_size_, 0);
         let (mean_window) = Math64x61_div(window_sum, curr_window_size);
 
         // Store the mean in the avg_array
         assert avg_array_[iterator_] = mean_window;
 
+        // Remove the element leaving the window from the rolling sum
+        let (next_window_sum) = Math64x61_sub(window_sum, [tail_window_]);
+
         // Recursively call the next array element
         return movavg(
             tail_window_len_ - 1,
@@ -272,30 +344,37 @@ func movavg{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
             window_size_,
             avg_array_,
             iterator_ + 1,
+            next_window_sum,
         );
     }
 }
 
-// @notice Function to calculate the upper and lower bands
+// @notice Function to calculate the upper and lower bands using rolling window sums
 // @param array_len_ - Length of upper and lower bands
 // @param upper_array_ - Current upper band
 // @param lower_array_ - Current lower band
-// @param tail_window_len_ - Length of the tail window array
+// @param head_window_ - Head window array, end of a window
 // @param tail_window_ - Tail window array, start of a window
 // @param avg_array_ - Average Array
+// @param squares_ - Array storing the squares of the elements that entered the window
 // @param window_size_ - Window size of the array
 // @param iterator_ - iterator for the arrays
 // @param boll_width_ - Width of the boll band
+// @param window_sum_ - Sum of the elements in the window preceding the head element
+// @param window_sq_sum_ - Sum of the squared elements in the window preceding the head element
 func calc_bollinger{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     array_len_: felt,
     upper_array_: felt*,
     lower_array_: felt*,
-    tail_window_len_: felt,
+    head_window_: felt*,
     tail_window_: felt*,
     avg_array_: felt*,
+    squares_: felt*,
     window_size_: felt,
     iterator_: felt,
     boll_width_: felt,
+    window_sum_: felt,
+    window_sq_sum_: felt,
 ) {
     alloc_locals;
 
@@ -306,13 +385,19 @@ func calc_bollinger{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_
 
     local mean = [avg_array_];
 
+    // Add the element entering the window and its square to the rolling sums
+    let (square) = Math64x61_mul([head_window_], [head_window_]);
+    assert squares_[iterator_] = square;
+    let (window_sum) = Math64x61_add(window_sum_, [head_window_]);
+    let (window_sq_sum) = Math64x61_add(window_sq_sum_, square);
+
     // Check if the iterator is on the left boundary of the window
     let is_boundary = is_le(iterator_, window_size_ - 2);
 
     if (is_boundary == 1) {
         // Calculate the std deviation of the window
         let (curr_window_size) = Math64x61_fromIntFelt(iterator_ + 1);
-        let (std_deviation) = find_std_sum(tail_window_len_, tail_window_, mean, iterator_ + 1, 0);
+        let (std_deviation) = find_rolling_std_sum(window_sum, window_sq_sum, curr_window_size);
 
         local curr_window;
         if (iterator_ == 0) {
@@ -337,17 +422,20 @@ func calc_bollinger{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_
             array_len_ - 1,
             upper_array_,
             lower_array_,
-            tail_window_len_,
+            head_window_ + 1,
             tail_window_,
             avg_array_ + 1,
+            squares_,
             window_size_,
             iterator_ + 1,
             boll_width_,
+            window_sum,
+            window_sq_sum,
         );
     } else {
         // Calculate the std deviation of the window
         let (curr_window_size) = Math64x61_fromIntFelt(window_size_);
-        let (std_deviation) = find_std_sum(tail_window_len_, tail_window_, mean, window_size_, 0);
+        let (std_deviation) = find_rolling_std_sum(window_sum, window_sq_sum, curr_window_size);
 
         let (curr_size) = Math64x61_sub(curr_window_size, Math64x61_ONE);
 
@@ -362,21 +450,51 @@ func calc_bollinger{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_
         assert lower_array_[iterator_] = lower;
         assert upper_array_[iterator_] = upper;
 
+        // Remove the element leaving the window and its square from the rolling sums
+        let (next_window_sum) = Math64x61_sub(window_sum, [tail_window_]);
+        let (next_window_sq_sum) = Math64x61_sub(
+            window_sq_sum, squares_[iterator_ - window_size_ + 1]
+        );
+
         // # Recursively call the next array element
         return calc_bollinger(
             array_len_ - 1,
             upper_array_,
             lower_array_,
-            tail_window_len_ - 1,
+            head_window_ + 1,
             tail_window_ + 1,
             avg_array_ + 1,
+            squares_,
             window_size_,
             iterator_ + 1,
             boll_width_,
+            next_window_sum,
+            next_window_sq_sum,
         );
     }
 }
 
+// @notice Function to calculate the sum of squared deviations of a window from its rolling sums
+// @param window_sum_ - Sum of the elements in the window
+// @param window_sq_sum_ - Sum of the squares of the elements in the window
+// @param window_size_ - Window size in 64x61 format
+// @returns sum - Sum of the squared deviations from the mean of the window
+func find_rolling_std_sum{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    window_sum_: felt, window_sq_sum_: felt, window_size_: felt
+) -> (sum: felt) {
+    // sum((x - mean)^2) = sum(x^2) - sum(x)^2 / n
+    let (sum_sq) = Math64x61_mul(window_sum_, window_sum_);
+    let (sum_sq_mean) = Math64x61_div(sum_sq, window_size_);
+    let (std_sum) = Math64x61_sub(window_sq_sum_, sum_sq_mean);
+
+    // Rounding can push a flat window marginally below zero
+    let is_negative = is_le(std_sum, -1);
+    if (is_negative == 1) {
+        return (0,);
+    }
+    return (std_sum,);
+}
+
 // @notice Function to calculate the jump and ABRdyn
 // @param array_len_ - Size of the mark prices and index prices array
 // @param mark_prices_ - Mark prices array
@@ -396,16 +514,48 @@ func calc_jump{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     ABRdyn_jump_: felt*,
     iterator_: felt,
 ) {
-    alloc_locals;
-
     // If reached the end of the array, return
     if (array_len_ == 0) {
         return ();
     }
 
+    let (total_jump) = find_jump(
+        mark_price_=[mark_prices_],
+        index_price_=[index_prices_],
+        upper_=[upper_array_],
+        lower_=[lower_array_],
+        ABRdyn_=[ABRdyn_],
+    );
+    assert ABRdyn_jump_[iterator_] = total_jump;
+
+    // Recursively call the next array element
+    return calc_jump(
+        array_len_ - 1,
+        mark_prices_ + 1,
+        index_prices_ + 1,
+        upper_array_ + 1,
+        lower_array_ + 1,
+        ABRdyn_ + 1,
+        ABRdyn_jump_,
+        iterator_ + 1,
+    );
+}
+
+// @notice Function to add the jump to the ABRdyn of a single sample
+// @param mark_price_ - Mark price of the sample
+// @param index_price_ - Index price of the sample
+// @param upper_ - Upper band of the sample
+// @param lower_ - Lower band of the sample
+// @param ABRdyn_ - ABRdyn of the sample
+// @returns total_jump - ABRdyn of the sample including the jump
+func find_jump{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    mark_price_: felt, index_price_: felt, upper_: felt, lower_: felt, ABRdyn_: felt
+) -> (total_jump: felt) {
+    alloc_locals;
+
     // Calculate the diffrence between bands and the mark prices
-    let (upper_diff) = Math64x61_sub([mark_prices_], [upper_array_]);
-    let (lower_diff) = Math64x61_sub([lower_array_], [mark_prices_]);
+    let (upper_diff) = Math64x61_sub(mark_price_, upper_);
+    let (lower_diff) = Math64x61_sub(lower_, mark_price_);
 
     // Check if the upper or lower diff is positive
     let is_upper = is_le(upper_diff, 0);
@@ -428,7 +578,7 @@ func calc_jump{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
 
         // Add the jump to the premium
         if (is_jump_negative == 0) {
-            let (jump) = Math64x61_div(ln_jump, [index_prices_]);
+            let (jump) = Math64x61_div(ln_jump, index_price_);
             jump_value_upper = jump;
         } else {
             jump_value_upper = 0;
@@ -457,7 +607,7 @@ func calc_jump{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
 
         // Add the jump to the premium
         if (is_jump_negative == 0) {
-            let (jump) = Math64x61_div(ln_jump, [index_prices_]);
+            let (jump) = Math64x61_div(ln_jump, index_price_);
             jump_value_lower = jump;
         } else {
             jump_value_lower = 0;
@@ -468,21 +618,9 @@ func calc_jump{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
         tempvar range_check_ptr = range_check_ptr;
     }
 
-    let (temp_jump) = Math64x61_add([ABRdyn_], jump_value_upper);
+    let (temp_jump) = Math64x61_add(ABRdyn_, jump_value_upper);
     let (total_jump) = Math64x61_sub(temp_jump, jump_value_lower);
-    assert ABRdyn_jump_[iterator_] = total_jump;
-
-    // Recursively call the next array element
-    return calc_jump(
-        array_len_ - 1,
-        mark_prices_ + 1,
-        index_prices_ + 1,
-        upper_array_ + 1,
-        lower_array_ + 1,
-        ABRdyn_ + 1,
-        ABRdyn_jump_,
-        iterator_ + 1,
-    );
+    return (total_jump,);
 }
 
 // @notice Function to reduce the values from 480 -> 60
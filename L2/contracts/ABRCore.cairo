@@ -3,10 +3,13 @@
 from starkware.cairo.common.alloc import alloc
 from starkware.cairo.common.bool import FALSE, TRUE
 from starkware.cairo.common.cairo_builtins import HashBuiltin
-from starkware.cairo.common.math import assert_lt, assert_le
+from starkware.cairo.common.math import assert_lt, assert_le, assert_not_zero, unsigned_div_rem
 from starkware.cairo.common.math_cmp import is_le
 from contracts.libraries.CommonLibrary import CommonLib
-from contracts.libraries.UserBatches import calculate_no_of_batches, get_batch
+from contracts.libraries.UserBatches import (
+    calculate_no_of_active_trader_batches,
+    get_active_traders_batch,
+)
 from contracts.Constants import (
     ABR_STATE_0,
     ABR_STATE_1,
@@ -18,10 +21,11 @@ from contracts.Constants import (
     MasterAdmin_ACTION,
 )
 
-from contracts.DataTypes import ABRDetails, Market
+from contracts.DataTypes import ABRAccumulator, ABRDetails, ABRSample, Market
 from contracts.interfaces.IAuthorizedRegistry import IAuthorizedRegistry
 from contracts.interfaces.IABRCalculations import IABRCalculations
 from contracts.interfaces.IABRPayment import IABRPayment
+from contracts.interfaces.IAccountRegistry import IAccountRegistry
 from contracts.interfaces.IMarkets import IMarkets
 from contracts.libraries.Utils import verify_caller_authority
 
@@ -41,6 +45,9 @@ const BASE_ABR_MAX = 230584300921369;
 // Minimum ABR interval
 const ABR_INTERVAL_MIN = 3600;
 
+// Size of the sliding window over the reduced ABR samples
+const ABR_WINDOW_SIZE = 8;
+
 // /////////
 // Events //
 // /////////
@@ -62,6 +69,10 @@ func abr_set(epoch: felt, market_id: felt, abr_value: felt, abr_last_price: felt
 func abr_payment_made(epoch: felt, batch_id: felt) {
 }
 
+@event
+func abr_samples_pushed(epoch: felt, market_id: felt, samples_count: felt) {
+}
+
 // //////////
 // Storage //
 // //////////
@@ -114,6 +125,15 @@ func base_abr_rate() -> (value: felt) {
 func bollinger_width() -> (value: felt) {
 }
 
+@storage_var
+func epoch_market_to_abr_accumulator(epoch: felt, market_id: felt) -> (res: ABRAccumulator) {
+}
+
+// Ring buffer holding the last ABR_WINDOW_SIZE reduced samples of a market
+@storage_var
+func market_to_abr_window_sample(market_id: felt, slot: felt) -> (res: ABRSample) {
+}
+
 // //////////////
 // Constructor //
 // //////////////
@@ -240,7 +260,7 @@ func get_no_of_batches_for_current_epoch{
 
     // Return number_of_batches if in state 2
     if (current_state == ABR_STATE_2) {
-        let (no_of_batches) = no_of_batches_for_epoch.read(epoch=current_epoch);
+        let (no_of_batches) = calculate_current_no_of_batches();
         return (no_of_batches,);
     } else {
         return (0,);
@@ -261,15 +281,15 @@ func get_no_of_users_per_batch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, r
 @view
 func get_remaining_pay_abr_calls{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     ) -> (res: felt) {
+    alloc_locals;
     // Get current state and epoch
     let (current_state) = state.read();
-    let (current_epoch) = epoch.read();
-
-    // Get the no of batches and batches fetched
-    let (no_of_batches) = no_of_batches_for_epoch.read(epoch=current_epoch);
-    let (batches_fetched) = batches_fetched_for_epoch.read(epoch=current_epoch);
+    let (local current_epoch) = epoch.read();
 
     if (current_state == ABR_STATE_2) {
+        // Get the no of batches and batches fetched
+        let (no_of_batches) = calculate_current_no_of_batches();
+        let (batches_fetched) = batches_fetched_for_epoch.read(epoch=current_epoch);
         let remaining_batches = no_of_batches - batches_fetched;
         return (remaining_batches,);
     } else {
@@ -328,6 +348,20 @@ func get_abr_details{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check
     return (abr_value, abr_last_price);
 }
 
+// @notice Function to get the running sums of the ABR samples pushed for a market in an epoch
+// @param epoch_ - Epoch for which to get the running sums
+// @param market_id_ - Market Id for which to get the running sums
+// @returns res - ABRAccumulator struct of the market in the epoch
+@view
+func get_abr_accumulator{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    epoch_: felt, market_id_: felt
+) -> (res: ABRAccumulator) {
+    let (res: ABRAccumulator) = epoch_market_to_abr_accumulator.read(
+        epoch=epoch_, market_id=market_id_
+    );
+    return (res,);
+}
+
 // @notice Function to get the last n abr values for a market; if n > abr values set in the contract
 //         it'll return the sliced version of
 // @param starting_epoch_ - Epoch at which to begin populating abr values
@@ -534,8 +568,8 @@ func set_abr_timestamp{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     // Get no of users in a batch
     let (current_no_of_users_per_batch) = no_of_users_per_batch.read();
 
-    // Get the no of batches
-    let (no_of_batches) = calculate_no_of_batches(
+    // Get the no of batches; only accounts with open positions take part in ABR payments
+    let (no_of_batches) = calculate_no_of_active_trader_batches(
         current_no_of_users_per_batch_=current_no_of_users_per_batch,
         account_registry_address_=account_registry_address,
     );
@@ -553,9 +587,9 @@ func set_abr_timestamp{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
 // @notice Function to set the abr for a market
 // @requirements - Contract must be in state 1
 // @param market_id_ - Market Id for which the abr value is to be set
-// @param perp_index_len - Length of the perp_index array
+// @param perp_index_len - Length of the perp_index array; 0 to use the samples pushed in the epoch
 // @param perp_index - Perp Index array
-// @param perp_mark_len - Length of the perp_mark array
+// @param perp_mark_len - Length of the perp_mark array; 0 to use the samples pushed in the epoch
 // @param perp_mark - Perp Marke array
 @external
 func set_abr_value{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
@@ -608,16 +642,54 @@ func set_abr_value{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_p
     let (boll_width) = bollinger_width.read();
     let (base_abr) = base_abr_rate.read();
 
-    // Calculate abr from the inputs
-    let (abr_value: felt, abr_last_price: felt) = IABRCalculations.calculate_abr(
-        contract_address=abr_calculations_address,
-        perp_index_len=perp_index_len,
-        perp_index=perp_index,
-        perp_mark_len=perp_mark_len,
-        perp_mark=perp_mark,
-        boll_width_=boll_width,
-        base_abr_=base_abr,
-    );
+    local abr_value;
+    local abr_last_price;
+    if (perp_mark_len == 0) {
+        with_attr error_message(
+                "ABRCore: Index array length must be equal to Perp array length") {
+            assert perp_index_len = 0;
+        }
+
+        // Finalize the abr from the samples pushed during the epoch
+        let (accumulator: ABRAccumulator) = epoch_market_to_abr_accumulator.read(
+            epoch=current_epoch, market_id=market_id_
+        );
+
+        with_attr error_message("ABRCore: No ABR samples pushed for the market") {
+            assert_not_zero(accumulator.samples_count);
+        }
+
+        let (
+            accumulated_abr_value: felt, accumulated_abr_last_price: felt
+        ) = IABRCalculations.calculate_abr_from_accumulator(
+            contract_address=abr_calculations_address, accumulator_=accumulator, base_abr_=base_abr
+        );
+        assert abr_value = accumulated_abr_value;
+        assert abr_last_price = accumulated_abr_last_price;
+
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    } else {
+        // Calculate abr from the inputs
+        let (
+            calculated_abr_value: felt, calculated_abr_last_price: felt
+        ) = IABRCalculations.calculate_abr(
+            contract_address=abr_calculations_address,
+            perp_index_len=perp_index_len,
+            perp_index=perp_index,
+            perp_mark_len=perp_mark_len,
+            perp_mark=perp_mark,
+            boll_width_=boll_width,
+            base_abr_=base_abr,
+        );
+        assert abr_value = calculated_abr_value;
+        assert abr_last_price = calculated_abr_last_price;
+
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    }
 
     // Get all the tradable markets in the system
     let (markets_list_len_: felt, markets_list_: Market*) = IMarkets.get_all_markets_by_state(
@@ -649,6 +721,121 @@ func set_abr_value{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_p
     return ();
 }
 
+// @notice Function to push reduced ABR samples of a market during an epoch
+// @dev Each sample is the mean of 8 raw prices; the running sums are finalized by set_abr_value
+//      when it is called with empty arrays. Samples pushed in state 2 belong to the next epoch
+// @param market_id_ - Market Id for which the samples are pushed
+// @param index_prices_len - Length of the index_prices array
+// @param index_prices - Reduced index prices array
+// @param mark_prices_len - Length of the mark_prices array
+// @param mark_prices - Reduced mark prices array
+// @param last_price_ - Last raw mark price of the pushed samples
+@external
+func push_abr_samples{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt,
+    index_prices_len: felt,
+    index_prices: felt*,
+    mark_prices_len: felt,
+    mark_prices: felt*,
+    last_price_: felt,
+) {
+    alloc_locals;
+
+    // Get current state and epoch
+    let (current_state) = state.read();
+    let (current_epoch) = epoch.read();
+
+    // Get registry and version
+    let (registry) = CommonLib.get_registry_address();
+    let (version) = CommonLib.get_contract_version();
+
+    with_attr error_message("ABRCore: Index array length must be equal to Perp array length") {
+        assert index_prices_len = mark_prices_len;
+    }
+
+    with_attr error_message("ABRCore: No ABR samples passed") {
+        assert_not_zero(index_prices_len);
+    }
+
+    // Find the epoch for which the samples are collected
+    local accumulation_epoch;
+    if (current_state == ABR_STATE_2) {
+        accumulation_epoch = current_epoch + 1;
+    } else {
+        if (current_epoch == 0) {
+            accumulation_epoch = 1;
+        } else {
+            accumulation_epoch = current_epoch;
+        }
+    }
+
+    // Get ABR calculation address
+    let (abr_calculations_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=ABR_Calculations_INDEX, version=version
+    );
+
+    // Get Market address
+    let (markets_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=Market_INDEX, version=version
+    );
+
+    // Get Market details
+    let (market_details: Market) = IMarkets.get_market(
+        contract_address=markets_address, market_id_=market_id_
+    );
+
+    // Market must be tradable
+    with_attr error_message("ABRCore: Given Market is not tradable") {
+        assert market_details.is_tradable = TRUE;
+    }
+
+    // Check if the market's abr is already set
+    let (market_status) = abr_market_status.read(
+        epoch=accumulation_epoch, market_id=market_id_
+    );
+    with_attr error_message("ABRCore: ABR already set for the market") {
+        assert market_status = FALSE;
+    }
+
+    let (boll_width) = bollinger_width.read();
+    let (accumulator: ABRAccumulator) = epoch_market_to_abr_accumulator.read(
+        epoch=accumulation_epoch, market_id=market_id_
+    );
+
+    // Add the samples to the running sums
+    let (new_accumulator: ABRAccumulator) = push_abr_samples_recurse(
+        market_id_=market_id_,
+        abr_calculations_address_=abr_calculations_address,
+        boll_width_=boll_width,
+        accumulator_=accumulator,
+        index_prices_len_=index_prices_len,
+        index_prices_=index_prices,
+        mark_prices_=mark_prices,
+    );
+
+    epoch_market_to_abr_accumulator.write(
+        epoch=accumulation_epoch,
+        market_id=market_id_,
+        value=ABRAccumulator(
+            samples_count=new_accumulator.samples_count,
+            mark_sum=new_accumulator.mark_sum,
+            mark_sq_sum=new_accumulator.mark_sq_sum,
+            diff_sum=new_accumulator.diff_sum,
+            rate_sum=new_accumulator.rate_sum,
+            last_price=last_price_,
+        ),
+    );
+
+    // emit event
+    abr_samples_pushed.emit(
+        epoch=accumulation_epoch,
+        market_id=market_id_,
+        samples_count=new_accumulator.samples_count,
+    );
+
+    return ();
+}
+
 // @notice Function to make abr payments between users
 // @requirements - Contract must be in state 2
 @external
@@ -784,14 +971,22 @@ func check_abr_markets_status{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, ra
         markets_list_=markets_list_,
     );
 
-    // Increment the state if all markets are set
-    if (status == TRUE) {
-        state_changed.emit(epoch=current_epoch_, new_state=ABR_STATE_2);
-        state.write(value=ABR_STATE_2);
+    if (status == FALSE) {
         return ();
-    } else {
+    }
+
+    // If there are no active traders, there are no payments to be made for this epoch
+    let (no_of_batches) = calculate_current_no_of_batches();
+    no_of_batches_for_epoch.write(epoch=current_epoch_, value=no_of_batches);
+    if (no_of_batches == 0) {
+        complete_epoch(current_epoch_=current_epoch_);
         return ();
     }
+
+    // Increment the state if all markets are set
+    state_changed.emit(epoch=current_epoch_, new_state=ABR_STATE_2);
+    state.write(value=ABR_STATE_2);
+    return ();
 }
 
 // @notice Function to get the current batch (reverts if it crosses the set number of batches)
@@ -804,13 +999,14 @@ func get_current_batch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
 ) -> (users_list_len: felt, users_list: felt*) {
     alloc_locals;
 
-    // Get the current batch details
-    let (current_no_of_users_per_batch) = no_of_users_per_batch.read();
-    let (batches_fetched) = batches_fetched_for_epoch.read(epoch=current_epoch_);
-    let (no_of_batches) = no_of_batches_for_epoch.read(epoch=current_epoch_);
+    // Get the current batch details; accounts opening a position during the epoch are appended to the active traders
+    let (local current_no_of_users_per_batch) = no_of_users_per_batch.read();
+    let (local batches_fetched) = batches_fetched_for_epoch.read(epoch=current_epoch_);
+    let (local no_of_batches) = calculate_current_no_of_batches();
+    no_of_batches_for_epoch.write(epoch=current_epoch_, value=no_of_batches);
 
-    // Get the current batch
-    let (users_list_len: felt, users_list: felt*) = get_batch(
+    // Get the current batch of active traders
+    let (local users_list_len: felt, local users_list: felt*) = get_active_traders_batch(
         batch_id=batches_fetched,
         no_of_users_per_batch=current_no_of_users_per_batch,
         account_registry_address=account_registry_address_,
@@ -824,15 +1020,56 @@ func get_current_batch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
 
     // If all batches are fetched, increment state and epoch
     if (new_batches_fetched == no_of_batches) {
-        state_changed.emit(epoch=current_epoch_, new_state=ABR_STATE_0);
-        state.write(value=ABR_STATE_0);
-        epoch.write(current_epoch_ + 1);
+        complete_epoch(current_epoch_=current_epoch_);
         return (users_list_len, users_list);
     } else {
         return (users_list_len, users_list);
     }
 }
 
+// @notice Function to get the number of batches of active traders with the current no of users per batch
+// @returns no_of_batches - Number of batches
+func calculate_current_no_of_batches{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}() -> (no_of_batches: felt) {
+    let (registry) = CommonLib.get_registry_address();
+    let (version) = CommonLib.get_contract_version();
+    let (account_registry_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=AccountRegistry_INDEX, version=version
+    );
+    let (current_no_of_users_per_batch) = no_of_users_per_batch.read();
+
+    return calculate_no_of_active_trader_batches(
+        current_no_of_users_per_batch_=current_no_of_users_per_batch,
+        account_registry_address_=account_registry_address,
+    );
+}
+
+// @notice Function to move to state 0 and the next epoch once all payments of an epoch are made
+// @param current_epoch_ - Current epoch of ABRCore
+func complete_epoch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    current_epoch_: felt
+) {
+    alloc_locals;
+    state_changed.emit(epoch=current_epoch_, new_state=ABR_STATE_0);
+    state.write(value=ABR_STATE_0);
+    epoch.write(current_epoch_ + 1);
+
+    // Remove the accounts that closed all their positions while the epoch was in progress
+    let (registry) = CommonLib.get_registry_address();
+    let (version) = CommonLib.get_contract_version();
+    let (local account_registry_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=AccountRegistry_INDEX, version=version
+    );
+    let (removals_len) = IAccountRegistry.get_deferred_removals_len(
+        contract_address=account_registry_address
+    );
+    IAccountRegistry.remove_deferred_active_traders(
+        contract_address=account_registry_address, num_accounts_=removals_len
+    );
+    return ();
+}
+
 // @notice Internal recursive function to get the last n abr values for a market
 // @param abr_values_list_ - Array storing the populated abrdetails
 // @param market_id_ - Market Id for which to fetch the abr values
@@ -882,3 +1119,73 @@ func get_previous_abr_values_recurse{
         n_=n_ - 1,
     );
 }
+
+// @notice Recursive function to add reduced samples to the running sums of a market
+// @param market_id_ - Market Id for which the samples are pushed
+// @param abr_calculations_address_ - Address of the ABRCalculations contract
+// @param boll_width_ - Width of the boll band
+// @param accumulator_ - Current running sums
+// @param index_prices_len_ - Number of samples left
+// @param index_prices_ - Reduced index prices array
+// @param mark_prices_ - Reduced mark prices array
+// @returns accumulator - Running sums including all the samples
+func push_abr_samples_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt,
+    abr_calculations_address_: felt,
+    boll_width_: felt,
+    accumulator_: ABRAccumulator,
+    index_prices_len_: felt,
+    index_prices_: felt*,
+    mark_prices_: felt*,
+) -> (accumulator: ABRAccumulator) {
+    alloc_locals;
+
+    if (index_prices_len_ == 0) {
+        return (accumulator_,);
+    }
+
+    // The slot of the ring buffer being overwritten holds the sample leaving the window
+    let (_, local slot) = unsigned_div_rem(accumulator_.samples_count, ABR_WINDOW_SIZE);
+    let is_window_full = is_le(ABR_WINDOW_SIZE, accumulator_.samples_count);
+
+    local leaving_sample: ABRSample;
+    if (is_window_full == TRUE) {
+        let (window_sample: ABRSample) = market_to_abr_window_sample.read(
+            market_id=market_id_, slot=slot
+        );
+        assert leaving_sample = window_sample;
+
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    } else {
+        assert leaving_sample = ABRSample(mark_price=0, mark_price_sq=0, diff=0);
+
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    }
+
+    let (
+        local accumulator: ABRAccumulator, sample: ABRSample
+    ) = IABRCalculations.accumulate_abr_sample(
+        contract_address=abr_calculations_address_,
+        accumulator_=accumulator_,
+        leaving_sample_=leaving_sample,
+        index_price_=[index_prices_],
+        mark_price_=[mark_prices_],
+        boll_width_=boll_width_,
+    );
+
+    market_to_abr_window_sample.write(market_id=market_id_, slot=slot, value=sample);
+
+    return push_abr_samples_recurse(
+        market_id_=market_id_,
+        abr_calculations_address_=abr_calculations_address_,
+        boll_width_=boll_width_,
+        accumulator_=accumulator,
+        index_prices_len_=index_prices_len_ - 1,
+        index_prices_=index_prices_ + 1,
+        mark_prices_=mark_prices_ + 1,
+    );
+}
@@ -19,6 +19,7 @@ from starkware.starknet.common.syscalls import (
 
 from contracts.Constants import (
     ABR_PAYMENT_INDEX,
+    AccountRegistry_INDEX,
     Asset_INDEX,
     BUY,
     DELEVERAGING_ORDER,
@@ -43,6 +44,7 @@ from contracts.DataTypes import (
     LiquidatablePosition,
     Market,
     OrderRequest,
+    PackedPositionDetails,
     PositionDetails,
     PositionDetailsForRiskManagement,
     PositionDetailsWithMarket,
@@ -53,6 +55,7 @@ from contracts.DataTypes import (
 )
 
 from contracts.interfaces.IAccountLiquidator import IAccountLiquidator
+from contracts.interfaces.IAccountRegistry import IAccountRegistry
 from contracts.interfaces.IAsset import IAsset
 from contracts.interfaces.IAuthorizedRegistry import IAuthorizedRegistry
 from contracts.interfaces.IMarkets import IMarkets
@@ -60,6 +63,7 @@ from contracts.interfaces.IMarketPrices import IMarketPrices
 from contracts.interfaces.IWithdrawalFeeBalance import IWithdrawalFeeBalance
 from contracts.interfaces.IWithdrawalRequest import IWithdrawalRequest
 from contracts.libraries.CommonLibrary import CommonLib
+from contracts.libraries.PositionPacking import PositionPacking
 from contracts.Math_64x61 import (
     Math64x61_add,
     Math64x61_assert_le,
@@ -107,9 +111,9 @@ func account_deployed_block_number() -> (block_number: felt) {
 func margin_locked(asset_id: felt) -> (res: felt) {
 }
 
-// Mapping of marketID, direction to PositionDetails struct
+// Mapping of marketID, direction to the packed PositionDetails struct
 @storage_var
-func position_mapping(market_id: felt, direction: felt) -> (res: PositionDetails) {
+func packed_position_mapping(market_id: felt, direction: felt) -> (res: PackedPositionDetails) {
 }
 
 // Mapping of orderID to portionExecuted of that order
@@ -169,11 +173,41 @@ func withdrawal_history_array(index: felt) -> (res: WithdrawalHistory) {
 func withdrawal_history_array_len() -> (len: felt) {
 }
 
+// Stores the index of a request in the withdrawal history array, offset by 1 (0 if not present)
+@storage_var
+func withdrawal_history_index(request_id: felt) -> (index_plus_one: felt) {
+}
+
+// Stores the withdrawal history indices of all withdrawals with a status
+@storage_var
+func withdrawal_history_by_status(status: felt, index: felt) -> (history_index: felt) {
+}
+
+// Stores the number of withdrawals with a status
+@storage_var
+func withdrawal_history_by_status_len(status: felt) -> (len: felt) {
+}
+
+// Stores the position of a withdrawal in the list of its current status
+@storage_var
+func withdrawal_status_list_index(history_index: felt) -> (index: felt) {
+}
+
 // Stores the order_id to hash mapping
 @storage_var
 func order_id_mapping(order_id: felt) -> (hash: felt) {
 }
 
+// Stores the number of state changing calls made to the account
+@storage_var
+func modification_counter() -> (counter: felt) {
+}
+
+// Stores the block number of the last state changing call made to the account
+@storage_var
+func last_modified_block_number() -> (block_number: felt) {
+}
+
 // //////////////
 // Constructor //
 // //////////////
@@ -232,6 +266,18 @@ func get_account_deployed_block_number{
     return (block_number=block_number);
 }
 
+// @notice view function to get the modification info of the account, used by indexers to sync incrementally
+// @return counter - Number of state changing calls made to the account
+// @return last_modified_block_number - Block number of the last state changing call
+@view
+func get_modification_info{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() -> (
+    counter: felt, last_modified_block_number: felt
+) {
+    let (counter) = modification_counter.read();
+    let (block_number) = last_modified_block_number.read();
+    return (counter=counter, last_modified_block_number=block_number);
+}
+
 // @notice view function to check if the transaction signature is valid
 // @param hash - Hash of the transaction parameters
 // @param singature_len - Length of the signatures
@@ -497,7 +543,7 @@ func get_portion_executed{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
 func get_position_data{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     market_id_: felt, direction_: felt
 ) -> (res: PositionDetails) {
-    let (res) = position_mapping.read(market_id=market_id_, direction=direction_);
+    let (res) = read_position(market_id_=market_id_, direction_=direction_);
     return (res=res);
 }
 
@@ -619,6 +665,50 @@ func get_account_info{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_chec
     );
 }
 
+// @notice function to get a page of the positions corresponding to a collateral
+// @param collateral_id_ - collateral ID of the asset
+// @param starting_index_ - Index in the collateral's markets array from which to fetch the page
+// @param num_markets_ - Maximum number of markets to traverse in the page
+// @returns next_index - Index from which to fetch the next page, 0 if there are no more pages
+// @returns positions_array_len - Length of the array
+// @returns positions_array - Required array of positions
+@view
+func get_positions_paginated{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    collateral_id_: felt, starting_index_: felt, num_markets_: felt
+) -> (next_index: felt, positions_array_len: felt, positions_array: PositionDetailsWithMarket*) {
+    alloc_locals;
+    let (local markets_array_len) = collateral_to_market_array_len.read(
+        collateral_id=collateral_id_
+    );
+    let (local page_len) = get_page_len(markets_array_len, starting_index_, num_markets_);
+    local ending_index = starting_index_ + page_len;
+
+    // Get position to be liquidated or deleveraged
+    let liq_position: LiquidatablePosition = deleveragable_or_liquidatable_position.read(
+        collateral_id=collateral_id_
+    );
+
+    let (positions_array: PositionDetailsWithMarket*) = alloc();
+    let (
+        positions_array_len: felt, positions_array: PositionDetailsWithMarket*
+    ) = populate_positions(
+        positions_array_len_=0,
+        positions_array_=positions_array,
+        markets_iterator_=starting_index_,
+        markets_array_len_=ending_index,
+        current_collateral_id_=collateral_id_,
+        liq_position_=liq_position,
+    );
+
+    if (page_len == 0) {
+        return (0, positions_array_len, positions_array);
+    }
+    if (ending_index == markets_array_len) {
+        return (0, positions_array_len, positions_array);
+    }
+    return (ending_index, positions_array_len, positions_array);
+}
+
 // @notice view function to get L1 address of the user
 // @return res - L1 address of the user
 @view
@@ -651,6 +741,24 @@ func return_array_collaterals{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, ra
     return populate_array_collaterals(0, array_list, array_len);
 }
 
+// @notice view function to get a page of the user collaterals
+// @param starting_index_ - Index of the first collateral in the page
+// @param num_collaterals_ - Maximum number of collaterals in the page
+// @return array_list_len - Length of the array_list
+// @return array_list - List of CollateralBalance in the page
+@view
+func return_array_collaterals_paginated{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(starting_index_: felt, num_collaterals_: felt) -> (
+    array_list_len: felt, array_list: CollateralBalance*
+) {
+    alloc_locals;
+    let (array_len: felt) = collateral_array_len.read();
+    let (page_len) = get_page_len(array_len, starting_index_, num_collaterals_);
+    let (array_list: CollateralBalance*) = alloc();
+    return populate_array_collaterals_page(starting_index_, 0, page_len, array_list);
+}
+
 // @notice view function to get withdrawal history
 // @return withdrawal_list_len - Length of the withdrawal list
 // @return withdrawal_list - Fully populated list of withdrawals
@@ -672,8 +780,47 @@ func get_withdrawal_history_by_status{
     syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
 }(status_: felt) -> (withdrawal_list_len: felt, withdrawal_list: WithdrawalHistory*) {
     let (withdrawal_list: WithdrawalHistory*) = alloc();
+    let (list_len) = withdrawal_history_by_status_len.read(status_);
+    return populate_withdrawals_array_by_status(status_, 0, 0, list_len, withdrawal_list);
+}
+
+// @notice view function to get a page of the withdrawal history
+// @param starting_index_ - Index of the first withdrawal in the page
+// @param num_withdrawals_ - Maximum number of withdrawals in the page
+// @return withdrawal_list_len - Length of the withdrawal list
+// @return withdrawal_list - List of withdrawals in the page
+@view
+func get_withdrawal_history_paginated{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(starting_index_: felt, num_withdrawals_: felt) -> (
+    withdrawal_list_len: felt, withdrawal_list: WithdrawalHistory*
+) {
+    alloc_locals;
     let (arr_len) = withdrawal_history_array_len.read();
-    return populate_withdrawals_array_by_status(status_, 0, arr_len, 0, withdrawal_list);
+    let (page_len) = get_page_len(arr_len, starting_index_, num_withdrawals_);
+    let (withdrawal_list: WithdrawalHistory*) = alloc();
+    return populate_withdrawals_page(starting_index_, 0, page_len, withdrawal_list);
+}
+
+// @notice view function to get a page of the withdrawal history by status
+// @param status_ - Withdrawal history status
+// @param starting_index_ - Index of the first withdrawal in the page
+// @param num_withdrawals_ - Maximum number of withdrawals in the page
+// @return withdrawal_list_len - Length of the withdrawal list
+// @return withdrawal_list - List of withdrawals in the page
+@view
+func get_withdrawal_history_by_status_paginated{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(status_: felt, starting_index_: felt, num_withdrawals_: felt) -> (
+    withdrawal_list_len: felt, withdrawal_list: WithdrawalHistory*
+) {
+    alloc_locals;
+    let (list_len) = withdrawal_history_by_status_len.read(status_);
+    let (page_len) = get_page_len(list_len, starting_index_, num_withdrawals_);
+    let (withdrawal_list: WithdrawalHistory*) = alloc();
+    return populate_withdrawals_array_by_status(
+        status_, starting_index_, 0, page_len, withdrawal_list
+    );
 }
 
 // @notice view function to get amount to withdraw
@@ -782,6 +929,7 @@ func deposit{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     with_attr error_message("AccountManager: L1 address mismatch for deposit") {
         assert stored_L1_address = user;
     }
+    record_modification();
     // Get asset contract address
     let (asset_address) = IAuthorizedRegistry.get_contract_address(
         contract_address=registry, index=Asset_INDEX, version=version
@@ -844,6 +992,7 @@ func transfer_from{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_p
     with_attr error_message("AccountManager: Unauthorized caller for transfer_from") {
         assert caller = trading_address;
     }
+    record_modification();
 
     with_attr error_message("AccountManager: Amount cannot be negative") {
         assert_nn(amount_);
@@ -883,6 +1032,7 @@ func transfer{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     with_attr error_message("AccountManager: Unauthorized caller for transfer") {
         assert caller = trading_address;
     }
+    record_modification();
 
     with_attr error_message("AccountManager: Amount cannot be negative") {
         assert_nn(amount_);
@@ -919,6 +1069,8 @@ func transfer_from_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     position_size_: felt,
     abr_last_price_: felt,
 ) {
+    alloc_locals;
+
     // Check if the caller is ABR Payment
     let (caller) = get_caller_address();
     let (registry) = CommonLib.get_registry_address();
@@ -931,6 +1083,7 @@ func transfer_from_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     with_attr error_message("AccountManager: Unauthorized caller for transfer_from_abr") {
         assert caller = abr_payment_address;
     }
+    record_modification();
 
     with_attr error_message("AccountManager: Amount cannot be negative") {
         assert_le(0, amount_);
@@ -942,11 +1095,11 @@ func transfer_from_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     balance.write(assetID=collateral_id_, value=new_balance);
 
     // Get curent block_timestamp
-    let (block_timestamp) = get_block_timestamp();
+    let (local block_timestamp) = get_block_timestamp();
 
     // Get the details of the position
-    let (position_details: PositionDetails) = position_mapping.read(
-        market_id=market_id_, direction=direction_
+    let (local position_details: PositionDetails) = read_position(
+        market_id_=market_id_, direction_=direction_
     );
 
     // Calculate the new pnl
@@ -965,7 +1118,9 @@ func transfer_from_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     );
 
     // Write it to the position mapping
-    position_mapping.write(market_id=market_id_, direction=direction_, value=updated_position);
+    write_position(
+        market_id_=market_id_, direction_=direction_, position_details_=updated_position
+    );
 
     let (keys: felt*) = alloc();
     assert keys[0] = 'abr_transfer';
@@ -998,6 +1153,7 @@ func transfer_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_pt
     position_size_: felt,
     abr_last_price_: felt,
 ) {
+    alloc_locals;
     // Check if the caller is trading contract
     let (caller) = get_caller_address();
     let (registry) = CommonLib.get_registry_address();
@@ -1009,6 +1165,7 @@ func transfer_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_pt
     with_attr error_message("AccountManager: Unauthorized caller for transfer_abr") {
         assert caller = abr_payment_address;
     }
+    record_modification();
 
     with_attr error_message("AccountManager: Amount cannot be negative") {
         assert_le(0, amount_);
@@ -1020,11 +1177,11 @@ func transfer_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_pt
     balance.write(assetID=collateral_id_, value=new_balance);
 
     // Update the timestamp of last called
-    let (block_timestamp) = get_block_timestamp();
+    let (local block_timestamp) = get_block_timestamp();
 
     // Get the details of the position
-    let (position_details: PositionDetails) = position_mapping.read(
-        market_id=market_id_, direction=direction_
+    let (local position_details: PositionDetails) = read_position(
+        market_id_=market_id_, direction_=direction_
     );
 
     // Calculate the new pnl
@@ -1043,7 +1200,9 @@ func transfer_abr{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_pt
     );
 
     // Write it to the position mapping
-    position_mapping.write(market_id=market_id_, direction=direction_, value=updated_position);
+    write_position(
+        market_id_=market_id_, direction_=direction_, position_details_=updated_position
+    );
 
     let (keys: felt*) = alloc();
     assert keys[0] = 'abr_transfer';
@@ -1111,11 +1270,13 @@ func execute_order{
     }
 
     if (error_message_ == 0) {
+        record_modification();
+
         // Update the position mapping
-        position_mapping.write(
-            market_id=market_id_,
-            direction=execution_details_.direction,
-            value=updated_position_details_,
+        write_position(
+            market_id_=market_id_,
+            direction_=execution_details_.direction,
+            position_details_=updated_position_details_,
         );
 
         // Update the margin locked
@@ -1205,23 +1366,34 @@ func update_withdrawal_history{
     with_attr error_message("AccountManager: Unauthorized caller for withdrawal history updation") {
         assert caller = withdrawal_request_address;
     }
-    let (arr_len) = withdrawal_history_array_len.read();
-    let (index) = find_index_to_be_updated_recurse(request_id_, arr_len);
-    local index_to_be_updated = index;
-    if (index_to_be_updated != -1) {
-        let (history) = withdrawal_history_array.read(index=index_to_be_updated);
-        let updated_history = WithdrawalHistory(
-            request_id=history.request_id,
-            collateral_id=history.collateral_id,
-            amount=history.amount,
-            timestamp=history.timestamp,
-            node_operator_L2_address=history.node_operator_L2_address,
-            fee=history.fee,
-            status=WITHDRAWAL_SUCCEEDED,
-        );
-        withdrawal_history_array.write(index=index_to_be_updated, value=updated_history);
+    let (index_plus_one) = withdrawal_history_index.read(request_id=request_id_);
+    if (index_plus_one == 0) {
         return ();
     }
+
+    local index_to_be_updated = index_plus_one - 1;
+    let (local history: WithdrawalHistory) = withdrawal_history_array.read(
+        index=index_to_be_updated
+    );
+    if (history.status == WITHDRAWAL_SUCCEEDED) {
+        return ();
+    }
+    record_modification();
+
+    let updated_history = WithdrawalHistory(
+        request_id=history.request_id,
+        collateral_id=history.collateral_id,
+        amount=history.amount,
+        timestamp=history.timestamp,
+        node_operator_L2_address=history.node_operator_L2_address,
+        fee=history.fee,
+        status=WITHDRAWAL_SUCCEEDED,
+    );
+    withdrawal_history_array.write(index=index_to_be_updated, value=updated_history);
+
+    // Move the withdrawal to the list of succeeded withdrawals
+    remove_from_withdrawal_status_list(history.status, index_to_be_updated);
+    add_to_withdrawal_status_list(WITHDRAWAL_SUCCEEDED, index_to_be_updated);
     return ();
 }
 
@@ -1258,11 +1430,11 @@ func withdraw{
     let (hash) = hash_withdrawal_request(&hash_withdrawal_request_);
     // check if Tx is signed by the user
     is_valid_signature(hash, 2, signature_);
-    let (arr_len) = withdrawal_history_array_len.read();
-    let (result) = check_for_withdrawal_replay(request_id_, arr_len);
+    let (existing_index_plus_one) = withdrawal_history_index.read(request_id=request_id_);
     with_attr error_message("AccountManager: Withdrawal replay detected") {
-        assert_nn(result);
+        assert existing_index_plus_one = 0;
     }
+    record_modification();
     // Make sure 'amount' is positive.
     with_attr error_message("AccountManager: Amount cannot be negative") {
         assert_nn(amount_);
@@ -1350,6 +1522,8 @@ func withdraw{
     let (array_len) = withdrawal_history_array_len.read();
     withdrawal_history_array.write(index=array_len, value=withdrawal_history_);
     withdrawal_history_array_len.write(array_len + 1);
+    withdrawal_history_index.write(request_id=request_id_, value=array_len + 1);
+    add_to_withdrawal_status_list(WITHDRAWAL_INITIATED, array_len);
 
     // Event for withdrawal
     let (keys: felt*) = alloc();
@@ -1395,6 +1569,7 @@ func liquidate_position{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_ch
     with_attr error_message("AccountManager: Unauthorized caller for liquidate_position") {
         assert caller = liquidate_address;
     }
+    record_modification();
 
     local amount;
     local liquidatable;
@@ -1435,6 +1610,36 @@ func liquidate_position{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_ch
 // Internal //
 // ///////////
 
+// @notice Internal function to read a position from the packed position mapping
+// @param market_id_ - Market ID of the position
+// @param direction_ - Direction of the position
+// @returns res - PositionDetails struct
+func read_position{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt, direction_: felt
+) -> (res: PositionDetails) {
+    alloc_locals;
+    let (packed_position: PackedPositionDetails) = packed_position_mapping.read(
+        market_id=market_id_, direction=direction_
+    );
+    let (res: PositionDetails) = PositionPacking.unpack(packed_position);
+    return (res=res);
+}
+
+// @notice Internal function to write a position to the packed position mapping
+// @param market_id_ - Market ID of the position
+// @param direction_ - Direction of the position
+// @param position_details_ - PositionDetails struct to be stored
+func write_position{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt, direction_: felt, position_details_: PositionDetails
+) {
+    alloc_locals;
+    let (packed_position: PackedPositionDetails) = PositionPacking.pack(position_details_);
+    packed_position_mapping.write(
+        market_id=market_id_, direction=direction_, value=packed_position
+    );
+    return ();
+}
+
 func get_risk_parameters_position{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     position: PositionDetails,
     direction_: felt,
@@ -1517,13 +1722,13 @@ func get_margin_info_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, ran
     );
 
     // Get Long position
-    let (long_position: PositionDetails) = position_mapping.read(
-        market_id=curr_market_id, direction=LONG
+    let (long_position: PositionDetails) = read_position(
+        market_id_=curr_market_id, direction_=LONG
     );
 
     // Get Short position
-    let (short_position: PositionDetails) = position_mapping.read(
-        market_id=curr_market_id, direction=SHORT
+    let (short_position: PositionDetails) = read_position(
+        market_id_=curr_market_id, direction_=SHORT
     );
 
     let (market_price: felt) = IMarketPrices.get_market_price(
@@ -1818,11 +2023,30 @@ func populate_withdrawals_array{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*,
     return populate_withdrawals_array(iterator_ + 1, withdrawal_list_len_, withdrawal_list_);
 }
 
+// @notice Internal Function called by get_withdrawal_history_paginated to recursively add WithdrawalRequest to the array and return it
+// @param starting_index_ - Index of the first withdrawal in the page
+// @param iterator_ - Index in the page being populated
+// @param page_len_ - Length of the page
+// @param withdrawal_list_ - Array of WithdrawalRequest filled up to the index
+// @return withdrawal_list_len - Length of the withdrawal_list
+// @return withdrawal_list - Fully populated list of Withdrawals
+func populate_withdrawals_page{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    starting_index_: felt, iterator_: felt, page_len_: felt, withdrawal_list_: WithdrawalHistory*
+) -> (withdrawal_list_len: felt, withdrawal_list: WithdrawalHistory*) {
+    if (iterator_ == page_len_) {
+        return (page_len_, withdrawal_list_);
+    }
+
+    let (withdrawal_history) = withdrawal_history_array.read(index=starting_index_ + iterator_);
+    assert withdrawal_list_[iterator_] = withdrawal_history;
+    return populate_withdrawals_page(starting_index_, iterator_ + 1, page_len_, withdrawal_list_);
+}
+
 // @notice Internal Function called by get_withdrawal_history_by_status to recursively add WithdrawalRequest to the array and return it
 // @param status_ - Status of the withdrawal
-// @param iterator_ - Index to fetch withdrawal history
-// @param withdrawal_array_len_ - Length of withdrawals array
-// @param withdrawal_list_len_ - Stores the current length of the populated withdrawals array
+// @param starting_index_ - Index in the status list of the first withdrawal in the page
+// @param iterator_ - Index in the page being populated
+// @param page_len_ - Length of the page
 // @param withdrawal_list_ - Array of WithdrawalRequest filled up to the index
 // @return withdrawal_list_len - Length of the withdrawal_list
 // @return withdrawal_list - Fully populated list of Withdrawals
@@ -1830,30 +2054,61 @@ func populate_withdrawals_array_by_status{
     syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
 }(
     status_: felt,
+    starting_index_: felt,
     iterator_: felt,
-    withdrawal_array_len_: felt,
-    withdrawal_list_len_: felt,
+    page_len_: felt,
     withdrawal_list_: WithdrawalHistory*,
 ) -> (withdrawal_list_len: felt, withdrawal_list: WithdrawalHistory*) {
-    alloc_locals;
-    if (iterator_ == withdrawal_array_len_) {
-        return (withdrawal_list_len_, withdrawal_list_);
+    if (iterator_ == page_len_) {
+        return (page_len_, withdrawal_list_);
     }
 
-    local withdrawal_list_len;
-    let (withdrawal_history) = withdrawal_history_array.read(index=iterator_);
-    if (withdrawal_history.status == status_) {
-        assert withdrawal_list_[withdrawal_list_len_] = withdrawal_history;
-        withdrawal_list_len = withdrawal_list_len_ + 1;
-    } else {
-        withdrawal_list_len = withdrawal_list_len_;
-    }
+    let (history_index) = withdrawal_history_by_status.read(
+        status=status_, index=starting_index_ + iterator_
+    );
+    let (withdrawal_history) = withdrawal_history_array.read(index=history_index);
+    assert withdrawal_list_[iterator_] = withdrawal_history;
 
     return populate_withdrawals_array_by_status(
-        status_, iterator_ + 1, withdrawal_array_len_, withdrawal_list_len, withdrawal_list_
+        status_, starting_index_, iterator_ + 1, page_len_, withdrawal_list_
     );
 }
 
+// @notice Internal function to get the length of a page of a list
+// @param list_len_ - Length of the list being paginated
+// @param starting_index_ - Index of the first element in the page
+// @param page_size_ - Maximum number of elements in the page
+// @return page_len - Length of the page, 0 if it starts after the end of the list
+func get_page_len{range_check_ptr}(list_len_: felt, starting_index_: felt, page_size_: felt) -> (
+    page_len: felt
+) {
+    with_attr error_message("AccountManager: Invalid pagination parameters") {
+        assert_nn(starting_index_);
+        assert_nn(page_size_);
+    }
+
+    let is_out_of_range = is_le(list_len_, starting_index_);
+    if (is_out_of_range == TRUE) {
+        return (0,);
+    }
+
+    // Truncate the page to the end of the list
+    let is_truncated = is_le(list_len_, starting_index_ + page_size_);
+    if (is_truncated == TRUE) {
+        return (list_len_ - starting_index_,);
+    }
+    return (page_size_,);
+}
+
+// @notice Internal function to record a state changing call made to the account
+func record_modification{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() {
+    let (counter) = modification_counter.read();
+    modification_counter.write(counter + 1);
+    let (block_number) = get_block_number();
+    last_modified_block_number.write(block_number);
+    return ();
+}
+
 // @notice Internal Function called by return_array_collaterals to recursively add collateralBalance to the array and return it
 // @param array_list_len_ - Stores the current length of the populated array
 // @param array_list_ - Array of CollateralBalance filled up to the index
@@ -1876,6 +2131,30 @@ func populate_array_collaterals{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*,
     return populate_array_collaterals(array_list_len_ + 1, array_list_, final_len_);
 }
 
+// @notice Internal Function called by return_array_collaterals_paginated to recursively add collateralBalance to the page
+// @param index_ - Index of the current collateral in the collateral array
+// @param iterator_ - Stores the current length of the populated page
+// @param page_len_ - Length of the page
+// @param array_list_ - Array of CollateralBalance filled up to the iterator
+// @return array_list_len - Length of the array_list
+// @return array_list - Fully populated page of CollateralBalance
+func populate_array_collaterals_page{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(index_: felt, iterator_: felt, page_len_: felt, array_list_: CollateralBalance*) -> (
+    array_list_len: felt, array_list: CollateralBalance*
+) {
+    if (iterator_ == page_len_) {
+        return (iterator_, array_list_);
+    }
+
+    let (collateral_id) = collateral_array.read(index=index_);
+    let (collateral_balance: felt) = balance.read(assetID=collateral_id);
+    assert array_list_[iterator_] = CollateralBalance(
+        assetID=collateral_id, balance=collateral_balance
+    );
+    return populate_array_collaterals_page(index_ + 1, iterator_ + 1, page_len_, array_list_);
+}
+
 // @notice Internal Function called by get_positions to recursively add active positions to the array and return it
 // @param positions_array_len_ - Length of the array
 // @param positions_array_ - Required array of positions
@@ -1906,13 +2185,13 @@ func populate_positions{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_ch
     );
 
     // Get Long position
-    let (long_position: PositionDetails) = position_mapping.read(
-        market_id=curr_market_id, direction=LONG
+    let (long_position: PositionDetails) = read_position(
+        market_id_=curr_market_id, direction_=LONG
     );
 
     // Get Short position
-    let (short_position: PositionDetails) = position_mapping.read(
-        market_id=curr_market_id, direction=SHORT
+    let (short_position: PositionDetails) = read_position(
+        market_id_=curr_market_id, direction_=SHORT
     );
 
     // Get asset token decimal
@@ -2105,13 +2384,13 @@ func populate_simplified_positions{syscall_ptr: felt*, pedersen_ptr: HashBuiltin
     );
 
     // Get Long position
-    let (long_position: PositionDetails) = position_mapping.read(
-        market_id=curr_market_id, direction=LONG
+    let (long_position: PositionDetails) = read_position(
+        market_id_=curr_market_id, direction_=LONG
     );
 
     // Get Short position
-    let (short_position: PositionDetails) = position_mapping.read(
-        market_id=curr_market_id, direction=SHORT
+    let (short_position: PositionDetails) = read_position(
+        market_id_=curr_market_id, direction_=SHORT
     );
 
     // Get asset token decimal
@@ -2356,6 +2635,14 @@ func add_to_market_array{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
     market_to_index_mapping.write(market_id=market_id_, value=arr_len);
     collateral_to_market_array_len.write(collateral_id=collateral_id_, value=arr_len + 1);
     market_is_exist.write(market_id=market_id_, value=TRUE);
+
+    // Make sure the account is part of the active traders index used for ABR payments
+    let (registry) = CommonLib.get_registry_address();
+    let (version) = CommonLib.get_contract_version();
+    let (account_registry_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=AccountRegistry_INDEX, version=version
+    );
+    IAccountRegistry.add_to_active_traders(contract_address=account_registry_address);
     return ();
 }
 
@@ -2385,9 +2672,48 @@ func remove_from_market_array{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, ra
     market_to_index_mapping.write(market_id=market_id_, value=0);
     market_is_exist.write(market_id=market_id_, value=FALSE);
     collateral_to_market_array_len.write(collateral_id=collateral_id_, value=arr_len - 1);
+
+    // If this was the last open market of the account, remove it from the active traders index
+    let (collateral_array_len_) = collateral_array_len.read();
+    let (open_markets_count) = get_open_markets_count_recurse(
+        collateral_array_iterator_=0, collateral_array_len_=collateral_array_len_, count_=0
+    );
+    if (open_markets_count == 0) {
+        let (registry) = CommonLib.get_registry_address();
+        let (version) = CommonLib.get_contract_version();
+        let (account_registry_address) = IAuthorizedRegistry.get_contract_address(
+            contract_address=registry, index=AccountRegistry_INDEX, version=version
+        );
+        IAccountRegistry.remove_from_active_traders(contract_address=account_registry_address);
+        return ();
+    }
     return ();
 }
 
+// @notice Internal function to count the markets with open positions across all collaterals
+// @param collateral_array_iterator_ - Iterator to the collateral array
+// @param collateral_array_len_ - Length of the collateral array
+// @param count_ - Number of markets counted so far
+// @return count - Number of markets with open positions
+func get_open_markets_count_recurse{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(collateral_array_iterator_: felt, collateral_array_len_: felt, count_: felt) -> (count: felt) {
+    if (collateral_array_iterator_ == collateral_array_len_) {
+        return (count_,);
+    }
+
+    let (current_collateral_id) = collateral_array.read(index=collateral_array_iterator_);
+    let (current_markets_array_len) = collateral_to_market_array_len.read(
+        collateral_id=current_collateral_id
+    );
+
+    return get_open_markets_count_recurse(
+        collateral_array_iterator_=collateral_array_iterator_ + 1,
+        collateral_array_len_=collateral_array_len_,
+        count_=count_ + current_markets_array_len,
+    );
+}
+
 // @notice Internal function to add collateral to the array
 // @param new_asset_id - asset Id to be added
 // @param iterator - index at which an asset to be added
@@ -2411,40 +2737,36 @@ func add_collateral{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_
     return add_collateral(new_asset_id=new_asset_id, iterator=iterator + 1, length=length);
 }
 
-// @notice Internal function to recursively find the index of the withdrawal history to be updated
-// @param request_id_ - Id of the withdrawal request
-// @param arr_len_ - current index which is being checked to be updated
-// @return index - returns the index which needs to be updated
-func find_index_to_be_updated_recurse{
+// @notice Internal function to add a withdrawal to the list of a status
+// @param status_ - Status of the withdrawal
+// @param history_index_ - Index of the withdrawal in the withdrawal history array
+func add_to_withdrawal_status_list{
     syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
-}(request_id_: felt, arr_len_: felt) -> (index: felt) {
-    if (arr_len_ == 0) {
-        return (-1,);
-    }
-
-    let (request: WithdrawalHistory) = withdrawal_history_array.read(index=arr_len_ - 1);
-    if (request.request_id == request_id_) {
-        return (arr_len_ - 1,);
-    }
-
-    return find_index_to_be_updated_recurse(request_id_, arr_len_ - 1);
+}(status_: felt, history_index_: felt) {
+    let (list_len) = withdrawal_history_by_status_len.read(status=status_);
+    withdrawal_history_by_status.write(status=status_, index=list_len, value=history_index_);
+    withdrawal_status_list_index.write(history_index=history_index_, value=list_len);
+    withdrawal_history_by_status_len.write(status=status_, value=list_len + 1);
+    return ();
 }
 
-// @notice Internal function to recursively check for withdrawal replays
-// @param request_id_ - Id of the withdrawal request
-// @param arr_len_ - current index which is being checked to be updated
-// @return - -1 if same withdrawal request already exists, else 1
-func check_for_withdrawal_replay{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
-    request_id_: felt, arr_len_: felt
-) -> (index: felt) {
-    if (arr_len_ == 0) {
-        return (1,);
-    }
-
-    let (request: WithdrawalHistory) = withdrawal_history_array.read(index=arr_len_ - 1);
-    if (request.request_id == request_id_) {
-        return (-1,);
-    }
+// @notice Internal function to remove a withdrawal from the list of a status
+// The last withdrawal of the list is moved into its place
+// @param status_ - Status of the withdrawal
+// @param history_index_ - Index of the withdrawal in the withdrawal history array
+func remove_from_withdrawal_status_list{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(status_: felt, history_index_: felt) {
+    alloc_locals;
+    let (local list_len) = withdrawal_history_by_status_len.read(status=status_);
+    let (index) = withdrawal_status_list_index.read(history_index=history_index_);
+    let (last_history_index) = withdrawal_history_by_status.read(
+        status=status_, index=list_len - 1
+    );
 
-    return check_for_withdrawal_replay(request_id_, arr_len_ - 1);
+    withdrawal_history_by_status.write(status=status_, index=index, value=last_history_index);
+    withdrawal_status_list_index.write(history_index=last_history_index, value=index);
+    withdrawal_history_by_status.write(status=status_, index=list_len - 1, value=0);
+    withdrawal_history_by_status_len.write(status=status_, value=list_len - 1);
+    return ();
 }
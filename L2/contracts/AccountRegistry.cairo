@@ -1,13 +1,20 @@
 %lang starknet
 
 from starkware.cairo.common.alloc import alloc
-from starkware.cairo.common.bool import FALSE
+from starkware.cairo.common.bool import FALSE, TRUE
 from starkware.cairo.common.cairo_builtins import HashBuiltin
 from starkware.cairo.common.math import assert_le, assert_lt, assert_nn, assert_not_zero
 from starkware.cairo.common.math_cmp import is_le
 from starkware.starknet.common.syscalls import get_caller_address
 
-from contracts.Constants import AccountDeployer_INDEX, MasterAdmin_ACTION
+from contracts.Constants import (
+    ABR_Core_Index,
+    ABR_STATE_0,
+    AccountDeployer_INDEX,
+    MasterAdmin_ACTION,
+)
+from contracts.interfaces.IABRCore import IABRCore
+from contracts.interfaces.IAccountManager import IAccountManager
 from contracts.interfaces.IAuthorizedRegistry import IAuthorizedRegistry
 from contracts.libraries.CommonLibrary import CommonLib
 from contracts.libraries.Utils import verify_caller_authority
@@ -31,6 +38,41 @@ func account_registry_len() -> (len: felt) {
 func account_present(address: felt) -> (present: felt) {
 }
 
+// Stores account contract addresses of users with at least one open position
+@storage_var
+func active_traders(index: felt) -> (address: felt) {
+}
+
+// Stores length of the active traders array
+@storage_var
+func active_traders_len() -> (len: felt) {
+}
+
+// Stores account contract address to index mapping in the active traders array
+@storage_var
+func active_trader_index(address: felt) -> (index: felt) {
+}
+
+// Stores account contract address to boolean mapping to check whether a user is an active trader
+@storage_var
+func active_trader_present(address: felt) -> (present: felt) {
+}
+
+// Stores account contract addresses whose removal from the active traders array is deferred
+@storage_var
+func deferred_removals(index: felt) -> (address: felt) {
+}
+
+// Stores length of the deferred removals array
+@storage_var
+func deferred_removals_len() -> (len: felt) {
+}
+
+// Stores account contract address to boolean mapping to check whether its removal is deferred
+@storage_var
+func deferred_removal_present(address: felt) -> (present: felt) {
+}
+
 // //////////////
 // Constructor //
 // //////////////
@@ -100,6 +142,82 @@ func get_batch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     );
 }
 
+// @notice Function to check whether a user has at least one open position
+// @param address_ Address of the user that is to be checked
+// @returns present - 0 if not an active trader, 1 if an active trader
+@view
+func is_active_trader{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    address_: felt
+) -> (present: felt) {
+    let (present) = active_trader_present.read(address=address_);
+    return (present,);
+}
+
+// @notice Function to get the length of the active traders array
+// @returns len - length of the active traders array
+@view
+func get_active_traders_len{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    ) -> (len: felt) {
+    let (traders_len) = active_traders_len.read();
+    return (traders_len,);
+}
+
+// @notice Helper function to get a batch of active traders
+// @param starting_index_ - Index at which begin populating the array
+// @param ending_index_ - Upper limit of the batch
+// @returns active_traders_list_len - Length of the batch
+// @returns active_traders_list - Batch of active trader addresses
+@view
+func get_active_traders_batch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    starting_index_: felt, ending_index_: felt
+) -> (active_traders_list_len: felt, active_traders_list: felt*) {
+    alloc_locals;
+
+    local ending_index;
+    let (traders_len) = active_traders_len.read();
+    let is_longer = is_le(traders_len, ending_index_);
+
+    // Check if batch must be truncated
+    if (is_longer == 1) {
+        ending_index = traders_len;
+    } else {
+        ending_index = ending_index_;
+    }
+
+    let (active_traders_list: felt*) = alloc();
+    let is_empty = is_le(ending_index, starting_index_);
+    if (is_empty == 1) {
+        return (0, active_traders_list);
+    }
+
+    return populate_active_traders(
+        iterator_=0,
+        starting_index_=starting_index_,
+        ending_index_=ending_index,
+        active_traders_list_=active_traders_list,
+    );
+}
+
+// @notice Function to get the number of active trader removals deferred during ABR payments
+// @returns len - length of the deferred removals array
+@view
+func get_deferred_removals_len{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    ) -> (len: felt) {
+    let (removals_len) = deferred_removals_len.read();
+    return (removals_len,);
+}
+
+// @notice Function to check whether the removal of an account from the active traders is deferred
+// @param address_ Address of the user that is to be checked
+// @returns present - 0 if not deferred, 1 if deferred
+@view
+func is_removal_deferred{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    address_: felt
+) -> (present: felt) {
+    let (present) = deferred_removal_present.read(address=address_);
+    return (present,);
+}
+
 // @notice Function to get all user account addresses
 // @param starting_index_ - Index from which to fetch the array
 // @param num_accounts - Number of accounts to fetch from the array
@@ -127,6 +245,53 @@ func get_account_registry{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
     return populate_account_registry(0, starting_index_, ending_index, account_registry_list);
 }
 
+// @notice Function to get the accounts modified at or after a block, scanning one page of the registry
+// @param block_number_ - Block number from which to consider an account as modified
+// @param starting_index_ - Index of the registry from which to scan
+// @param num_accounts_ - Maximum number of registry entries to scan
+// @returns next_index - Index from which to scan the next page, 0 if the end of the registry is reached
+// @returns account_registry_len - Length of the list of modified accounts
+// @returns account_registry - List of modified account addresses
+@view
+func get_accounts_modified_since{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    block_number_: felt, starting_index_: felt, num_accounts_: felt
+) -> (next_index: felt, account_registry_len: felt, account_registry: felt*) {
+    alloc_locals;
+    with_attr error_message("AccountRegistry: Invalid pagination parameters") {
+        assert_nn(starting_index_);
+        assert_nn(num_accounts_);
+    }
+
+    local ending_index;
+    local next_index;
+    let (local reg_len) = account_registry_len.read();
+    let is_longer = is_le(reg_len, starting_index_ + num_accounts_);
+
+    // Check if the page must be truncated
+    if (is_longer == TRUE) {
+        ending_index = reg_len;
+        next_index = 0;
+    } else {
+        ending_index = starting_index_ + num_accounts_;
+        next_index = starting_index_ + num_accounts_;
+    }
+
+    let is_out_of_range = is_le(reg_len, starting_index_);
+    let (account_registry_list: felt*) = alloc();
+    if (is_out_of_range == TRUE) {
+        return (0, 0, account_registry_list);
+    }
+
+    let (modified_len: felt, modified_list: felt*) = populate_modified_accounts(
+        iterator_=0,
+        starting_index_=starting_index_,
+        ending_index_=ending_index,
+        block_number_=block_number_,
+        account_registry_list_=account_registry_list,
+    );
+    return (next_index, modified_len, modified_list);
+}
+
 // ///////////
 // External //
 // ///////////
@@ -208,6 +373,77 @@ func remove_from_account_registry{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*
     account_registry_len.write(reg_len - 1);
     account_present.write(address=account_address, value=FALSE);
 
+    // A removed account must not be picked up by ABR batches anymore
+    remove_or_defer_active_trader(address_=account_address);
+    return ();
+}
+
+// @notice External function called by an account contract when it opens a position in a new market
+// @dev Idempotent; accounts already present in the active traders array are ignored
+@external
+func add_to_active_traders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() {
+    let (caller) = get_caller_address();
+    let (is_registered) = account_present.read(address=caller);
+    with_attr error_message("AccountRegistry: Unauthorized caller for add_to_active_traders") {
+        assert is_registered = TRUE;
+    }
+
+    // An account opening a position again must not be removed when the deferred removals are processed
+    deferred_removal_present.write(address=caller, value=FALSE);
+
+    let (is_active) = active_trader_present.read(address=caller);
+    if (is_active == TRUE) {
+        return ();
+    }
+
+    let (traders_len) = active_traders_len.read();
+    active_traders.write(index=traders_len, value=caller);
+    active_trader_index.write(address=caller, value=traders_len);
+    active_traders_len.write(traders_len + 1);
+    active_trader_present.write(address=caller, value=TRUE);
+    return ();
+}
+
+// @notice External function called by an account contract when all of its positions are closed
+// @dev Removal is deferred while ABR payments are in progress, since ABRCore iterates the array by index
+@external
+func remove_from_active_traders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    ) {
+    let (caller) = get_caller_address();
+    remove_or_defer_active_trader(address_=caller);
+    return ();
+}
+
+// @notice External function to process the active trader removals deferred during ABR payments
+// @dev Called by ABRCore when an epoch is complete; anyone can call it to process the removals in parts
+// @param num_accounts_ - Maximum number of deferred removals to process
+@external
+func remove_deferred_active_traders{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(num_accounts_: felt) {
+    alloc_locals;
+    with_attr error_message("AccountRegistry: Number of accounts cannot be negative") {
+        assert_nn(num_accounts_);
+    }
+
+    let (is_in_progress) = is_abr_in_progress();
+    with_attr error_message("AccountRegistry: ABR payments are in progress") {
+        assert is_in_progress = FALSE;
+    }
+
+    local num_removals;
+    let (local removals_len) = deferred_removals_len.read();
+    let is_longer = is_le(removals_len, num_accounts_);
+    if (is_longer == TRUE) {
+        num_removals = removals_len;
+    } else {
+        num_removals = num_accounts_;
+    }
+
+    remove_deferred_active_traders_recurse(
+        removals_len_=removals_len, num_removals_=num_removals
+    );
+    deferred_removals_len.write(removals_len - num_removals);
     return ();
 }
 
@@ -215,6 +451,131 @@ func remove_from_account_registry{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*
 // Internal //
 // ///////////
 
+// @notice Internal function to check whether ABRCore is in the middle of an epoch
+// @returns res - 1 if ABR values are being set or paid, 0 otherwise
+func is_abr_in_progress{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() -> (
+    res: felt
+) {
+    let (registry) = CommonLib.get_registry_address();
+    let (version) = CommonLib.get_contract_version();
+    let (abr_core_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=ABR_Core_Index, version=version
+    );
+    if (abr_core_address == 0) {
+        return (FALSE,);
+    }
+
+    let (abr_state) = IABRCore.get_state(contract_address=abr_core_address);
+    if (abr_state == ABR_STATE_0) {
+        return (FALSE,);
+    }
+    return (TRUE,);
+}
+
+// @notice Internal function to remove an account from the active traders, or defer it while ABR is in progress
+// @param address_ - Address of the account to be removed
+func remove_or_defer_active_trader{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    address_: felt
+) {
+    let (is_active) = active_trader_present.read(address=address_);
+    if (is_active == FALSE) {
+        return ();
+    }
+
+    let (is_in_progress) = is_abr_in_progress();
+    if (is_in_progress == FALSE) {
+        remove_active_trader(address_=address_);
+        return ();
+    }
+
+    // Batches of the current epoch are addressed by index, so the account is removed once it is complete
+    let (is_deferred) = deferred_removal_present.read(address=address_);
+    if (is_deferred == TRUE) {
+        return ();
+    }
+
+    let (removals_len) = deferred_removals_len.read();
+    deferred_removals.write(index=removals_len, value=address_);
+    deferred_removals_len.write(removals_len + 1);
+    deferred_removal_present.write(address=address_, value=TRUE);
+    return ();
+}
+
+// @notice Internal function to process deferred removals from the end of the deferred removals array
+// @param removals_len_ - Current length of the deferred removals array
+// @param num_removals_ - Number of deferred removals left to process
+func remove_deferred_active_traders_recurse{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(removals_len_: felt, num_removals_: felt) {
+    alloc_locals;
+    if (num_removals_ == 0) {
+        return ();
+    }
+
+    let (local address) = deferred_removals.read(index=removals_len_ - 1);
+    deferred_removals.write(index=removals_len_ - 1, value=0);
+
+    // Accounts that opened a position again since are no longer flagged
+    let (is_deferred) = deferred_removal_present.read(address=address);
+    if (is_deferred == TRUE) {
+        deferred_removal_present.write(address=address, value=FALSE);
+        let (is_active) = active_trader_present.read(address=address);
+        if (is_active == TRUE) {
+            remove_active_trader(address_=address);
+            return remove_deferred_active_traders_recurse(
+                removals_len_=removals_len_ - 1, num_removals_=num_removals_ - 1
+            );
+        }
+        return remove_deferred_active_traders_recurse(
+            removals_len_=removals_len_ - 1, num_removals_=num_removals_ - 1
+        );
+    }
+
+    return remove_deferred_active_traders_recurse(
+        removals_len_=removals_len_ - 1, num_removals_=num_removals_ - 1
+    );
+}
+
+// @notice Internal function to remove an address from the active traders array by swapping in the last element
+// @param address_ - Address of the account to be removed
+func remove_active_trader{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    address_: felt
+) {
+    let (index) = active_trader_index.read(address=address_);
+    let (traders_len) = active_traders_len.read();
+    let (last_address) = active_traders.read(index=traders_len - 1);
+
+    active_traders.write(index=index, value=last_address);
+    active_trader_index.write(address=last_address, value=index);
+    active_traders.write(index=traders_len - 1, value=0);
+
+    active_trader_index.write(address=address_, value=0);
+    active_trader_present.write(address=address_, value=FALSE);
+    active_traders_len.write(traders_len - 1);
+    return ();
+}
+
+// @notice Internal Function called by get_active_traders_batch to recursively add active traders to the array and return it
+// @param iterator_ - The index of pointer of the array to be returned
+// @param starting_index_ - The current index of the active traders array
+// @param ending_index_ - The index at which to stop
+// @param active_traders_list_ - Active traders filled up to the index
+// @returns active_traders_list_len - Length of the active traders list
+// @returns active_traders_list - List of active trader addresses
+func populate_active_traders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    iterator_: felt, starting_index_: felt, ending_index_: felt, active_traders_list_: felt*
+) -> (active_traders_list_len: felt, active_traders_list: felt*) {
+    if (starting_index_ == ending_index_) {
+        return (iterator_, active_traders_list_);
+    }
+    let (address) = active_traders.read(index=starting_index_);
+
+    assert active_traders_list_[iterator_] = address;
+    return populate_active_traders(
+        iterator_ + 1, starting_index_ + 1, ending_index_, active_traders_list_
+    );
+}
+
 // @notice Internal Function called by get_account_registry to recursively add accounts to the registry and return it
 // @param iterator_ - The index of pointer of the array to be returned
 // @param starting_index_ - The current index of the registry array
@@ -235,3 +596,39 @@ func populate_account_registry{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, r
         iterator_ + 1, starting_index_ + 1, ending_index_, account_registry_list_
     );
 }
+
+// @notice Internal Function called by get_accounts_modified_since to recursively add modified accounts to the list
+// @param iterator_ - The index of pointer of the array to be returned
+// @param starting_index_ - The current index of the registry array
+// @param ending_index_ - The index at which to stop
+// @param block_number_ - Block number from which to consider an account as modified
+// @param account_registry_list_ - Modified accounts filled up to the iterator
+// @returns account_registry_len - Length of the list of modified accounts
+// @returns account_registry - List of modified account addresses
+func populate_modified_accounts{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    iterator_: felt,
+    starting_index_: felt,
+    ending_index_: felt,
+    block_number_: felt,
+    account_registry_list_: felt*,
+) -> (account_registry_len: felt, account_registry: felt*) {
+    alloc_locals;
+    if (starting_index_ == ending_index_) {
+        return (iterator_, account_registry_list_);
+    }
+    let (local address) = account_registry.read(index=starting_index_);
+    let (_, last_modified_block_number) = IAccountManager.get_modification_info(
+        contract_address=address
+    );
+
+    let is_modified = is_le(block_number_, last_modified_block_number);
+    if (is_modified == TRUE) {
+        assert account_registry_list_[iterator_] = address;
+        return populate_modified_accounts(
+            iterator_ + 1, starting_index_ + 1, ending_index_, block_number_, account_registry_list_
+        );
+    }
+    return populate_modified_accounts(
+        iterator_, starting_index_ + 1, ending_index_, block_number_, account_registry_list_
+    );
+}
@@ -175,6 +175,34 @@ func get_metadata_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     return (link_len, link);
 }
 
+// @notice View function to read asset icon link with 31 characters packed per felt
+// @return link_len - Length of link string
+// @return packed_link_len - Number of felts in packed_link
+// @return packed_link - Link characters, packed as Cairo short strings
+@view
+func get_icon_link_packed{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    id: felt
+) -> (link_len: felt, packed_link_len: felt, packed_link: felt*) {
+    let (link_len, packed_link_len, packed_link) = StringLib.read_packed_string(
+        type=ICON_LINK_TYPE, id=id
+    );
+    return (link_len, packed_link_len, packed_link);
+}
+
+// @notice View function to read asset metadata link with 31 characters packed per felt
+// @return link_len - Length of link string
+// @return packed_link_len - Number of felts in packed_link
+// @return packed_link - Link characters, packed as Cairo short strings
+@view
+func get_metadata_link_packed{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    id: felt
+) -> (link_len: felt, packed_link_len: felt, packed_link: felt*) {
+    let (link_len, packed_link_len, packed_link) = StringLib.read_packed_string(
+        type=METADATA_LINK_TYPE, id=id
+    );
+    return (link_len, packed_link_len, packed_link);
+}
+
 // ///////////
 // External //
 // ///////////
@@ -394,6 +422,21 @@ func update_metadata_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
     return ();
 }
 
+// @notice Rewrite asset's links stored one character per felt in the packed encoding
+// @param asset_id - ID of Asset to be migrated
+@external
+func migrate_links{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    asset_id: felt
+) {
+    // Verification
+    verify_asset_manager_authority();
+    verify_asset_id_exists(asset_id, should_exist_=TRUE);
+
+    StringLib.migrate_string(type=ICON_LINK_TYPE, id=asset_id);
+    StringLib.migrate_string(type=METADATA_LINK_TYPE, id=asset_id);
+    return ();
+}
+
 // ///////////
 // Internal //
 // ///////////
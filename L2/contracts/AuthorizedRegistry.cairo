@@ -41,6 +41,11 @@ func updated_registry(index: felt, version: felt, address: felt) {
 func contract_registry(index: felt, version: felt) -> (address: felt) {
 }
 
+// @notice Stores the number of updates made to the registry, so that contracts caching its entries can detect stale ones
+@storage_var
+func registry_update_count() -> (count: felt) {
+}
+
 // //////////////
 // Constructor //
 // //////////////
@@ -74,6 +79,15 @@ func get_contract_address{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
     return (address=address);
 }
 
+// @notice Function to get the number of updates made to the registry
+// @return count - Incremented by every call to update_contract_registry
+@view
+func get_registry_update_count{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    ) -> (count: felt) {
+    let (count) = registry_update_count.read();
+    return (count=count);
+}
+
 // ///////////
 // External //
 // ///////////
@@ -99,6 +113,8 @@ func update_contract_registry{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, ra
 
     // Update the registry
     contract_registry.write(index=index_, version=version_, value=contract_address_);
+    let (update_count) = registry_update_count.read();
+    registry_update_count.write(update_count + 1);
 
     updated_registry.emit(index=index_, version=version_, address=contract_address_);
     return ();
@@ -50,6 +50,9 @@ const RelayAccountRegistry_INDEX = 1400;
 const RelayABR_INDEX = 1700;
 const RelayABRPayment_INDEX = 1900;
 
+const RELAY_ACCOUNTING_PER_CALL = 0;
+const RELAY_ACCOUNTING_AGGREGATED = 1;
+
 const MasterAdmin_ACTION = 0;
 const ManageAssets_ACTION = 1;
 const ManageMarkets_ACTION = 2;
@@ -85,6 +88,8 @@ const WITHDRAWAL_SUCCEEDED = 2;
 const HIGHTIDE_INITIATED = 1;
 const HIGHTIDE_ACTIVE = 2;
 
+const LEADERBOARD_MAX_DELTA_DEPTH = 10;
+
 const FoK = 2;
 const IoC = 3;
 
@@ -115,3 +120,8 @@ const REWARD_DISTRIBUTION_COMPLETED = 3;
 
 const EXECUTED = 1;
 const FAILED = 2;
+
+// String encodings
+const STRING_ENCODING_CHARS = 0;
+const STRING_ENCODING_PACKED = 1;
+const SHORT_STRING_MAX_LEN = 31;
@@ -104,6 +104,14 @@ struct PositionDetails {
     realized_pnl: felt,
 }
 
+// Struct to store PositionDetails in 4 felts; see PositionPacking for the layout
+struct PackedPositionDetails {
+    price_and_size: felt,
+    margin_and_borrowed: felt,
+    leverage_and_timestamps: felt,
+    realized_pnl: felt,
+}
+
 // Struct to be used for liquidation calls
 struct PositionDetailsForRiskManagement {
     market_id: felt,
@@ -310,6 +318,13 @@ struct LeaderboardStat {
     user_address: felt,
     reward: felt,
 }
+
+// Struct to pass a changed row of the leaderboard
+struct LeaderboardDelta {
+    index: felt,
+    user_address: felt,
+    reward: felt,
+}
 struct CoreFunctionCall {
     index: felt,
     version: felt,
@@ -330,6 +345,23 @@ struct ABRDetails {
     abr_timestamp: felt,
 }
 
+// Struct to store the running sums of the reduced ABR samples pushed in an epoch
+struct ABRAccumulator {
+    samples_count: felt,
+    mark_sum: felt,
+    mark_sq_sum: felt,
+    diff_sum: felt,
+    rate_sum: felt,
+    last_price: felt,
+}
+
+// Struct to store a reduced ABR sample in the sliding window ring buffer
+struct ABRSample {
+    mark_price: felt,
+    mark_price_sq: felt,
+    diff: felt,
+}
+
 struct MultipleMarketPrices {
     market_id: felt,
     price: felt,
@@ -347,3 +379,46 @@ struct ExecutionDetails {
     opening_fee: felt,
     is_final: felt,
 }
+
+// Struct to pass a signed fund transfer of a position; positive amounts are deposits
+struct PositionFundDelta {
+    position_id: felt,
+    amount: felt,
+}
+
+// Struct to pass the trading fee charged to a user
+struct UserFee {
+    user_address: felt,
+    fee: felt,
+}
+
+// Struct to accumulate the fund transfers of a batch until they are settled in execute_batch
+struct BatchSettlement {
+    holding_amount: felt,
+    liquidity_fund_deltas_len: felt,
+    liquidity_fund_deltas: PositionFundDelta*,
+    insurance_fund_deltas_len: felt,
+    insurance_fund_deltas: PositionFundDelta*,
+    user_fees_len: felt,
+    user_fees: UserFee*,
+}
+
+// Struct to pass the full fee schedule of TradingFees; tiers are ordered by numberOfTokens
+struct FeeSchedule {
+    version: felt,
+    base_fees_len: felt,
+    base_fees: BaseFee*,
+    discounts_len: felt,
+    discounts: Discount*,
+}
+
+// Struct to aggregate the stats of a trader across the orders of a batch
+struct AggregatedTraderStats {
+    fee_64x61: felt,
+    open_orders_count: felt,
+    open_volume_64x61: felt,
+    close_orders_count: felt,
+    close_volume_64x61: felt,
+    pnl_64x61: felt,
+    margin_amount_64x61: felt,
+}
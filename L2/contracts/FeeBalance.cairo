@@ -5,6 +5,7 @@ from starkware.cairo.common.math import assert_le, assert_lt, assert_nn
 from starkware.starknet.common.syscalls import get_caller_address
 
 from contracts.Constants import Trading_INDEX, MasterAdmin_ACTION
+from contracts.DataTypes import UserFee
 from contracts.interfaces.IAuthorizedRegistry import IAuthorizedRegistry
 from contracts.libraries.CommonLibrary import CommonLib
 from contracts.libraries.Utils import verify_caller_authority
@@ -142,6 +143,43 @@ func update_fee_mapping{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_ch
     return ();
 }
 
+// @notice Function to update the fee mapping of all the users charged in a trading batch
+// @param assetID_ - asset ID of the collateral
+// @param user_fees_len - Length of the user fees array
+// @param user_fees - Array of users and the fee to be added for each of them
+@external
+func update_fee_mapping_bulk{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    assetID_: felt, user_fees_len: felt, user_fees: UserFee*
+) {
+    alloc_locals;
+
+    let (caller) = get_caller_address();
+    let (registry) = CommonLib.get_registry_address();
+    let (version) = CommonLib.get_contract_version();
+    let (trading_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=Trading_INDEX, version=version
+    );
+
+    with_attr error_message("FeeBalance: Unauthorized call to update fee mapping") {
+        assert caller = trading_address;
+    }
+
+    let (local current_total_fee_per_asset: felt) = total_fee_per_asset.read(assetID=assetID_);
+
+    // Update every user's fee and write the total fee of the asset once
+    let (new_total_fee_per_asset) = update_fee_mapping_recurse(
+        assetID_=assetID_,
+        iterator_=0,
+        user_fees_len_=user_fees_len,
+        user_fees_=user_fees,
+        total_fee_=current_total_fee_per_asset,
+    );
+
+    total_fee_per_asset.write(assetID=assetID_, value=new_total_fee_per_asset);
+
+    return ();
+}
+
 // @notice Function to update fee mapping which stores total fee for a user
 // @param address - address of the user for whom fee is to be updated
 // @param assetID_ - asset ID of the collateral
@@ -183,3 +221,61 @@ func withdraw{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
 
     return ();
 }
+
+// ///////////
+// Internal //
+// ///////////
+
+// @notice Internal function to add the fee of each user in a batch
+// @param assetID_ - asset ID of the collateral
+// @param iterator_ - Current index of the user fees array
+// @param user_fees_len_ - Length of the user fees array
+// @param user_fees_ - Array of users and the fee to be added for each of them
+// @param total_fee_ - Total fee of the asset so far
+// @return total_fee - Total fee of the asset after adding the fees of all the users
+func update_fee_mapping_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    assetID_: felt, iterator_: felt, user_fees_len_: felt, user_fees_: UserFee*, total_fee_: felt
+) -> (total_fee: felt) {
+    alloc_locals;
+
+    if (iterator_ == user_fees_len_) {
+        return (total_fee_,);
+    }
+
+    local user_fee: UserFee = user_fees_[iterator_];
+
+    with_attr error_message("FeeBalance: Fee must be non negative") {
+        assert_nn(user_fee.fee);
+    }
+
+    let current_fee: felt = fee_mapping.read(address=user_fee.user_address, assetID=assetID_);
+    let new_fee: felt = current_fee + user_fee.fee;
+
+    with_attr error_message("FeeBalance: Fee must be in 64x61 representation") {
+        Math64x61_assert64x61(new_fee);
+    }
+
+    fee_mapping.write(address=user_fee.user_address, assetID=assetID_, value=new_fee);
+
+    let new_total_fee: felt = total_fee_ + user_fee.fee;
+
+    with_attr error_message("FeeBalance: Total fee must be in 64x61 representation") {
+        Math64x61_assert64x61(new_total_fee);
+    }
+
+    fee_mapping_updated.emit(
+        user_address=user_fee.user_address,
+        assetID=assetID_,
+        fee_to_add=user_fee.fee,
+        prev_user_fee_for_asset=current_fee,
+        prev_asset_fee=total_fee_,
+    );
+
+    return update_fee_mapping_recurse(
+        assetID_=assetID_,
+        iterator_=iterator_ + 1,
+        user_fees_len_=user_fees_len_,
+        user_fees_=user_fees_,
+        total_fee_=new_total_fee,
+    );
+}
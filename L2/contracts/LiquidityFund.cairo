@@ -1,10 +1,12 @@
 %lang starknet
 
 from starkware.cairo.common.cairo_builtins import HashBuiltin
+from starkware.cairo.common.math_cmp import is_le
 
 from contracts.Constants import LiquidityFund_INDEX, Trading_INDEX
+from contracts.DataTypes import PositionFundDelta
 from contracts.libraries.FundLibrary import balance, FundLib
-from contracts.Math_64x61 import Math64x61_assert64x61
+from contracts.Math_64x61 import Math64x61_add, Math64x61_assert64x61
 
 // /////////
 // Events //
@@ -149,3 +151,94 @@ func withdraw{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
 
     return ();
 }
+
+// @notice Settle the net amount of all the positions of a trading batch in a single balance update
+// @param asset_id_ - target asset_id
+// @param position_deltas_len - Length of the position deltas array
+// @param position_deltas - Array of signed amounts per position; positive amounts are deposits
+@external
+func settle_position_deltas{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    asset_id_: felt, position_deltas_len: felt, position_deltas: PositionFundDelta*
+) {
+    alloc_locals;
+
+    let (local net_amount) = update_positions_recurse(
+        asset_id_=asset_id_,
+        iterator_=0,
+        position_deltas_len_=position_deltas_len,
+        position_deltas_=position_deltas,
+        net_amount_=0,
+    );
+
+    let is_deposit = is_le(0, net_amount);
+    if (is_deposit == 1) {
+        FundLib.deposit_to_contract(asset_id_, net_amount, Trading_INDEX);
+    } else {
+        FundLib.withdraw_from_contract(asset_id_, -net_amount, Trading_INDEX);
+    }
+
+    return ();
+}
+
+// ///////////
+// Internal //
+// ///////////
+
+// @notice Internal function to update the amount of each position in a trading batch
+// @param asset_id_ - target asset_id
+// @param iterator_ - Current index of the position deltas array
+// @param position_deltas_len_ - Length of the position deltas array
+// @param position_deltas_ - Array of signed amounts per position
+// @param net_amount_ - Net amount of the positions so far
+// @return net_amount - Net amount to be added to the asset's balance
+func update_positions_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    asset_id_: felt,
+    iterator_: felt,
+    position_deltas_len_: felt,
+    position_deltas_: PositionFundDelta*,
+    net_amount_: felt,
+) -> (net_amount: felt) {
+    alloc_locals;
+
+    if (iterator_ == position_deltas_len_) {
+        return (net_amount_,);
+    }
+
+    local position_delta: PositionFundDelta = position_deltas_[iterator_];
+
+    let current_liq_amount: felt = asset_liq_position.read(
+        asset_id=asset_id_, position_id=position_delta.position_id
+    );
+    let updated_liq_amount: felt = current_liq_amount + position_delta.amount;
+
+    with_attr error_message("LiquidityFund: Updated amount must be in 64x61 representation") {
+        Math64x61_assert64x61(updated_liq_amount);
+    }
+
+    asset_liq_position.write(
+        asset_id=asset_id_, position_id=position_delta.position_id, value=updated_liq_amount
+    );
+
+    let is_deposit = is_le(0, position_delta.amount);
+    if (is_deposit == 1) {
+        deposit_Liquidity_called.emit(
+            asset_id=asset_id_, amount=position_delta.amount, position_id=position_delta.position_id
+        );
+    } else {
+        withdraw_Liquidity_called.emit(
+            asset_id=asset_id_,
+            amount=-position_delta.amount,
+            position_id=position_delta.position_id,
+        );
+    }
+
+    let (net_amount) = Math64x61_add(net_amount_, position_delta.amount);
+
+    return update_positions_recurse(
+        asset_id_=asset_id_,
+        iterator_=iterator_ + 1,
+        position_deltas_len_=position_deltas_len_,
+        position_deltas_=position_deltas_,
+        net_amount_=net_amount,
+    );
+}
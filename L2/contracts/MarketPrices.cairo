@@ -1,14 +1,14 @@
 %lang starknet
 
 from starkware.cairo.common.alloc import alloc
-from starkware.cairo.common.bool import FALSE
+from starkware.cairo.common.bool import FALSE, TRUE
 from starkware.cairo.common.cairo_builtins import HashBuiltin
-from starkware.cairo.common.math import assert_nn, assert_not_zero
+from starkware.cairo.common.math import assert_nn, assert_not_zero, split_felt
 from starkware.cairo.common.math_cmp import is_le
 from starkware.starknet.common.syscalls import get_block_timestamp, get_caller_address
 
 from contracts.Constants import AdminAuth_INDEX, ManageMarkets_ACTION, Market_INDEX, Trading_INDEX
-from contracts.DataTypes import Market, MarketPrice, MultipleMarketPrices
+from contracts.DataTypes import Market, MultipleMarketPrices
 from contracts.interfaces.IAdminAuth import IAdminAuth
 from contracts.interfaces.IAuthorizedRegistry import IAuthorizedRegistry
 from contracts.interfaces.IMarkets import IMarkets
@@ -25,13 +25,20 @@ from contracts.Math_64x61 import Math64x61_assert64x61
 func update_market_price_called(market_id: felt, price: felt) {
 }
 
+// ////////////
+// Constants //
+// ////////////
+
+// The timestamp is packed above the 128 bits holding the price
+const TIMESTAMP_SHIFT = 2 ** 128;
+
 // ///////////
 // Storage //
 // ///////////
 
-// Mapping between market ID and Market Prices
+// Mapping between market ID and the packed (timestamp, price) of the market
 @storage_var
-func market_prices(id: felt) -> (res: MarketPrice) {
+func packed_market_prices(id: felt) -> (res: felt) {
 }
 
 // ///////////////
@@ -73,23 +80,48 @@ func get_market_price{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_chec
         contract_address=market_address, market_id_=market_id_
     );
 
-    // Get market price structure of the specified market id
-    let (market_price: MarketPrice) = market_prices.read(market_id_);
+    // Calculate the timestamp
+    let (current_timestamp) = get_block_timestamp();
+
+    return get_price_within_ttl(
+        market_id_=market_id_, ttl_=market_ttl, current_timestamp_=current_timestamp
+    );
+}
+
+// @notice function to get the market prices of a list of markets
+// @param market_ids_len - Length of the market ids array
+// @param market_ids - Array of market ids
+// @return market_prices_list_len - length of market prices list
+// @return market_prices_list - market prices list in the order of market_ids; 0 if the ttl has passed
+@view
+func get_market_prices{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_ids_len: felt, market_ids: felt*
+) -> (market_prices_list_len: felt, market_prices_list: MultipleMarketPrices*) {
+    alloc_locals;
+
+    // Get registry and version
+    let (registry) = CommonLib.get_registry_address();
+    let (version) = CommonLib.get_contract_version();
+
+    // Get Market address
+    let (markets_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=Market_INDEX, version=version
+    );
 
     // Calculate the timestamp
     let (current_timestamp) = get_block_timestamp();
-    let ttl = market_ttl;
-    let timestamp = market_price.timestamp;
-    let time_difference = current_timestamp - timestamp;
 
-    let status = is_le(time_difference, ttl);
-    // ttl has passed, return 0
-    if (status == FALSE) {
-        return (0,);
-    } else {
-        let price = market_price.price;
-        return (price,);
-    }
+    let (market_prices_list: MultipleMarketPrices*) = alloc();
+    populate_market_prices_by_id_recurse(
+        markets_address_=markets_address,
+        current_timestamp_=current_timestamp,
+        iterator_=0,
+        market_ids_len_=market_ids_len,
+        market_ids_=market_ids,
+        market_prices_list_=market_prices_list,
+    );
+
+    return (market_ids_len, market_prices_list);
 }
 
 // @notice function to get market prices of all markets
@@ -115,9 +147,13 @@ func get_all_market_prices{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range
         contract_address=markets_address
     );
 
+    // Calculate the timestamp
+    let (current_timestamp) = get_block_timestamp();
+
     let (market_prices_list: MultipleMarketPrices*) = alloc();
 
     let market_prices_list_len: felt = populate_market_prices_recurse(
+        current_timestamp_=current_timestamp,
         iterator=0,
         markets_list_len=markets_list_len,
         markets_list=markets_list,
@@ -127,6 +163,69 @@ func get_all_market_prices{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range
     return (market_prices_list_len, market_prices_list);
 }
 
+// @notice function to get the market prices of a page of markets
+// @param starting_index_ - Index of the first market of the page in the markets list
+// @param num_markets_ - Number of markets in the page
+// @return market_prices_list_len - length of market prices list
+// @return market_prices_list - market prices list; markets without a valid price are skipped
+@view
+func get_all_market_prices_paginated{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(starting_index_: felt, num_markets_: felt) -> (
+    market_prices_list_len: felt, market_prices_list: MultipleMarketPrices*
+) {
+    alloc_locals;
+
+    with_attr error_message("MarketPrices: Invalid pagination parameters") {
+        assert_nn(starting_index_);
+        assert_nn(num_markets_);
+    }
+
+    // Get registry and version
+    let (registry) = CommonLib.get_registry_address();
+    let (version) = CommonLib.get_contract_version();
+
+    // Get Market address
+    let (markets_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=Market_INDEX, version=version
+    );
+
+    // Get all the markets in the system
+    let (markets_list_len: felt, markets_list: Market*) = IMarkets.get_all_markets(
+        contract_address=markets_address
+    );
+
+    // Calculate the timestamp
+    let (current_timestamp) = get_block_timestamp();
+
+    let (market_prices_list: MultipleMarketPrices*) = alloc();
+
+    // If the page starts after the last market, return an empty list
+    let is_out_of_range = is_le(markets_list_len, starting_index_);
+    if (is_out_of_range == TRUE) {
+        return (0, market_prices_list);
+    }
+
+    // Truncate the page to the end of the markets list
+    local page_len;
+    let is_truncated = is_le(markets_list_len, starting_index_ + num_markets_);
+    if (is_truncated == TRUE) {
+        assert page_len = markets_list_len - starting_index_;
+    } else {
+        assert page_len = num_markets_;
+    }
+
+    let market_prices_list_len: felt = populate_market_prices_recurse(
+        current_timestamp_=current_timestamp,
+        iterator=0,
+        markets_list_len=page_len,
+        markets_list=markets_list + starting_index_ * Market.SIZE,
+        market_prices_list=market_prices_list,
+    );
+
+    return (market_prices_list_len, market_prices_list);
+}
+
 // ////////////
 // External //
 // ////////////
@@ -198,15 +297,7 @@ func update_market_price{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
         assert_not_zero(market.asset);
     }
 
-    // Create a struct object for the market prices
-    tempvar new_market_price: MarketPrice = MarketPrice(
-        asset_id=market.asset,
-        collateral_id=market.asset_collateral,
-        timestamp=timestamp_,
-        price=price_,
-    );
-
-    market_prices.write(id=market_id_, value=new_market_price);
+    write_market_price(market_id_=market_id_, price_=price_, timestamp_=timestamp_);
 
     // update_market_price_called event is emitted
     update_market_price_called.emit(market_id=market_id_, price=price_);
@@ -247,7 +338,95 @@ func update_multiple_market_prices{syscall_ptr: felt*, pedersen_ptr: HashBuiltin
 // Internal //
 // ///////////
 
-// @notice function called by get_all_market_prices
+// @notice function to read the packed price and timestamp of a market
+// @param market_id_ - Id of the market
+// @return price - Last price of the market
+// @return timestamp - Timestamp at which the price was set
+func read_market_price{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt
+) -> (price: felt, timestamp: felt) {
+    let (packed_market_price) = packed_market_prices.read(id=market_id_);
+    let (timestamp, price) = split_felt(packed_market_price);
+    return (price, timestamp);
+}
+
+// @notice function to pack and store the price and timestamp of a market
+// @param market_id_ - Id of the market
+// @param price_ - Price of the market; a non-negative 64x61 value fits in the lower 128 bits
+// @param timestamp_ - Timestamp of the price
+func write_market_price{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt, price_: felt, timestamp_: felt
+) {
+    packed_market_prices.write(id=market_id_, value=timestamp_ * TIMESTAMP_SHIFT + price_);
+    return ();
+}
+
+// @notice function to get the price of a market if its ttl has not passed
+// @param market_id_ - Id of the market
+// @param ttl_ - ttl of the market
+// @param current_timestamp_ - Current block timestamp
+// @return market_price - Price of the market; 0 if the ttl has passed
+func get_price_within_ttl{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt, ttl_: felt, current_timestamp_: felt
+) -> (market_price: felt) {
+    let (price, timestamp) = read_market_price(market_id_);
+    let time_difference = current_timestamp_ - timestamp;
+
+    let status = is_le(time_difference, ttl_);
+    // ttl has passed, return 0
+    if (status == FALSE) {
+        return (0,);
+    } else {
+        return (price,);
+    }
+}
+
+// @notice function called by get_market_prices
+// @param markets_address_ - Address of the Markets contract
+// @param current_timestamp_ - Current block timestamp
+// @param iterator_ - Current index of the market ids array
+// @param market_ids_len_ - Length of the market ids array
+// @param market_ids_ - Array of market ids
+// @param market_prices_list_ - market prices list which gets populated
+func populate_market_prices_by_id_recurse{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(
+    markets_address_: felt,
+    current_timestamp_: felt,
+    iterator_: felt,
+    market_ids_len_: felt,
+    market_ids_: felt*,
+    market_prices_list_: MultipleMarketPrices*,
+) {
+    if (iterator_ == market_ids_len_) {
+        return ();
+    }
+
+    // Get the market ttl from the market contract
+    let (market_ttl: felt) = IMarkets.get_ttl_from_market(
+        contract_address=markets_address_, market_id_=market_ids_[iterator_]
+    );
+
+    let (price) = get_price_within_ttl(
+        market_id_=market_ids_[iterator_], ttl_=market_ttl, current_timestamp_=current_timestamp_
+    );
+
+    assert market_prices_list_[iterator_] = MultipleMarketPrices(
+        market_id=market_ids_[iterator_], price=price
+    );
+
+    return populate_market_prices_by_id_recurse(
+        markets_address_=markets_address_,
+        current_timestamp_=current_timestamp_,
+        iterator_=iterator_ + 1,
+        market_ids_len_=market_ids_len_,
+        market_ids_=market_ids_,
+        market_prices_list_=market_prices_list_,
+    );
+}
+
+// @notice function called by get_all_market_prices and get_all_market_prices_paginated
+// @param current_timestamp_ - Current block timestamp
 // @param iterator - current index of market_prices_list
 // @param markets_list_len - length of markets list
 // @param markets_list - markets list
@@ -256,6 +435,7 @@ func update_multiple_market_prices{syscall_ptr: felt*, pedersen_ptr: HashBuiltin
 func populate_market_prices_recurse{
     syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
 }(
+    current_timestamp_: felt,
     iterator: felt,
     markets_list_len: felt,
     markets_list: Market*,
@@ -265,8 +445,13 @@ func populate_market_prices_recurse{
         return (iterator,);
     }
 
+    // The ttl is read from the market struct instead of querying the Markets contract again
     let market_id = markets_list[markets_list_len - 1].id;
-    let price: felt = get_market_price(market_id);
+    let price: felt = get_price_within_ttl(
+        market_id_=market_id,
+        ttl_=markets_list[markets_list_len - 1].ttl,
+        current_timestamp_=current_timestamp_,
+    );
 
     // Add market id and price to the list if price is non zero
     if (price != 0) {
@@ -275,6 +460,7 @@ func populate_market_prices_recurse{
         );
         assert market_prices_list[iterator] = market_prices_element;
         return populate_market_prices_recurse(
+            current_timestamp_=current_timestamp_,
             iterator=iterator + 1,
             markets_list_len=markets_list_len - 1,
             markets_list=markets_list,
@@ -282,6 +468,7 @@ func populate_market_prices_recurse{
         );
     }
     return populate_market_prices_recurse(
+        current_timestamp_=current_timestamp_,
         iterator=iterator,
         markets_list_len=markets_list_len - 1,
         markets_list=markets_list,
@@ -326,16 +513,12 @@ func update_market_prices_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*
         assert_not_zero(market.asset);
     }
 
-    // Create a struct object for the market prices
-    tempvar new_market_price: MarketPrice = MarketPrice(
-        asset_id=market.asset,
-        collateral_id=market.asset_collateral,
-        timestamp=timestamp_,
-        price=market_prices_list[iterator_].price,
+    write_market_price(
+        market_id_=market_prices_list[iterator_].market_id,
+        price_=market_prices_list[iterator_].price,
+        timestamp_=timestamp_,
     );
 
-    market_prices.write(id=market_prices_list[iterator_].market_id, value=new_market_price);
-
     return update_market_prices_recurse(
         market_contract_address_=market_contract_address_,
         timestamp_=timestamp_,
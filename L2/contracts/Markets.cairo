@@ -101,6 +101,23 @@ func market_mapping(asset_id: felt, collateral_id: felt) -> (res: felt) {
 func market_pair_exists(asset: felt, asset_collateral: felt) -> (res: felt) {
 }
 
+// Number of markets in a (tradable, archived) state
+@storage_var
+func markets_by_state_len(is_tradable: felt, is_archived: felt) -> (len: felt) {
+}
+
+// Markets in an array per (tradable, archived) state to retrieve them without scanning all markets
+@storage_var
+func market_id_by_state_index(is_tradable: felt, is_archived: felt, index: felt) -> (
+    market_id: felt
+) {
+}
+
+// Mapping between market ID and market's index in the array of its state
+@storage_var
+func market_state_index_by_id(market_id: felt) -> (index: felt) {
+}
+
 // //////////////
 // Constructor //
 // //////////////
@@ -204,10 +221,9 @@ func get_all_markets_by_state{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, ra
     alloc_locals;
 
     let (array_list: Market*) = alloc();
-    let (array_list_len) = markets_array_len.read();
+    let (array_list_len) = markets_by_state_len.read(is_tradable_, is_archived_);
     return populate_markets_by_state(
         iterator=0,
-        index=0,
         is_tradable=is_tradable_,
         is_archived=is_archived_,
         array_list_len=array_list_len,
@@ -227,6 +243,21 @@ func get_metadata_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     return (link_len, link);
 }
 
+// @notice View function to read market metadata link with 31 characters packed per felt
+// @param market_id_ - ID of the market
+// @return link_len - Length of link string
+// @return packed_link_len - Number of felts in packed_link
+// @return packed_link - Link characters, packed as Cairo short strings
+@view
+func get_metadata_link_packed{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt
+) -> (link_len: felt, packed_link_len: felt, packed_link: felt*) {
+    let (link_len, packed_link_len, packed_link) = StringLib.read_packed_string(
+        type=METADATA_LINK_TYPE, id=market_id_
+    );
+    return (link_len, packed_link_len, packed_link);
+}
+
 // ///////////
 // External //
 // ///////////
@@ -268,7 +299,7 @@ func add_market{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}
     validate_market_properties(new_market_);
     validate_market_trading_settings(new_market_);
 
-    let (new_tradable) = resolve_tradable_status(new_market_);
+    let (local new_tradable) = resolve_tradable_status(new_market_);
 
     // Computes tick precision and step precision
     let (tick_precision, step_precision) = calculate_tick_and_step_precision(
@@ -315,6 +346,11 @@ func add_market{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}
     market_id_exists.write(new_market_.id, TRUE);
     market_pair_exists.write(new_market_.asset, new_market_.asset_collateral, TRUE);
 
+    // Update the array of the market's state
+    add_market_to_state_index(
+        market_id_=new_market_.id, is_tradable_=new_tradable, is_archived_=new_market_.is_archived
+    );
+
     // Save metadata link
     StringLib.save_string(
         type=METADATA_LINK_TYPE,
@@ -352,6 +388,11 @@ func remove_market{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_p
         assert market_to_remove.is_tradable = FALSE;
     }
 
+    // Remove market_id_ from the array of its state
+    remove_market_from_state_index(
+        market_id_=market_id_, is_tradable_=FALSE, is_archived_=market_to_remove.is_archived
+    );
+
     // Replace market_id_ with last_market_id
     market_id_by_index.write(index_to_remove, last_market_id);
     market_index_by_id.write(last_market_id, index_to_remove);
@@ -455,6 +496,13 @@ func modify_tradable{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check
         );
 
         market_tradable_modified.emit(market_id=market_id_, is_tradable=asset1.is_tradable);
+        update_market_state_index(
+            market_id_=market_id_,
+            is_tradable_=market.is_tradable,
+            is_archived_=market.is_archived,
+            new_is_tradable_=asset1.is_tradable,
+            new_is_archived_=market.is_archived,
+        );
         return ();
     } else {
         if (is_tradable_ == 1) {
@@ -489,6 +537,13 @@ func modify_tradable{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check
         );
 
         market_tradable_modified.emit(market_id=market_id_, is_tradable=is_tradable_);
+        update_market_state_index(
+            market_id_=market_id_,
+            is_tradable_=market.is_tradable,
+            is_archived_=market.is_archived,
+            new_is_tradable_=is_tradable_,
+            new_is_archived_=market.is_archived,
+        );
         return ();
     }
 }
@@ -535,6 +590,13 @@ func modify_archived_state{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range
     );
 
     market_archived_state_modified.emit(market_id=market_id_, is_archived=is_archived_);
+    update_market_state_index(
+        market_id_=market_id_,
+        is_tradable_=market.is_tradable,
+        is_archived_=market.is_archived,
+        new_is_tradable_=market.is_tradable,
+        new_is_archived_=is_archived_,
+    );
 
     return ();
 }
@@ -644,6 +706,20 @@ func update_metadata_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
     return ();
 }
 
+// @notice Rewrite market metadata link stored one character per felt in the packed encoding
+// @param market_id_ - ID of Market to be migrated
+@external
+func migrate_metadata_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt
+) {
+    // Verification
+    verify_market_manager_authority();
+    verify_market_id_exists(market_id_, should_exist_=TRUE);
+
+    StringLib.migrate_string(type=METADATA_LINK_TYPE, id=market_id_);
+    return ();
+}
+
 // ///////////
 // Internal //
 // ///////////
@@ -699,73 +775,93 @@ func populate_markets{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_chec
     }
 }
 
-// @notice Internal Function called by get_all_markets to recursively add assets to the array and return it
+// @notice Internal Function called by get_all_markets_by_state to recursively add markets of a state to the array and return it
 // @param iterator - Current index being populated
-// @param index - It keeps track of element to be added in an array
 // @param is_tradable - tradable flag
 // @param is_archived - archived flag
-// @param array_list_len - Stores the current length of the populated array
+// @param array_list_len - Number of markets in the state
 // @param array_list - Array of Market filled up to the index
 // @returns array_list_len - Length of the array_list
 // @returns array_list - Fully populated list of Markets
 func populate_markets_by_state{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
-    iterator: felt,
-    index: felt,
-    is_tradable: felt,
-    is_archived: felt,
-    array_list_len: felt,
-    array_list: Market*,
+    iterator: felt, is_tradable: felt, is_archived: felt, array_list_len: felt, array_list: Market*
 ) -> (array_list_len: felt, array_list: Market*) {
-    alloc_locals;
-
     if (iterator == array_list_len) {
-        return (index, array_list);
+        return (array_list_len, array_list);
     }
 
-    let (market_id) = market_id_by_index.read(index=iterator);
-
+    let (market_id) = market_id_by_state_index.read(is_tradable, is_archived, iterator);
     let (market_details: Market) = market_by_id.read(market_id=market_id);
+    assert array_list[iterator] = market_details;
 
-    let (id_exists) = market_id_exists.read(market_id);
-    if (id_exists == FALSE) {
-        return populate_markets_by_state(
-            iterator + 1, index, is_tradable, is_archived, array_list_len, array_list
-        );
-    } else {
-        if (market_details.is_tradable == is_tradable) {
-            if (market_details.is_archived == is_archived) {
-                let market_details_w_id = Market(
-                    id=market_id,
-                    asset=market_details.asset,
-                    asset_collateral=market_details.asset_collateral,
-                    is_tradable=market_details.is_tradable,
-                    is_archived=market_details.is_archived,
-                    ttl=market_details.ttl,
-                    tick_size=market_details.tick_size,
-                    tick_precision=market_details.tick_precision,
-                    step_size=market_details.step_size,
-                    step_precision=market_details.step_precision,
-                    minimum_order_size=market_details.minimum_order_size,
-                    minimum_leverage=market_details.minimum_leverage,
-                    maximum_leverage=market_details.maximum_leverage,
-                    currently_allowed_leverage=market_details.currently_allowed_leverage,
-                    maintenance_margin_fraction=market_details.maintenance_margin_fraction,
-                    initial_margin_fraction=market_details.initial_margin_fraction,
-                    incremental_initial_margin_fraction=market_details.incremental_initial_margin_fraction,
-                    incremental_position_size=market_details.incremental_position_size,
-                    baseline_position_size=market_details.baseline_position_size,
-                    maximum_position_size=market_details.maximum_position_size,
-                );
-                assert array_list[index] = market_details_w_id;
-                return populate_markets_by_state(
-                    iterator + 1, index + 1, is_tradable, is_archived, array_list_len, array_list
-                );
-            }
+    return populate_markets_by_state(
+        iterator + 1, is_tradable, is_archived, array_list_len, array_list
+    );
+}
+
+// @notice Internal function to append a market to the array of its state
+// @param market_id_ - Market id
+// @param is_tradable_ - tradable flag of the market
+// @param is_archived_ - archived flag of the market
+func add_market_to_state_index{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt, is_tradable_: felt, is_archived_: felt
+) {
+    let (curr_len) = markets_by_state_len.read(is_tradable_, is_archived_);
+    market_id_by_state_index.write(is_tradable_, is_archived_, curr_len, market_id_);
+    market_state_index_by_id.write(market_id_, curr_len);
+    markets_by_state_len.write(is_tradable_, is_archived_, curr_len + 1);
+    return ();
+}
+
+// @notice Internal function to remove a market from the array of its state
+// @param market_id_ - Market id
+// @param is_tradable_ - tradable flag of the market
+// @param is_archived_ - archived flag of the market
+func remove_market_from_state_index{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(market_id_: felt, is_tradable_: felt, is_archived_: felt) {
+    alloc_locals;
+    let (local index_to_remove) = market_state_index_by_id.read(market_id_);
+    let (local curr_len) = markets_by_state_len.read(is_tradable_, is_archived_);
+    let (local last_market_id) = market_id_by_state_index.read(
+        is_tradable_, is_archived_, curr_len - 1
+    );
+
+    // Replace market_id_ with the last market of the array
+    market_id_by_state_index.write(is_tradable_, is_archived_, index_to_remove, last_market_id);
+    market_state_index_by_id.write(last_market_id, index_to_remove);
+
+    market_id_by_state_index.write(is_tradable_, is_archived_, curr_len - 1, 0);
+    markets_by_state_len.write(is_tradable_, is_archived_, curr_len - 1);
+    return ();
+}
+
+// @notice Internal function to move a market to the array of its new state
+// @param market_id_ - Market id
+// @param is_tradable_ - current tradable flag of the market
+// @param is_archived_ - current archived flag of the market
+// @param new_is_tradable_ - new tradable flag of the market
+// @param new_is_archived_ - new archived flag of the market
+func update_market_state_index{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt,
+    is_tradable_: felt,
+    is_archived_: felt,
+    new_is_tradable_: felt,
+    new_is_archived_: felt,
+) {
+    if (is_tradable_ == new_is_tradable_) {
+        if (is_archived_ == new_is_archived_) {
+            return ();
         }
     }
-    return populate_markets_by_state(
-        iterator + 1, index, is_tradable, is_archived, array_list_len, array_list
+
+    remove_market_from_state_index(
+        market_id_=market_id_, is_tradable_=is_tradable_, is_archived_=is_archived_
     );
+    add_market_to_state_index(
+        market_id_=market_id_, is_tradable_=new_is_tradable_, is_archived_=new_is_archived_
+    );
+    return ();
 }
 
 // @notice Internal function to check authorization
@@ -67,6 +67,19 @@ func get_settings_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     return (link_len, link);
 }
 
+// @notice Reads the stored settings link with 31 characters packed per felt
+// @returns link_len - Length of the link
+// @returns packed_link_len - Number of felts in packed_link
+// @returns packed_link - List of link characters, packed as Cairo short strings
+@view
+func get_settings_link_packed{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    ) -> (link_len: felt, packed_link_len: felt, packed_link: felt*) {
+    let (link_len, packed_link_len, packed_link) = StringLib.read_packed_string(
+        type=SETTINGS_LINK_TYPE, id=LINK_ID
+    );
+    return (link_len, packed_link_len, packed_link);
+}
+
 // ///////////
 // External //
 // ///////////
@@ -96,3 +109,19 @@ func update_settings_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
 
     return ();
 }
+
+// @notice Rewrite the settings link stored one character per felt in the packed encoding
+@external
+func migrate_settings_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() {
+    // 1. Verify authority
+    with_attr error_message("Settings: caller not authorized to manage settings") {
+        let (registry) = CommonLib.get_registry_address();
+        let (version) = CommonLib.get_contract_version();
+        verify_master_admin_or_authority(registry, version, ManageSettings_ACTION);
+    }
+
+    // 2. Migrate link
+    StringLib.migrate_string(type=SETTINGS_LINK_TYPE, id=LINK_ID);
+
+    return ();
+}
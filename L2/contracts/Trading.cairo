@@ -17,6 +17,7 @@ from contracts.Constants import (
     DELEVERAGING_ORDER,
     EXECUTED,
     FeeBalance_INDEX,
+    FeeDiscount_INDEX,
     FoK,
     Holding_INDEX,
     InsuranceFund_INDEX,
@@ -38,13 +39,19 @@ from contracts.Constants import (
 )
 from contracts.DataTypes import (
     Asset,
+    BaseFee,
+    BatchSettlement,
+    Discount,
     ExecutionDetails,
+    FeeSchedule,
     LiquidatablePosition,
     Market,
     MultipleOrder,
     PositionDetails,
+    PositionFundDelta,
     Signature,
     TraderStats,
+    UserFee,
 )
 
 from contracts.interfaces.IAccountLiquidator import IAccountLiquidator
@@ -53,6 +60,7 @@ from contracts.interfaces.IAccountRegistry import IAccountRegistry
 from contracts.interfaces.IAsset import IAsset
 from contracts.interfaces.IAuthorizedRegistry import IAuthorizedRegistry
 from contracts.interfaces.IFeeBalance import IFeeBalance
+from contracts.interfaces.IFeeDiscount import IFeeDiscount
 from contracts.interfaces.IHolding import IHolding
 from contracts.interfaces.IInsuranceFund import IInsuranceFund
 from contracts.interfaces.ILiquidate import ILiquidate
@@ -62,6 +70,7 @@ from contracts.interfaces.IMarkets import IMarkets
 from contracts.interfaces.ITradingStats import ITradingStats
 from contracts.interfaces.ITradingFees import ITradingFees
 from contracts.libraries.CommonLibrary import CommonLib
+from contracts.libraries.FeeTiers import FeeTiers
 from contracts.Math_64x61 import (
     Math64x61_add,
     Math64x61_div,
@@ -162,6 +171,7 @@ func execute_batch{
         asset_address: felt,
         holding_address: felt,
         trading_fees_address: felt,
+        fee_discount_address: felt,
         fees_balance_address: felt,
         liquidity_fund_address: felt,
         insurance_fund_address: felt,
@@ -216,8 +226,40 @@ func execute_batch{
         assert error_code = 0;
     }
 
+    // Load the fee schedule once; the fee tier of each user is resolved locally
+    let (
+        fee_schedule_version: felt,
+        base_fees_len: felt,
+        base_fees: BaseFee*,
+        discounts_len: felt,
+        discounts: Discount*,
+    ) = ITradingFees.get_fee_schedule(contract_address=trading_fees_address);
+    local fee_schedule: FeeSchedule = FeeSchedule(
+        version=fee_schedule_version,
+        base_fees_len=base_fees_len,
+        base_fees=base_fees,
+        discounts_len=discounts_len,
+        discounts=discounts,
+    );
+
+    // Fund transfers of the orders are accumulated and settled once after the batch is executed
+    let (liquidity_fund_deltas: PositionFundDelta*) = alloc();
+    let (insurance_fund_deltas: PositionFundDelta*) = alloc();
+    let (user_fees: UserFee*) = alloc();
+    let initial_settlement = BatchSettlement(
+        holding_amount=0,
+        liquidity_fund_deltas_len=0,
+        liquidity_fund_deltas=liquidity_fund_deltas,
+        insurance_fund_deltas_len=0,
+        insurance_fund_deltas=insurance_fund_deltas,
+        user_fees_len=0,
+        user_fees=user_fees,
+    );
+
     // Recursively loop through the orders in the batch
-    let (taker_execution_price: felt, open_interest: felt) = process_and_execute_orders_recurse(
+    let (
+        taker_execution_price: felt, open_interest: felt, settlement: BatchSettlement
+    ) = process_and_execute_orders_recurse(
         batch_id_=batch_id_,
         taker_locked_quantity_=initial_taker_locked,
         market_id_=market_id_,
@@ -230,12 +272,10 @@ func execute_batch{
         request_list_=request_list,
         quantity_executed_=0,
         account_registry_address_=account_registry_address,
-        holding_address_=holding_address,
-        trading_fees_address_=trading_fees_address,
-        fees_balance_address_=fees_balance_address,
+        fee_discount_address_=fee_discount_address,
+        fee_schedule_=fee_schedule,
         liquidate_address_=liquidate_address,
-        liquidity_fund_address_=liquidity_fund_address,
-        insurance_fund_address_=insurance_fund_address,
+        settlement_=initial_settlement,
         max_leverage_=market.currently_allowed_leverage,
         min_quantity_=market.minimum_order_size,
         maker1_direction_=[request_list].direction,
@@ -249,6 +289,16 @@ func execute_batch{
         error_param_=0,
     );
 
+    // Settle the net fund transfers of the batch
+    settle_batch_funds(
+        settlement_=settlement,
+        collateral_id_=collateral_id,
+        holding_address_=holding_address,
+        fees_balance_address_=fees_balance_address,
+        liquidity_fund_address_=liquidity_fund_address,
+        insurance_fund_address_=insurance_fund_address,
+    );
+
     // Get Market price for the corresponding market Id
     let (market_price: felt) = IMarketPrices.get_market_price(
         contract_address=market_prices_address, id=market_id_
@@ -547,6 +597,7 @@ func check_limit_price{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
 // @returns asset_address - Address of the Asset contract
 // @returns holding_address - Address of the Holding contract
 // @returns trading_fees_address - Address of the Trading contract
+// @returns fee_discount_address - Address of the Fee Discount contract
 // @returns fees_balance_address - Address of the Fee Balance contract
 // @returns liquidity_fund_address - Address of the Liquidity Fund contract
 // @returns insurance_fund_address - Address of the Insurance Fund contract
@@ -559,6 +610,7 @@ func get_registry_addresses{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, rang
     asset_address: felt,
     holding_address: felt,
     trading_fees_address: felt,
+    fee_discount_address: felt,
     fees_balance_address: felt,
     liquidity_fund_address: felt,
     insurance_fund_address: felt,
@@ -591,6 +643,11 @@ func get_registry_addresses{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, rang
         contract_address=registry, index=TradingFees_INDEX, version=version
     );
 
+    // Get Fee discount address
+    let (fee_discount_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=FeeDiscount_INDEX, version=version
+    );
+
     // Get Fee balance address
     let (fees_balance_address) = IAuthorizedRegistry.get_contract_address(
         contract_address=registry, index=FeeBalance_INDEX, version=version
@@ -631,6 +688,7 @@ func get_registry_addresses{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, rang
         asset_address,
         holding_address,
         trading_fees_address,
+        fee_discount_address,
         fees_balance_address,
         liquidity_fund_address,
         insurance_fund_address,
@@ -641,6 +699,157 @@ func get_registry_addresses{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, rang
     );
 }
 
+// @notice Internal function to add the fund transfers of an order to the batch settlement
+// @param settlement_ - Fund transfers of the batch so far
+// @param user_address_ - Address of the user
+// @param fee_ - Trading fee charged to the user
+// @param position_id_ - Id of the order
+// @param holding_amount_ - Signed amount to be deposited to the Holding contract
+// @param liquidity_fund_amount_ - Signed amount to be deposited to the Liquidity Fund
+// @param insurance_fund_amount_ - Signed amount to be deposited to the Insurance Fund
+// @returns settlement - Fund transfers of the batch including the order
+func record_fund_transfers{range_check_ptr}(
+    settlement_: BatchSettlement,
+    user_address_: felt,
+    fee_: felt,
+    position_id_: felt,
+    holding_amount_: felt,
+    liquidity_fund_amount_: felt,
+    insurance_fund_amount_: felt,
+) -> (settlement: BatchSettlement) {
+    alloc_locals;
+
+    local user_fees_len;
+    local liquidity_fund_deltas_len;
+    local insurance_fund_deltas_len;
+
+    let (local holding_amount) = Math64x61_add(settlement_.holding_amount, holding_amount_);
+
+    let is_fee_zero = is_le(fee_, 0);
+    if (is_fee_zero == FALSE) {
+        assert settlement_.user_fees[settlement_.user_fees_len] = UserFee(
+            user_address=user_address_, fee=fee_
+        );
+        assert user_fees_len = settlement_.user_fees_len + 1;
+    } else {
+        assert user_fees_len = settlement_.user_fees_len;
+    }
+
+    if (liquidity_fund_amount_ != 0) {
+        let liquidity_fund_deltas = settlement_.liquidity_fund_deltas;
+        assert liquidity_fund_deltas[settlement_.liquidity_fund_deltas_len] = PositionFundDelta(
+            position_id=position_id_, amount=liquidity_fund_amount_
+        );
+        assert liquidity_fund_deltas_len = settlement_.liquidity_fund_deltas_len + 1;
+    } else {
+        assert liquidity_fund_deltas_len = settlement_.liquidity_fund_deltas_len;
+    }
+
+    if (insurance_fund_amount_ != 0) {
+        let insurance_fund_deltas = settlement_.insurance_fund_deltas;
+        assert insurance_fund_deltas[settlement_.insurance_fund_deltas_len] = PositionFundDelta(
+            position_id=position_id_, amount=insurance_fund_amount_
+        );
+        assert insurance_fund_deltas_len = settlement_.insurance_fund_deltas_len + 1;
+    } else {
+        assert insurance_fund_deltas_len = settlement_.insurance_fund_deltas_len;
+    }
+
+    let settlement = BatchSettlement(
+        holding_amount=holding_amount,
+        liquidity_fund_deltas_len=liquidity_fund_deltas_len,
+        liquidity_fund_deltas=settlement_.liquidity_fund_deltas,
+        insurance_fund_deltas_len=insurance_fund_deltas_len,
+        insurance_fund_deltas=settlement_.insurance_fund_deltas,
+        user_fees_len=user_fees_len,
+        user_fees=settlement_.user_fees,
+    );
+    return (settlement=settlement);
+}
+
+// @notice Internal function to settle the fund transfers of a batch with one call per fund
+// @param settlement_ - Fund transfers of the batch
+// @param collateral_id_ - Collateral id of the batch
+// @param holding_address_ - Address of the Holding contract
+// @param fees_balance_address_ - Address of the Fee Balance contract
+// @param liquidity_fund_address_ - Address of the Liquidity Fund contract
+// @param insurance_fund_address_ - Address of the Insurance Fund contract
+func settle_batch_funds{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    settlement_: BatchSettlement,
+    collateral_id_: felt,
+    holding_address_: felt,
+    fees_balance_address_: felt,
+    liquidity_fund_address_: felt,
+    insurance_fund_address_: felt,
+) {
+    alloc_locals;
+
+    // Attribute the fees of all the users in the batch
+    if (settlement_.user_fees_len != 0) {
+        IFeeBalance.update_fee_mapping_bulk(
+            contract_address=fees_balance_address_,
+            assetID_=collateral_id_,
+            user_fees_len=settlement_.user_fees_len,
+            user_fees=settlement_.user_fees,
+        );
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    } else {
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    }
+
+    // Deposit or withdraw the net amount of the Holding contract
+    let is_holding_deposit = is_le(0, settlement_.holding_amount);
+    if (is_holding_deposit == TRUE) {
+        IHolding.deposit(
+            contract_address=holding_address_,
+            asset_id_=collateral_id_,
+            amount_=settlement_.holding_amount,
+        );
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    } else {
+        IHolding.withdraw(
+            contract_address=holding_address_,
+            asset_id_=collateral_id_,
+            amount_=-settlement_.holding_amount,
+        );
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    }
+
+    if (settlement_.liquidity_fund_deltas_len != 0) {
+        ILiquidityFund.settle_position_deltas(
+            contract_address=liquidity_fund_address_,
+            asset_id_=collateral_id_,
+            position_deltas_len=settlement_.liquidity_fund_deltas_len,
+            position_deltas=settlement_.liquidity_fund_deltas,
+        );
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    } else {
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    }
+
+    if (settlement_.insurance_fund_deltas_len != 0) {
+        IInsuranceFund.settle_position_deltas(
+            contract_address=insurance_fund_address_,
+            asset_id_=collateral_id_,
+            position_deltas_len=settlement_.insurance_fund_deltas_len,
+            position_deltas=settlement_.insurance_fund_deltas,
+        );
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    } else {
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    }
+
+    return ();
+}
+
 // @notice Intenal function that processes open orders
 // @param order_ - Order request
 // @param execution_price_ - The price at which it got matched
@@ -648,12 +857,11 @@ func get_registry_addresses{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, rang
 // @param market_id_ - The market ID of the batch
 // @param collateral_id_ - Collateral_id of all the orders in the batch
 // @param collateral_token_decimal_ - No.of token decimals of collateral
-// @param liquidity_fund_address_ - Address of the Liquidity contract
 // @param liquidate_address_ - Address of the Liquidate contract
-// @param holding_address_ - Address of the Holding contract
-// @param trading_fees_address_ - Address of the Trading fees contract
-// @param fees_balance_address_ - Address of the Fee Balance contract
+// @param fee_discount_address_ - Address of the Fee Discount contract
+// @param fee_schedule_ - Fee schedule loaded once for the batch
 // @param side_ - TAKER/MAKER
+// @param settlement_ - Fund transfers of the batch so far
 // @returns error_code - Returns an error code, if there's an error
 // @returns user_available_balance - Available margin of the user
 // @returns average_execution_price_open - Average Execution Price for the order
@@ -661,6 +869,7 @@ func get_registry_addresses{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, rang
 // @returns borrowed_amount_open - New Borrowed amount for the position
 // @returns trading_fee - Trading fee for the order
 // @returns margin_lock_amount - Margin to be locked in AccountManager
+// @returns settlement - Fund transfers of the batch including this order
 func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     order_: MultipleOrder,
     execution_price_: felt,
@@ -669,12 +878,11 @@ func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
     market_id_: felt,
     collateral_id_: felt,
     collateral_token_decimal_: felt,
-    liquidity_fund_address_: felt,
     liquidate_address_: felt,
-    holding_address_: felt,
-    trading_fees_address_: felt,
-    fees_balance_address_: felt,
+    fee_discount_address_: felt,
+    fee_schedule_: FeeSchedule,
     side_: felt,
+    settlement_: BatchSettlement,
 ) -> (
     error_code: felt,
     user_available_balance: felt,
@@ -683,6 +891,7 @@ func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
     borrowed_amount_open: felt,
     trading_fee: felt,
     margin_lock_amount: felt,
+    settlement: BatchSettlement,
 ) {
     alloc_locals;
 
@@ -693,9 +902,12 @@ func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
     local trading_fee;
     local order_id;
 
-    // Get the fees from Trading Fee contract
-    let (fees_rate, base_fee_tier, discount_tier) = ITradingFees.get_discounted_fee_rate_for_user(
-        contract_address=trading_fees_address_, address_=order_.user_address, side_=side_
+    // Resolve the fee tier of the user against the fee schedule of the batch
+    let (number_of_tokens) = IFeeDiscount.get_user_tokens(
+        contract_address=fee_discount_address_, address=order_.user_address
+    );
+    let (local fees_rate, _, _) = FeeTiers.get_discounted_fee_rate(
+        fee_schedule_=fee_schedule_, number_of_tokens_=number_of_tokens, side_=side_
     );
 
     // Get position details
@@ -722,10 +934,10 @@ func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
         tempvar range_check_ptr = range_check_ptr;
     }
 
-    let (leveraged_order_value) = Math64x61_mul(order_size_, execution_price_);
+    let (local leveraged_order_value) = Math64x61_mul(order_size_, execution_price_);
     let (margin_order_value) = Math64x61_div(leveraged_order_value, order_.leverage);
     let (amount_to_be_borrowed_felt) = Math64x61_sub(leveraged_order_value, margin_order_value);
-    tempvar amount_to_be_borrowed = amount_to_be_borrowed_felt;
+    local amount_to_be_borrowed = amount_to_be_borrowed_felt;
 
     // Calculate borrowed and margin amounts to be stored in account contract
     let (margin_amount_open_felt) = Math64x61_add(margin_amount, margin_order_value);
@@ -734,7 +946,7 @@ func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
     assert borrowed_amount_open = borrowed_amount_open_felt;
 
     // Calculate the fees for the order
-    let (fees) = Math64x61_mul(fees_rate, leveraged_order_value);
+    let (local fees) = Math64x61_mul(fees_rate, leveraged_order_value);
     let (trading_fee) = Math64x61_mul(fees, NEGATIVE_ONE);
 
     // Check if the position can be opened
@@ -753,7 +965,7 @@ func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
     assert order_id = order_.order_id;
 
     if (is_liquidation == TRUE) {
-        return (531, user_available_balance, 0, 0, 0, 0, 0);
+        return (531, user_available_balance, 0, 0, 0, 0, 0, settlement_);
     }
 
     let (user_balance_check) = Math64x61_is_le(
@@ -761,7 +973,7 @@ func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
     );
 
     if (user_balance_check == FALSE) {
-        return (501, user_available_balance, 0, 0, 0, 0, 0);
+        return (501, user_available_balance, 0, 0, 0, 0, 0, settlement_);
     }
 
     if (is_le(fees, 0) == 0) {
@@ -773,41 +985,34 @@ func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
             amount_=fees,
             invoked_for_='fee',
         );
-
-        // Update the fees to be paid by user in fee balance contract
-        IFeeBalance.update_fee_mapping(
-            contract_address=fees_balance_address_,
-            address=order_.user_address,
-            assetID_=collateral_id_,
-            fee_to_add=fees,
-        );
         tempvar range_check_ptr = range_check_ptr;
         tempvar syscall_ptr = syscall_ptr;
     } else {
         tempvar range_check_ptr = range_check_ptr;
         tempvar syscall_ptr = syscall_ptr;
     }
+    local syscall_ptr: felt* = syscall_ptr;
 
     // Deduct the amount from liquidity funds if order is leveraged
+    local liquidity_fund_amount;
     let is_non_leveraged = is_le(order_.leverage, Math64x61_ONE);
 
     if (is_non_leveraged == FALSE) {
-        ILiquidityFund.withdraw(
-            contract_address=liquidity_fund_address_,
-            asset_id_=collateral_id_,
-            amount=amount_to_be_borrowed,
-            position_id_=order_.order_id,
-        );
-        tempvar syscall_ptr = syscall_ptr;
-        tempvar range_check_ptr = range_check_ptr;
+        assert liquidity_fund_amount = -amount_to_be_borrowed;
     } else {
-        tempvar syscall_ptr = syscall_ptr;
-        tempvar range_check_ptr = range_check_ptr;
+        assert liquidity_fund_amount = 0;
     }
 
-    // Deposit the funds taken from the user and liquidity fund
-    IHolding.deposit(
-        contract_address=holding_address_, asset_id_=collateral_id_, amount_=leveraged_order_value
+    // Record the fee and the funds taken from the user and liquidity fund for the Holding contract,
+    // they are settled at the end of the batch
+    let (settlement: BatchSettlement) = record_fund_transfers(
+        settlement_=settlement_,
+        user_address_=order_.user_address,
+        fee_=fees,
+        position_id_=order_.order_id,
+        holding_amount_=leveraged_order_value,
+        liquidity_fund_amount_=liquidity_fund_amount,
+        insurance_fund_amount_=0,
     );
 
     return (
@@ -818,6 +1023,7 @@ func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
         borrowed_amount_open,
         trading_fee,
         margin_order_value,
+        settlement,
     );
 }
 
@@ -828,14 +1034,13 @@ func process_open_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
 // @param market_id_ - The market ID of the batch
 // @param collateral_id_ - Collateral_id of all the orders in the batch
 // @param collateral_token_decimal_ - No.of token decimals of collateral
-// @param liquidity_fund_address_ - Address of the Liquidity contract
-// @param insurance_fund_address - Address of the Insurance Fund contract
-// @param holding_address_ - Address of the Holding contract
+// @param settlement_ - Fund transfers of the batch so far
 // @returns margin_amount_close - New margin amount for the position
 // @returns borrowed_amount_close - New borrowed amount for the position
 // @returns average_execution_price_open - Average Execution Price for the position
 // @returns realized_pnl - New realized pnl amount for the position
 // @returns margin_unlock_amount - Margin amount to be unlocked in the AccountManager
+// @returns settlement - Fund transfers of the batch including this order
 func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     order_: MultipleOrder,
     execution_price_: felt,
@@ -843,9 +1048,7 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
     market_id_: felt,
     collateral_id_: felt,
     collateral_token_decimal_: felt,
-    liquidity_fund_address_: felt,
-    insurance_fund_address_: felt,
-    holding_address_: felt,
+    settlement_: BatchSettlement,
 ) -> (
     error_code: felt,
     user_balance: felt,
@@ -854,6 +1057,7 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
     borrowed_amount_close: felt,
     realized_pnl: felt,
     margin_unlock_amount: felt,
+    settlement: BatchSettlement,
 ) {
     alloc_locals;
 
@@ -896,11 +1100,11 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
     }
 
     // Total value of the asset at current price
-    let (leveraged_amount_out) = Math64x61_mul(order_size_, actual_execution_price);
+    let (local leveraged_amount_out) = Math64x61_mul(order_size_, actual_execution_price);
 
     // Calculate the amount that needs to be returned to liquidity fund
     let (ratio_of_position) = Math64x61_div(order_size_, current_position.position_size);
-    let (borrowed_amount_to_be_returned) = Math64x61_mul(borrowed_amount, ratio_of_position);
+    let (local borrowed_amount_to_be_returned) = Math64x61_mul(borrowed_amount, ratio_of_position);
     let (local margin_amount_to_be_reduced) = Math64x61_mul(margin_amount, ratio_of_position);
     local margin_amount_open_64x61;
 
@@ -937,39 +1141,25 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
         tempvar range_check_ptr = range_check_ptr;
     }
 
-    // Deduct funds from holding contract
+    // Amount to be withdrawn from the holding contract
+    local holding_withdrawal;
     if (is_le(0, leveraged_amount_out) == TRUE) {
-        IHolding.withdraw(
-            contract_address=holding_address_,
-            asset_id_=collateral_id_,
-            amount_=leveraged_amount_out,
-        );
-
-        tempvar syscall_ptr = syscall_ptr;
-        tempvar range_check_ptr = range_check_ptr;
+        assert holding_withdrawal = leveraged_amount_out;
     } else {
-        tempvar syscall_ptr = syscall_ptr;
-        tempvar range_check_ptr = range_check_ptr;
+        assert holding_withdrawal = 0;
     }
 
-    // If the position is leveraged, deposit the borrowed funds to Liquidity Fund
+    // If the position is leveraged, the borrowed funds are returned to Liquidity Fund
+    local liquidity_fund_amount;
     if (current_position.leverage != LEVERAGE_ONE) {
-        ILiquidityFund.deposit(
-            contract_address=liquidity_fund_address_,
-            asset_id_=collateral_id_,
-            amount=borrowed_amount_to_be_returned,
-            position_id_=order_.order_id,
-        );
-
-        tempvar syscall_ptr = syscall_ptr;
-        tempvar range_check_ptr = range_check_ptr;
+        assert liquidity_fund_amount = borrowed_amount_to_be_returned;
     } else {
-        tempvar syscall_ptr = syscall_ptr;
-        tempvar range_check_ptr = range_check_ptr;
+        assert liquidity_fund_amount = 0;
     }
 
-    tempvar syscall_ptr = syscall_ptr;
-    tempvar range_check_ptr = range_check_ptr;
+    // Amounts to be deposited to (positive) or withdrawn from (negative) the funds
+    local holding_deficit;
+    local insurance_fund_amount;
 
     // Get the balance of user that is not locked
     let (local user_unused_balance) = IAccountManager.get_unused_balance(
@@ -991,60 +1181,35 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
 
         if (is_balance_sufficient == FALSE) {
             if (order_.order_type == LIMIT_ORDER) {
-                return (532, user_unused_balance, 0, 0, 0, 0, 0);
+                return (532, user_unused_balance, 0, 0, 0, 0, 0, settlement_);
             }
             let (is_balance_less_than_zero) = Math64x61_is_le(
                 user_unused_balance, 0, collateral_token_decimal_
             );
             if (is_balance_less_than_zero == TRUE) {
-                IInsuranceFund.withdraw(
-                    contract_address=insurance_fund_address_,
-                    asset_id_=collateral_id_,
-                    amount=amount_to_transfer_from,
-                    position_id_=order_.order_id,
-                );
-                tempvar syscall_ptr = syscall_ptr;
+                assert insurance_fund_amount = -amount_to_transfer_from;
                 tempvar range_check_ptr = range_check_ptr;
             } else {
                 let (deduct_from_insurance) = Math64x61_sub(
                     amount_to_transfer_from, user_unused_balance
                 );
-                IInsuranceFund.withdraw(
-                    contract_address=insurance_fund_address_,
-                    asset_id_=collateral_id_,
-                    amount=deduct_from_insurance,
-                    position_id_=order_.order_id,
-                );
-                tempvar syscall_ptr = syscall_ptr;
+                assert insurance_fund_amount = -deduct_from_insurance;
                 tempvar range_check_ptr = range_check_ptr;
             }
-            tempvar syscall_ptr = syscall_ptr;
-            tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
             tempvar range_check_ptr = range_check_ptr;
         } else {
-            tempvar syscall_ptr = syscall_ptr;
-            tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
+            assert insurance_fund_amount = 0;
             tempvar range_check_ptr = range_check_ptr;
         }
 
-        tempvar syscall_ptr = syscall_ptr;
-        tempvar range_check_ptr = range_check_ptr;
-
         // User's position value has become negative, it's a deficit for Holding contract as well
         if (is_le(0, leveraged_amount_out) == FALSE) {
-            let holding_deficit = abs_value(leveraged_amount_out);
-
-            IHolding.deposit(
-                contract_address=holding_address_, asset_id_=collateral_id_, amount_=holding_deficit
-            );
-
-            tempvar syscall_ptr = syscall_ptr;
+            let holding_deficit_abs = abs_value(leveraged_amount_out);
+            assert holding_deficit = holding_deficit_abs;
             tempvar range_check_ptr = range_check_ptr;
-            tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
         } else {
-            tempvar syscall_ptr = syscall_ptr;
+            assert holding_deficit = 0;
             tempvar range_check_ptr = range_check_ptr;
-            tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
         }
 
         // locked_margin needs to be taken from the user account
@@ -1068,6 +1233,8 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
         tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
         tempvar range_check_ptr = range_check_ptr;
     } else {
+        assert holding_deficit = 0;
+
         let (local user_balance) = IAccountManager.get_balance(
             contract_address=order_.user_address, assetID_=collateral_id_
         );
@@ -1085,31 +1252,18 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
                         user_balance, 0, collateral_token_decimal_
                     );
                     if (is_balance_less_than_zero == TRUE) {
-                        IInsuranceFund.withdraw(
-                            contract_address=insurance_fund_address_,
-                            asset_id_=collateral_id_,
-                            amount=pnl_abs,
-                            position_id_=order_.order_id,
-                        );
-                        tempvar syscall_ptr = syscall_ptr;
+                        assert insurance_fund_amount = -pnl_abs;
                         tempvar range_check_ptr = range_check_ptr;
                         // if user has some balance, deduct only remaining from insurance
                     } else {
                         let (deduct_from_insurance) = Math64x61_sub(pnl_abs, user_balance);
-                        IInsuranceFund.withdraw(
-                            contract_address=insurance_fund_address_,
-                            asset_id_=collateral_id_,
-                            amount=deduct_from_insurance,
-                            position_id_=order_.order_id,
-                        );
-                        tempvar syscall_ptr = syscall_ptr;
+                        assert insurance_fund_amount = -deduct_from_insurance;
                         tempvar range_check_ptr = range_check_ptr;
                     }
-                    tempvar syscall_ptr = syscall_ptr;
                     tempvar range_check_ptr = range_check_ptr;
                     // if user balance can cover whole loss, don't do anything
                 } else {
-                    tempvar syscall_ptr = syscall_ptr;
+                    assert insurance_fund_amount = 0;
                     tempvar range_check_ptr = range_check_ptr;
                 }
                 IAccountManager.transfer_from(
@@ -1121,6 +1275,7 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
                 );
                 // if user is in profit
             } else {
+                assert insurance_fund_amount = 0;
                 IAccountManager.transfer(
                     contract_address=order_.user_address,
                     asset_id_=collateral_id_,
@@ -1141,25 +1296,15 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
                 );
                 // if user balance >= margin amount, deposit remaining margin in insurance
                 if (is_balance_sufficient == TRUE) {
-                    IInsuranceFund.deposit(
-                        contract_address=insurance_fund_address_,
-                        asset_id_=collateral_id_,
-                        amount=margin_plus_pnl,
-                        position_id_=order_.order_id,
-                    );
+                    assert insurance_fund_amount = margin_plus_pnl;
+                    tempvar range_check_ptr = range_check_ptr;
                 } else {
                     let (is_balance_less_than_zero) = Math64x61_is_le(
                         user_balance, 0, collateral_token_decimal_
                     );
                     // if user balance <= 0, deduct margin amount from insurance
                     if (is_balance_less_than_zero == TRUE) {
-                        IInsuranceFund.withdraw(
-                            contract_address=insurance_fund_address_,
-                            asset_id_=collateral_id_,
-                            amount=margin_amount_to_be_reduced,
-                            position_id_=order_.order_id,
-                        );
-                        tempvar syscall_ptr = syscall_ptr;
+                        assert insurance_fund_amount = -margin_amount_to_be_reduced;
                         tempvar range_check_ptr = range_check_ptr;
                         // if user has some balance
                     } else {
@@ -1170,25 +1315,17 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
                         // if user balance can't cover loss, deduct deficit from insurance
                         if (is_balance_less_than_loss == TRUE) {
                             let (deduct_from_insurance) = Math64x61_sub(pnl_abs, user_balance);
-                            IInsuranceFund.withdraw(
-                                contract_address=insurance_fund_address_,
-                                asset_id_=collateral_id_,
-                                amount=deduct_from_insurance,
-                                position_id_=order_.order_id,
-                            );
-                            tempvar syscall_ptr = syscall_ptr;
+                            assert insurance_fund_amount = -deduct_from_insurance;
                             tempvar range_check_ptr = range_check_ptr;
                             // if user balance can cover loss, deposit remaining to insurance
                         } else {
                             let (deposit_to_insurance) = Math64x61_sub(user_balance, pnl_abs);
-                            IInsuranceFund.deposit(
-                                contract_address=insurance_fund_address_,
-                                asset_id_=collateral_id_,
-                                amount=deposit_to_insurance,
-                                position_id_=order_.order_id,
-                            );
+                            assert insurance_fund_amount = deposit_to_insurance;
+                            tempvar range_check_ptr = range_check_ptr;
                         }
+                        tempvar range_check_ptr = range_check_ptr;
                     }
+                    tempvar range_check_ptr = range_check_ptr;
                 }
 
                 IAccountManager.transfer_from(
@@ -1207,6 +1344,7 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
                 tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
                 tempvar range_check_ptr = range_check_ptr;
             } else {
+                assert insurance_fund_amount = 0;
                 realized_pnl = 0;
                 tempvar syscall_ptr = syscall_ptr;
                 tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
@@ -1220,6 +1358,19 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
         tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
         tempvar range_check_ptr = range_check_ptr;
     }
+    local syscall_ptr: felt* = syscall_ptr;
+    local pedersen_ptr: HashBuiltin* = pedersen_ptr;
+
+    // Record the fund transfers of the order, they are settled at the end of the batch
+    let (settlement: BatchSettlement) = record_fund_transfers(
+        settlement_=settlement_,
+        user_address_=order_.user_address,
+        fee_=0,
+        position_id_=order_.order_id,
+        holding_amount_=holding_deficit - holding_withdrawal,
+        liquidity_fund_amount_=liquidity_fund_amount,
+        insurance_fund_amount_=insurance_fund_amount,
+    );
 
     return (
         FALSE,
@@ -1229,6 +1380,7 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
         borrowed_amount_close,
         realized_pnl,
         margin_amount_to_be_reduced,
+        settlement,
     );
 }
 
@@ -1245,12 +1397,10 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
 // @param request_list_ - The batch of the orders
 // @param quantity_executed_ - Quantity of maker orders executed so far
 // @param account_registry_address_ - Address of the Account Registry contract
-// @param holding_address_ - Address of the Holding contract
-// @param trading_fees_address_ - Address of the Trading contract
-// @param fees_balance_address_ - Address of the Fee Balance contract
+// @param fee_discount_address_ - Address of the Fee Discount contract
+// @param fee_schedule_ - Fee schedule loaded once for the batch
 // @param liquidate_address_ - Address of the Liquidate contract
-// @param liquidity_fund_address_ - Address of the Liquidity Fund contract
-// @param insurance_fund_address_ - Address of the Insurance Fund contract
+// @param settlement_ - Fund transfers of the orders executed so far
 // @param max_leverage_ - Maximum Leverage for the market set by the first order
 // @param min_quantity_ - Minimum quantity for the market set by the first order
 // @param maker1_direction_ - Direction of the first maker order
@@ -1264,6 +1414,7 @@ func process_close_orders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
 // @param error_param_ - Parameter of the above error
 // @return taker_execution_price - The price at which the taker order was executed
 // @return open_interest - open interest corresponding to the trade batch
+// @return settlement - Fund transfers of the batch to be settled in execute_batch
 func process_and_execute_orders_recurse{
     syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr, ecdsa_ptr: SignatureBuiltin*
 }(
@@ -1279,12 +1430,10 @@ func process_and_execute_orders_recurse{
     request_list_: MultipleOrder*,
     quantity_executed_: felt,
     account_registry_address_: felt,
-    holding_address_: felt,
-    trading_fees_address_: felt,
-    fees_balance_address_: felt,
+    fee_discount_address_: felt,
+    fee_schedule_: FeeSchedule,
     liquidate_address_: felt,
-    liquidity_fund_address_: felt,
-    insurance_fund_address_: felt,
+    settlement_: BatchSettlement,
     max_leverage_: felt,
     min_quantity_: felt,
     maker1_direction_: felt,
@@ -1296,7 +1445,7 @@ func process_and_execute_orders_recurse{
     error_order_id_: felt,
     error_code_: felt,
     error_param_: felt,
-) -> (taker_execution_price: felt, open_interest: felt) {
+) -> (taker_execution_price: felt, open_interest: felt, settlement: BatchSettlement) {
     alloc_locals;
 
     local execution_price;
@@ -1316,6 +1465,7 @@ func process_and_execute_orders_recurse{
     local updated_margin_locked;
     local updated_liquidatable_position: LiquidatablePosition;
     local is_liquidation;
+    local updated_settlement: BatchSettlement;
 
     // Error messages require local variables to be passed in params
     local current_index;
@@ -1325,7 +1475,11 @@ func process_and_execute_orders_recurse{
     if (request_list_len_ == 0) {
         let (actual_open_interest) = Math64x61_div(open_interest_, TWO);
 
-        return (taker_execution_price=taker_execution_price_, open_interest=actual_open_interest);
+        return (
+            taker_execution_price=taker_execution_price_,
+            open_interest=actual_open_interest,
+            settlement=settlement_,
+        );
     }
     // Set order_id for AccountManager events
     assert order_id = [request_list_].order_id;
@@ -1395,12 +1549,10 @@ func process_and_execute_orders_recurse{
             request_list_=request_list_ + MultipleOrder.SIZE,
             quantity_executed_=quantity_executed_,
             account_registry_address_=account_registry_address_,
-            holding_address_=holding_address_,
-            trading_fees_address_=trading_fees_address_,
-            fees_balance_address_=fees_balance_address_,
+            fee_discount_address_=fee_discount_address_,
+            fee_schedule_=fee_schedule_,
             liquidate_address_=liquidate_address_,
-            liquidity_fund_address_=liquidity_fund_address_,
-            insurance_fund_address_=insurance_fund_address_,
+            settlement_=settlement_,
             max_leverage_=max_leverage_,
             min_quantity_=min_quantity_,
             maker1_direction_=maker1_direction_,
@@ -1483,12 +1635,10 @@ func process_and_execute_orders_recurse{
             request_list_=request_list_ + MultipleOrder.SIZE,
             quantity_executed_=quantity_executed_,
             account_registry_address_=account_registry_address_,
-            holding_address_=holding_address_,
-            trading_fees_address_=trading_fees_address_,
-            fees_balance_address_=fees_balance_address_,
+            fee_discount_address_=fee_discount_address_,
+            fee_schedule_=fee_schedule_,
             liquidate_address_=liquidate_address_,
-            liquidity_fund_address_=liquidity_fund_address_,
-            insurance_fund_address_=insurance_fund_address_,
+            settlement_=settlement_,
             max_leverage_=max_leverage_,
             min_quantity_=min_quantity_,
             maker1_direction_=maker1_direction_,
@@ -1569,12 +1719,10 @@ func process_and_execute_orders_recurse{
             request_list_=request_list_ + MultipleOrder.SIZE,
             quantity_executed_=quantity_executed_,
             account_registry_address_=account_registry_address_,
-            holding_address_=holding_address_,
-            trading_fees_address_=trading_fees_address_,
-            fees_balance_address_=fees_balance_address_,
+            fee_discount_address_=fee_discount_address_,
+            fee_schedule_=fee_schedule_,
             liquidate_address_=liquidate_address_,
-            liquidity_fund_address_=liquidity_fund_address_,
-            insurance_fund_address_=insurance_fund_address_,
+            settlement_=settlement_,
             max_leverage_=max_leverage_,
             min_quantity_=min_quantity_,
             maker1_direction_=maker1_direction_,
@@ -1659,12 +1807,10 @@ func process_and_execute_orders_recurse{
             request_list_=request_list_ + MultipleOrder.SIZE,
             quantity_executed_=quantity_executed_,
             account_registry_address_=account_registry_address_,
-            holding_address_=holding_address_,
-            trading_fees_address_=trading_fees_address_,
-            fees_balance_address_=fees_balance_address_,
+            fee_discount_address_=fee_discount_address_,
+            fee_schedule_=fee_schedule_,
             liquidate_address_=liquidate_address_,
-            liquidity_fund_address_=liquidity_fund_address_,
-            insurance_fund_address_=insurance_fund_address_,
+            settlement_=settlement_,
             max_leverage_=max_leverage_,
             min_quantity_=min_quantity_,
             maker1_direction_=maker1_direction_,
@@ -1748,12 +1894,10 @@ func process_and_execute_orders_recurse{
             request_list_=request_list_ + MultipleOrder.SIZE,
             quantity_executed_=quantity_executed_,
             account_registry_address_=account_registry_address_,
-            holding_address_=holding_address_,
-            trading_fees_address_=trading_fees_address_,
-            fees_balance_address_=fees_balance_address_,
+            fee_discount_address_=fee_discount_address_,
+            fee_schedule_=fee_schedule_,
             liquidate_address_=liquidate_address_,
-            liquidity_fund_address_=liquidity_fund_address_,
-            insurance_fund_address_=insurance_fund_address_,
+            settlement_=settlement_,
             max_leverage_=max_leverage_,
             min_quantity_=min_quantity_,
             maker1_direction_=maker1_direction_,
@@ -1885,12 +2029,10 @@ func process_and_execute_orders_recurse{
             request_list_=request_list_ + MultipleOrder.SIZE,
             quantity_executed_=quantity_executed_,
             account_registry_address_=account_registry_address_,
-            holding_address_=holding_address_,
-            trading_fees_address_=trading_fees_address_,
-            fees_balance_address_=fees_balance_address_,
+            fee_discount_address_=fee_discount_address_,
+            fee_schedule_=fee_schedule_,
             liquidate_address_=liquidate_address_,
-            liquidity_fund_address_=liquidity_fund_address_,
-            insurance_fund_address_=insurance_fund_address_,
+            settlement_=settlement_,
             max_leverage_=max_leverage_,
             min_quantity_=min_quantity_,
             maker1_direction_=maker1_direction_,
@@ -2117,12 +2259,10 @@ func process_and_execute_orders_recurse{
                 request_list_=request_list_ + MultipleOrder.SIZE,
                 quantity_executed_=quantity_executed_,
                 account_registry_address_=account_registry_address_,
-                holding_address_=holding_address_,
-                trading_fees_address_=trading_fees_address_,
-                fees_balance_address_=fees_balance_address_,
+                fee_discount_address_=fee_discount_address_,
+                fee_schedule_=fee_schedule_,
                 liquidate_address_=liquidate_address_,
-                liquidity_fund_address_=liquidity_fund_address_,
-                insurance_fund_address_=insurance_fund_address_,
+                settlement_=settlement_,
                 max_leverage_=max_leverage_,
                 min_quantity_=min_quantity_,
                 maker1_direction_=maker1_direction_,
@@ -2195,12 +2335,10 @@ func process_and_execute_orders_recurse{
                 request_list_=request_list_ + MultipleOrder.SIZE,
                 quantity_executed_=quantity_executed_,
                 account_registry_address_=account_registry_address_,
-                holding_address_=holding_address_,
-                trading_fees_address_=trading_fees_address_,
-                fees_balance_address_=fees_balance_address_,
+                fee_discount_address_=fee_discount_address_,
+                fee_schedule_=fee_schedule_,
                 liquidate_address_=liquidate_address_,
-                liquidity_fund_address_=liquidity_fund_address_,
-                insurance_fund_address_=insurance_fund_address_,
+                settlement_=settlement_,
                 max_leverage_=max_leverage_,
                 min_quantity_=min_quantity_,
                 maker1_direction_=maker1_direction_,
@@ -2265,12 +2403,10 @@ func process_and_execute_orders_recurse{
                 request_list_=request_list_ + MultipleOrder.SIZE,
                 quantity_executed_=quantity_executed_,
                 account_registry_address_=account_registry_address_,
-                holding_address_=holding_address_,
-                trading_fees_address_=trading_fees_address_,
-                fees_balance_address_=fees_balance_address_,
+                fee_discount_address_=fee_discount_address_,
+                fee_schedule_=fee_schedule_,
                 liquidate_address_=liquidate_address_,
-                liquidity_fund_address_=liquidity_fund_address_,
-                insurance_fund_address_=insurance_fund_address_,
+                settlement_=settlement_,
                 max_leverage_=max_leverage_,
                 min_quantity_=min_quantity_,
                 maker1_direction_=maker1_direction_,
@@ -2326,6 +2462,7 @@ func process_and_execute_orders_recurse{
             borrowed_amount_temp: felt,
             trading_fee: felt,
             margin_lock_amount: felt,
+            settlement_open: BatchSettlement,
         ) = process_open_orders(
             order_=[request_list_],
             execution_price_=execution_price,
@@ -2334,12 +2471,11 @@ func process_and_execute_orders_recurse{
             market_id_=market_id_,
             collateral_id_=collateral_id_,
             collateral_token_decimal_=collateral_token_decimal_,
-            liquidity_fund_address_=liquidity_fund_address_,
             liquidate_address_=liquidate_address_,
-            holding_address_=holding_address_,
-            trading_fees_address_=trading_fees_address_,
-            fees_balance_address_=fees_balance_address_,
+            fee_discount_address_=fee_discount_address_,
+            fee_schedule_=fee_schedule_,
             side_=current_order_side,
+            settlement_=settlement_,
         );
 
         if (error_code_open != 0) {
@@ -2395,12 +2531,10 @@ func process_and_execute_orders_recurse{
                 request_list_=request_list_ + MultipleOrder.SIZE,
                 quantity_executed_=quantity_executed_,
                 account_registry_address_=account_registry_address_,
-                holding_address_=holding_address_,
-                trading_fees_address_=trading_fees_address_,
-                fees_balance_address_=fees_balance_address_,
+                fee_discount_address_=fee_discount_address_,
+                fee_schedule_=fee_schedule_,
                 liquidate_address_=liquidate_address_,
-                liquidity_fund_address_=liquidity_fund_address_,
-                insurance_fund_address_=insurance_fund_address_,
+                settlement_=settlement_,
                 max_leverage_=max_leverage_,
                 min_quantity_=min_quantity_,
                 maker1_direction_=maker1_direction_,
@@ -2498,6 +2632,7 @@ func process_and_execute_orders_recurse{
 
         assert pnl = trading_fee;
         assert opening_fee = trading_fee;
+        assert updated_settlement = settlement_open;
         assert current_open_interest = quantity_to_execute;
         assert is_liquidation = FALSE;
 
@@ -2543,6 +2678,7 @@ func process_and_execute_orders_recurse{
             borrowed_amount_temp: felt,
             realized_pnl: felt,
             margin_unlock_amount: felt,
+            settlement_close: BatchSettlement,
         ) = process_close_orders(
             order_=[request_list_],
             execution_price_=execution_price,
@@ -2550,9 +2686,7 @@ func process_and_execute_orders_recurse{
             market_id_=market_id_,
             collateral_id_=collateral_id_,
             collateral_token_decimal_=collateral_token_decimal_,
-            liquidity_fund_address_=liquidity_fund_address_,
-            insurance_fund_address_=insurance_fund_address_,
-            holding_address_=holding_address_,
+            settlement_=settlement_,
         );
 
         if (error_code_close != 0) {
@@ -2610,12 +2744,10 @@ func process_and_execute_orders_recurse{
                 request_list_=request_list_ + MultipleOrder.SIZE,
                 quantity_executed_=quantity_executed_,
                 account_registry_address_=account_registry_address_,
-                holding_address_=holding_address_,
-                trading_fees_address_=trading_fees_address_,
-                fees_balance_address_=fees_balance_address_,
+                fee_discount_address_=fee_discount_address_,
+                fee_schedule_=fee_schedule_,
                 liquidate_address_=liquidate_address_,
-                liquidity_fund_address_=liquidity_fund_address_,
-                insurance_fund_address_=insurance_fund_address_,
+                settlement_=settlement_,
                 max_leverage_=max_leverage_,
                 min_quantity_=min_quantity_,
                 maker1_direction_=maker1_direction_,
@@ -2716,12 +2848,10 @@ func process_and_execute_orders_recurse{
                         request_list_=request_list_ + MultipleOrder.SIZE,
                         quantity_executed_=quantity_executed_,
                         account_registry_address_=account_registry_address_,
-                        holding_address_=holding_address_,
-                        trading_fees_address_=trading_fees_address_,
-                        fees_balance_address_=fees_balance_address_,
+                        fee_discount_address_=fee_discount_address_,
+                        fee_schedule_=fee_schedule_,
                         liquidate_address_=liquidate_address_,
-                        liquidity_fund_address_=liquidity_fund_address_,
-                        insurance_fund_address_=insurance_fund_address_,
+                        settlement_=settlement_close,
                         max_leverage_=max_leverage_,
                         min_quantity_=min_quantity_,
                         maker1_direction_=maker1_direction_,
@@ -2798,12 +2928,10 @@ func process_and_execute_orders_recurse{
                         request_list_=request_list_ + MultipleOrder.SIZE,
                         quantity_executed_=quantity_executed_,
                         account_registry_address_=account_registry_address_,
-                        holding_address_=holding_address_,
-                        trading_fees_address_=trading_fees_address_,
-                        fees_balance_address_=fees_balance_address_,
+                        fee_discount_address_=fee_discount_address_,
+                        fee_schedule_=fee_schedule_,
                         liquidate_address_=liquidate_address_,
-                        liquidity_fund_address_=liquidity_fund_address_,
-                        insurance_fund_address_=insurance_fund_address_,
+                        settlement_=settlement_close,
                         max_leverage_=max_leverage_,
                         min_quantity_=min_quantity_,
                         maker1_direction_=maker1_direction_,
@@ -2971,6 +3099,7 @@ func process_and_execute_orders_recurse{
 
         assert pnl = realized_pnl;
         assert opening_fee = 0;
+        assert updated_settlement = settlement_close;
         assert current_open_interest = 0 - quantity_to_execute;
         assert is_liquidation = is_liq;
 
@@ -3061,12 +3190,10 @@ func process_and_execute_orders_recurse{
         request_list_=request_list_ + MultipleOrder.SIZE,
         quantity_executed_=current_quantity_executed,
         account_registry_address_=account_registry_address_,
-        holding_address_=holding_address_,
-        trading_fees_address_=trading_fees_address_,
-        fees_balance_address_=fees_balance_address_,
+        fee_discount_address_=fee_discount_address_,
+        fee_schedule_=fee_schedule_,
         liquidate_address_=liquidate_address_,
-        liquidity_fund_address_=liquidity_fund_address_,
-        insurance_fund_address_=insurance_fund_address_,
+        settlement_=updated_settlement,
         max_leverage_=max_leverage_,
         min_quantity_=min_quantity_,
         maker1_direction_=maker1_direction_,
@@ -6,29 +6,14 @@ from starkware.cairo.common.math import assert_le, assert_lt, assert_nn, assert_
 from starkware.cairo.common.math_cmp import is_le, is_nn
 
 from contracts.Constants import FeeDiscount_INDEX, ManageFeeDetails_ACTION
+from contracts.DataTypes import BaseFee, Discount, FeeSchedule
 from contracts.interfaces.IAuthorizedRegistry import IAuthorizedRegistry
 from contracts.interfaces.IFeeDiscount import IFeeDiscount
 from contracts.libraries.CommonLibrary import CommonLib
+from contracts.libraries.FeeTiers import FeeTiers
 from contracts.libraries.Utils import verify_caller_authority
 from contracts.Math_64x61 import Math64x61_assert64x61, Math64x61_mul, Math64x61_ONE
 
-// //////////
-// Structs //
-// //////////
-
-// Struct to store base fee percentage for each tier for maker and taker
-struct BaseFee {
-    numberOfTokens: felt,
-    makerFee: felt,
-    takerFee: felt,
-}
-
-// Struct to store discount percentage for each tier
-struct Discount {
-    numberOfTokens: felt,
-    discount: felt,
-}
-
 // /////////
 // Events //
 // /////////
@@ -67,6 +52,11 @@ func base_fee_tier(tier: felt) -> (value: BaseFee) {
 func discount_tier(tier: felt) -> (value: Discount) {
 }
 
+// Stores the version of the fee schedule, incremented on every tier update
+@storage_var
+func fee_schedule_version() -> (value: felt) {
+}
+
 // //////////////
 // Constructor //
 // //////////////
@@ -175,6 +165,61 @@ func get_discounted_fee_rate_for_user{
     );
 }
 
+// @notice Function which returns the discounted fee rates for a list of users
+// @param side_ - 1 if maker, any other value if taker
+// @param users_len - Length of the users array
+// @param users - Array of user addresses
+// @returns fee_rates_len - Length of the fee rates array
+// @returns fee_rates - Discounted fee rates in the order of users
+@view
+func get_discounted_fee_rates{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    side_: felt, users_len: felt, users: felt*
+) -> (fee_rates_len: felt, fee_rates: felt*) {
+    alloc_locals;
+    let (registry) = CommonLib.get_registry_address();
+    let (version) = CommonLib.get_contract_version();
+    let (fee_discount_address) = IAuthorizedRegistry.get_contract_address(
+        contract_address=registry, index=FeeDiscount_INDEX, version=version
+    );
+    let (fee_schedule: FeeSchedule) = get_fee_schedule_struct();
+
+    let (fee_rates: felt*) = alloc();
+    populate_fee_rates_recurse(
+        iterator_=0,
+        side_=side_,
+        fee_schedule_=fee_schedule,
+        fee_discount_address_=fee_discount_address,
+        users_len_=users_len,
+        users_=users,
+        fee_rates_=fee_rates,
+    );
+    return (users_len, fee_rates);
+}
+
+// @notice Function which returns all base fee and discount tiers along with the schedule version
+// @returns version - Version of the fee schedule
+// @returns fee_tiers_len - Length of base fee tiers
+// @returns fee_tiers - Array of base fee tiers
+// @returns discount_tiers_len - Length of discount tiers
+// @returns discount_tiers - Array of discount tiers
+@view
+func get_fee_schedule{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() -> (
+    version: felt,
+    fee_tiers_len: felt,
+    fee_tiers: BaseFee*,
+    discount_tiers_len: felt,
+    discount_tiers: Discount*,
+) {
+    let (fee_schedule: FeeSchedule) = get_fee_schedule_struct();
+    return (
+        fee_schedule.version,
+        fee_schedule.base_fees_len,
+        fee_schedule.base_fees,
+        fee_schedule.discounts_len,
+        fee_schedule.discounts,
+    );
+}
+
 // @notice Function which returns an array of all tier fees
 // @returns fee_tiers_len - Length of base fee tiers
 // @returns fee_tiers - Array of base fee tiers
@@ -277,6 +322,9 @@ func update_base_fees{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_chec
         base_fee_tier.write(tier=tier_, value=fee_details);
     }
 
+    let (current_version) = fee_schedule_version.read();
+    fee_schedule_version.write(value=current_version + 1);
+
     // update_base_fees_called event is emitted
     update_base_fees_called.emit(tier=tier_, fee_details=fee_details);
 
@@ -348,6 +396,9 @@ func update_discount{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check
         discount_tier.write(tier=tier_, value=discount_details);
     }
 
+    let (current_version) = fee_schedule_version.read();
+    fee_schedule_version.write(value=current_version + 1);
+
     // update_discount_called event is emitted
     update_discount_called.emit(tier=tier_, discount_details=discount_details);
 
@@ -358,6 +409,66 @@ func update_discount{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check
 // Internal //
 // ///////////
 
+// @notice Internal function to load all the tiers into a FeeSchedule struct
+// @returns fee_schedule - FeeSchedule struct
+func get_fee_schedule_struct{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    ) -> (fee_schedule: FeeSchedule) {
+    alloc_locals;
+    let (local version) = fee_schedule_version.read();
+    let (local fee_tiers_len, local fee_tiers: BaseFee*) = get_all_tier_fees();
+    let (discount_tiers_len, discount_tiers: Discount*) = get_all_tier_discounts();
+
+    let fee_schedule = FeeSchedule(
+        version=version,
+        base_fees_len=fee_tiers_len,
+        base_fees=fee_tiers,
+        discounts_len=discount_tiers_len,
+        discounts=discount_tiers,
+    );
+    return (fee_schedule,);
+}
+
+// @notice Internal function called by get_discounted_fee_rates to recursively add fee rates
+// @param iterator_ - Current index being populated
+// @param side_ - 1 if maker, any other value if taker
+// @param fee_schedule_ - FeeSchedule struct loaded once for all the users
+// @param fee_discount_address_ - Address of the FeeDiscount contract
+// @param users_len_ - Length of the users array
+// @param users_ - Array of user addresses
+// @param fee_rates_ - Array of fee rates up to the index
+func populate_fee_rates_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    iterator_: felt,
+    side_: felt,
+    fee_schedule_: FeeSchedule,
+    fee_discount_address_: felt,
+    users_len_: felt,
+    users_: felt*,
+    fee_rates_: felt*,
+) {
+    alloc_locals;
+    if (iterator_ == users_len_) {
+        return ();
+    }
+
+    let (number_of_tokens) = IFeeDiscount.get_user_tokens(
+        contract_address=fee_discount_address_, address=users_[iterator_]
+    );
+    let (fee, _, _) = FeeTiers.get_discounted_fee_rate(
+        fee_schedule_=fee_schedule_, number_of_tokens_=number_of_tokens, side_=side_
+    );
+    assert fee_rates_[iterator_] = fee;
+
+    return populate_fee_rates_recurse(
+        iterator_ + 1,
+        side_,
+        fee_schedule_,
+        fee_discount_address_,
+        users_len_,
+        users_,
+        fee_rates_,
+    );
+}
+
 // @notice Recursive funtion to find the base fee tier of the user
 // @param  number_of_tokens_ - number of the tokens of the user
 // @param tier_ - tier level
@@ -7,8 +7,8 @@ from starkware.cairo.common.math import assert_le, assert_lt, assert_not_zero
 from starkware.cairo.common.math_cmp import is_le
 from starkware.starknet.common.syscalls import get_block_timestamp
 
-from contracts.Constants import Hightide_INDEX, ManageHighTide_ACTION
-from contracts.DataTypes import LeaderboardStat
+from contracts.Constants import Hightide_INDEX, LEADERBOARD_MAX_DELTA_DEPTH, ManageHighTide_ACTION
+from contracts.DataTypes import LeaderboardDelta, LeaderboardStat
 from contracts.interfaces.IAuthorizedRegistry import IAuthorizedRegistry
 from contracts.interfaces.IHighTide import IHighTide
 from contracts.libraries.CommonLibrary import CommonLib
@@ -69,6 +69,17 @@ func time_between_calls() -> (res: felt) {
 func last_call_timestamp(season_id: felt, market_id: felt) -> (timestamp: felt) {
 }
 
+// Stores the number of delta epochs since the last full leaderboard, 0 for a full leaderboard
+// Rows of a delta epoch which are not stored are the same as in the previous epoch
+@storage_var
+func delta_depth(season_id: felt, market_id: felt, epoch: felt) -> (depth: felt) {
+}
+
+// Stores the number of rows of a delta epoch
+@storage_var
+func delta_leaderboard_size(season_id: felt, market_id: felt, epoch: felt) -> (size: felt) {
+}
+
 // //////////////
 // Constructor //
 // //////////////
@@ -161,6 +172,24 @@ func get_leaderboard_epoch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range
 ) -> (leaderboard_array_len: felt, leaderboard_array: LeaderboardStat*) {
     alloc_locals;
     let leaderboard_array: LeaderboardStat* = alloc();
+    let (depth: felt) = delta_depth.read(season_id=season_id_, market_id=market_id_, epoch=epoch_);
+
+    // Resolve the rows of a delta epoch from the previous epochs
+    if (depth != 0) {
+        let (size: felt) = delta_leaderboard_size.read(
+            season_id=season_id_, market_id=market_id_, epoch=epoch_
+        );
+        resolve_leaderboard_delta_recurse(
+            season_id_=season_id_,
+            market_id_=market_id_,
+            epoch_=epoch_,
+            iterator_=0,
+            size_=size,
+            leaderboard_array_=leaderboard_array,
+        );
+        return (size, leaderboard_array);
+    }
+
     let (array_length: felt) = get_leaderboard_epoch_recurse(
         season_id_=season_id_,
         market_id_=market_id_,
@@ -172,6 +201,19 @@ func get_leaderboard_epoch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range
     return (array_length, leaderboard_array);
 }
 
+// @notice Provides the number of delta epochs since the last full leaderboard
+// @param season_id_ - Season id
+// @param market_id_ - Id of the market
+// @param epoch_ - Epoch of the leaderboard
+// @returns depth - 0 if the full leaderboard is stored at this epoch
+@view
+func get_delta_depth{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    season_id_: felt, market_id_: felt, epoch_: felt
+) -> (depth: felt) {
+    let (depth: felt) = delta_depth.read(season_id=season_id_, market_id=market_id_, epoch=epoch_);
+    return (depth,);
+}
+
 // @notice Provides the status of a market
 // @param season_id_ - Season id
 // @param market_id_ - Id of the market
@@ -307,6 +349,98 @@ func set_number_of_top_traders{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, r
 func set_leaderboard{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     market_id_: felt, leaderboard_array_len: felt, leaderboard_array: LeaderboardStat*
 ) -> (res: felt) {
+    alloc_locals;
+    let (
+        local season_id: felt, local current_epoch: felt, local number_of_entries: felt
+    ) = start_epoch(market_id_=market_id_);
+
+    // The length of the array should be same as number_of_top_traders variable
+    with_attr error_message("Leaderboard: Invalid number of entries") {
+        assert leaderboard_array_len = number_of_entries;
+    }
+
+    // Recursively write the leaderboard stats to state
+    set_leaderboard_recurse(
+        season_id_=season_id,
+        market_id_=market_id_,
+        epoch_=current_epoch,
+        iterator_=0,
+        leaderboard_array_len_=leaderboard_array_len,
+        leaderboard_array_=leaderboard_array,
+    );
+
+    end_epoch(season_id_=season_id, market_id_=market_id_, epoch_=current_epoch);
+    return (1,);
+}
+
+// @notice External function to set the leaderboard for a market by storing only the rows changed since the previous epoch
+// @param market_id_ - Id of the market
+// @param delta_array_len - Length of the delta array
+// @param delta_array - Array of changed rows, with their index in the leaderboard
+// @returns status
+// @dev returns 1 => Succesfully set the leaderboard
+// @dev a full leaderboard must be set after LEADERBOARD_MAX_DELTA_DEPTH consecutive delta epochs
+@external
+func set_leaderboard_delta{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt, delta_array_len: felt, delta_array: LeaderboardDelta*
+) -> (res: felt) {
+    alloc_locals;
+    let (
+        local season_id: felt, local current_epoch: felt, local number_of_entries: felt
+    ) = start_epoch(market_id_=market_id_);
+
+    // There must be a previous epoch to point back to
+    with_attr error_message("Leaderboard: Full leaderboard required") {
+        assert_not_zero(current_epoch);
+    }
+
+    let (local previous_size: felt) = get_leaderboard_size(
+        season_id_=season_id, market_id_=market_id_, epoch_=current_epoch - 1
+    );
+    let (local previous_depth: felt) = delta_depth.read(
+        season_id=season_id, market_id=market_id_, epoch=current_epoch - 1
+    );
+
+    // The number of entries must not have changed since the previous epoch
+    // and the chain of delta epochs to resolve must stay bounded
+    with_attr error_message("Leaderboard: Full leaderboard required") {
+        assert previous_size = number_of_entries;
+        assert_lt(previous_depth, LEADERBOARD_MAX_DELTA_DEPTH);
+    }
+
+    delta_depth.write(
+        season_id=season_id, market_id=market_id_, epoch=current_epoch, value=previous_depth + 1
+    );
+    delta_leaderboard_size.write(
+        season_id=season_id, market_id=market_id_, epoch=current_epoch, value=number_of_entries
+    );
+
+    // Recursively write the changed rows to state
+    set_leaderboard_delta_recurse(
+        season_id_=season_id,
+        market_id_=market_id_,
+        epoch_=current_epoch,
+        number_of_entries_=number_of_entries,
+        delta_array_len_=delta_array_len,
+        delta_array_=delta_array,
+    );
+
+    end_epoch(season_id_=season_id, market_id_=market_id_, epoch_=current_epoch);
+    return (1,);
+}
+
+// ///////////
+// Internal //
+// ///////////
+
+// @notice Internal function to check that a new epoch can be set and to record its timestamp
+// @param market_id_ - Id of the market
+// @returns season_id - Id of the current season
+// @returns epoch - Epoch to be set
+// @returns number_of_entries - Number of rows in the leaderboard
+func start_epoch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt
+) -> (season_id: felt, epoch: felt, number_of_entries: felt) {
     alloc_locals;
     // Get status
     let (status: felt) = get_call_status(market_id_=market_id_);
@@ -316,17 +450,12 @@ func set_leaderboard{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check
         assert_not_zero(status);
     }
 
-    let (number_of_entries: felt) = number_of_top_traders.read();
+    let (local number_of_entries: felt) = number_of_top_traders.read();
 
     with_attr error_message("Leaderboard: Number of entries not set") {
         assert_not_zero(number_of_entries);
     }
 
-    // The length of the array should be same as number_of_top_traders variable
-    with_attr error_message("Leaderboard: Invalid number of entries") {
-        assert leaderboard_array_len = number_of_entries;
-    }
-
     let (registry) = CommonLib.get_registry_address();
     let (version) = CommonLib.get_contract_version();
 
@@ -335,10 +464,12 @@ func set_leaderboard{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check
     );
 
     // Get trading season id
-    let (season_id: felt) = IHighTide.get_current_season_id(contract_address=hightide_address);
+    let (local season_id: felt) = IHighTide.get_current_season_id(
+        contract_address=hightide_address
+    );
 
     // Get current epoch
-    let (current_epoch: felt) = epoch_length.read(season_id=season_id, market_id=market_id_);
+    let (local current_epoch: felt) = epoch_length.read(season_id=season_id, market_id=market_id_);
 
     // Get current timestamp
     let (current_timestamp: felt) = get_block_timestamp();
@@ -348,31 +479,176 @@ func set_leaderboard{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check
         season_id=season_id, market_id=market_id_, epoch=current_epoch, value=current_timestamp
     );
 
-    // Recursively write the leaderboard stats to state
-    set_leaderboard_recurse(
-        season_id_=season_id,
+    return (season_id, current_epoch, number_of_entries);
+}
+
+// @notice Internal function to close an epoch once its leaderboard is set
+// @param season_id_ - Season id
+// @param market_id_ - Id of the market
+// @param epoch_ - Epoch that was set
+func end_epoch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    season_id_: felt, market_id_: felt, epoch_: felt
+) {
+    let (current_timestamp: felt) = get_block_timestamp();
+
+    // Update the length of the epoch
+    epoch_length.write(season_id=season_id_, market_id=market_id_, value=epoch_ + 1);
+
+    // Update the last called timestamp
+    last_call_timestamp.write(season_id=season_id_, market_id=market_id_, value=current_timestamp);
+
+    leaderboard_update.emit(
+        season_id=season_id_, market_id=market_id_, epoch=epoch_, timestamp=current_timestamp
+    );
+    return ();
+}
+
+// @notice Internal function to get the number of rows of the leaderboard at an epoch
+// @param season_id_ - Season id
+// @param market_id_ - Id for the market
+// @param epoch_ - Epoch of the leaderboard
+// @returns size - Number of rows of the leaderboard
+func get_leaderboard_size{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    season_id_: felt, market_id_: felt, epoch_: felt
+) -> (size: felt) {
+    let (depth: felt) = delta_depth.read(season_id=season_id_, market_id=market_id_, epoch=epoch_);
+    if (depth != 0) {
+        return delta_leaderboard_size.read(
+            season_id=season_id_, market_id=market_id_, epoch=epoch_
+        );
+    }
+
+    let (leaderboard_array: LeaderboardStat*) = alloc();
+    let (size: felt) = get_leaderboard_epoch_recurse(
+        season_id_=season_id_,
         market_id_=market_id_,
-        epoch_=current_epoch,
+        epoch_=epoch_,
         iterator_=0,
-        leaderboard_array_len_=leaderboard_array_len,
         leaderboard_array_=leaderboard_array,
     );
+    return (size=size);
+}
 
-    // Update the length of the epoch
-    epoch_length.write(season_id=season_id, market_id=market_id_, value=current_epoch + 1);
+// @notice Internal function to resolve the rows of a delta epoch
+// @param season_id_ - Season id
+// @param market_id_ - Id for the market
+// @param epoch_ - Epoch for which we are returning leaderboard
+// @param iterator_ - Iterator to set the array
+// @param size_ - Number of rows of the leaderboard
+// @param leaderboard_array_ - Array of the resolved leaderboard stats
+func resolve_leaderboard_delta_recurse{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(
+    season_id_: felt,
+    market_id_: felt,
+    epoch_: felt,
+    iterator_: felt,
+    size_: felt,
+    leaderboard_array_: LeaderboardStat*,
+) {
+    if (iterator_ == size_) {
+        return ();
+    }
 
-    // Update the last called timestamp
-    last_call_timestamp.write(season_id=season_id, market_id=market_id_, value=current_timestamp);
+    let (current_position: LeaderboardStat) = resolve_leaderboard_row(
+        season_id_=season_id_, market_id_=market_id_, epoch_=epoch_, index_=iterator_
+    );
+    assert leaderboard_array_[iterator_] = current_position;
 
-    leaderboard_update.emit(
-        season_id=season_id, market_id=market_id_, epoch=current_epoch, timestamp=current_timestamp
+    return resolve_leaderboard_delta_recurse(
+        season_id_=season_id_,
+        market_id_=market_id_,
+        epoch_=epoch_,
+        iterator_=iterator_ + 1,
+        size_=size_,
+        leaderboard_array_=leaderboard_array_,
     );
-    return (1,);
 }
 
-// ///////////
-// Internal //
-// ///////////
+// @notice Internal function to find a row of the leaderboard, walking back through the delta epochs
+// @param season_id_ - Season id
+// @param market_id_ - Id for the market
+// @param epoch_ - Epoch from which to start looking
+// @param index_ - Index of the row
+// @returns row - Leaderboard stat at the index
+func resolve_leaderboard_row{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    season_id_: felt, market_id_: felt, epoch_: felt, index_: felt
+) -> (row: LeaderboardStat) {
+    let (current_position: LeaderboardStat) = leaderboard_mapping.read(
+        season_id=season_id_, market_id=market_id_, epoch=epoch_, index=index_
+    );
+
+    // A row stored at this epoch, or a full leaderboard, ends the search
+    if (current_position.user_address != 0) {
+        return (current_position,);
+    }
+
+    let (depth: felt) = delta_depth.read(season_id=season_id_, market_id=market_id_, epoch=epoch_);
+    if (depth == 0) {
+        return (current_position,);
+    }
+
+    return resolve_leaderboard_row(
+        season_id_=season_id_, market_id_=market_id_, epoch_=epoch_ - 1, index_=index_
+    );
+}
+
+// @notice Internal function to set the changed rows of a delta epoch
+// @param season_id_ - Season id
+// @param market_id_ - Id for the market
+// @param epoch_ - Epoch for which we are setting leaderboard
+// @param number_of_entries_ - Number of rows of the leaderboard
+// @param delta_array_len_ - Number of changed rows left to set
+// @param delta_array_ - Array of the changed rows
+func set_leaderboard_delta_recurse{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(
+    season_id_: felt,
+    market_id_: felt,
+    epoch_: felt,
+    number_of_entries_: felt,
+    delta_array_len_: felt,
+    delta_array_: LeaderboardDelta*,
+) {
+    // Exit condition
+    if (delta_array_len_ == 0) {
+        return ();
+    }
+
+    with_attr error_message("Leaderboard: Invalid index provided") {
+        assert_le(0, [delta_array_].index);
+        assert_lt([delta_array_].index, number_of_entries_);
+    }
+
+    with_attr error_message("Leaderboard: Invalid user address provided") {
+        assert_not_zero([delta_array_].user_address);
+    }
+
+    with_attr error_message("Leaderboard: Invalid reward provided") {
+        assert_le(0, [delta_array_].reward);
+    }
+
+    // Write to leaderboard mapping
+    leaderboard_mapping.write(
+        season_id=season_id_,
+        market_id=market_id_,
+        epoch=epoch_,
+        index=[delta_array_].index,
+        value=LeaderboardStat(
+            user_address=[delta_array_].user_address, reward=[delta_array_].reward
+        ),
+    );
+
+    // Set the next value
+    return set_leaderboard_delta_recurse(
+        season_id_=season_id_,
+        market_id_=market_id_,
+        epoch_=epoch_,
+        number_of_entries_=number_of_entries_,
+        delta_array_len_=delta_array_len_ - 1,
+        delta_array_=delta_array_ + LeaderboardDelta.SIZE,
+    );
+}
 
 // @notice Internal function to get leaderboard stats for a market
 // @param season_id_ - Season id
@@ -1,7 +1,7 @@
 %lang starknet
 
 from starkware.cairo.common.alloc import alloc
-from starkware.cairo.common.bool import TRUE
+from starkware.cairo.common.bool import FALSE, TRUE
 from starkware.starknet.common.syscalls import get_block_timestamp, get_caller_address
 from starkware.cairo.common.cairo_builtins import HashBuiltin
 from starkware.cairo.common.math import unsigned_div_rem, assert_le, assert_lt
@@ -94,6 +94,16 @@ func trader_for_season(season_id: felt, trader_address: felt) -> (is_trader: fel
 func open_interest(market_id: felt) -> (res: felt) {
 }
 
+// stores the id of the active season last fetched from HighTide
+@storage_var
+func cached_season_id() -> (season_id: felt) {
+}
+
+// stores the metadata of the active season last fetched from HighTide
+@storage_var
+func cached_season() -> (season: TradingSeason) {
+}
+
 // //////////////
 // Constructor //
 // //////////////
@@ -122,6 +132,16 @@ func get_open_interest{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     return (current_open_interest,);
 }
 
+// @dev - Returns the active season cached from HighTide, season_id is 0 if nothing is cached
+@view
+func get_cached_season{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() -> (
+    season_id: felt, season: TradingSeason
+) {
+    let (season_id) = cached_season_id.read();
+    let (season: TradingSeason) = cached_season.read();
+    return (season_id, season);
+}
+
 // @dev - This function returns current running total for VolumeMetaData
 // It supports pagination through the use of num_order_required_ and index_from_ params
 // This might be used to calculate x_1 according to the hightide algorithm
@@ -358,16 +378,11 @@ func record_trade_batch_stats{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, ra
         contract_address=registry, index=Hightide_INDEX, version=version
     );
 
-    let (season_id_) = IHighTide.get_current_season_id(hightide_address);
+    let (season_id_, season: TradingSeason) = get_active_season(hightide_address);
     if (season_id_ == 0) {
         return ();
     }
 
-    let (is_expired) = IHighTide.get_season_expiry_state(hightide_address, season_id_);
-    if (is_expired == TRUE) {
-        return ();
-    }
-
     // Get User stats address
     let (user_stats_address) = IAuthorizedRegistry.get_contract_address(
         contract_address=registry, index=UserStats_INDEX, version=version
@@ -381,9 +396,6 @@ func record_trade_batch_stats{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, ra
         trader_stats_list=trader_stats_list,
     );
 
-    // Get trading season data
-    let (season: TradingSeason) = IHighTide.get_season(hightide_address, season_id_);
-
     // Get the current day according to the season
     let current_day = get_current_day(season.start_timestamp);
 
@@ -394,83 +406,279 @@ func record_trade_batch_stats{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, ra
         season_id_, market_id_, current_day, current_daily_count + request_list_len
     );
 
-    let (is_market_listed) = IHighTide.is_market_under_hightide(
+    let (local is_market_listed) = IHighTide.is_market_under_hightide(
         hightide_address, season_id_, market_id_
     );
 
-    // Recursively set the trading stats for each order
-    return record_trade_batch_stats_recurse(
+    // Sum up the order volume of the batch for each side
+    let (
+        open_orders_count, open_volume_64x61, close_orders_count, close_volume_64x61
+    ) = record_trade_batch_stats_recurse(
+        iterator_=0,
         season_id_=season_id_,
         market_id_=market_id_,
         execution_price_64x61_=execution_price_64x61_,
         request_list_len_=request_list_len,
         request_list_=request_list,
         executed_sizes_list_=executed_sizes_list,
+        open_orders_count_=0,
+        open_volume_64x61_=0,
+        close_orders_count_=0,
+        close_volume_64x61_=0,
+    );
+
+    // Update running totals of order volume once per side
+    add_order_volume(season_id_, market_id_, OPEN, open_orders_count, open_volume_64x61);
+    add_order_volume(season_id_, market_id_, CLOSE, close_orders_count, close_volume_64x61);
+
+    // Record the traders of the batch who are trading for the first time
+    let (local current_num_traders) = num_traders.read(season_id_, market_id_);
+    let (local current_num_traders_in_season) = num_traders_in_season.read(season_id_);
+    let (
+        local updated_num_traders, local updated_num_traders_in_season
+    ) = record_new_traders_recurse(
+        iterator_=0,
+        season_id_=season_id_,
+        market_id_=market_id_,
         is_market_listed_=is_market_listed,
+        request_list_len_=request_list_len,
+        request_list_=request_list,
+        num_traders_=current_num_traders,
+        num_traders_in_season_=current_num_traders_in_season,
     );
+
+    if (updated_num_traders != current_num_traders) {
+        num_traders.write(season_id_, market_id_, updated_num_traders);
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    } else {
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    }
+
+    if (updated_num_traders_in_season != current_num_traders_in_season) {
+        num_traders_in_season.write(season_id_, updated_num_traders_in_season);
+        return ();
+    }
+    return ();
 }
 
 // ///////////
 // Internal //
 // ///////////
 
+// @dev - Returns the active season, using the cached season while it has not expired
+// A season can only be ended once it has expired, so an unexpired cached season is still active
+// season_id is 0 if there is no active season
+func get_active_season{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    hightide_address_: felt
+) -> (season_id: felt, season: TradingSeason) {
+    alloc_locals;
+
+    let (local current_season_id) = cached_season_id.read();
+    let (local current_season: TradingSeason) = cached_season.read();
+    let (local current_timestamp) = get_block_timestamp();
+
+    if (current_season_id != 0) {
+        let is_expired = is_season_expired(current_season, current_timestamp);
+        if (is_expired == FALSE) {
+            return (current_season_id, current_season);
+        }
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    } else {
+        tempvar syscall_ptr = syscall_ptr;
+        tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
+        tempvar range_check_ptr = range_check_ptr;
+    }
+    local pedersen_ptr: HashBuiltin* = pedersen_ptr;
+
+    // Cache is empty or expired, fetch the active season from HighTide
+    let (local season_id) = IHighTide.get_current_season_id(hightide_address_);
+    if (season_id == 0) {
+        return (0, current_season);
+    }
+
+    // The cached season has expired but is yet to be ended
+    if (season_id == current_season_id) {
+        return (0, current_season);
+    }
+
+    let (local season: TradingSeason) = IHighTide.get_season(hightide_address_, season_id);
+    let is_expired = is_season_expired(season, current_timestamp);
+    if (is_expired == TRUE) {
+        return (0, season);
+    }
+
+    cached_season_id.write(season_id);
+    cached_season.write(season);
+    return (season_id, season);
+}
+
+// @dev - Returns TRUE if the season has expired at the given timestamp, as HighTide computes it
+func is_season_expired{range_check_ptr}(season_: TradingSeason, current_timestamp_: felt) -> felt {
+    let season_end_timestamp = season_.start_timestamp + season_.num_trading_days * ONE_DAY;
+    let within_season = is_le(current_timestamp_, season_end_timestamp);
+    if (within_season == TRUE) {
+        return FALSE;
+    }
+    return TRUE;
+}
+
 // @dev - Internal function to be called recursively
+// It emits an event for each order and returns the orders count and volume of the batch per side
 func record_trade_batch_stats_recurse{
     syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
 }(
+    iterator_: felt,
     season_id_: felt,
     market_id_: felt,
     execution_price_64x61_: felt,
     request_list_len_: felt,
     request_list_: MultipleOrder*,
     executed_sizes_list_: felt*,
-    is_market_listed_: felt,
+    open_orders_count_: felt,
+    open_volume_64x61_: felt,
+    close_orders_count_: felt,
+    close_volume_64x61_: felt,
+) -> (
+    open_orders_count: felt,
+    open_volume_64x61: felt,
+    close_orders_count: felt,
+    close_volume_64x61: felt,
 ) {
     alloc_locals;
 
-    if (request_list_len_ == 0) {
+    if (iterator_ == request_list_len_) {
+        return (open_orders_count_, open_volume_64x61_, close_orders_count_, close_volume_64x61_);
+    }
+
+    let (local present_trade_volume_64x61) = Math64x61_mul(
+        executed_sizes_list_[iterator_], execution_price_64x61_
+    );
+
+    // emit event for off-chain consumers
+    trade_recorded.emit(
+        season_id_,
+        market_id_,
+        request_list_[iterator_].user_address,
+        request_list_[iterator_].side,
+        executed_sizes_list_[iterator_],
+        execution_price_64x61_,
+    );
+
+    if (request_list_[iterator_].side == CLOSE) {
+        let (updated_close_volume_64x61) = Math64x61_add(
+            close_volume_64x61_, present_trade_volume_64x61
+        );
+        return record_trade_batch_stats_recurse(
+            iterator_ + 1,
+            season_id_,
+            market_id_,
+            execution_price_64x61_,
+            request_list_len_,
+            request_list_,
+            executed_sizes_list_,
+            open_orders_count_,
+            open_volume_64x61_,
+            close_orders_count_ + 1,
+            updated_close_volume_64x61,
+        );
+    }
+
+    let (updated_open_volume_64x61) = Math64x61_add(open_volume_64x61_, present_trade_volume_64x61);
+    return record_trade_batch_stats_recurse(
+        iterator_ + 1,
+        season_id_,
+        market_id_,
+        execution_price_64x61_,
+        request_list_len_,
+        request_list_,
+        executed_sizes_list_,
+        open_orders_count_ + 1,
+        updated_open_volume_64x61,
+        close_orders_count_,
+        close_volume_64x61_,
+    );
+}
+
+// @dev - Adds the orders and volume of a batch to the running totals of a volume_type
+func add_order_volume{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    season_id_: felt, market_id_: felt, side_: felt, orders_count_: felt, volume_64x61_: felt
+) {
+    alloc_locals;
+
+    if (orders_count_ == 0) {
         return ();
     }
 
-    // Update running total of order volume
     let volume_metadata: VolumeMetaData = VolumeMetaData(
-        season_id=season_id_, market_id=market_id_, side=[request_list_].side
+        season_id=season_id_, market_id=market_id_, side=side_
     );
 
     let (current_len) = num_orders.read(volume_metadata);
-
     let (current_volume_64x61) = order_volume.read(volume_metadata);
-    let (present_trade_volume_64x61) = Math64x61_mul(
-        [executed_sizes_list_], execution_price_64x61_
-    );
-    let (updated_order_volume_64x61) = Math64x61_add(
-        current_volume_64x61, present_trade_volume_64x61
-    );
+    let (updated_order_volume_64x61) = Math64x61_add(current_volume_64x61, volume_64x61_);
     order_volume.write(volume_metadata, updated_order_volume_64x61);
+    num_orders.write(volume_metadata, current_len + orders_count_);
+    return ();
+}
 
-    // increment number of trades storage_var
-    num_orders.write(volume_metadata, current_len + 1);
+// @dev - Internal function to mark the first time traders of a batch as active
+// A trader with several orders in the batch is checked only at the first order
+// It returns the updated trader counts, which are written once by the caller
+func record_new_traders_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    iterator_: felt,
+    season_id_: felt,
+    market_id_: felt,
+    is_market_listed_: felt,
+    request_list_len_: felt,
+    request_list_: MultipleOrder*,
+    num_traders_: felt,
+    num_traders_in_season_: felt,
+) -> (num_traders: felt, num_traders_in_season: felt) {
+    alloc_locals;
+
+    if (iterator_ == request_list_len_) {
+        return (num_traders_, num_traders_in_season_);
+    }
+
+    local trader_address = request_list_[iterator_].user_address;
+    let is_recorded = is_trader_in_orders(trader_address, iterator_, request_list_);
+    if (is_recorded == TRUE) {
+        return record_new_traders_recurse(
+            iterator_ + 1,
+            season_id_,
+            market_id_,
+            is_market_listed_,
+            request_list_len_,
+            request_list_,
+            num_traders_,
+            num_traders_in_season_,
+        );
+    }
+
+    local updated_num_traders;
+    local updated_num_traders_in_season;
 
     // Update number of unique active traders for a market in a season
-    let (trader_status) = trader_for_market.read(
-        season_id_, market_id_, [request_list_].user_address
-    );
+    let (trader_status) = trader_for_market.read(season_id_, market_id_, trader_address);
 
     // If trader was not active for market in this season
     if (trader_status == 0) {
         // Mark trader as active
-        trader_for_market.write(season_id_, market_id_, [request_list_].user_address, 1);
-        let (current_num_traders) = num_traders.read(season_id_, market_id_);
-        // Increment count of unique active traders for market in season
-        num_traders.write(season_id_, market_id_, current_num_traders + 1);
+        trader_for_market.write(season_id_, market_id_, trader_address, 1);
         // Store trader address for market in this season at current index
-        traders_in_market.write(
-            season_id_, market_id_, current_num_traders, [request_list_].user_address
-        );
+        traders_in_market.write(season_id_, market_id_, num_traders_, trader_address);
+        assert updated_num_traders = num_traders_ + 1;
         tempvar syscall_ptr = syscall_ptr;
         tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
         tempvar range_check_ptr = range_check_ptr;
     } else {
+        assert updated_num_traders = num_traders_;
         tempvar syscall_ptr = syscall_ptr;
         tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
         tempvar range_check_ptr = range_check_ptr;
@@ -478,52 +686,58 @@ func record_trade_batch_stats_recurse{
 
     if (is_market_listed_ == 1) {
         // Get the trader status in a season
-        let (trader_status) = trader_for_season.read(season_id_, [request_list_].user_address);
+        let (trader_status) = trader_for_season.read(season_id_, trader_address);
 
         // If trader was not active for a market listed under hightide in this season
         if (trader_status == 0) {
             // Mark trader as active
-            trader_for_season.write(season_id_, [request_list_].user_address, 1);
-            let (current_num_traders) = num_traders_in_season.read(season_id_);
-            // Increment count of unique active traders for market listed under hightide in season
-            num_traders_in_season.write(season_id_, current_num_traders + 1);
+            trader_for_season.write(season_id_, trader_address, 1);
             // Store trader address for a market listed under hightide in this season at current index
-            traders_in_season.write(season_id_, current_num_traders, [request_list_].user_address);
+            traders_in_season.write(season_id_, num_traders_in_season_, trader_address);
+            assert updated_num_traders_in_season = num_traders_in_season_ + 1;
             tempvar syscall_ptr = syscall_ptr;
             tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
             tempvar range_check_ptr = range_check_ptr;
         } else {
+            assert updated_num_traders_in_season = num_traders_in_season_;
             tempvar syscall_ptr = syscall_ptr;
             tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
             tempvar range_check_ptr = range_check_ptr;
         }
     } else {
+        assert updated_num_traders_in_season = num_traders_in_season_;
         tempvar syscall_ptr = syscall_ptr;
         tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
         tempvar range_check_ptr = range_check_ptr;
     }
 
-    // emit event for off-chain consumers
-    trade_recorded.emit(
-        season_id_,
-        market_id_,
-        [request_list_].user_address,
-        [request_list_].side,
-        [executed_sizes_list_],
-        execution_price_64x61_,
-    );
-
-    return record_trade_batch_stats_recurse(
+    return record_new_traders_recurse(
+        iterator_ + 1,
         season_id_,
         market_id_,
-        execution_price_64x61_,
-        request_list_len_ - 1,
-        request_list_ + MultipleOrder.SIZE,
-        executed_sizes_list_,
         is_market_listed_,
+        request_list_len_,
+        request_list_,
+        updated_num_traders,
+        updated_num_traders_in_season,
     );
 }
 
+// @dev - Returns TRUE if the trader placed any of the first orders_len_ orders of the batch
+func is_trader_in_orders(
+    trader_address_: felt, orders_len_: felt, orders_: MultipleOrder*
+) -> felt {
+    if (orders_len_ == 0) {
+        return FALSE;
+    }
+
+    if (orders_[orders_len_ - 1].user_address == trader_address_) {
+        return TRUE;
+    }
+
+    return is_trader_in_orders(trader_address_, orders_len_ - 1, orders_);
+}
+
 // @dev - Returns current day of the season based on current timestamp
 // if season has ended then it returns max number of trading days configured for the season
 func get_current_day{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
@@ -1,11 +1,12 @@
 %lang starknet
 
+from starkware.cairo.common.bool import FALSE, TRUE
 from starkware.cairo.common.cairo_builtins import HashBuiltin
 from starkware.cairo.common.math import abs_value
 from starkware.starknet.common.syscalls import get_caller_address
 
 from contracts.Constants import CLOSE, OPEN, TradingStats_INDEX
-from contracts.DataTypes import TraderStats, VolumeMetaData
+from contracts.DataTypes import AggregatedTraderStats, TraderStats, VolumeMetaData
 from contracts.interfaces.IAuthorizedRegistry import IAuthorizedRegistry
 from contracts.libraries.CommonLibrary import CommonLib
 from contracts.Math_64x61 import Math64x61_add
@@ -217,6 +218,14 @@ func record_trader_stats{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
 // Internal //
 // ///////////
 
+// @notice Internal function to record the stats of each trader in the list
+// Entries of the same trader are aggregated so that each storage slot is written once
+// @param season_id_ - id of the season
+// @param market_id_ - id of the market
+// @param iterator_ - index of the current entry
+// @param current_total_fee_64x61_ - fee collected from the entries recorded so far
+// @param trader_stats_list_len - length of the trader stats list
+// @param trader_stats_list - list of trader stats
 func update_trader_stats_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     season_id_: felt,
     market_id_: felt,
@@ -236,22 +245,50 @@ func update_trader_stats_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*,
 
         return ();
     }
-    let trader_address = [trader_stats_list].trader_address;
-    local total_fee_64x61;
+    local trader_address = trader_stats_list[iterator_].trader_address;
+
+    // Entries of a trader are recorded together at the first entry of the trader
+    let is_recorded = is_trader_in_list(trader_address, iterator_, trader_stats_list);
+    if (is_recorded == TRUE) {
+        return update_trader_stats_recurse(
+            season_id_,
+            market_id_,
+            iterator_ + 1,
+            current_total_fee_64x61_,
+            trader_stats_list_len,
+            trader_stats_list,
+        );
+    }
+
+    let initial_stats = AggregatedTraderStats(
+        fee_64x61=0,
+        open_orders_count=0,
+        open_volume_64x61=0,
+        close_orders_count=0,
+        close_volume_64x61=0,
+        pnl_64x61=0,
+        margin_amount_64x61=0,
+    );
+    let (local trader_stats: AggregatedTraderStats) = aggregate_trader_stats_recurse(
+        trader_address_=trader_address,
+        iterator_=iterator_,
+        trader_stats_list_len_=trader_stats_list_len,
+        trader_stats_list_=trader_stats_list,
+        stats_=initial_stats,
+    );
 
     // 1. Update trader fee
-    // Fee is charged only for open orders. So, if side is 1 (open order) we record the fee.
-    if ([trader_stats_list].side == OPEN) {
-        let fee_64x61 = [trader_stats_list].fee_64x61;
+    // Fee is charged only for open orders. So, if there are open orders we record the fee.
+    if (trader_stats.open_orders_count != 0) {
         let (current_trader_fee_64x61) = trader_fee_by_market.read(
             season_id_, market_id_, trader_address
         );
-        let (updated_trader_fee_64x61) = Math64x61_add(current_trader_fee_64x61, fee_64x61);
-        let (updated_total_fee_64x61) = Math64x61_add(current_total_fee_64x61_, fee_64x61);
+        let (updated_trader_fee_64x61) = Math64x61_add(
+            current_trader_fee_64x61, trader_stats.fee_64x61
+        );
         trader_fee_by_market.write(
             season_id_, market_id_, trader_address, updated_trader_fee_64x61
         );
-        assert total_fee_64x61 = updated_total_fee_64x61;
 
         // Emit event
         trader_fee_recorded.emit(season_id_, market_id_, trader_address, updated_trader_fee_64x61);
@@ -259,62 +296,46 @@ func update_trader_stats_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*,
         tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
         tempvar range_check_ptr = range_check_ptr;
     } else {
-        assert total_fee_64x61 = current_total_fee_64x61_;
         tempvar syscall_ptr = syscall_ptr;
         tempvar pedersen_ptr: HashBuiltin* = pedersen_ptr;
         tempvar range_check_ptr = range_check_ptr;
     }
+    let (total_fee_64x61) = Math64x61_add(current_total_fee_64x61_, trader_stats.fee_64x61);
 
     // 2. Update running total of order volume and order count
     // Order volume is recorded for all order types
-    let order_volume_64x61 = [trader_stats_list].order_volume_64x61;
-    let volume_metadata: VolumeMetaData = VolumeMetaData(
-        season_id=season_id_, market_id=market_id_, side=[trader_stats_list].side
-    );
-
-    let (current_order_volume_64x61) = trader_order_volume_by_market.read(
-        trader_address, volume_metadata
-    );
-    let (updated_order_volume_64x61) = Math64x61_add(
-        current_order_volume_64x61, order_volume_64x61
-    );
-    trader_order_volume_by_market.write(
-        trader_address, volume_metadata, updated_order_volume_64x61
-    );
-
-    // Emit event
-    trader_order_volume_recorded.emit(
-        season_id_, market_id_, trader_address, updated_order_volume_64x61
-    );
-
-    let (current_orders_count) = trader_orders_count_by_market.read(
-        trader_address, volume_metadata
+    record_order_volume(
+        season_id_,
+        market_id_,
+        trader_address,
+        OPEN,
+        trader_stats.open_orders_count,
+        trader_stats.open_volume_64x61,
     );
-    trader_orders_count_by_market.write(trader_address, volume_metadata, current_orders_count + 1);
-
-    // Emit event
-    trader_orders_count_recorded.emit(
-        season_id_, market_id_, trader_address, current_orders_count + 1
+    record_order_volume(
+        season_id_,
+        market_id_,
+        trader_address,
+        CLOSE,
+        trader_stats.close_orders_count,
+        trader_stats.close_volume_64x61,
     );
 
     // 3. Update PnL
     // Realized PnL is calculated when trader closes a position. So, we record PnL for close orders.
-    if ([trader_stats_list].side == CLOSE) {
-        let pnl_64x61 = [trader_stats_list].pnl_64x61;
-        let abs_pnl_64x61 = abs_value(pnl_64x61);
+    if (trader_stats.close_orders_count != 0) {
         let (current_pnl_64x61) = trader_pnl_by_market.read(season_id_, market_id_, trader_address);
-        let (updated_pnl_64x61) = Math64x61_add(current_pnl_64x61, abs_pnl_64x61);
+        let (updated_pnl_64x61) = Math64x61_add(current_pnl_64x61, trader_stats.pnl_64x61);
         trader_pnl_by_market.write(season_id_, market_id_, trader_address, updated_pnl_64x61);
 
         // Emit event
         trader_pnl_recorded.emit(season_id_, market_id_, trader_address, updated_pnl_64x61);
 
-        let margin_amount_64x61 = [trader_stats_list].margin_amount_64x61;
         let (current_margin_amount_64x61) = trader_margin_by_market.read(
             season_id_, market_id_, trader_address
         );
         let (updated_margin_amount_64x61) = Math64x61_add(
-            current_margin_amount_64x61, margin_amount_64x61
+            current_margin_amount_64x61, trader_stats.margin_amount_64x61
         );
         trader_margin_by_market.write(
             season_id_, market_id_, trader_address, updated_margin_amount_64x61
@@ -340,6 +361,146 @@ func update_trader_stats_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*,
         iterator_ + 1,
         total_fee_64x61,
         trader_stats_list_len,
-        trader_stats_list + TraderStats.SIZE,
+        trader_stats_list,
+    );
+}
+
+// @notice Internal function to sum up the entries of a trader from the given index onwards
+// @param trader_address_ - l2 address of the trader
+// @param iterator_ - index of the current entry
+// @param trader_stats_list_len_ - length of the trader stats list
+// @param trader_stats_list_ - list of trader stats
+// @param stats_ - stats of the trader aggregated so far
+// @return stats - stats of the trader aggregated over the list
+func aggregate_trader_stats_recurse{range_check_ptr}(
+    trader_address_: felt,
+    iterator_: felt,
+    trader_stats_list_len_: felt,
+    trader_stats_list_: TraderStats*,
+    stats_: AggregatedTraderStats,
+) -> (stats: AggregatedTraderStats) {
+    alloc_locals;
+    if (iterator_ == trader_stats_list_len_) {
+        return (stats_,);
+    }
+
+    let entry: TraderStats = trader_stats_list_[iterator_];
+    if (entry.trader_address != trader_address_) {
+        return aggregate_trader_stats_recurse(
+            trader_address_, iterator_ + 1, trader_stats_list_len_, trader_stats_list_, stats_
+        );
+    }
+
+    if (entry.side == OPEN) {
+        let (fee_64x61) = Math64x61_add(stats_.fee_64x61, entry.fee_64x61);
+        let (open_volume_64x61) = Math64x61_add(stats_.open_volume_64x61, entry.order_volume_64x61);
+        let updated_stats = AggregatedTraderStats(
+            fee_64x61=fee_64x61,
+            open_orders_count=stats_.open_orders_count + 1,
+            open_volume_64x61=open_volume_64x61,
+            close_orders_count=stats_.close_orders_count,
+            close_volume_64x61=stats_.close_volume_64x61,
+            pnl_64x61=stats_.pnl_64x61,
+            margin_amount_64x61=stats_.margin_amount_64x61,
+        );
+        return aggregate_trader_stats_recurse(
+            trader_address_,
+            iterator_ + 1,
+            trader_stats_list_len_,
+            trader_stats_list_,
+            updated_stats,
+        );
+    }
+
+    let (local close_volume_64x61) = Math64x61_add(
+        stats_.close_volume_64x61, entry.order_volume_64x61
+    );
+    let abs_pnl_64x61 = abs_value(entry.pnl_64x61);
+    let (local pnl_64x61) = Math64x61_add(stats_.pnl_64x61, abs_pnl_64x61);
+    let (margin_amount_64x61) = Math64x61_add(
+        stats_.margin_amount_64x61, entry.margin_amount_64x61
+    );
+    let updated_stats = AggregatedTraderStats(
+        fee_64x61=stats_.fee_64x61,
+        open_orders_count=stats_.open_orders_count,
+        open_volume_64x61=stats_.open_volume_64x61,
+        close_orders_count=stats_.close_orders_count + 1,
+        close_volume_64x61=close_volume_64x61,
+        pnl_64x61=pnl_64x61,
+        margin_amount_64x61=margin_amount_64x61,
+    );
+    return aggregate_trader_stats_recurse(
+        trader_address_, iterator_ + 1, trader_stats_list_len_, trader_stats_list_, updated_stats
+    );
+}
+
+// @notice Internal function to add the orders and volume of a batch to a trader's running totals
+// @param season_id_ - id of the season
+// @param market_id_ - id of the market
+// @param trader_address_ - l2 address of the trader
+// @param side_ - 1 for open orders, 2 for close orders
+// @param orders_count_ - number of orders of the trader in the batch
+// @param order_volume_64x61_ - volume of the orders of the trader in the batch
+func record_order_volume{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    season_id_: felt,
+    market_id_: felt,
+    trader_address_: felt,
+    side_: felt,
+    orders_count_: felt,
+    order_volume_64x61_: felt,
+) {
+    alloc_locals;
+    if (orders_count_ == 0) {
+        return ();
+    }
+
+    let volume_metadata: VolumeMetaData = VolumeMetaData(
+        season_id=season_id_, market_id=market_id_, side=side_
+    );
+
+    let (current_order_volume_64x61) = trader_order_volume_by_market.read(
+        trader_address_, volume_metadata
+    );
+    let (updated_order_volume_64x61) = Math64x61_add(
+        current_order_volume_64x61, order_volume_64x61_
+    );
+    trader_order_volume_by_market.write(
+        trader_address_, volume_metadata, updated_order_volume_64x61
+    );
+
+    // Emit event
+    trader_order_volume_recorded.emit(
+        season_id_, market_id_, trader_address_, updated_order_volume_64x61
+    );
+
+    let (current_orders_count) = trader_orders_count_by_market.read(
+        trader_address_, volume_metadata
+    );
+    let updated_orders_count = current_orders_count + orders_count_;
+    trader_orders_count_by_market.write(trader_address_, volume_metadata, updated_orders_count);
+
+    // Emit event
+    trader_orders_count_recorded.emit(
+        season_id_, market_id_, trader_address_, updated_orders_count
     );
+    return ();
+}
+
+// @notice Internal function to check whether a trader has an entry among the first entries
+// @param trader_address_ - l2 address of the trader
+// @param trader_stats_list_len_ - number of entries to check
+// @param trader_stats_list_ - list of trader stats
+// @return res - TRUE if the trader has an entry, FALSE otherwise
+func is_trader_in_list(
+    trader_address_: felt, trader_stats_list_len_: felt, trader_stats_list_: TraderStats*
+) -> felt {
+    if (trader_stats_list_len_ == 0) {
+        return FALSE;
+    }
+
+    if (trader_stats_list_[trader_stats_list_len_ - 1].trader_address == trader_address_) {
+        return TRUE;
+    }
+
+    return is_trader_in_list(trader_address_, trader_stats_list_len_ - 1, trader_stats_list_);
 }
@@ -1,7 +1,25 @@
 %lang starknet
 
+from contracts.DataTypes import ABRAccumulator, ABRSample
+
 @contract_interface
 namespace IABRCalculations {
+    // View functions
+
+    func accumulate_abr_sample(
+        accumulator_: ABRAccumulator,
+        leaving_sample_: ABRSample,
+        index_price_: felt,
+        mark_price_: felt,
+        boll_width_: felt,
+    ) -> (accumulator: ABRAccumulator, sample: ABRSample) {
+    }
+
+    func calculate_abr_from_accumulator(accumulator_: ABRAccumulator, base_abr_: felt) -> (
+        abr_value: felt, abr_last_price: felt
+    ) {
+    }
+
     // External functions
 
     func calculate_abr(
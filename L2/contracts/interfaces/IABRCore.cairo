@@ -1,6 +1,6 @@
 %lang starknet
 
-from contracts.DataTypes import ABRDetails
+from contracts.DataTypes import ABRAccumulator, ABRDetails
 
 @contract_interface
 namespace IABRCore {
@@ -43,6 +43,9 @@ namespace IABRCore {
     ) {
     }
 
+    func get_abr_accumulator(epoch_: felt, market_id_: felt) -> (res: ABRAccumulator) {
+    }
+
     func get_previous_abr_values(starting_epoch_: felt, market_id_: felt, n_: felt) -> (
         abr_values_list_len: felt, abr_values_list: ABRDetails*
     ) {
@@ -65,6 +68,16 @@ namespace IABRCore {
     ) {
     }
 
+    func push_abr_samples(
+        market_id_: felt,
+        index_prices_len: felt,
+        index_prices: felt*,
+        mark_prices_len: felt,
+        mark_prices: felt*,
+        last_price_: felt,
+    ) {
+    }
+
     func make_abr_payments() {
     }
 
@@ -49,6 +49,19 @@ namespace IAccountManager {
     func return_array_collaterals() -> (array_list_len: felt, array_list: CollateralBalance*) {
     }
 
+    func return_array_collaterals_paginated(starting_index_: felt, num_collaterals_: felt) -> (
+        array_list_len: felt, array_list: CollateralBalance*
+    ) {
+    }
+
+    func get_positions_paginated(
+        collateral_id_: felt, starting_index_: felt, num_markets_: felt
+    ) -> (next_index: felt, positions_array_len: felt, positions_array: PositionDetailsWithMarket*) {
+    }
+
+    func get_modification_info() -> (counter: felt, last_modified_block_number: felt) {
+    }
+
     func get_deleveragable_or_liquidatable_position(collateral_id_: felt) -> (
         position: LiquidatablePosition
     ) {
@@ -20,6 +20,28 @@ namespace IAccountRegistry {
     func get_registry_len() -> (len: felt) {
     }
 
+    func is_active_trader(address_: felt) -> (present: felt) {
+    }
+
+    func get_active_traders_len() -> (len: felt) {
+    }
+
+    func get_active_traders_batch(starting_index_: felt, ending_index_: felt) -> (
+        active_traders_list_len: felt, active_traders_list: felt*
+    ) {
+    }
+
+    func get_deferred_removals_len() -> (len: felt) {
+    }
+
+    func is_removal_deferred(address_: felt) -> (present: felt) {
+    }
+
+    func get_accounts_modified_since(
+        block_number_: felt, starting_index_: felt, num_accounts_: felt
+    ) -> (next_index: felt, account_registry_len: felt, account_registry: felt*) {
+    }
+
     // External functions
 
     func add_to_account_registry(address_: felt) -> () {
@@ -27,4 +49,13 @@ namespace IAccountRegistry {
 
     func remove_from_account_registry(id_: felt) -> () {
     }
+
+    func add_to_active_traders() {
+    }
+
+    func remove_from_active_traders() {
+    }
+
+    func remove_deferred_active_traders(num_accounts_: felt) {
+    }
 }
@@ -18,6 +18,16 @@ namespace IAsset {
     func get_metadata_link(id: felt) -> (link_len: felt, link: felt*) {
     }
 
+    func get_icon_link_packed(id: felt) -> (
+        link_len: felt, packed_link_len: felt, packed_link: felt*
+    ) {
+    }
+
+    func get_metadata_link_packed(id: felt) -> (
+        link_len: felt, packed_link_len: felt, packed_link: felt*
+    ) {
+    }
+
     func get_version() -> (version: felt) {
     }
 
@@ -49,4 +59,7 @@ namespace IAsset {
 
     func update_metadata_link(asset_id: felt, link_len: felt, link: felt*) {
     }
+
+    func migrate_links(asset_id: felt) {
+    }
 }
@@ -6,4 +6,7 @@ namespace IAuthorizedRegistry {
 
     func get_contract_address(index: felt, version: felt) -> (address: felt) {
     }
+
+    func get_registry_update_count() -> (count: felt) {
+    }
 }
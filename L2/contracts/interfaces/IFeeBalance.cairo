@@ -1,5 +1,7 @@
 %lang starknet
 
+from contracts.DataTypes import UserFee
+
 @contract_interface
 namespace IFeeBalance {
     // View functions
@@ -13,4 +15,7 @@ namespace IFeeBalance {
     // External functions
     func update_fee_mapping(address: felt, assetID_: felt, fee_to_add: felt) {
     }
+
+    func update_fee_mapping_bulk(assetID_: felt, user_fees_len: felt, user_fees: UserFee*) {
+    }
 }
@@ -1,5 +1,7 @@
 %lang starknet
 
+from contracts.DataTypes import PositionFundDelta
+
 @contract_interface
 namespace ILiquidityFund {
     // View functions
@@ -23,4 +25,9 @@ namespace ILiquidityFund {
 
     func withdraw(asset_id_: felt, amount: felt, position_id_: felt) {
     }
+
+    func settle_position_deltas(
+        asset_id_: felt, position_deltas_len: felt, position_deltas: PositionFundDelta*
+    ) {
+    }
 }
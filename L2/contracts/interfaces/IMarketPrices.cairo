@@ -1,5 +1,7 @@
 %lang starknet
 
+from contracts.DataTypes import MultipleMarketPrices
+
 @contract_interface
 namespace IMarketPrices {
     // View functions
@@ -7,6 +9,21 @@ namespace IMarketPrices {
     func get_market_price(id: felt) -> (market_price: felt) {
     }
 
+    func get_market_prices(market_ids_len: felt, market_ids: felt*) -> (
+        market_prices_list_len: felt, market_prices_list: MultipleMarketPrices*
+    ) {
+    }
+
+    func get_all_market_prices() -> (
+        market_prices_list_len: felt, market_prices_list: MultipleMarketPrices*
+    ) {
+    }
+
+    func get_all_market_prices_paginated(starting_index_: felt, num_markets_: felt) -> (
+        market_prices_list_len: felt, market_prices_list: MultipleMarketPrices*
+    ) {
+    }
+
     // External functions
 
     func update_market_price(id: felt, price: felt) {
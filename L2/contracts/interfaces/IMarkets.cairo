@@ -34,6 +34,11 @@ namespace IMarkets {
     func get_metadata_link(market_id_: felt) -> (link_len: felt, link: felt*) {
     }
 
+    func get_metadata_link_packed(market_id_: felt) -> (
+        link_len: felt, packed_link_len: felt, packed_link: felt*
+    ) {
+    }
+
     // External functions
 
     func add_market(new_market_: Market, metadata_link_len: felt, metadata_link: felt*) {
@@ -74,4 +79,7 @@ namespace IMarkets {
 
     func update_metadata_link(market_id_: felt, link_len: felt, link: felt*) {
     }
+
+    func migrate_metadata_link(market_id_: felt) {
+    }
 }
@@ -7,6 +7,9 @@ namespace IPubkeyWhitelister {
     func is_whitelisted(pubkey: felt) -> (res: felt) {
     }
 
+    func are_whitelisted(pubkey_len: felt, pubkey: felt*) -> (res_len: felt, res: felt*) {
+    }
+
     // External functions
 
     func whitelist_pubkey(pubkey: felt) {
@@ -9,6 +9,9 @@ namespace ISigRequirementsManager {
     func get_sig_requirement(core_function: CoreFunction) -> (num_req: felt) {
     }
 
+    func get_handled_sig_requirement(core_function: CoreFunction) -> (num_req: felt) {
+    }
+
     // External functions
 
     func set_sig_requirement(core_function: CoreFunction, num_req: felt) {
@@ -23,6 +23,20 @@ namespace ITradingFees {
     ) {
     }
 
+    func get_discounted_fee_rates(side_: felt, users_len: felt, users: felt*) -> (
+        fee_rates_len: felt, fee_rates: felt*
+    ) {
+    }
+
+    func get_fee_schedule() -> (
+        version: felt,
+        fee_tiers_len: felt,
+        fee_tiers: BaseFee*,
+        discount_tiers_len: felt,
+        discount_tiers: Discount*,
+    ) {
+    }
+
     // External functions
 
     func update_base_fees(tier_: felt, fee_details: BaseFee) {
@@ -1,6 +1,6 @@
 %lang starknet
 
-from contracts.DataTypes import MultipleOrder, TraderStats
+from contracts.DataTypes import MultipleOrder, TraderStats, TradingSeason
 
 @contract_interface
 namespace ITradingStats {
@@ -35,6 +35,9 @@ namespace ITradingStats {
     ) -> (trader_list_len: felt, trader_list: felt*) {
     }
 
+    func get_cached_season() -> (season_id: felt, season: TradingSeason) {
+    }
+
     // External functions
 
     func record_trade_batch_stats(
@@ -0,0 +1,111 @@
+%lang starknet
+
+from starkware.cairo.common.math import unsigned_div_rem
+from starkware.cairo.common.math_cmp import is_le
+from contracts.DataTypes import BaseFee, Discount, FeeSchedule
+from contracts.Math_64x61 import Math64x61_mul, Math64x61_ONE
+
+// Tiers are 1-indexed; tier 0 is the implicit zero fee/discount tier below the first tier
+namespace FeeTiers {
+    // @notice Function to calculate the discounted fee rate of a user from a loaded fee schedule
+    // @param fee_schedule_ - FeeSchedule struct returned by TradingFees
+    // @param number_of_tokens_ - Number of governance tokens held by the user
+    // @param side_ - 1 if maker, any other value if taker
+    // @returns discounted_base_fee_percent - Fee rate after the discount
+    // @returns base_fee_tier - Base fee tier of the user
+    // @returns discount_tier - Discount tier of the user
+    func get_discounted_fee_rate{range_check_ptr}(
+        fee_schedule_: FeeSchedule, number_of_tokens_: felt, side_: felt
+    ) -> (discounted_base_fee_percent: felt, base_fee_tier: felt, discount_tier: felt) {
+        alloc_locals;
+
+        let (local base_fee_tier) = find_base_fee_tier(
+            number_of_tokens_=number_of_tokens_,
+            low_=0,
+            high_=fee_schedule_.base_fees_len,
+            base_fees_=fee_schedule_.base_fees,
+        );
+        let (local discount_tier) = find_discount_tier(
+            number_of_tokens_=number_of_tokens_,
+            low_=0,
+            high_=fee_schedule_.discounts_len,
+            discounts_=fee_schedule_.discounts,
+        );
+
+        local base_fee;
+        if (base_fee_tier == 0) {
+            base_fee = 0;
+        } else {
+            tempvar tier_fee: BaseFee* = fee_schedule_.base_fees + (base_fee_tier - 1) * BaseFee.SIZE;
+            if (side_ == 1) {
+                base_fee = tier_fee.makerFee;
+            } else {
+                base_fee = tier_fee.takerFee;
+            }
+        }
+
+        local discount;
+        if (discount_tier == 0) {
+            discount = 0;
+        } else {
+            tempvar tier_discount: Discount* = fee_schedule_.discounts + (discount_tier - 1) * Discount.SIZE;
+            discount = tier_discount.discount;
+        }
+
+        // Calculate fee after the discount
+        let non_discount = Math64x61_ONE - discount;
+        let fee: felt = Math64x61_mul(base_fee, non_discount);
+
+        return (
+            discounted_base_fee_percent=fee,
+            base_fee_tier=base_fee_tier,
+            discount_tier=discount_tier,
+        );
+    }
+}
+
+// /////////////////////
+// Internal Functions //
+// /////////////////////
+
+// @notice Binary search for the highest base fee tier whose numberOfTokens is <= number_of_tokens_
+// @param number_of_tokens_ - Number of governance tokens held by the user
+// @param low_ - Lowest candidate tier
+// @param high_ - Highest candidate tier
+// @param base_fees_ - Array of base fee tiers, tier 1 at index 0
+// @returns tier - Base fee tier of the user
+func find_base_fee_tier{range_check_ptr}(
+    number_of_tokens_: felt, low_: felt, high_: felt, base_fees_: BaseFee*
+) -> (tier: felt) {
+    if (low_ == high_) {
+        return (tier=low_);
+    }
+
+    let (mid, _) = unsigned_div_rem(low_ + high_ + 1, 2);
+    let is_eligible = is_le(base_fees_[mid - 1].numberOfTokens, number_of_tokens_);
+    if (is_eligible == 1) {
+        return find_base_fee_tier(number_of_tokens_, mid, high_, base_fees_);
+    }
+    return find_base_fee_tier(number_of_tokens_, low_, mid - 1, base_fees_);
+}
+
+// @notice Binary search for the highest discount tier whose numberOfTokens is <= number_of_tokens_
+// @param number_of_tokens_ - Number of governance tokens held by the user
+// @param low_ - Lowest candidate tier
+// @param high_ - Highest candidate tier
+// @param discounts_ - Array of discount tiers, tier 1 at index 0
+// @returns tier - Discount tier of the user
+func find_discount_tier{range_check_ptr}(
+    number_of_tokens_: felt, low_: felt, high_: felt, discounts_: Discount*
+) -> (tier: felt) {
+    if (low_ == high_) {
+        return (tier=low_);
+    }
+
+    let (mid, _) = unsigned_div_rem(low_ + high_ + 1, 2);
+    let is_eligible = is_le(discounts_[mid - 1].numberOfTokens, number_of_tokens_);
+    if (is_eligible == 1) {
+        return find_discount_tier(number_of_tokens_, mid, high_, discounts_);
+    }
+    return find_discount_tier(number_of_tokens_, low_, mid - 1, discounts_);
+}
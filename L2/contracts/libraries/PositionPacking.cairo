@@ -0,0 +1,166 @@
+%lang starknet
+
+from starkware.cairo.common.math import (
+    assert_in_range,
+    assert_nn_le,
+    split_felt,
+    unsigned_div_rem,
+)
+from starkware.cairo.common.math_cmp import is_le
+from contracts.DataTypes import PackedPositionDetails, PositionDetails
+from contracts.Math_64x61 import Math64x61_assert64x61
+
+// ////////////
+// Constants //
+// ////////////
+
+// A packed felt holds a 122 bit field above a 128 bit field
+// Signed values are stored in two's complement within their field
+// The low field uses all of its 128 bits, so any 64x61 value, including +-2^125, decodes back unchanged
+const HIGH_FIELD_BOUND = 2 ** 121;
+const HIGH_FIELD_MODULUS = 2 ** 122;
+const LOW_FIELD_BOUND = 2 ** 127;
+const LOW_FIELD_MODULUS = 2 ** 128;
+const LOW_FIELD_SHIFT = 2 ** 128;
+
+// Timestamps are stored in 64 bits each
+const TIMESTAMP_SHIFT = 2 ** 64;
+
+// Layout of PackedPositionDetails:
+// price_and_size - position_size (high) | avg_execution_price (low)
+// margin_and_borrowed - borrowed_amount (high) | margin_amount (low)
+// leverage_and_timestamps - leverage (high) | created_timestamp | modified_timestamp (64 bits each)
+// realized_pnl - realized_pnl
+namespace PositionPacking {
+    // @notice Function to pack a position into 4 felts
+    // @param position_ - PositionDetails struct to be packed
+    // @returns res - PackedPositionDetails struct
+    func pack{range_check_ptr}(position_: PositionDetails) -> (res: PackedPositionDetails) {
+        alloc_locals;
+
+        let (local price_and_size) = pack_pair(
+            position_.position_size, position_.avg_execution_price
+        );
+        let (local margin_and_borrowed) = pack_pair(
+            position_.borrowed_amount, position_.margin_amount
+        );
+
+        with_attr error_message("PositionPacking: Timestamp out of range") {
+            assert_nn_le(position_.created_timestamp, TIMESTAMP_SHIFT - 1);
+            assert_nn_le(position_.modified_timestamp, TIMESTAMP_SHIFT - 1);
+        }
+
+        let (leverage_encoded) = encode_high_field(position_.leverage);
+        let leverage_and_timestamps = leverage_encoded * LOW_FIELD_SHIFT +
+            position_.created_timestamp * TIMESTAMP_SHIFT + position_.modified_timestamp;
+
+        let packed_position = PackedPositionDetails(
+            price_and_size=price_and_size,
+            margin_and_borrowed=margin_and_borrowed,
+            leverage_and_timestamps=leverage_and_timestamps,
+            realized_pnl=position_.realized_pnl,
+        );
+        return (res=packed_position);
+    }
+
+    // @notice Function to unpack a position stored with pack
+    // @param packed_ - PackedPositionDetails struct
+    // @returns res - PositionDetails struct
+    func unpack{range_check_ptr}(packed_: PackedPositionDetails) -> (res: PositionDetails) {
+        alloc_locals;
+
+        let (local position_size, local avg_execution_price) = unpack_pair(packed_.price_and_size);
+        let (local borrowed_amount, local margin_amount) = unpack_pair(
+            packed_.margin_and_borrowed
+        );
+
+        let (leverage_encoded, timestamps) = split_felt(packed_.leverage_and_timestamps);
+        let (local leverage) = decode_field(
+            leverage_encoded, HIGH_FIELD_BOUND, HIGH_FIELD_MODULUS
+        );
+        let (created_timestamp, modified_timestamp) = unsigned_div_rem(
+            timestamps, TIMESTAMP_SHIFT
+        );
+
+        let position = PositionDetails(
+            avg_execution_price=avg_execution_price,
+            position_size=position_size,
+            margin_amount=margin_amount,
+            borrowed_amount=borrowed_amount,
+            leverage=leverage,
+            created_timestamp=created_timestamp,
+            modified_timestamp=modified_timestamp,
+            realized_pnl=packed_.realized_pnl,
+        );
+        return (res=position);
+    }
+}
+
+// /////////////////////
+// Internal Functions //
+// /////////////////////
+
+// @notice Function to pack two 64x61 values into a single felt
+// @param high_ - Value stored in the upper bits; must be within +-2^121
+// @param low_ - Value stored in the lower 128 bits; any 64x61 value
+// @returns res - Packed felt
+func pack_pair{range_check_ptr}(high_: felt, low_: felt) -> (res: felt) {
+    alloc_locals;
+
+    let (local high_encoded) = encode_high_field(high_);
+
+    with_attr error_message("PositionPacking: Value out of range") {
+        Math64x61_assert64x61(low_);
+    }
+    let (low_encoded) = encode_field(low_, LOW_FIELD_MODULUS);
+
+    return (res=high_encoded * LOW_FIELD_SHIFT + low_encoded);
+}
+
+// @notice Function to unpack a felt packed with pack_pair
+// @param packed_ - Packed felt
+// @returns high - Value stored in the upper bits
+// @returns low - Value stored in the lower 128 bits
+func unpack_pair{range_check_ptr}(packed_: felt) -> (high: felt, low: felt) {
+    alloc_locals;
+
+    let (high_encoded, low_encoded) = split_felt(packed_);
+    let (local high) = decode_field(high_encoded, HIGH_FIELD_BOUND, HIGH_FIELD_MODULUS);
+    let (low) = decode_field(low_encoded, LOW_FIELD_BOUND, LOW_FIELD_MODULUS);
+    return (high, low);
+}
+
+// @notice Function to range check and encode a value stored in the upper bits
+// @param value_ - Value to be encoded
+// @returns res - Encoded value
+func encode_high_field{range_check_ptr}(value_: felt) -> (res: felt) {
+    with_attr error_message("PositionPacking: Value out of range") {
+        assert_in_range(value_, -HIGH_FIELD_BOUND, HIGH_FIELD_BOUND);
+    }
+    return encode_field(value_, HIGH_FIELD_MODULUS);
+}
+
+// @notice Function to encode a signed value in two's complement
+// @param value_ - Value to be encoded
+// @param modulus_ - Modulus of the field
+// @returns res - Encoded value
+func encode_field{range_check_ptr}(value_: felt, modulus_: felt) -> (res: felt) {
+    let is_negative = is_le(value_, -1);
+    if (is_negative == 1) {
+        return (res=value_ + modulus_);
+    }
+    return (res=value_);
+}
+
+// @notice Function to decode a signed value stored in two's complement
+// @param value_ - Encoded value
+// @param bound_ - Smallest encoded value that represents a negative value
+// @param modulus_ - Modulus of the field
+// @returns res - Decoded value
+func decode_field{range_check_ptr}(value_: felt, bound_: felt, modulus_: felt) -> (res: felt) {
+    let is_negative = is_le(bound_, value_);
+    if (is_negative == 1) {
+        return (res=value_ - modulus_);
+    }
+    return (res=value_);
+}
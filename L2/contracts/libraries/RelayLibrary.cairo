@@ -4,8 +4,15 @@
 from starkware.starknet.common.syscalls import get_caller_address, get_tx_info
 from starkware.cairo.common.cairo_builtins import HashBuiltin
 from starkware.cairo.common.alloc import alloc
+from starkware.cairo.common.hash import hash2
+from starkware.cairo.common.math import assert_not_zero
 from contracts.interfaces.IAdminAuth import IAdminAuth
-from contracts.Constants import AdminAuth_INDEX, MasterAdmin_ACTION
+from contracts.Constants import (
+    AdminAuth_INDEX,
+    MasterAdmin_ACTION,
+    RELAY_ACCOUNTING_AGGREGATED,
+    RELAY_ACCOUNTING_PER_CALL,
+)
 
 from contracts.interfaces.IAuthorizedRegistry import IAuthorizedRegistry
 
@@ -50,6 +57,42 @@ func hash_count(caller: felt) -> (res: felt) {
 func hash_list_for_caller(caller: felt, index: felt) -> (res: felt) {
 }
 
+// @dev - 0 => per call hash list and status (default), 1 => aggregated per epoch counters and running hash
+@storage_var
+func accounting_mode() -> (mode: felt) {
+}
+
+// stores the current accounting epoch, advanced after remunerating nodes
+@storage_var
+func current_epoch() -> (epoch: felt) {
+}
+
+// stores the call counter of a caller for a function name in an epoch
+@storage_var
+func epoch_call_counter(epoch: felt, caller: felt, func_name: felt) -> (counter: felt) {
+}
+
+// stores the running hash of all transaction hashes of a caller, h_n = pedersen(h_(n-1), tx_hash)
+@storage_var
+func caller_hash_commitment(caller: felt) -> (commitment: felt) {
+}
+
+// stores the running hash of a caller up to which the caller has been paid
+@storage_var
+func paid_hash_commitment(caller: felt) -> (commitment: felt) {
+}
+
+// /////////
+// Events //
+// /////////
+
+// @dev - emitted for every call in aggregated mode so that the hash list of a caller can be rebuilt off-chain
+@event
+func relay_call_recorded(
+    caller: felt, function_name: felt, transaction_hash: felt, epoch: felt, commitment: felt
+) {
+}
+
 // //////////////
 // Constructor //
 // //////////////
@@ -123,6 +166,40 @@ func get_caller_hash_list{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
     return (count, hash_list);
 }
 
+@view
+func get_accounting_mode{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() -> (
+    mode: felt
+) {
+    let (mode) = accounting_mode.read();
+    return (mode,);
+}
+
+@view
+func get_current_epoch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() -> (
+    epoch: felt
+) {
+    let (epoch) = current_epoch.read();
+    return (epoch,);
+}
+
+@view
+func get_epoch_call_counter{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    epoch: felt, caller: felt, function_name: felt
+) -> (count: felt) {
+    let (count) = epoch_call_counter.read(epoch, caller, function_name);
+    return (count,);
+}
+
+// @notice - gets the running hash of all transaction hashes of a caller and the running hash up to which it has been paid
+@view
+func get_caller_hash_commitment{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    caller: felt
+) -> (commitment: felt, paid_commitment: felt) {
+    let (commitment) = caller_hash_commitment.read(caller);
+    let (paid_commitment) = paid_hash_commitment.read(caller);
+    return (commitment, paid_commitment);
+}
+
 // ///////////
 // External //
 // ///////////
@@ -160,6 +237,42 @@ func reset_call_counter{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_ch
     return ();
 }
 
+// @notice - can be called by admin to switch between per call and aggregated accounting
+@external
+func set_accounting_mode{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    mode: felt
+) {
+    verify_caller_authority(MasterAdmin_ACTION);
+    with_attr error_message("RelayLibrary: Invalid accounting mode") {
+        assert (mode - RELAY_ACCOUNTING_PER_CALL) * (mode - RELAY_ACCOUNTING_AGGREGATED) = 0;
+    }
+    accounting_mode.write(mode);
+    return ();
+}
+
+// @notice - can be called by some reward paying authority to start a new epoch after remunerating nodes
+// @dev - this replaces resetting the call counters one by one in aggregated mode
+@external
+func advance_epoch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() {
+    verify_caller_authority(MasterAdmin_ACTION);
+    let (epoch) = current_epoch.read();
+    current_epoch.write(epoch + 1);
+    return ();
+}
+
+// @notice - can be called by some reward paying authority to mark all transaction hashes of a caller up to a running hash as paid
+@external
+func mark_caller_commitment_paid{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    caller: felt, commitment: felt
+) {
+    verify_caller_authority(MasterAdmin_ACTION);
+    with_attr error_message("RelayLibrary: Invalid commitment") {
+        assert_not_zero(commitment);
+    }
+    paid_hash_commitment.write(caller, commitment);
+    return ();
+}
+
 // @notice - call be called by admin to change index of underlying contract
 @external
 func set_self_index{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(index: felt) {
@@ -254,11 +367,44 @@ func get_inner_contract{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_ch
     return (inner_address,);
 }
 
+// @notice - increments the epoch call counter and extends the running hash of the current caller
+// @dev - writes 2 storage slots per call, the hash list can be rebuilt from relay_call_recorded events
+func record_call_aggregated{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    function_name: felt
+) {
+    alloc_locals;
+    let (local caller) = get_caller_address();
+    let (local tx_info) = get_tx_info();
+    let (local epoch) = current_epoch.read();
+    let (current_count) = epoch_call_counter.read(epoch, caller, function_name);
+    epoch_call_counter.write(epoch, caller, function_name, current_count + 1);
+
+    let (current_commitment) = caller_hash_commitment.read(caller);
+    let (local commitment) = hash2{hash_ptr=pedersen_ptr}(
+        current_commitment, tx_info.transaction_hash
+    );
+    caller_hash_commitment.write(caller, commitment);
+
+    relay_call_recorded.emit(
+        caller=caller,
+        function_name=function_name,
+        transaction_hash=tx_info.transaction_hash,
+        epoch=epoch,
+        commitment=commitment,
+    );
+    return ();
+}
+
 // @notice - helper function to do necessary bookkeeping
 // @dev - this is the only function called by Relay contract to do bookkeeping
 func record_call_details{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     function_name: felt
 ) {
+    let (mode) = accounting_mode.read();
+    if (mode == RELAY_ACCOUNTING_AGGREGATED) {
+        record_call_aggregated(function_name);
+        return ();
+    }
     store_caller_hash();
     increment_call_counter(function_name);
     set_caller_hash_status();
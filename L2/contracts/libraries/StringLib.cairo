@@ -1,7 +1,12 @@
 %lang starknet
 
 from starkware.cairo.common.alloc import alloc
+from starkware.cairo.common.bool import TRUE
 from starkware.cairo.common.cairo_builtins import HashBuiltin
+from starkware.cairo.common.math import assert_nn_le, split_felt, unsigned_div_rem
+from starkware.cairo.common.math_cmp import is_le
+
+from contracts.Constants import SHORT_STRING_MAX_LEN, STRING_ENCODING_PACKED
 
 // //////////
 // Storage //
@@ -11,10 +16,16 @@ from starkware.cairo.common.cairo_builtins import HashBuiltin
 func string_len_mapping(type: felt, id: felt) -> (res: felt) {
 }
 
+// Stores one character per index for STRING_ENCODING_CHARS
+// and SHORT_STRING_MAX_LEN characters per index for STRING_ENCODING_PACKED
 @storage_var
 func string_chars_mapping(type: felt, id: felt, index: felt) -> (res: felt) {
 }
 
+@storage_var
+func string_encoding_mapping(type: felt, id: felt) -> (res: felt) {
+}
+
 namespace StringLib {
     // ////////////////////
     // Library functions //
@@ -23,32 +34,102 @@ namespace StringLib {
     func read_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
         type: felt, id: felt
     ) -> (string_len: felt, string: felt*) {
-        let (string_len) = string_len_mapping.read(type, id);
-        let (string: felt*) = alloc();
+        alloc_locals;
+        let (local string_len) = string_len_mapping.read(type, id);
+        let (encoding) = string_encoding_mapping.read(type, id);
+        let (local string: felt*) = alloc();
+
+        if (encoding == STRING_ENCODING_PACKED) {
+            _recurse_unpack_string(
+                type=type, id=id, iterator=0, string_len=string_len, string=string
+            );
+            return (string_len, string);
+        }
+
         return _recurse_populate_string(
             type=type, id=id, iterator=0, string_len=string_len, string=string
         );
     }
 
+    func read_packed_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+        type: felt, id: felt
+    ) -> (string_len: felt, packed_string_len: felt, packed_string: felt*) {
+        alloc_locals;
+        let (local string_len) = string_len_mapping.read(type, id);
+        let (encoding) = string_encoding_mapping.read(type, id);
+        let (local packed_string_len) = _get_packed_len(string_len);
+        let (local packed_string: felt*) = alloc();
+
+        if (encoding == STRING_ENCODING_PACKED) {
+            _recurse_populate_string(
+                type=type, id=id, iterator=0, string_len=packed_string_len, string=packed_string
+            );
+            return (string_len, packed_string_len, packed_string);
+        }
+
+        // Strings saved one character per index are packed on the fly
+        let (local string: felt*) = alloc();
+        _recurse_populate_string(
+            type=type, id=id, iterator=0, string_len=string_len, string=string
+        );
+        _recurse_pack_string(string_len=string_len, string=string, packed_string=packed_string);
+        return (string_len, packed_string_len, packed_string);
+    }
+
     func save_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
         type: felt, id: felt, string_len: felt, string: felt*
     ) {
+        alloc_locals;
+        let (local packed_string_len) = _get_packed_len(string_len);
+        let (local packed_string: felt*) = alloc();
+
+        with_attr error_message("StringLib: Invalid character") {
+            _recurse_pack_string(
+                string_len=string_len, string=string, packed_string=packed_string
+            );
+        }
+
         string_len_mapping.write(type=type, id=id, value=string_len);
+        string_encoding_mapping.write(type=type, id=id, value=STRING_ENCODING_PACKED);
         return _recurse_save_string(
-            type=type, id=id, iterator=0, string_len=string_len, string=string
+            type=type, id=id, iterator=0, string_len=packed_string_len, string=packed_string
         );
     }
 
     func remove_existing_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
         type: felt, id: felt
     ) {
-        let (string_len) = string_len_mapping.read(type, id);
+        alloc_locals;
+        let (local string_len) = string_len_mapping.read(type, id);
         if (string_len == 0) {
             return ();
         }
         string_len_mapping.write(type=type, id=id, value=0);
+
+        let (encoding) = string_encoding_mapping.read(type, id);
+        if (encoding == STRING_ENCODING_PACKED) {
+            let (packed_string_len) = _get_packed_len(string_len);
+            return _recurse_remove_string(
+                type=type, id=id, iterator=0, string_len=packed_string_len
+            );
+        }
         return _recurse_remove_string(type=type, id=id, iterator=0, string_len=string_len);
     }
+
+    // Rewrites a string saved one character per index in the packed encoding
+    func migrate_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+        type: felt, id: felt
+    ) {
+        alloc_locals;
+        let (encoding) = string_encoding_mapping.read(type, id);
+        if (encoding == STRING_ENCODING_PACKED) {
+            return ();
+        }
+
+        let (local string_len, local string: felt*) = read_string(type=type, id=id);
+        remove_existing_string(type=type, id=id);
+        return save_string(type=type, id=id, string_len=string_len, string=string);
+    }
 }
 
 // ///////////////////
@@ -86,3 +167,93 @@ func _recurse_remove_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, rang
     string_chars_mapping.write(type=type, id=id, index=iterator, value=0);
     return _recurse_remove_string(type, id, iterator + 1, string_len);
 }
+
+// Returns the number of felts needed to store string_len characters in the packed encoding
+func _get_packed_len{range_check_ptr}(string_len: felt) -> (packed_string_len: felt) {
+    let (packed_string_len, _) = unsigned_div_rem(
+        string_len + SHORT_STRING_MAX_LEN - 1, SHORT_STRING_MAX_LEN
+    );
+    return (packed_string_len,);
+}
+
+// Packs the characters into felts of SHORT_STRING_MAX_LEN characters, the first one being the
+// most significant byte as in Cairo short strings
+func _recurse_pack_string{range_check_ptr}(string_len: felt, string: felt*, packed_string: felt*) {
+    if (string_len == 0) {
+        return ();
+    }
+
+    let is_last_word = is_le(string_len, SHORT_STRING_MAX_LEN);
+    if (is_last_word == TRUE) {
+        let (word) = _pack_word(word=0, word_len=string_len, string=string);
+        assert [packed_string] = word;
+        return ();
+    }
+
+    let (word) = _pack_word(word=0, word_len=SHORT_STRING_MAX_LEN, string=string);
+    assert [packed_string] = word;
+    return _recurse_pack_string(
+        string_len=string_len - SHORT_STRING_MAX_LEN,
+        string=string + SHORT_STRING_MAX_LEN,
+        packed_string=packed_string + 1,
+    );
+}
+
+func _pack_word{range_check_ptr}(word: felt, word_len: felt, string: felt*) -> (word: felt) {
+    if (word_len == 0) {
+        return (word,);
+    }
+    assert_nn_le([string], 255);
+    return _pack_word(word=word * 256 + [string], word_len=word_len - 1, string=string + 1);
+}
+
+// Reads the packed felts of a string and writes its characters to string
+func _recurse_unpack_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    type: felt, id: felt, iterator: felt, string_len: felt, string: felt*
+) {
+    alloc_locals;
+    if (string_len == 0) {
+        return ();
+    }
+
+    let (word) = string_chars_mapping.read(type=type, id=id, index=iterator);
+    let is_last_word = is_le(string_len, SHORT_STRING_MAX_LEN);
+    if (is_last_word == TRUE) {
+        _unpack_word(word=word, word_len=string_len, string=string);
+        return ();
+    }
+
+    _unpack_word(word=word, word_len=SHORT_STRING_MAX_LEN, string=string);
+    return _recurse_unpack_string(
+        type=type,
+        id=id,
+        iterator=iterator + 1,
+        string_len=string_len - SHORT_STRING_MAX_LEN,
+        string=string + SHORT_STRING_MAX_LEN,
+    );
+}
+
+// Splits a packed felt in two halves of at most 128 bits so that each can be divided safely
+func _unpack_word{range_check_ptr}(word: felt, word_len: felt, string: felt*) {
+    alloc_locals;
+    let (local high, local low) = split_felt(word);
+
+    let is_low_only = is_le(word_len, 16);
+    if (is_low_only == TRUE) {
+        _unpack_bytes(value=low, value_len=word_len, string=string);
+        return ();
+    }
+
+    _unpack_bytes(value=high, value_len=word_len - 16, string=string);
+    _unpack_bytes(value=low, value_len=16, string=string + word_len - 16);
+    return ();
+}
+
+func _unpack_bytes{range_check_ptr}(value: felt, value_len: felt, string: felt*) {
+    if (value_len == 0) {
+        return ();
+    }
+    let (q, r) = unsigned_div_rem(value, 256);
+    assert string[value_len - 1] = r;
+    return _unpack_bytes(value=q, value_len=value_len - 1, string=string);
+}
@@ -56,3 +56,54 @@ func get_batch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
 
     return (account_registry_len, account_registry);
 }
+
+// Function to calculate the number of batches of active traders given the no_of_users_per_batch
+// @param current_no_of_users_per_batch_ - Number of users in a batch
+// @param account_registry_address_ - Account Registry address
+@view
+func calculate_no_of_active_trader_batches{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(current_no_of_users_per_batch_: felt, account_registry_address_: felt) -> (no_of_batches: felt) {
+    alloc_locals;
+
+    local no_of_batches;
+    // Get the number of accounts with open positions
+    let (local current_active_traders_length) = IAccountRegistry.get_active_traders_len(
+        contract_address=account_registry_address_
+    );
+
+    let (q, r) = unsigned_div_rem(current_active_traders_length, current_no_of_users_per_batch_);
+
+    if (r == 0) {
+        assert no_of_batches = q;
+    } else {
+        assert no_of_batches = q + 1;
+    }
+
+    return (no_of_batches,);
+}
+
+// Function to fetch the corresponding batch of active traders given the batch id
+// @param batch_id - Batch id of the batch
+// @param no_of_users_per_batch - Number of users in a batch
+// @param account_registry_address - Account Registry address
+@view
+func get_active_traders_batch{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    batch_id: felt, no_of_users_per_batch: felt, account_registry_address: felt
+) -> (active_traders_list_len: felt, active_traders_list: felt*) {
+    // Get the lower index of the batch
+    let lower_limit: felt = batch_id * no_of_users_per_batch;
+    // Get the upper index of the batch
+    let upper_limit: felt = lower_limit + no_of_users_per_batch;
+
+    // Fetch the required batch from the active traders array of AccountRegistry
+    let (
+        active_traders_list_len: felt, active_traders_list: felt*
+    ) = IAccountRegistry.get_active_traders_batch(
+        contract_address=account_registry_address,
+        starting_index_=lower_limit,
+        ending_index_=upper_limit,
+    );
+
+    return (active_traders_list_len, active_traders_list);
+}
@@ -5,8 +5,15 @@ from contracts.libraries.RelayLibrary import (
     record_call_details,
     get_inner_contract,
     initialize,
+    get_accounting_mode,
+    set_accounting_mode,
+    advance_epoch,
+    get_current_epoch,
+    get_epoch_call_counter,
+    get_caller_hash_commitment,
+    mark_caller_commitment_paid,
 )
-from contracts.DataTypes import ABRDetails
+from contracts.DataTypes import ABRAccumulator, ABRDetails
 from starkware.cairo.common.cairo_builtins import HashBuiltin
 
 // //////////////
@@ -123,6 +130,17 @@ func get_abr_details{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check
     return (abr_value, abr_last_price);
 }
 
+@view
+func get_abr_accumulator{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    epoch_: felt, market_id_: felt
+) -> (res: ABRAccumulator) {
+    let (inner_address) = get_inner_contract();
+    let (res: ABRAccumulator) = IABRCore.get_abr_accumulator(
+        contract_address=inner_address, epoch_=epoch_, market_id_=market_id_
+    );
+    return (res,);
+}
+
 @view
 func get_previous_abr_values{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     starting_epoch_: felt, market_id_: felt, n_: felt
@@ -244,6 +262,33 @@ func set_abr_value{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_p
     return ();
 }
 
+@external
+func push_abr_samples{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt,
+    index_prices_len: felt,
+    index_prices: felt*,
+    mark_prices_len: felt,
+    mark_prices: felt*,
+    last_price_: felt,
+) {
+    alloc_locals;
+
+    record_call_details('push_abr_samples');
+    local pedersen_ptr: HashBuiltin* = pedersen_ptr;
+    let (inner_address) = get_inner_contract();
+    let () = IABRCore.push_abr_samples(
+        contract_address=inner_address,
+        market_id_=market_id_,
+        index_prices_len=index_prices_len,
+        index_prices=index_prices,
+        mark_prices_len=mark_prices_len,
+        mark_prices=mark_prices,
+        last_price_=last_price_,
+    );
+
+    return ();
+}
+
 @external
 func make_abr_payments{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() {
     alloc_locals;
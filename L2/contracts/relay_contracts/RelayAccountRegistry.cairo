@@ -2,17 +2,24 @@
 
 from contracts.interfaces.IAccountRegistry import IAccountRegistry
 from contracts.libraries.RelayLibrary import (
+    advance_epoch,
+    get_accounting_mode,
+    get_caller_hash_commitment,
     get_caller_hash_list,
     get_caller_hash_status,
     get_call_counter,
+    get_current_epoch,
     get_current_version,
+    get_epoch_call_counter,
     get_inner_contract,
     get_registry_address_at_relay,
     get_self_index,
     initialize,
+    mark_caller_commitment_paid,
     mark_caller_hash_paid,
     record_call_details,
     reset_call_counter,
+    set_accounting_mode,
     set_self_index,
     set_current_version
 )
@@ -56,6 +63,51 @@ func is_registered_user{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_ch
     return (res,);
 }
 
+@view
+func is_active_trader{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    address_: felt
+) -> (present: felt) {
+    let (inner_address) = get_inner_contract();
+    let (res) = IAccountRegistry.is_active_trader(inner_address, address_);
+    return (res,);
+}
+
+@view
+func get_active_traders_len{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    ) -> (len: felt) {
+    let (inner_address) = get_inner_contract();
+    let (res) = IAccountRegistry.get_active_traders_len(inner_address);
+    return (res,);
+}
+
+@view
+func get_deferred_removals_len{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    ) -> (len: felt) {
+    let (inner_address) = get_inner_contract();
+    let (res) = IAccountRegistry.get_deferred_removals_len(inner_address);
+    return (res,);
+}
+
+@view
+func is_removal_deferred{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    address_: felt
+) -> (present: felt) {
+    let (inner_address) = get_inner_contract();
+    let (res) = IAccountRegistry.is_removal_deferred(inner_address, address_);
+    return (res,);
+}
+
+@view
+func get_accounts_modified_since{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    block_number_: felt, starting_index_: felt, num_accounts_: felt
+) -> (next_index: felt, account_registry_len: felt, account_registry: felt*) {
+    let (inner_address) = get_inner_contract();
+    let (next_index, res_len, res: felt*) = IAccountRegistry.get_accounts_modified_since(
+        inner_address, block_number_, starting_index_, num_accounts_
+    );
+    return (next_index, res_len, res);
+}
+
 // ///////////
 // External //
 // ///////////
@@ -80,3 +132,13 @@ func remove_from_account_registry{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*
     IAccountRegistry.remove_from_account_registry(inner_address, id_);
     return ();
 }
+
+@external
+func remove_deferred_active_traders{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(num_accounts_: felt) {
+    record_call_details('remove_deferred_active_traders');
+    let (inner_address) = get_inner_contract();
+    IAccountRegistry.remove_deferred_active_traders(inner_address, num_accounts_);
+    return ();
+}
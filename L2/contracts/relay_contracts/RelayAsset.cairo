@@ -7,7 +7,14 @@ from contracts.libraries.RelayLibrary import (
     initialize,
     verify_caller_authority,
     get_call_counter,
-    get_caller_hash_list
+    get_caller_hash_list,
+    get_accounting_mode,
+    set_accounting_mode,
+    advance_epoch,
+    get_current_epoch,
+    get_epoch_call_counter,
+    get_caller_hash_commitment,
+    mark_caller_commitment_paid,
 )
 
 from contracts.DataTypes import Asset
@@ -78,6 +85,26 @@ func get_metadata_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     return (link_len, link);
 }
 
+@view
+func get_icon_link_packed{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    id: felt
+) -> (link_len: felt, packed_link_len: felt, packed_link: felt*) {
+    let (inner_address) = get_inner_contract();
+    let (link_len, packed_link_len, packed_link) = IAsset.get_icon_link_packed(inner_address, id);
+    return (link_len, packed_link_len, packed_link);
+}
+
+@view
+func get_metadata_link_packed{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    id: felt
+) -> (link_len: felt, packed_link_len: felt, packed_link: felt*) {
+    let (inner_address) = get_inner_contract();
+    let (link_len, packed_link_len, packed_link) = IAsset.get_metadata_link_packed(
+        inner_address, id
+    );
+    return (link_len, packed_link_len, packed_link);
+}
+
 // ////////////
 // External //
 // ////////////
@@ -145,3 +172,15 @@ func update_metadata_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
     IAsset.update_metadata_link(inner_address, asset_id, link_len, link);
     return ();
 }
+
+@external
+func migrate_links{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    asset_id: felt
+) {
+    alloc_locals;
+    verify_caller_authority(ManageAssets_ACTION);
+    record_call_details('migrate_links');
+    let (local inner_address) = get_inner_contract();
+    IAsset.migrate_links(inner_address, asset_id);
+    return ();
+}
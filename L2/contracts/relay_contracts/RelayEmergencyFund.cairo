@@ -6,6 +6,13 @@ from contracts.libraries.RelayLibrary import (
     get_inner_contract,
     initialize,
     verify_caller_authority,
+    get_accounting_mode,
+    set_accounting_mode,
+    advance_epoch,
+    get_current_epoch,
+    get_epoch_call_counter,
+    get_caller_hash_commitment,
+    mark_caller_commitment_paid,
 )
 
 from starkware.cairo.common.cairo_builtins import HashBuiltin
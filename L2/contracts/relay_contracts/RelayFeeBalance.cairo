@@ -1,10 +1,18 @@
 %lang starknet
 
+from contracts.DataTypes import UserFee
 from contracts.interfaces.IFeeBalance import IFeeBalance
 from contracts.libraries.RelayLibrary import (
     record_call_details,
     get_inner_contract,
     initialize,
+    get_accounting_mode,
+    set_accounting_mode,
+    advance_epoch,
+    get_current_epoch,
+    get_epoch_call_counter,
+    get_caller_hash_commitment,
+    mark_caller_commitment_paid,
 )
 
 from starkware.cairo.common.cairo_builtins import HashBuiltin
@@ -58,3 +66,14 @@ func update_fee_mapping{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_ch
     IFeeBalance.update_fee_mapping(inner_address, address, assetID_, fee_to_add);
     return ();
 }
+
+@external
+func update_fee_mapping_bulk{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    assetID_: felt, user_fees_len: felt, user_fees: UserFee*
+) {
+    alloc_locals;
+    record_call_details('update_fee_mapping_bulk');
+    let (inner_address) = get_inner_contract();
+    IFeeBalance.update_fee_mapping_bulk(inner_address, assetID_, user_fees_len, user_fees);
+    return ();
+}
@@ -5,6 +5,13 @@ from contracts.libraries.RelayLibrary import (
     record_call_details,
     get_inner_contract,
     initialize,
+    get_accounting_mode,
+    set_accounting_mode,
+    advance_epoch,
+    get_current_epoch,
+    get_epoch_call_counter,
+    get_caller_hash_commitment,
+    mark_caller_commitment_paid,
 )
 from starkware.cairo.common.cairo_builtins import HashBuiltin
 
@@ -1,11 +1,19 @@
 %lang starknet
 
+from contracts.DataTypes import PositionFundDelta
 from contracts.interfaces.IInsuranceFund import IInsuranceFund
 from contracts.libraries.RelayLibrary import (
     record_call_details,
     get_inner_contract,
     initialize,
     verify_caller_authority,
+    get_accounting_mode,
+    set_accounting_mode,
+    advance_epoch,
+    get_current_epoch,
+    get_epoch_call_counter,
+    get_caller_hash_commitment,
+    mark_caller_commitment_paid,
 )
 
 from starkware.cairo.common.cairo_builtins import HashBuiltin
@@ -92,3 +100,16 @@ func withdraw{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     IInsuranceFund.withdraw(inner_address, asset_id_, amount, position_id_);
     return ();
 }
+
+@external
+func settle_position_deltas{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    asset_id_: felt, position_deltas_len: felt, position_deltas: PositionFundDelta*
+) {
+    alloc_locals;
+    record_call_details('settle_position_deltas');
+    let (inner_address) = get_inner_contract();
+    IInsuranceFund.settle_position_deltas(
+        inner_address, asset_id_, position_deltas_len, position_deltas
+    );
+    return ();
+}
@@ -6,6 +6,13 @@ from contracts.libraries.RelayLibrary import (
     get_inner_contract,
     initialize,
     verify_caller_authority,
+    get_accounting_mode,
+    set_accounting_mode,
+    advance_epoch,
+    get_current_epoch,
+    get_epoch_call_counter,
+    get_caller_hash_commitment,
+    mark_caller_commitment_paid,
 )
 
 from contracts.DataTypes import Market
@@ -96,6 +103,17 @@ func get_metadata_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_che
     return (link_len, link);
 }
 
+@view
+func get_metadata_link_packed{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt
+) -> (link_len: felt, packed_link_len: felt, packed_link: felt*) {
+    let (inner_address) = get_inner_contract();
+    let (link_len, packed_link_len, packed_link) = IMarkets.get_metadata_link_packed(
+        inner_address, market_id_
+    );
+    return (link_len, packed_link_len, packed_link);
+}
+
 // ///////////
 // External //
 // ///////////
@@ -208,3 +226,15 @@ func update_metadata_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_
     IMarkets.update_metadata_link(inner_address, market_id_, link_len, link);
     return ();
 }
+
+@external
+func migrate_metadata_link{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    market_id_: felt
+) {
+    alloc_locals;
+    verify_caller_authority(ManageMarkets_ACTION);
+    record_call_details('migrate_metadata_link');
+    let (inner_address) = get_inner_contract();
+    IMarkets.migrate_metadata_link(inner_address, market_id_);
+    return ();
+}
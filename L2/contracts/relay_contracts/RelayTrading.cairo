@@ -5,6 +5,14 @@ from contracts.libraries.RelayLibrary import (
     record_call_details,
     get_inner_contract,
     initialize,
+    get_accounting_mode,
+    get_caller_hash_commitment,
+    get_caller_hash_list,
+    get_epoch_call_counter,
+    get_current_epoch,
+    set_accounting_mode,
+    advance_epoch,
+    mark_caller_commitment_paid,
 )
 
 from contracts.DataTypes import MultipleOrder
@@ -6,6 +6,13 @@ from contracts.libraries.RelayLibrary import (
     get_inner_contract,
     initialize,
     verify_caller_authority,
+    get_accounting_mode,
+    set_accounting_mode,
+    advance_epoch,
+    get_current_epoch,
+    get_epoch_call_counter,
+    get_caller_hash_commitment,
+    mark_caller_commitment_paid,
 )
 
 from contracts.DataTypes import BaseFee, Discount
@@ -78,6 +85,33 @@ func get_discounted_fee_rate_for_user{
     return (discounted_base_fee_percent, base_fee_tier, discount_tier);
 }
 
+@view
+func get_discounted_fee_rates{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    side_: felt, users_len: felt, users: felt*
+) -> (fee_rates_len: felt, fee_rates: felt*) {
+    alloc_locals;
+    let (inner_address) = get_inner_contract();
+    let (fee_rates_len, fee_rates: felt*) = ITradingFees.get_discounted_fee_rates(
+        inner_address, side_, users_len, users
+    );
+    return (fee_rates_len, fee_rates);
+}
+
+@view
+func get_fee_schedule{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() -> (
+    version: felt,
+    fee_tiers_len: felt,
+    fee_tiers: BaseFee*,
+    discount_tiers_len: felt,
+    discount_tiers: Discount*,
+) {
+    let (inner_address) = get_inner_contract();
+    let (
+        version, fee_tiers_len, fee_tiers: BaseFee*, discount_tiers_len, discount_tiers: Discount*
+    ) = ITradingFees.get_fee_schedule(inner_address);
+    return (version, fee_tiers_len, fee_tiers, discount_tiers_len, discount_tiers);
+}
+
 // ///////////
 // External //
 // ///////////
@@ -1,5 +1,6 @@
 %lang starknet
 
+from starkware.cairo.common.alloc import alloc
 from starkware.cairo.common.cairo_builtins import HashBuiltin
 from starkware.cairo.common.math import assert_not_zero
 from contracts.Constants import MasterAdmin_ACTION
@@ -69,6 +70,21 @@ func is_whitelisted{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_
     return (res,);
 }
 
+// @notice - returns whether each public key of an array is whitelisted or not
+// @param pubkey_len - length of the array of public keys
+// @param pubkey - array of public keys
+// @return res_len - length of the result array, equal to pubkey_len
+// @return res - array with 1 at the positions of whitelisted public keys and 0 elsewhere
+@view
+func are_whitelisted{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    pubkey_len: felt, pubkey: felt*
+) -> (res_len: felt, res: felt*) {
+    alloc_locals;
+    let (local res: felt*) = alloc();
+    populate_whitelist_status(0, pubkey_len, pubkey, res);
+    return (pubkey_len, res);
+}
+
 @view
 func get_registry_address{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}() -> (
     address: felt
@@ -128,3 +144,20 @@ func delist_pubkey{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_p
     pubkey_removed_from_whitelist.emit(pubkey=pubkey);
     return ();
 }
+
+// ///////////
+// Internal //
+// ///////////
+
+// @notice - recursively fills the whitelist status of each public key of an array
+func populate_whitelist_status{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    iterator_: felt, pubkey_len: felt, pubkey: felt*, res: felt*
+) {
+    if (iterator_ == pubkey_len) {
+        return ();
+    }
+
+    let (is_whitelisted) = pubkey_to_whitelist.read(pubkey[iterator_]);
+    assert res[iterator_] = is_whitelisted;
+    return populate_whitelist_status(iterator_ + 1, pubkey_len, pubkey, res);
+}
@@ -82,6 +82,18 @@ func assert_func_handled{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_c
     return ();
 }
 
+// @notice - this function reverts if core function is not registered, otherwise returns number of signatures required for it
+// @dev - combines assert_func_handled and get_sig_requirement so that callers need a single call
+@view
+func get_handled_sig_requirement{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    core_function: CoreFunction
+) -> (num_req: felt) {
+    assert_func_handled(core_function);
+    let (num_req) = func_to_num_sig_mapping.read(core_function);
+
+    return (num_req,);
+}
+
 // @notice - this function returns number of signatures required for a function
 @view
 func get_sig_requirement{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
@@ -1,5 +1,7 @@
 %lang starknet
 
+from starkware.cairo.common.alloc import alloc
+from starkware.cairo.common.bool import FALSE, TRUE
 from starkware.cairo.common.cairo_builtins import HashBuiltin, SignatureBuiltin
 from starkware.cairo.common.math import assert_not_zero, assert_le
 from starkware.starknet.common.syscalls import call_contract
@@ -47,6 +49,16 @@ func version() -> (res: felt) {
 func nonce() -> (res: felt) {
 }
 
+// stores contract addresses fetched from the registry, keyed by index and version
+@storage_var
+func contract_address_cache(index: felt, version: felt) -> (address: felt) {
+}
+
+// stores the registry update count at which each cached address was fetched
+@storage_var
+func contract_address_cache_update_count(index: felt, version: felt) -> (count: felt) {
+}
+
 // this var stores a master switch
 // 0 - no signature check required
 // 1 - signature check will be done
@@ -110,11 +122,33 @@ func get_nonce{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     return (current_nonce,);
 }
 
+// @notice - returns the cached address of a contract, 0 if it has not been fetched from the registry yet
+// or the registry has been updated since
+@view
+func get_cached_contract_address{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    index: felt, version_: felt
+) -> (address: felt) {
+    alloc_locals;
+    let (local address) = contract_address_cache.read(index, version_);
+    let (local cached_update_count) = contract_address_cache_update_count.read(index, version_);
+    let (current_registry_address) = registry_address.read();
+    let (registry_update_count) = IAuthorizedRegistry.get_registry_update_count(
+        current_registry_address
+    );
+
+    if (cached_update_count != registry_update_count) {
+        return (0,);
+    }
+    return (address,);
+}
+
 // ///////////
 // External //
 // ///////////
 
 // @notice - this is the main function which is called by signature nodes
+// @dev - makes a fixed number of cross-contract calls regardless of the number of signers,
+// registry addresses are cached until the registry is updated
 // @param - index, version together give the exact contract address
 // @param - function_selector specifies which function to call in the contract
 // @param - calldata_len and calldata specify the calldata which needs to be passed on
@@ -144,8 +178,11 @@ func call_core_function{
         core_function_call.index, core_function_call.version, core_function_call.function_selector
     );
 
+    let (local current_version) = version.read();
     let (current_registry_address) = registry_address.read();
-    let (current_version) = version.read();
+    let (local registry_update_count) = IAuthorizedRegistry.get_registry_update_count(
+        current_registry_address
+    );
 
     // check nonce
     let (current_nonce) = nonce.read();
@@ -169,15 +206,8 @@ func call_core_function{
     let (should_check_sig) = check_sig.read();
 
     if (should_check_sig == 0) {
-        let (contract_address) = IAuthorizedRegistry.get_contract_address(
-            current_registry_address, core_function_call.index, core_function_call.version
-        );
-
-        let (retdata_len: felt, retdata: felt*) = call_contract(
-            contract_address,
-            core_function_call.function_selector,
-            core_function_call.calldata_len,
-            core_function_call.calldata,
+        let (retdata_len: felt, retdata: felt*) = forward_call(
+            core_function_call, registry_update_count
         );
         return (retdata_len, retdata);
     }
@@ -188,17 +218,13 @@ func call_core_function{
         assert sig_len = pubkey_len;
     }
 
-    // check whether function being called is handled by the signature infra
-
-    let (sig_req_manager_address) = IAuthorizedRegistry.get_contract_address(
-        current_registry_address, SigRequirementsManager_INDEX, current_version
+    let (sig_req_manager_address) = get_contract_address_cached(
+        SigRequirementsManager_INDEX, current_version, registry_update_count
     );
 
-    // if called function is not handled then revert
-    ISigRequirementsManager.assert_func_handled(sig_req_manager_address, core_function);
-
-    // get number of required signatures for this call
-    let (num_req) = ISigRequirementsManager.get_sig_requirement(
+    // revert if called function is not handled by the signature infra,
+    // otherwise get number of required signatures for this call
+    let (local num_req) = ISigRequirementsManager.get_handled_sig_requirement(
         sig_req_manager_address, core_function
     );
 
@@ -210,33 +236,29 @@ func call_core_function{
 
     // if 0 signatures are required for the called function, then simply forward the call
     if (num_req == 0) {
-        let (contract_address) = IAuthorizedRegistry.get_contract_address(
-            current_registry_address, core_function_call.index, core_function_call.version
-        );
-
-        let (retdata_len: felt, retdata: felt*) = call_contract(
-            contract_address,
-            core_function_call.function_selector,
-            core_function_call.calldata_len,
-            core_function_call.calldata,
+        let (retdata_len: felt, retdata: felt*) = forward_call(
+            core_function_call, registry_update_count
         );
-
         return (retdata_len, retdata);
     }
 
     // calculate the hash of the contract address, nonce, function selector and calldata
     // contract address is represented by index and version
-    let (hash) = SignatureVerification.calc_call_hash(core_function_call);
-    local num_left;
-    assert num_left = sig_len;  // we can validate at most sig_len number of signatures
+    let (local hash) = SignatureVerification.calc_call_hash(core_function_call);
+
+    let (pubkey_whitelister_address) = get_contract_address_cached(
+        PubkeyWhitelister_INDEX, current_version, registry_update_count
+    );
 
-    let (pubkey_whitelister_adddress) = IAuthorizedRegistry.get_contract_address(
-        current_registry_address, PubkeyWhitelister_INDEX, current_version
+    // get whitelist status of all public keys in a single call
+    let (_, is_whitelisted: felt*) = IPubkeyWhitelister.are_whitelisted(
+        pubkey_whitelister_address, pubkey_len, pubkey
     );
 
-    // get number of valid signatures provided
+    // get number of valid signatures provided, we can validate at most sig_len number of signatures
+    let (validated_pubkeys: felt*) = alloc();
     let (num_sig_provided) = get_num_valid_sig(
-        num_left, 0, hash, sig, pubkey, pubkey_whitelister_adddress
+        sig_len, 0, num_req, hash, sig, pubkey, is_whitelisted, validated_pubkeys
     );
 
     // check that number of valid signatures provided  >= number of signatures required
@@ -244,19 +266,9 @@ func call_core_function{
         assert_le(num_req, num_sig_provided);
     }
 
-    let (current_registry_address) = registry_address.read();
-
-    let (contract_address) = IAuthorizedRegistry.get_contract_address(
-        current_registry_address, core_function_call.index, core_function_call.version
+    let (retdata_len: felt, retdata: felt*) = forward_call(
+        core_function_call, registry_update_count
     );
-
-    let (retdata_len: felt, retdata: felt*) = call_contract(
-        contract_address,
-        core_function_call.function_selector,
-        core_function_call.calldata_len,
-        core_function_call.calldata,
-    );
-
     return (retdata_len, retdata);
 }
 
@@ -275,47 +287,136 @@ func toggle_check_sig{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_chec
     return ();
 }
 
+// @notice - clears the cached address of a contract, so that it is fetched from the registry on the next call
+// @dev - updating the registry already invalidates every cached address
+@external
+func clear_cached_contract_address{
+    syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr
+}(index: felt, version_: felt) {
+    let (current_registry_address) = registry_address.read();
+    let (current_version) = version.read();
+
+    verify_caller_authority(current_registry_address, current_version, MasterAdmin_ACTION);
+
+    contract_address_cache.write(index, version_, 0);
+    return ();
+}
+
 // ///////////
 // Internal //
 // ///////////
 
+// @notice - returns the address of a contract from the cache, fetching it from the registry on a miss
+// @param registry_update_count - current update count of the registry, cached addresses fetched at
+// another count are stale
+func get_contract_address_cached{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    index: felt, version_: felt, registry_update_count: felt
+) -> (address: felt) {
+    alloc_locals;
+    let (local cached_address) = contract_address_cache.read(index, version_);
+    let (cached_update_count) = contract_address_cache_update_count.read(index, version_);
+    if (cached_address != 0) {
+        if (cached_update_count == registry_update_count) {
+            return (cached_address,);
+        }
+    }
+
+    let (current_registry_address) = registry_address.read();
+    let (local contract_address) = IAuthorizedRegistry.get_contract_address(
+        current_registry_address, index, version_
+    );
+    contract_address_cache.write(index, version_, contract_address);
+    contract_address_cache_update_count.write(index, version_, registry_update_count);
+    return (contract_address,);
+}
+
+// @notice - forwards the call to the concerned contract
+func forward_call{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    core_function_call: CoreFunctionCall, registry_update_count: felt
+) -> (retdata_len: felt, retdata: felt*) {
+    let (contract_address) = get_contract_address_cached(
+        core_function_call.index, core_function_call.version, registry_update_count
+    );
+
+    let (retdata_len: felt, retdata: felt*) = call_contract(
+        contract_address,
+        core_function_call.function_selector,
+        core_function_call.calldata_len,
+        core_function_call.calldata,
+    );
+    return (retdata_len, retdata);
+}
+
 // @notice - goes through the list of signatures and verifies that the hash was signed by the private key
 // corresponding to the public key in the same index position
+// @dev - is_whitelisted holds the whitelist status of each public key in the same index position,
+// so keys which are not whitelisted are skipped without verifying their signature.
+// A public key is counted at most once and the search stops as soon as num_req signatures are validated
+// @param validated_pubkeys - public keys whose signatures have been validated so far
 func get_num_valid_sig{
     syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr, ecdsa_ptr: SignatureBuiltin*
 }(
     num_left_to_validate: felt,
     num_validated: felt,
+    num_req: felt,
     hash: felt,
     sig: Signature*,
     pubkey: felt*,
-    pubkey_whitelister_adddress: felt,
+    is_whitelisted: felt*,
+    validated_pubkeys: felt*,
 ) -> (res: felt) {
     if (num_left_to_validate == 0) {
         return (num_validated,);
     }
 
-    let (is_whitelisted) = IPubkeyWhitelister.is_whitelisted(pubkey_whitelister_adddress, [pubkey]);
-
-    if (is_whitelisted == 1) {
-        // if signature is invalid then the whole call to validator will get reverted
-        SignatureVerification.verify_sig(hash, [pubkey], [sig]);
-        return get_num_valid_sig(
-            num_left_to_validate - 1,
-            num_validated + 1,
-            hash,
-            sig + Signature.SIZE,
-            pubkey + 1,
-            pubkey_whitelister_adddress,
-        );
-    } else {
-        return get_num_valid_sig(
-            num_left_to_validate - 1,
-            num_validated,
-            hash,
-            sig + Signature.SIZE,
-            pubkey + 1,
-            pubkey_whitelister_adddress,
-        );
+    if (num_validated == num_req) {
+        return (num_validated,);
     }
+
+    if ([is_whitelisted] == 1) {
+        let is_duplicate = is_pubkey_in_list([pubkey], num_validated, validated_pubkeys);
+        if (is_duplicate == FALSE) {
+            // if signature is invalid then the whole call to validator will get reverted
+            SignatureVerification.verify_sig(hash, [pubkey], [sig]);
+            assert validated_pubkeys[num_validated] = [pubkey];
+            return get_num_valid_sig(
+                num_left_to_validate - 1,
+                num_validated + 1,
+                num_req,
+                hash,
+                sig + Signature.SIZE,
+                pubkey + 1,
+                is_whitelisted + 1,
+                validated_pubkeys,
+            );
+        }
+    }
+
+    return get_num_valid_sig(
+        num_left_to_validate - 1,
+        num_validated,
+        num_req,
+        hash,
+        sig + Signature.SIZE,
+        pubkey + 1,
+        is_whitelisted + 1,
+        validated_pubkeys,
+    );
+}
+
+// @notice - checks whether a public key is present in a list of public keys
+// @param pubkey - public key to look for
+// @param pubkey_list_len - number of entries to check
+// @param pubkey_list - list of public keys
+// @return res - TRUE if the public key is present, FALSE otherwise
+func is_pubkey_in_list(pubkey: felt, pubkey_list_len: felt, pubkey_list: felt*) -> felt {
+    if (pubkey_list_len == 0) {
+        return FALSE;
+    }
+
+    if (pubkey_list[pubkey_list_len - 1] == pubkey) {
+        return TRUE;
+    }
+
+    return is_pubkey_in_list(pubkey, pubkey_list_len - 1, pubkey_list);
 }
@@ -0,0 +1,229 @@
+"""Off-chain reference for the HighTideCalc contract.
+
+Works on stats exported from TradingStats and UserStats for a whole season, with every
+per-trader quantity held in a numpy array, so a season can be precomputed or verified
+without replaying the batched on-chain calls.
+"""
+
+import math
+from dataclasses import dataclass, field
+import numpy as np
+
+
+@dataclass
+class MarketStats:
+    """TradingStats of a market in a season"""
+    market_id: int
+    average_order_volume: float
+    max_trades_in_day: int
+    total_days_traded: int
+    num_active_traders: int
+
+
+@dataclass
+class MarketUserStats:
+    """UserStats of all the traders of a market in a season, in TradingStats order"""
+    market_id: int
+    total_fee: float
+    trader_addresses: list
+    fee: np.ndarray
+    num_orders_open: np.ndarray
+    volume_open: np.ndarray
+    num_orders_close: np.ndarray
+    volume_close: np.ndarray
+    pnl: np.ndarray
+    margin_amount: np.ndarray
+
+    @classmethod
+    def from_rows(cls, market_id, total_fee, rows):
+        """Builds the table from one dict per trader.
+
+        Every row has the keys trader_address, fee, num_orders_open, volume_open,
+        num_orders_close, volume_close, pnl and margin_amount.
+        """
+        def column(key):
+            return np.array([row[key] for row in rows], dtype=float)
+
+        return cls(
+            market_id=market_id,
+            total_fee=total_fee,
+            trader_addresses=[row["trader_address"] for row in rows],
+            fee=column("fee"),
+            num_orders_open=column("num_orders_open"),
+            volume_open=column("volume_open"),
+            num_orders_close=column("num_orders_close"),
+            volume_close=column("volume_close"),
+            pnl=column("pnl"),
+            margin_amount=column("margin_amount"),
+        )
+
+
+@dataclass
+class Constants:
+    a: float
+    b: float
+    c: float
+    z: float
+    e: float
+
+
+@dataclass
+class Multipliers:
+    a_1: float
+    a_2: float
+    a_3: float
+    a_4: float
+
+
+@dataclass
+class PhasePlan:
+    """Calls needed by each on-chain phase of a hightide market"""
+    market_id: int
+    no_of_batches: int
+    batch_sizes: list = field(default_factory=list)
+
+    @property
+    def calculate_w_calls(self):
+        return self.no_of_batches
+
+    @property
+    def calculate_trader_score_calls(self):
+        return self.no_of_batches
+
+    @property
+    def traders_processed(self):
+        return sum(self.batch_sizes)
+
+
+def safe_divide(numerator, denominator):
+    """Element-wise division returning 0 where the denominator is 0, like the contract"""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    result = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+
+def find_top_stats(markets):
+    """Returns (max_trades, number_of_traders, average_volume) over all the tradable markets"""
+    if not markets:
+        return (0, 0, 0)
+    return (
+        max(market.max_trades_in_day for market in markets),
+        max(market.num_active_traders for market in markets),
+        max(market.average_order_volume for market in markets),
+    )
+
+
+def calculate_high_tide_factors(markets, hightide_market_ids, num_trading_days):
+    """Returns {market_id: [x_1, x_2, x_3, x_4]} for the hightide markets of a season
+
+    markets must hold the stats of every tradable market, since the top stats are taken
+    across all of them.
+    """
+    max_trades, number_of_traders, average_volume = find_top_stats(markets)
+    by_id = {market.market_id: market for market in markets}
+    hightides = [by_id[market_id] for market_id in hightide_market_ids]
+
+    x_1 = safe_divide([m.average_order_volume for m in hightides], average_volume)
+    x_2 = safe_divide([m.max_trades_in_day for m in hightides], max_trades)
+    x_3 = safe_divide([m.total_days_traded for m in hightides], num_trading_days)
+    x_4 = safe_divide([m.num_active_traders for m in hightides], number_of_traders)
+
+    factors = np.stack([x_1, x_2, x_3, x_4], axis=1)
+    return {market_id: factors[i] for i, market_id in enumerate(hightide_market_ids)}
+
+
+def calculate_funds_flow(factors, multipliers):
+    """Returns {market_id: funds_flow} from the factors of calculate_high_tide_factors"""
+    weights = np.array(
+        [multipliers.a_1, multipliers.a_2, multipliers.a_3, multipliers.a_4], dtype=float
+    )
+    denominator = weights.sum()
+    if denominator == 0:
+        return {}
+    return {
+        market_id: float(np.dot(market_factors, weights) / denominator)
+        for market_id, market_factors in factors.items()
+    }
+
+
+def calculate_d(user_stats):
+    """Average open interest of every trader, 0 if the close volume is not lower"""
+    remaining_volume = user_stats.volume_open - user_stats.volume_close
+    total_orders = user_stats.num_orders_open + user_stats.num_orders_close
+    d = safe_divide(remaining_volume, total_orders)
+    return np.where(remaining_volume > 0, d, 0.0)
+
+
+def calculate_p(user_stats):
+    """Ratio of pnl to margin of every trader"""
+    return safe_divide(user_stats.pnl, user_stats.margin_amount)
+
+
+def calculate_w(user_stats, xp_values, constants):
+    """Returns the w value of every trader of a market
+
+    xp_values is an array of the xp of every trader, in the same order as user_stats.
+    """
+    fp = user_stats.fee
+    ft = user_stats.total_fee
+    fee_power_a = np.power((1 + fp) / (1 + ft), constants.a)
+    d_power_b = np.power(1 + calculate_d(user_stats), constants.b)
+    xp_power_c = np.power(
+        np.maximum(constants.z, np.asarray(xp_values, dtype=float)), constants.c)
+    p_power_e = np.power(1 + calculate_p(user_stats), constants.e)
+    return fee_power_a * d_power_b * xp_power_c * p_power_e
+
+
+def calculate_trader_score(w_values):
+    """Returns the share of the market's total w held by every trader"""
+    w_values = np.asarray(w_values, dtype=float)
+    return safe_divide(w_values, w_values.sum())
+
+
+def calculate_trader_scores(user_stats, xp_by_address, constants):
+    """Returns {trader_address: trader_score} for a market"""
+    xp_values = [xp_by_address.get(address, 0) for address in user_stats.trader_addresses]
+    scores = calculate_trader_score(calculate_w(user_stats, xp_values, constants))
+    return dict(zip(user_stats.trader_addresses, scores.tolist()))
+
+
+def calculate_no_of_batches(num_active_traders, no_of_users_per_batch):
+    """Number of batches HighTideCalc splits the traders of a market into"""
+    return math.ceil(num_active_traders / no_of_users_per_batch)
+
+
+def plan_phases(markets, hightide_market_ids, no_of_users_per_batch):
+    """Returns a PhasePlan for every hightide market
+
+    calculate_high_tide_factors and calculate_funds_flow are a single call per season, while
+    calculate_w and calculate_trader_score are called once for every batch of every market.
+    """
+    by_id = {market.market_id: market for market in markets}
+    plans = []
+    for market_id in hightide_market_ids:
+        num_traders = by_id[market_id].num_active_traders
+        no_of_batches = calculate_no_of_batches(num_traders, no_of_users_per_batch)
+        batch_sizes = [
+            min(no_of_users_per_batch, num_traders - batch_id * no_of_users_per_batch)
+            for batch_id in range(no_of_batches)
+        ]
+        plans.append(PhasePlan(market_id, no_of_batches, batch_sizes))
+    return plans
+
+
+def calculate_season(markets, user_stats, hightide_market_ids, num_trading_days, xp_by_address,
+                     constants, multipliers):
+    """Runs every HighTideCalc phase of a season
+
+    user_stats maps the hightide market ids to their MarketUserStats.
+    Returns (factors, funds_flow, trader_scores), with trader_scores keyed by market id.
+    """
+    factors = calculate_high_tide_factors(markets, hightide_market_ids, num_trading_days)
+    funds_flow = calculate_funds_flow(factors, multipliers)
+    trader_scores = {
+        market_id: calculate_trader_scores(user_stats[market_id], xp_by_address, constants)
+        for market_id in hightide_market_ids
+    }
+    return factors, funds_flow, trader_scores
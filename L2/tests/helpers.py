@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Dict, List, Tuple
 from cachetools import LRUCache
 from starkware.starknet.core.os.class_hash import set_class_hash_cache
 from starkware.starknet.compiler.compile import compile_starknet_files
@@ -6,6 +7,14 @@ from starkware.starknet.testing.starknet import Starknet
 from starkware.starknet.testing.contract import StarknetContract
 from starkware.starknet.testing.state import StarknetState
 from starkware.starknet.services.api.contract_class import ContractClass
+from starkware.starknet.business_logic.transaction.objects import InternalTransaction, TransactionExecutionInfo
+from starkware.starknet.core.os.contract_address.contract_address import calculate_contract_address_from_hash
+from starkware.starknet.definitions.constants import UNINITIALIZED_CLASS_HASH
+from starkware.starknet.public.abi import get_storage_var_address
+from utils import Signer
+
+# Balance the AccountManager constructor gives the default collateral
+DEFAULT_BALANCE = 23058430092136939520000
 
 
 class ContractType(Enum):
@@ -73,16 +82,29 @@ class ContractType(Enum):
     ERC20 = "tests/testable/TestERC20Mintable.cairo"
     TestUserBatch = "tests/testable/TestUserBatch.cairo"
     TestMath64x61 = "tests/testable/TestMath64x61.cairo"
+    TestStringLib = "tests/testable/TestStringLib.cairo"
 
 
 
 class OptimizedStarknetState(StarknetState):
+    # (contract_address, key) -> value of every storage slot written by the latest transaction
+    last_storage_writes: Dict[Tuple[int, int], int] = {}
 
     def copy(self) -> "OptimizedStarknetState":
         # StarknetState's copy operation is the most expesive part of send tx call
         # We don't use StarknetState, so no problem in skipping copy operation
         return self
 
+    async def execute_tx(self, tx: InternalTransaction) -> TransactionExecutionInfo:
+        # Same as StarknetState.execute_tx, keeping the storage writes of the transaction
+        with self.state.copy_and_apply() as state_copy:
+            tx_execution_info = await tx.apply_state_updates(
+                state=state_copy, general_config=self.general_config)
+            self.last_storage_writes = dict(state_copy.cache._storage_writes)
+
+        self.add_messages_and_events(execution_info=tx_execution_info)
+        return tx_execution_info
+
 
 class ContractsHolder:
 
@@ -141,3 +163,81 @@ class AccountFactory:
             self.version,
             self.collateral_id
         ])
+
+    async def provision_ZKX_accounts(self, count: int, first_private_key: int, balances: Dict[int, int] = None, account_registry: StarknetContract = None) -> List[Tuple[Signer, StarknetContract]]:
+        """
+        Creates AccountManager accounts by writing their storage directly into the state, instead of
+        deploying and registering them one transaction at a time.
+
+        The accounts use the private keys first_private_key to first_private_key + count - 1, and
+        get the address a deploy with the private key as salt would give them.
+        balances maps asset ids to 64x61 amounts, on top of the default collateral balance.
+        Accounts already deployed at their address are returned as they are, without writing their storage again.
+        The accounts are appended to account_registry when it is passed.
+        """
+        starknet_state = self.starknet_service.starknet.state
+        state = starknet_state.state
+
+        contract_class = self.starknet_service.contracts_holder.get_contract_class(ContractType.AccountManager)
+        with set_class_hash_cache(self.starknet_service.compilation_cache):
+            class_hash, _ = await starknet_state.declare(contract_class)
+
+        # Storage the constructor and set_balance would write, shared by every account
+        account_balances = {self.collateral_id: DEFAULT_BALANCE, **(balances or {})}
+        account_storage = {
+            get_storage_var_address("L1_address"): self.L1_user_address,
+            get_storage_var_address("account_deployed_block_number"): state.block_info.block_number,
+            get_storage_var_address("CommonLib_registry_address"): self.registry_address,
+            get_storage_var_address("CommonLib_contract_version"): self.version,
+            get_storage_var_address("collateral_array_len"): len(account_balances),
+        }
+        for (index, (asset_id, amount)) in enumerate(account_balances.items()):
+            account_storage[get_storage_var_address("collateral_array", index)] = asset_id
+            account_storage[get_storage_var_address("balance", asset_id)] = amount
+        public_key_address = get_storage_var_address("public_key")
+
+        accounts = []
+        for private_key in range(first_private_key, first_private_key + count):
+            signer = Signer(private_key)
+            contract_address = calculate_contract_address_from_hash(
+                salt=private_key,
+                class_hash=int.from_bytes(class_hash, "big"),
+                constructor_calldata=[signer.public_key, self.L1_user_address,
+                                      self.registry_address, self.version, self.collateral_id],
+                deployer_address=0,
+            )
+            if await state.get_class_hash_at(contract_address) == UNINITIALIZED_CLASS_HASH:
+                await state.deploy_contract(contract_address, class_hash)
+                await state.set_storage_at(contract_address, public_key_address, signer.public_key)
+                for (key, value) in account_storage.items():
+                    await state.set_storage_at(contract_address, key, value)
+
+            account = StarknetContract(
+                state=starknet_state,
+                abi=contract_class.abi,
+                contract_address=contract_address,
+                deploy_call_info=None,
+            )
+            accounts.append((signer, account))
+
+        if account_registry is not None:
+            await register_accounts(state, account_registry.contract_address, [
+                account.contract_address for (_, account) in accounts])
+        return accounts
+
+
+# Append addresses to an AccountRegistry the way add_to_account_registry does, without a transaction each
+async def register_accounts(state, account_registry_address: int, addresses: List[int]):
+    registry_len_address = get_storage_var_address("account_registry_len")
+    registry_len = await state.get_storage_at(account_registry_address, registry_len_address)
+
+    for address in addresses:
+        account_present_address = get_storage_var_address("account_present", address)
+        if await state.get_storage_at(account_registry_address, account_present_address) == 1:
+            continue
+        await state.set_storage_at(
+            account_registry_address, get_storage_var_address("account_registry", registry_len), address)
+        await state.set_storage_at(account_registry_address, account_present_address, 1)
+        registry_len += 1
+
+    await state.set_storage_at(account_registry_address, registry_len_address, registry_len)
@@ -15,6 +15,7 @@ from utils_markets import MarketProperties
 from utils_trading import User, order_direction, order_types, side, OrderExecutor, fund_mapping, set_balance, execute_and_compare, compare_fund_balances, compare_user_balances, compare_user_positions, check_batch_status
 from helpers import StarknetService, ContractType, AccountFactory
 from dummy_addresses import L1_dummy_address
+from calculate_hightide import MarketStats, MarketUserStats, Constants, Multipliers, calculate_season, plan_phases
 
 
 admin1_signer = Signer(123456789987654321)
@@ -1504,3 +1505,96 @@ async def test_calculating_factors(adminAuth_factory):
     funds_flow_TSLA_USD_ID = await hightideCalc.get_funds_flow_per_market(season_id, TSLA_USD_ID).call()
     assert from64x61(
         funds_flow_TSLA_USD_ID.result.funds_flow) == 0.5296052631578947
+
+
+@pytest.mark.asyncio
+async def test_python_reference_matches_contract(adminAuth_factory):
+    starknet_service, adminAuth, fees, admin1, admin2, asset, trading, alice, bob, charlie, dave, fixed_math, holding, feeBalance, _, _, trading_stats, hightide, hightideCalc, user_stats, rewardsCalculation, alice_test, bob_test, charlie_test, python_executor = adminAuth_factory
+
+    season_id = 1
+    season = await hightide.get_season(season_id).call()
+    num_trading_days = season.result.trading_season.num_trading_days
+
+    # Export TradingStats for every tradable market
+    markets = []
+    for market_id in [BTC_USD_ID, BTC_UST_ID, ETH_USD_ID, TSLA_USD_ID, UST_USDC_ID]:
+        average_volume = await trading_stats.get_average_order_volume(season_id, market_id).call()
+        max_trades = await trading_stats.get_max_trades_in_day(season_id, market_id).call()
+        days_traded = await trading_stats.get_total_days_traded(season_id, market_id).call()
+        num_traders = await trading_stats.get_num_active_traders(season_id, market_id).call()
+        markets.append(MarketStats(
+            market_id=market_id,
+            average_order_volume=from64x61(average_volume.result.average_volume_64x61),
+            max_trades_in_day=max_trades.result.res,
+            total_days_traded=days_traded.result.res,
+            num_active_traders=num_traders.result.res,
+        ))
+
+    hightide_list = await hightide.get_hightides_by_season_id(season_id).call()
+    hightide_market_ids = []
+    for hightide_id in hightide_list.result.hightide_list:
+        hightide_metadata = await hightide.get_hightide(hightide_id).call()
+        hightide_market_ids.append(hightide_metadata.result.hightide_metadata.market_id)
+
+    # Export UserStats for the traders of every hightide market
+    user_stats_by_market = {}
+    xp_by_address = {}
+    for market in markets:
+        if market.market_id not in hightide_market_ids:
+            continue
+        batch = await trading_stats.get_batch(season_id, market.market_id, 0, market.num_active_traders).call()
+        rows = []
+        for trader_address in batch.result.trader_list:
+            fee = await user_stats.get_trader_fee(season_id, market.market_id, trader_address).call()
+            volume_open = await user_stats.get_trader_order_volume(trader_address, (season_id, market.market_id, 1)).call()
+            volume_close = await user_stats.get_trader_order_volume(trader_address, (season_id, market.market_id, 2)).call()
+            pnl = await user_stats.get_trader_pnl(season_id, market.market_id, trader_address).call()
+            margin = await user_stats.get_trader_margin_amount(season_id, market.market_id, trader_address).call()
+            xp = await rewardsCalculation.get_user_xp_value(season_id, trader_address).call()
+            xp_by_address[trader_address] = xp.result.xp_value
+            rows.append({
+                "trader_address": trader_address,
+                "fee": from64x61(fee.result.fee_64x61),
+                "num_orders_open": volume_open.result.number_of_orders,
+                "volume_open": from64x61(volume_open.result.total_volume_64x61),
+                "num_orders_close": volume_close.result.number_of_orders,
+                "volume_close": from64x61(volume_close.result.total_volume_64x61),
+                "pnl": from64x61(pnl.result.pnl_64x61),
+                "margin_amount": from64x61(margin.result.margin_amount_64x61),
+            })
+        total_fee = await user_stats.get_total_fee(season_id, market.market_id).call()
+        user_stats_by_market[market.market_id] = MarketUserStats.from_rows(
+            market.market_id, from64x61(total_fee.result.total_fee_64x61), rows)
+
+    constants = await hightide.get_constants().call()
+    multipliers = await hightide.get_multipliers().call()
+    (factors, funds_flow, trader_scores) = calculate_season(
+        markets=markets,
+        user_stats=user_stats_by_market,
+        hightide_market_ids=hightide_market_ids,
+        num_trading_days=num_trading_days,
+        xp_by_address=xp_by_address,
+        constants=Constants(*[from64x61(value) for value in constants.result.constants]),
+        multipliers=Multipliers(*[from64x61(value) for value in multipliers.result.multipliers]),
+    )
+
+    no_of_users_per_batch = await hightideCalc.get_no_of_users_per_batch().call()
+    plans = plan_phases(markets, hightide_market_ids, no_of_users_per_batch.result.no_of_users)
+
+    for plan in plans:
+        market_id = plan.market_id
+        contract_factors = await hightideCalc.get_hightide_factors(season_id, market_id).call()
+        assert [from64x61(x) for x in contract_factors.result.res] == pytest.approx(
+            list(factors[market_id]), abs=1e-6)
+
+        contract_funds_flow = await hightideCalc.get_funds_flow_per_market(season_id, market_id).call()
+        assert from64x61(contract_funds_flow.result.funds_flow) == pytest.approx(
+            funds_flow[market_id], abs=1e-6)
+
+        for trader_address, score in trader_scores[market_id].items():
+            contract_score = await hightideCalc.get_trader_score_per_market(season_id, market_id, trader_address).call()
+            assert from64x61(contract_score.result.trader_score) == pytest.approx(score, abs=1e-6)
+
+        no_of_batches = await hightideCalc.get_no_of_batches_per_market(season_id, market_id).call()
+        assert plan.no_of_batches == no_of_batches.result.no_of_batches
+        assert plan.traders_processed == len(trader_scores[market_id])
@@ -547,6 +547,17 @@ async def test_opening_orders_day_0(adminAuth_factory):
         quantity_locked_1*execution_price_1
 
 
+@pytest.mark.asyncio
+async def test_active_season_is_cached(adminAuth_factory):
+    _, adminAuth, fees, admin1, admin2, asset, trading, alice, bob, charlie, dave, fixed_math, holding, feeBalance, _, _, trading_stats, hightide, alice_test, bob_test, _, python_executor = adminAuth_factory
+
+    # The season started in the previous test is cached on the first recorded batch
+    cached_season = await trading_stats.get_cached_season().call()
+    season = await hightide.get_season(1).call()
+    assert cached_season.result.season_id == 1
+    assert cached_season.result.season == season.result.trading_season
+
+
 @pytest.mark.asyncio
 async def test_closing_orders_day_1(adminAuth_factory):
     starknet_service, adminAuth, fees, admin1, admin2, asset, trading, alice, bob, charlie, dave, fixed_math, holding, feeBalance, _, _, trading_stats, hightide, alice_test, bob_test, _, python_executor = adminAuth_factory
@@ -0,0 +1,126 @@
+import pytest
+import asyncio
+import ABR_data
+from calculate_abr import calculate_abr
+from helpers import StarknetService, ContractType
+from utils import convertTo64x61, from64x61, to64x61
+from utils_abr_sampler import ABRSampler
+
+# Maximum deviation allowed from the ABR values of the window re-summing implementation
+ABR_TOLERANCE = 1e-12
+
+# Steps taken by the window re-summing implementation on 480 samples, the least across the data sets
+LEGACY_ABR_STEPS = 480926
+
+base_rate = 0.0000125
+boll_width = 2.0
+
+abr_data_sets = [
+    (ABR_data.eth_usd_perp_spot_1, ABR_data.eth_usd_perp_1),
+    (ABR_data.eth_usd_perp_spot_2, ABR_data.eth_usd_perp_2),
+    (ABR_data.btc_usd_perp_spot_1, ABR_data.btc_usd_perp_1),
+    (ABR_data.btc_usd_perp_spot_2, ABR_data.btc_usd_perp_2),
+    (ABR_data.btc_ust_perp_spot_1, ABR_data.btc_ust_perp_1),
+    (ABR_data.btc_ust_perp_spot_2, ABR_data.btc_ust_perp_2),
+]
+
+# 64x61 ABR values returned by the window re-summing implementation for abr_data_sets
+legacy_abr_values = [
+    75767547721997,
+    73846939960772,
+    171878232829334,
+    2670314634797187,
+    -659678947101474,
+    -2114745854593566,
+]
+
+
+@pytest.fixture(scope='module')
+def event_loop():
+    return asyncio.new_event_loop()
+
+
+@pytest.fixture(scope='module')
+async def abr_calculations_factory(starknet_service: StarknetService):
+    abr_calculations = await starknet_service.deploy(ContractType.ABRCalculations, [])
+    return abr_calculations
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("spot, perp, legacy_abr_value", [
+    (spot, perp, abr_value) for ((spot, perp), abr_value) in zip(abr_data_sets, legacy_abr_values)
+])
+async def test_rolling_abr_matches_window_sums(abr_calculations_factory, spot, perp, legacy_abr_value):
+    abr_calculations = abr_calculations_factory
+
+    arguments = [convertTo64x61(spot), convertTo64x61(perp), to64x61(boll_width), to64x61(base_rate)]
+
+    rolling_query = await abr_calculations.calculate_abr(*arguments).call()
+
+    assert len(spot) == 480
+    assert from64x61(rolling_query.result.abr_value) == pytest.approx(
+        from64x61(legacy_abr_value), abs=ABR_TOLERANCE)
+    assert rolling_query.result.abr_last_price == convertTo64x61(perp)[-1]
+
+    python_abr = calculate_abr(spot, perp, base_rate, boll_width)
+    assert python_abr == pytest.approx(
+        from64x61(rolling_query.result.abr_value), abs=1e-4)
+
+    # The rolling sums touch every element a constant number of times
+    rolling_steps = rolling_query.call_info.execution_resources.n_steps
+    assert rolling_steps < LEGACY_ABR_STEPS
+
+
+@pytest.mark.asyncio
+async def test_rolling_abr_flat_prices(abr_calculations_factory):
+    abr_calculations = abr_calculations_factory
+
+    # Flat mark prices have zero variance; rounding in the rolling sums must not make it negative
+    spot = [1000.0] * 480
+    perp = [1000.5] * 480
+    arguments = [convertTo64x61(spot), convertTo64x61(perp), to64x61(boll_width), to64x61(base_rate)]
+
+    rolling_query = await abr_calculations.calculate_abr(*arguments).call()
+
+    # 64x61 ABR value returned by the window re-summing implementation
+    legacy_abr_value = 172938225691026
+    assert from64x61(rolling_query.result.abr_value) == pytest.approx(
+        from64x61(legacy_abr_value), abs=ABR_TOLERANCE)
+
+
+@pytest.mark.asyncio
+async def test_abr_sampler_builds_set_abr_value_arrays(abr_calculations_factory):
+    abr_calculations = abr_calculations_factory
+
+    epoch_start = 1000
+    market_ids = list(range(len(abr_data_sets)))
+    sampler = ABRSampler(market_ids, epoch_start)
+
+    for (market_id, (spot, perp)) in enumerate(abr_data_sets):
+        for slot in range(len(spot)):
+            timestamp = epoch_start + slot * sampler.sample_interval
+            assert sampler.record(market_id, spot[slot], perp[slot], timestamp)
+            # Later ticks within the same slot are not sampled
+            assert not sampler.record(market_id, 0.5, 0.5, timestamp + sampler.sample_interval - 1)
+
+    calldata = sampler.close_epoch(epoch_start + 480 * sampler.sample_interval)
+    assert list(calldata) == market_ids
+    for (market_id, (spot, perp)) in enumerate(abr_data_sets):
+        assert calldata[market_id] == [market_id, 480, *convertTo64x61(spot), 480, *convertTo64x61(perp)]
+
+    (spot, perp) = abr_data_sets[0]
+    abr_query = await abr_calculations.calculate_abr(
+        calldata[0][2:482], calldata[0][483:], to64x61(boll_width), to64x61(base_rate)).call()
+    assert from64x61(abr_query.result.abr_value) == pytest.approx(
+        calculate_abr(spot, perp, base_rate, boll_width), abs=1e-4)
+
+    # Skipped slots repeat the previous sample and the ring keeps only the latest 480 samples
+    epoch_start = sampler.epoch_start
+    sampler.record(0, 100.0, 101.0, epoch_start)
+    sampler.record(0, 102.0, 103.0, epoch_start + 3 * sampler.sample_interval)
+    assert sampler.get_prices(0) == ([100.0, 100.0, 100.0, 102.0], [101.0, 101.0, 101.0, 103.0])
+    for slot in range(4, 481):
+        sampler.record(0, slot, slot + 1, epoch_start + slot * sampler.sample_interval)
+    (index_prices, mark_prices) = sampler.get_prices(0)
+    assert (len(index_prices), index_prices[0], index_prices[-1]) == (480, 100.0, 480.0)
+    assert sampler.is_ready(0) and not sampler.is_ready(1)
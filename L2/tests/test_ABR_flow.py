@@ -6,7 +6,7 @@ from calculate_abr import calculate_abr
 from starkware.cairo.lang.version import __version__ as STARKNET_VERSION
 from starkware.starknet.business_logic.state.state import BlockInfo
 from utils import ContractIndex, ManagerAction, Signer, str_to_felt, assert_event_emitted, to64x61, convertTo64x61, assert_revert, from64x61, PRIME
-from utils_trading import User, order_direction, order_types, order_time_in_force, OrderExecutor, User, ABR, fund_mapping, set_balance, execute_and_compare, compare_fund_balances, compare_user_balances, compare_user_positions, compare_abr_values, check_batch_status, set_abr_value, make_abr_payments
+from utils_trading import User, order_direction, order_types, order_time_in_force, OrderExecutor, User, ABR, fund_mapping, set_balance, execute_and_compare, compare_fund_balances, compare_user_balances, compare_user_positions, compare_abr_values, check_batch_status, set_abr_value, make_abr_payments, push_abr_samples
 from utils_asset import AssetID, build_asset_properties
 from utils_markets import MarketProperties
 from helpers import StarknetService, ContractType, AccountFactory
@@ -874,11 +874,12 @@ async def test_view_functions_state_2(abr_factory):
     next_timestamp_query = await abr_core.get_next_abr_timestamp().call()
     assert next_timestamp_query.result.res == timestamp_1 + 28800
 
+    # Only alice and bob hold open positions so far, so a single batch of 2 is required
     remaining_pay_abr_query = await abr_core.get_remaining_pay_abr_calls().call()
-    assert remaining_pay_abr_query.result.res == 2
+    assert remaining_pay_abr_query.result.res == 1
 
     no_of_batches_query = await abr_core.get_no_of_batches_for_current_epoch().call()
-    assert no_of_batches_query.result.res == 2
+    assert no_of_batches_query.result.res == 1
 
     remaining_markets_query = await abr_core.get_markets_remaining().call()
     assert remaining_markets_query.result.remaining_markets_list == []
@@ -1431,3 +1432,94 @@ async def test_abr_result_different_length(abr_factory):
         print("Cairo rate", from64x61(abr_query.result.abr_value), "\n")
         assert python_abr_rate == pytest.approx(
             from64x61(abr_query.result.abr_value), abs=1e-6)
+
+
+@ pytest.mark.asyncio
+async def test_push_abr_samples_invalid_length(abr_factory):
+    starknet_service, non_admin, admin1, trading, fixed_math, alice,  bob, charlie, dave, abr_calculations, abr_core, abr_fund, abr_payment, timestamp, admin2, alice_test, bob_test, charlie_test, dave_test, python_executor, abr_executor = abr_factory
+
+    await assert_revert(
+        admin1_signer.send_transaction(
+            admin1, abr_core.contract_address, 'push_abr_samples', [BTC_USD_ID, 2, to64x61(1000), to64x61(1001), 1, to64x61(1000), to64x61(1000)]),
+        "ABRCore: Index array length must be equal to Perp array length"
+    )
+
+    await assert_revert(
+        admin1_signer.send_transaction(
+            admin1, abr_core.contract_address, 'push_abr_samples', [BTC_USD_ID, 0, 0, to64x61(1000)]),
+        "ABRCore: No ABR samples passed"
+    )
+
+
+@ pytest.mark.asyncio
+async def test_push_abr_samples_round_3(abr_factory):
+    starknet_service, non_admin, admin1, trading, fixed_math, alice,  bob, charlie, dave, abr_calculations, abr_core, abr_fund, abr_payment, timestamp, admin2, alice_test, bob_test, charlie_test, dave_test, python_executor, abr_executor = abr_factory
+
+    spot_64x61 = convertTo64x61(ABR_data.btc_usd_perp_spot_1)
+    perp_64x61 = convertTo64x61(ABR_data.btc_usd_perp_1)
+
+    # Samples pushed in state 0 are collected for the current epoch
+    push_txs = await push_abr_samples(market_id=BTC_USD_ID, node_signer=admin1_signer, node=admin1, abr_core=abr_core, spot_64x61=spot_64x61, perp_64x61=perp_64x61)
+    assert len(push_txs) == 8
+
+    assert_events_emitted_from_all_calls(
+        push_txs[-1],
+        [
+            [0, abr_core.contract_address, 'abr_samples_pushed', [3, BTC_USD_ID, 60]]
+        ]
+    )
+
+    accumulator_query = await abr_core.get_abr_accumulator(3, BTC_USD_ID).call()
+    assert accumulator_query.result.res.samples_count == 60
+    assert accumulator_query.result.res.last_price == perp_64x61[479]
+
+    # Finalizing from the running sums gives the same result as the full-array calculation
+    full_abr_query = await abr_calculations.calculate_abr(spot_64x61, perp_64x61, to64x61(1.5), to64x61(0.000025)).call()
+    accumulated_abr_query = await abr_calculations.calculate_abr_from_accumulator(accumulator_query.result.res, to64x61(0.000025)).call()
+    assert accumulated_abr_query.result.abr_value == full_abr_query.result.abr_value
+    assert accumulated_abr_query.result.abr_last_price == full_abr_query.result.abr_last_price
+
+
+@ pytest.mark.asyncio
+async def test_set_abr_from_samples_round_3(abr_factory):
+    starknet_service, non_admin, admin1, trading, fixed_math, alice,  bob, charlie, dave, abr_calculations, abr_core, abr_fund, abr_payment, timestamp, admin2, alice_test, bob_test, charlie_test, dave_test, python_executor, abr_executor = abr_factory
+
+    timestamp_5 = timestamp_4 + 3600
+    starknet_service.starknet.state.state.block_info = BlockInfo(
+        block_number=1,
+        block_timestamp=timestamp_5,
+        gas_price=starknet_service.starknet.state.state.block_info.gas_price,
+        sequencer_address=starknet_service.starknet.state.state.block_info.sequencer_address,
+        starknet_version=STARKNET_VERSION
+    )
+    await admin1_signer.send_transaction(
+        admin1, abr_core.contract_address, 'set_abr_timestamp', [timestamp_5])
+
+    # No samples were pushed for ETH_USD
+    await assert_revert(
+        admin1_signer.send_transaction(
+            admin1, abr_core.contract_address, 'set_abr_value', [ETH_USD_ID, 0, 0]),
+        "ABRCore: No ABR samples pushed for the market"
+    )
+
+    spot_64x61 = convertTo64x61(ABR_data.btc_usd_perp_spot_1)
+    perp_64x61 = convertTo64x61(ABR_data.btc_usd_perp_1)
+    full_abr_query = await abr_calculations.calculate_abr(spot_64x61, perp_64x61, to64x61(1.5), to64x61(0.000025)).call()
+
+    set_abr_value_tx = await admin1_signer.send_transaction(
+        admin1, abr_core.contract_address, 'set_abr_value', [BTC_USD_ID, 0, 0])
+
+    assert_events_emitted_from_all_calls(
+        set_abr_value_tx,
+        [
+            [0, abr_core.contract_address, 'abr_set',
+                [3, BTC_USD_ID, full_abr_query.result.abr_value, full_abr_query.result.abr_last_price]]
+        ]
+    )
+
+    # Samples can't be pushed once the ABR of the market is set
+    await assert_revert(
+        admin1_signer.send_transaction(
+            admin1, abr_core.contract_address, 'push_abr_samples', [BTC_USD_ID, 1, to64x61(1000), 1, to64x61(1000), to64x61(1000)]),
+        "ABRCore: ABR already set for the market"
+    )
@@ -703,3 +703,38 @@ async def test_closing_more_than_parent_size_should_pass(trading_test_initialize
     #           1], #is_final
     #     order=6
     # )
+
+
+@pytest.mark.asyncio
+async def test_paginated_account_views(trading_test_initializer):
+    _, _, _, _, _, _, charlie, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+
+    asset_id_1 = AssetID.USDC
+
+    # Every state changing call bumps the modification counter
+    modification_info = await charlie.get_modification_info().call()
+    assert modification_info.result.counter > 0
+    assert modification_info.result.last_modified_block_number >= 1
+
+    # Walk the positions one market at a time and compare with the unpaginated view
+    account_info = await charlie.get_account_info(asset_id_1).call()
+    paginated_positions = []
+    next_index = 0
+    while True:
+        page = await charlie.get_positions_paginated(asset_id_1, next_index, 1).call()
+        paginated_positions.extend(page.result.positions_array)
+        next_index = page.result.next_index
+        if next_index == 0:
+            break
+    assert paginated_positions == account_info.result.positions_array
+
+    collaterals = await charlie.return_array_collaterals().call()
+    paginated_collaterals = await charlie.return_array_collaterals_paginated(0, 1).call()
+    assert paginated_collaterals.result.array_list == collaterals.result.array_list[:1]
+    out_of_range_collaterals = await charlie.return_array_collaterals_paginated(100, 1).call()
+    assert out_of_range_collaterals.result.array_list == []
+
+    await assert_revert(
+        charlie.get_positions_paginated(asset_id_1, -1, 1).call(),
+        reverted_with="AccountManager: Invalid pagination parameters"
+    )
@@ -3,10 +3,15 @@ import asyncio
 from starkware.starknet.testing.starknet import Starknet
 from starkware.starkware_utils.error_handling import StarkException
 from starkware.starknet.definitions.error_codes import StarknetErrorCode
-from utils import ContractIndex, ManagerAction, assert_revert
-from helpers import StarknetService, ContractType, AccountFactory
+from starkware.starknet.public.abi import get_storage_var_address
+from starkware.cairo.lang.version import __version__ as STARKNET_VERSION
+from starkware.starknet.business_logic.state.state import BlockInfo
+from utils import ContractIndex, ManagerAction, assert_revert, to64x61, from64x61
+from helpers import StarknetService, ContractType, AccountFactory, DEFAULT_BALANCE
 from dummy_addresses import L1_dummy_address
 from dummy_signers import signer1, signer2
+from utils_synthetic_state import SyntheticState, SyntheticStateConfig, generate_synthetic_state, apply_synthetic_state, OPEN, CLOSE
+from utils_trading import compare_user_balances, compare_user_positions
 
 
 @pytest.fixture(scope='module')
@@ -159,4 +164,238 @@ async def test_get_account_registry(adminAuth_factory):
 
     fetched_account_registry_6 = await account_registry.get_account_registry(0, 6).call()
     assert fetched_account_registry_6.result.account_registry == [0x98765, 0x12345, 0x67891, 0x23565, 0x98383, 0x31231]
-    
\ No newline at end of file
+    
+
+@pytest.mark.asyncio
+async def test_unregistered_add_to_active_traders(adminAuth_factory):
+    adminAuth, account_registry, admin1, admin2 = adminAuth_factory
+
+    await assert_revert(signer2.send_transaction(
+        admin2, account_registry.contract_address, 'add_to_active_traders', []),
+        reverted_with="AccountRegistry: Unauthorized caller for add_to_active_traders"
+    )
+
+
+@pytest.mark.asyncio
+async def test_add_and_remove_active_traders(adminAuth_factory):
+    adminAuth, account_registry, admin1, admin2 = adminAuth_factory
+
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'add_to_account_registry', [admin1.contract_address])
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'add_to_account_registry', [admin2.contract_address])
+
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'add_to_active_traders', [])
+    await signer2.send_transaction(admin2, account_registry.contract_address, 'add_to_active_traders', [])
+    # Adding an active trader again must not create a duplicate entry
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'add_to_active_traders', [])
+
+    active_traders_len = await account_registry.get_active_traders_len().call()
+    assert active_traders_len.result.len == 2
+
+    fetched_active_traders = await account_registry.get_active_traders_batch(0, 5).call()
+    assert fetched_active_traders.result.active_traders_list == [admin1.contract_address, admin2.contract_address]
+
+    fetched_active_traders = await account_registry.get_active_traders_batch(5, 10).call()
+    assert fetched_active_traders.result.active_traders_list == []
+
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'remove_from_active_traders', [])
+
+    is_active = await account_registry.is_active_trader(admin1.contract_address).call()
+    assert is_active.result.present == 0
+
+    fetched_active_traders = await account_registry.get_active_traders_batch(0, 5).call()
+    assert fetched_active_traders.result.active_traders_list == [admin2.contract_address]
+
+    # Removing an account from the registry removes it from the active traders too
+    array_length = await account_registry.get_registry_len().call()
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'remove_from_account_registry', [array_length.result.len - 1])
+
+    active_traders_len = await account_registry.get_active_traders_len().call()
+    assert active_traders_len.result.len == 0
+
+
+@pytest.mark.asyncio
+async def test_active_trader_removals_deferred_during_abr(adminAuth_factory, starknet_service: StarknetService):
+    adminAuth, account_registry, admin1, admin2 = adminAuth_factory
+    registry_address = await starknet_service.starknet.state.state.get_storage_at(
+        account_registry.contract_address, get_storage_var_address("CommonLib_registry_address"))
+
+    for admin in [admin1, admin2]:
+        await signer1.send_transaction(admin1, account_registry.contract_address, 'add_to_account_registry', [admin.contract_address])
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'add_to_active_traders', [])
+    await signer2.send_transaction(admin2, account_registry.contract_address, 'add_to_active_traders', [])
+
+    # Setting the ABR timestamp moves ABRCore to state 1, from which ABR batches are addressed by index
+    abr_core = await starknet_service.deploy(ContractType.ABRCore, [registry_address, 1, 0])
+    await signer1.send_transaction(admin1, registry_address, 'update_contract_registry', [ContractIndex.ABRCore, 1, abr_core.contract_address])
+    await signer1.send_transaction(admin1, abr_core.contract_address, 'set_no_of_users_per_batch', [1])
+    await signer1.send_transaction(admin1, abr_core.contract_address, 'set_abr_timestamp', [28800])
+
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'remove_from_active_traders', [])
+    is_active = await account_registry.is_active_trader(admin1.contract_address).call()
+    assert is_active.result.present == 1
+    is_deferred = await account_registry.is_removal_deferred(admin1.contract_address).call()
+    assert is_deferred.result.present == 1
+
+    # Opening a position again cancels the deferred removal
+    await signer2.send_transaction(admin2, account_registry.contract_address, 'remove_from_active_traders', [])
+    await signer2.send_transaction(admin2, account_registry.contract_address, 'add_to_active_traders', [])
+    is_deferred = await account_registry.is_removal_deferred(admin2.contract_address).call()
+    assert is_deferred.result.present == 0
+
+    # Removing an account from the registry defers its removal from the active traders too
+    fetched_account_registry = await account_registry.get_account_registry(0, (await account_registry.get_registry_len().call()).result.len).call()
+    admin2_index = fetched_account_registry.result.account_registry.index(admin2.contract_address)
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'remove_from_account_registry', [admin2_index])
+
+    fetched_active_traders = await account_registry.get_active_traders_batch(0, 5).call()
+    assert fetched_active_traders.result.active_traders_list == [admin1.contract_address, admin2.contract_address]
+    deferred_removals_len = await account_registry.get_deferred_removals_len().call()
+    assert deferred_removals_len.result.len == 3
+
+    await assert_revert(
+        signer1.send_transaction(admin1, account_registry.contract_address, 'remove_deferred_active_traders', [3]),
+        reverted_with="AccountRegistry: ABR payments are in progress"
+    )
+
+    # An ABRCore in state 0 stands in for the completion of the epoch
+    abr_core = await starknet_service.deploy(ContractType.ABRCore, [registry_address, 1, 0])
+    await signer1.send_transaction(admin1, registry_address, 'update_contract_registry', [ContractIndex.ABRCore, 1, abr_core.contract_address])
+
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'remove_deferred_active_traders', [1])
+    fetched_active_traders = await account_registry.get_active_traders_batch(0, 5).call()
+    assert fetched_active_traders.result.active_traders_list == [admin1.contract_address]
+
+    await signer1.send_transaction(admin1, account_registry.contract_address, 'remove_deferred_active_traders', [5])
+    active_traders_len = await account_registry.get_active_traders_len().call()
+    assert active_traders_len.result.len == 0
+    deferred_removals_len = await account_registry.get_deferred_removals_len().call()
+    assert deferred_removals_len.result.len == 0
+    is_deferred = await account_registry.is_removal_deferred(admin1.contract_address).call()
+    assert is_deferred.result.present == 0
+
+
+@pytest.mark.asyncio
+async def test_provision_ZKX_accounts(adminAuth_factory, starknet_service: StarknetService):
+    adminAuth, account_registry, admin1, admin2 = adminAuth_factory
+    account_factory = AccountFactory(starknet_service, L1_dummy_address, 0, 1)
+
+    array_length = await account_registry.get_registry_len().call()
+    registry_len = array_length.result.len
+
+    usdc_id = 5634
+    accounts = await account_factory.provision_ZKX_accounts(
+        count=20, first_private_key=1000, balances={usdc_id: to64x61(500)}, account_registry=account_registry)
+
+    array_length = await account_registry.get_registry_len().call()
+    assert array_length.result.len == registry_len + 20
+
+    fetched_account_registry = await account_registry.get_account_registry(registry_len, 20).call()
+    assert fetched_account_registry.result.account_registry == [
+        account.contract_address for (_, account) in accounts]
+
+    for (signer, account) in [accounts[0], accounts[-1]]:
+        public_key = await account.get_public_key().call()
+        assert public_key.result.pub_key == signer.public_key
+
+        default_balance = await account.get_balance(account_factory.collateral_id).call()
+        assert default_balance.result.res == DEFAULT_BALANCE
+        usdc_balance = await account.get_balance(usdc_id).call()
+        assert usdc_balance.result.res == to64x61(500)
+
+        collaterals = await account.return_array_collaterals().call()
+        assert [collateral.assetID for collateral in collaterals.result.array_list] == [
+            account_factory.collateral_id, usdc_id]
+
+        is_registered = await account_registry.is_registered_user(account.contract_address).call()
+        assert is_registered.result.present == 1
+
+    # Provisioning the same keys again gives the same addresses and does not register them twice
+    accounts_again = await account_factory.provision_ZKX_accounts(
+        count=20, first_private_key=1000, account_registry=account_registry)
+    assert [account.contract_address for (_, account) in accounts_again] == [
+        account.contract_address for (_, account) in accounts]
+
+    array_length = await account_registry.get_registry_len().call()
+    assert array_length.result.len == registry_len + 20
+
+
+@pytest.mark.asyncio
+async def test_apply_synthetic_state(adminAuth_factory, starknet_service: StarknetService, tmp_path):
+    adminAuth, account_registry, admin1, admin2 = adminAuth_factory
+    account_factory = AccountFactory(starknet_service, L1_dummy_address, 0, 1)
+
+    config = SyntheticStateConfig(seed=7, num_accounts=25, positions_per_account=2, first_private_key=5000)
+    synthetic_state = generate_synthetic_state(config)
+
+    # The same seed gives the same state, and a snapshot restores it unchanged
+    assert generate_synthetic_state(config) == synthetic_state
+    synthetic_state.save(tmp_path / "snapshot.pkl")
+    assert SyntheticState.load(tmp_path / "snapshot.pkl") == synthetic_state
+
+    registry_address = await starknet_service.starknet.state.state.get_storage_at(
+        account_registry.contract_address, get_storage_var_address("CommonLib_registry_address"))
+    market = await starknet_service.deploy(ContractType.Markets, [registry_address, 1])
+    market_prices = await starknet_service.deploy(ContractType.MarketPrices, [registry_address, 1])
+    trading_stats = await starknet_service.deploy(ContractType.TradingStats, [registry_address, 1])
+    user_stats = await starknet_service.deploy(ContractType.UserStats, [registry_address, 1])
+    await signer1.send_transaction(admin1, registry_address, 'update_contract_registry', [ContractIndex.Market, 1, market.contract_address])
+
+    # The prices are written at the block timestamp, so they are within the ttl of every market
+    starknet_service.starknet.state.state.block_info = BlockInfo(
+        block_number=starknet_service.starknet.state.state.block_info.block_number,
+        block_timestamp=config.timestamp,
+        gas_price=starknet_service.starknet.state.state.block_info.gas_price,
+        sequencer_address=starknet_service.starknet.state.state.block_info.sequencer_address,
+        starknet_version=STARKNET_VERSION
+    )
+
+    active_traders_len = await account_registry.get_active_traders_len().call()
+    traders_len = active_traders_len.result.len
+
+    (accounts, users_test, executor) = await apply_synthetic_state(
+        synthetic_state, account_factory, account_registry=account_registry, market_prices=market_prices,
+        trading_stats=trading_stats, user_stats=user_stats)
+
+    active_traders_len = await account_registry.get_active_traders_len().call()
+    assert active_traders_len.result.len == traders_len + 25
+
+    for market_id in config.market_ids:
+        await compare_user_positions(users=accounts, users_test=users_test, market_id=market_id)
+    for collateral_id in {collateral_id for account in synthetic_state.accounts for collateral_id in account.balances}:
+        await compare_user_balances(users=accounts, user_tests=users_test, asset_id=collateral_id)
+
+    fetched_market_prices = await market_prices.get_market_prices(config.market_ids).call()
+    assert [(price.market_id, price.price) for price in fetched_market_prices.result.market_prices_list] == [
+        (market_id, to64x61(synthetic_state.market_prices[market_id])) for market_id in config.market_ids]
+
+    season_id = config.season_id
+    for market_stats in synthetic_state.market_stats():
+        market_id = market_stats.market_id
+        traders = synthetic_state.trader_stats[market_id]
+
+        num_active_traders = await trading_stats.get_num_active_traders(season_id, market_id).call()
+        assert num_active_traders.result.res == market_stats.num_active_traders
+        average_order_volume = await trading_stats.get_average_order_volume(season_id, market_id).call()
+        assert from64x61(average_order_volume.result.average_volume_64x61) == pytest.approx(
+            market_stats.average_order_volume, rel=1e-9)
+        order_volume = await trading_stats.get_order_volume((season_id, market_id, OPEN)).call()
+        assert order_volume.result.number_of_orders == sum(stats.num_orders_open for stats in traders.values())
+
+        total_fee = await user_stats.get_total_fee(season_id, market_id).call()
+        assert from64x61(total_fee.result.total_fee_64x61) == pytest.approx(
+            sum(stats.fee for stats in traders.values()), abs=1e-6)
+        for (account_index, stats) in list(traders.items())[:2]:
+            address = accounts[account_index].contract_address
+            trader_fee = await user_stats.get_trader_fee(season_id, market_id, address).call()
+            assert trader_fee.result.fee_64x61 == to64x61(stats.fee)
+            trader_pnl = await user_stats.get_trader_pnl(season_id, market_id, address).call()
+            assert from64x61(trader_pnl.result.pnl_64x61) == pytest.approx(stats.pnl, abs=1e-6)
+            trader_margin = await user_stats.get_trader_margin_amount(season_id, market_id, address).call()
+            assert trader_margin.result.margin_amount_64x61 == to64x61(stats.margin_amount)
+            trader_order_volume = await user_stats.get_trader_order_volume(address, (season_id, market_id, CLOSE)).call()
+            assert trader_order_volume.result.number_of_orders == stats.num_orders_close
+            assert trader_order_volume.result.total_volume_64x61 == to64x61(stats.volume_close)
+
+    num_season_traders = await trading_stats.get_num_active_traders(season_id, 0).call()
+    assert num_season_traders.result.res == len(
+        {account_index for traders in synthetic_state.trader_stats.values() for account_index in traders})
@@ -5,7 +5,7 @@ from starkware.starkware_utils.error_handling import StarkException
 from starkware.starknet.definitions.error_codes import StarknetErrorCode
 from utils import ContractIndex, ManagerAction, str_to_felt, MAX_UINT256, assert_revert, assert_event_emitted
 from utils_asset import build_default_asset_properties, encode_asset_id_name, DEFAULT_ASSET_ICON_LINK, DEFAULT_ASSET_METADATA_LINK
-from utils_links import encode_characters
+from utils_links import encode_characters, encode_packed_string
 from helpers import StarknetService, ContractType, AccountFactory
 from dummy_addresses import L1_dummy_address
 from dummy_signers import signer1, signer2, signer3
@@ -111,6 +111,10 @@ async def test_adding_asset_by_admin(adminAuth_factory):
     metadata_link = list(metadata_call.result.link)
     assert metadata_link == encode_characters(DEFAULT_ASSET_METADATA_LINK)
 
+    packed_metadata_call = await asset.get_metadata_link_packed(asset_id).call()
+    assert packed_metadata_call.result.link_len == len(DEFAULT_ASSET_METADATA_LINK)
+    assert packed_metadata_call.result.packed_link == encode_packed_string(DEFAULT_ASSET_METADATA_LINK)
+
 
 @pytest.mark.asyncio
 async def test_adding_asset_by_unauthorized_user(adminAuth_factory):
@@ -161,4 +161,45 @@ async def test_withdraw_0(feeBalance_factory):
 @pytest.mark.asyncio
 async def test_withdraw_more_than_balance(feeBalance_factory):
     feeBalance, callFeeBalance, admin1, _ = feeBalance_factory
-    await assert_revert(signer1.send_transaction(admin1, feeBalance.contract_address, 'withdraw', [asset_ID, 100]), reverted_with="FeeBalance: Insufficient Balance")
\ No newline at end of file
+    await assert_revert(signer1.send_transaction(admin1, feeBalance.contract_address, 'withdraw', [asset_ID, 100]), reverted_with="FeeBalance: Insufficient Balance")
+@pytest.mark.asyncio
+async def test_update_fee_mapping_bulk_invalid(feeBalance_factory):
+    feeBalance, callFeeBalance, admin1, _ = feeBalance_factory
+
+    await assert_revert(signer1.send_transaction(admin1, feeBalance.contract_address,
+                  'update_fee_mapping_bulk', [asset_ID, 1, pytest.user1.contract_address, 10]),
+                  reverted_with="FeeBalance: Unauthorized call to update fee mapping")
+
+@pytest.mark.asyncio
+async def test_update_fee_mapping_bulk(feeBalance_factory):
+    feeBalance, callFeeBalance, admin1, _ = feeBalance_factory
+
+    tx_exec_info=await signer1.send_transaction(admin1, callFeeBalance.contract_address, 'update_bulk', [
+        asset_ID, 3,
+        pytest.user1.contract_address, 5,
+        pytest.user2.contract_address, 7,
+        pytest.user1.contract_address, 3,
+    ])
+
+    execution_info = await feeBalance.get_total_fee(asset_ID).call()
+    assert execution_info.result.fee == 35
+
+    execution_info = await feeBalance.get_user_fee(pytest.user1.contract_address, asset_ID).call()
+    assert execution_info.result.fee == 28
+
+    execution_info = await feeBalance.get_user_fee(pytest.user2.contract_address, asset_ID).call()
+    assert execution_info.result.fee == 17
+
+    assert_event_emitted(
+        tx_exec_info,
+        from_address = feeBalance.contract_address,
+        name = 'fee_mapping_updated',
+        data=[
+            pytest.user1.contract_address,
+            asset_ID,
+            3,
+            25,
+            32
+        ],
+        order=2
+    )
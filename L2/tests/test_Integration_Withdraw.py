@@ -289,6 +289,20 @@ async def test_withdraw_positive_flow(adminAuth_factory):
     assert parsed_list.fee == to64x61(1)
     assert parsed_list.status == WITHDRAWAL_SUCCEEDED
 
+    # the withdrawal moves out of the initiated list once it succeeds
+    execution_info = await new_account_contract.get_withdrawal_history_by_status(WITHDRAWAL_INITIATED).call()
+    assert execution_info.result.withdrawal_list == []
+
+    # paginated views return the same withdrawal and truncate at the end of the list
+    execution_info = await new_account_contract.get_withdrawal_history_paginated(0, 10).call()
+    assert [w.request_id for w in execution_info.result.withdrawal_list] == [request_id]
+
+    execution_info = await new_account_contract.get_withdrawal_history_by_status_paginated(WITHDRAWAL_SUCCEEDED, 0, 10).call()
+    assert [w.request_id for w in execution_info.result.withdrawal_list] == [request_id]
+
+    execution_info = await new_account_contract.get_withdrawal_history_by_status_paginated(WITHDRAWAL_SUCCEEDED, 1, 10).call()
+    assert execution_info.result.withdrawal_list == []
+
 
 @pytest.mark.asyncio
 async def test_withdraw_incorrect_payload(adminAuth_factory):
@@ -11,6 +11,7 @@ from starkware.starknet.business_logic.state.state import BlockInfo
 from utils import Signer, uint, str_to_felt, MAX_UINT256, assert_revert, hash_order, from64x61, to64x61, print_parsed_positions, print_parsed_collaterals, assert_event_emitted
 from utils_asset import AssetID, build_asset_properties
 from utils_markets import MarketProperties
+from utils_leaderboard import compute_leaderboard_delta, flatten_leaderboard_delta
 from helpers import StarknetService, ContractType, AccountFactory
 from dummy_addresses import L1_dummy_address
 
@@ -31,6 +32,9 @@ timestamp2 = int(time.time()) + 299
 timestamp3 = int(time.time()) + 300
 timestamp4 = int(time.time()) + 301
 timestamp5 = int(time.time()) + 600
+timestamp6 = int(time.time()) + 902
+timestamp7 = int(time.time()) + 1203
+timestamp8 = int(time.time()) + 1504
 
 @pytest.fixture(scope='module')
 def event_loop():
@@ -639,4 +643,89 @@ async def test_setting_leaderboard_eth_2(adminAuth_factory):
 
     set_timestamp = await leaderboard.get_epoch_to_timestamp(1, ETH_USD_ID, 1).call()
     assert set_timestamp.result.timestamp == timestamp5
-  
\ No newline at end of file
+  
+@pytest.mark.asyncio
+async def test_setting_leaderboard_delta_btc(adminAuth_factory):
+    starknet_service, adminAuth, admin1, admin2, alice, bob, charlie, leaderboard = adminAuth_factory
+
+    previous_rows = [
+        (bob.contract_address, to64x61(71)),
+        (alice.contract_address, to64x61(17)),
+    ]
+    delta_epochs = [
+        (timestamp6, [
+            (bob.contract_address, to64x61(71)),
+            (charlie.contract_address, to64x61(25)),
+        ]),
+        (timestamp7, [
+            (bob.contract_address, to64x61(90)),
+            (charlie.contract_address, to64x61(25)),
+        ]),
+    ]
+
+    for epoch, (timestamp, current_rows) in enumerate(delta_epochs, start=2):
+        starknet_service.starknet.state.state.block_info = BlockInfo(
+            block_number=1,
+            block_timestamp=timestamp,
+            gas_price=starknet_service.starknet.state.state.block_info.gas_price,
+            sequencer_address=starknet_service.starknet.state.state.block_info.sequencer_address,
+            starknet_version = STARKNET_VERSION
+        )
+
+        # Only the changed row is stored
+        delta = compute_leaderboard_delta(previous_rows, current_rows)
+        assert len(delta) == 1
+
+        set_leaderboard = await admin1_signer.send_transaction(
+            admin1, leaderboard.contract_address, "set_leaderboard_delta",
+            [BTC_USD_ID] + flatten_leaderboard_delta(delta)
+        )
+
+        assert_event_emitted(
+            set_leaderboard,
+            from_address=leaderboard.contract_address,
+            name="leaderboard_update",
+            data=[
+                1,
+                BTC_USD_ID,
+                epoch,
+                timestamp
+            ]
+        )
+
+        depth = await leaderboard.get_delta_depth(1, BTC_USD_ID, epoch).call()
+        assert depth.result.depth == epoch - 1
+
+        # The reader resolves the unchanged rows from the previous epochs
+        leaderboard_positions = await leaderboard.get_leaderboard_epoch(1, BTC_USD_ID, epoch).call()
+        parsed_leaderboard_positions = [
+            (position.user_address, position.reward)
+            for position in leaderboard_positions.result.leaderboard_array
+        ]
+        assert parsed_leaderboard_positions == current_rows
+
+        previous_rows = current_rows
+
+    # Full leaderboards are unaffected
+    depth = await leaderboard.get_delta_depth(1, BTC_USD_ID, 1).call()
+    assert depth.result.depth == 0
+
+@pytest.mark.asyncio
+async def test_setting_leaderboard_delta_invalid_index(adminAuth_factory):
+    starknet_service, adminAuth, admin1, admin2, alice, bob, charlie, leaderboard = adminAuth_factory
+
+    starknet_service.starknet.state.state.block_info = BlockInfo(
+        block_number=1,
+        block_timestamp=timestamp8,
+        gas_price=starknet_service.starknet.state.state.block_info.gas_price,
+        sequencer_address=starknet_service.starknet.state.state.block_info.sequencer_address,
+        starknet_version = STARKNET_VERSION
+    )
+
+    await assert_revert(
+        admin1_signer.send_transaction(
+            admin1, leaderboard.contract_address, "set_leaderboard_delta",
+            [BTC_USD_ID] + flatten_leaderboard_delta([(2, alice.contract_address, to64x61(5))])
+        ),
+        "Leaderboard: Invalid index provided"
+    )
@@ -8,6 +8,7 @@ from utils_links import DEFAULT_LINK_1, prepare_starknet_string
 from utils_asset import AssetID, build_asset_properties
 from helpers import StarknetService, ContractType, AccountFactory
 from dummy_addresses import L1_dummy_address
+from utils_price_feed import OraclePriceAggregator, OraclePricePipeline, PriceSample, PriceWindow, file_price_source, fetch_market_ttls
 
 admin1_signer = Signer(123456789987654321)
 admin2_signer = Signer(123456789987654322)
@@ -92,11 +93,11 @@ async def adminAuth_factory(starknet_service: StarknetService):
     await admin1_signer.send_transaction(admin1, market.contract_address, 'add_market', [ETH_USD_ID, AssetID.ETH, AssetID.USDC, 1, 0, 10, 1, 0, 1, 0, 10, to64x61(1), to64x61(10), to64x61(10), 1, 1, 1, 100, 1000, 10000] + prepare_starknet_string(DEFAULT_LINK_1))
     await admin1_signer.send_transaction(admin1, market.contract_address, 'add_market', [TSLA_USD_ID, AssetID.TSLA, AssetID.USDC, 1, 0, 10, 1, 0, 1, 0, 10, to64x61(1), to64x61(10), to64x61(10), 1, 1, 1, 100, 1000, 10000] + prepare_starknet_string(DEFAULT_LINK_1))
 
-    return adminAuth, market_prices, admin1, admin2
+    return adminAuth, market_prices, admin1, admin2, market
 
 @pytest.mark.asyncio
 async def test_update_market_price(adminAuth_factory):
-    adminAuth, market_prices, admin1, admin2 = adminAuth_factory
+    adminAuth, market_prices, admin1, admin2, _ = adminAuth_factory
 
     await admin1_signer.send_transaction(admin1, market_prices.contract_address, 'update_market_price', [BTC_USD_ID, 500])
     await admin1_signer.send_transaction(admin1, market_prices.contract_address, 'update_market_price', [ETH_USD_ID, 1000])
@@ -109,13 +110,13 @@ async def test_update_market_price(adminAuth_factory):
 
 @pytest.mark.asyncio
 async def test_unauthorized_add_market_price_to_market_prices(adminAuth_factory):
-    adminAuth, market_prices, admin1, admin2 = adminAuth_factory
+    adminAuth, market_prices, admin1, admin2, _ = adminAuth_factory
 
     await assert_revert(admin2_signer.send_transaction(admin2, market_prices.contract_address, 'update_market_price', [BTC_USD_ID, 500]),reverted_with="MarketPrices: Unauthorized caller for updating market price")
 
 @pytest.mark.asyncio
 async def test_update_multiple_market_prices(adminAuth_factory):
-    adminAuth, market_prices, admin1, admin2 = adminAuth_factory
+    adminAuth, market_prices, admin1, admin2, _ = adminAuth_factory
 
     await admin1_signer.send_transaction(admin1, market_prices.contract_address, 'update_multiple_market_prices', [2, BTC_USD_ID, 1000, ETH_USD_ID, 100])
 
@@ -131,7 +132,7 @@ async def test_update_multiple_market_prices(adminAuth_factory):
 
 @pytest.mark.asyncio
 async def test_get_multiple_market_prices(adminAuth_factory):
-    adminAuth, market_prices, admin1, admin2 = adminAuth_factory
+    adminAuth, market_prices, admin1, admin2, _ = adminAuth_factory
 
     await admin1_signer.send_transaction(admin1, market_prices.contract_address, 'update_multiple_market_prices', [2, BTC_USD_ID, 1000, ETH_USD_ID, 0])
 
@@ -152,6 +153,124 @@ async def test_get_multiple_market_prices(adminAuth_factory):
 
 @pytest.mark.asyncio
 async def test_unauthorized_update_multiple_market_prices(adminAuth_factory):
-    adminAuth, market_prices, admin1, admin2 = adminAuth_factory
+    adminAuth, market_prices, admin1, admin2, _ = adminAuth_factory
 
-    await assert_revert(admin2_signer.send_transaction(admin2, market_prices.contract_address, 'update_market_price', [2, BTC_USD_ID, 300, ETH_USD_ID, 100]))
\ No newline at end of file
+    await assert_revert(admin2_signer.send_transaction(admin2, market_prices.contract_address, 'update_market_price', [2, BTC_USD_ID, 300, ETH_USD_ID, 100]))
+@pytest.mark.asyncio
+async def test_get_market_prices_by_ids(adminAuth_factory):
+    adminAuth, market_prices, admin1, admin2, _ = adminAuth_factory
+
+    prices = await market_prices.get_market_prices([TSLA_USD_ID, BTC_USD_ID, ETH_USD_ID]).call()
+    assert [(p.market_id, p.price) for p in prices.result.market_prices_list] == [
+        (TSLA_USD_ID, 10), (BTC_USD_ID, 1000), (ETH_USD_ID, 500)
+    ]
+
+    # Unknown markets have no price set
+    prices = await market_prices.get_market_prices([str_to_felt("unknown")]).call()
+    assert prices.result.market_prices_list[0].price == 0
+
+@pytest.mark.asyncio
+async def test_get_all_market_prices_paginated(adminAuth_factory):
+    adminAuth, market_prices, admin1, admin2, _ = adminAuth_factory
+
+    all_prices = await market_prices.get_all_market_prices().call()
+
+    first_page = await market_prices.get_all_market_prices_paginated(0, 2).call()
+    second_page = await market_prices.get_all_market_prices_paginated(2, 2).call()
+    assert len(first_page.result.market_prices_list) == 2
+    assert len(second_page.result.market_prices_list) == 1
+
+    paginated_ids = {p.market_id for p in first_page.result.market_prices_list + second_page.result.market_prices_list}
+    assert paginated_ids == {p.market_id for p in all_prices.result.market_prices_list}
+
+    empty_page = await market_prices.get_all_market_prices_paginated(3, 2).call()
+    assert empty_page.result.market_prices_list == []
+
+    await assert_revert(
+        market_prices.get_all_market_prices_paginated(-1, 2).call(),
+        reverted_with="MarketPrices: Invalid pagination parameters"
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_market_prices_from_price_feed(adminAuth_factory, tmp_path):
+    adminAuth, market_prices, admin1, admin2, market = adminAuth_factory
+
+    now = 1000
+    ttls = await fetch_market_ttls(market, [BTC_USD_ID, ETH_USD_ID, TSLA_USD_ID])
+    assert ttls == {BTC_USD_ID: 10, ETH_USD_ID: 10, TSLA_USD_ID: 10}
+
+    # The outlier of BTC does not move the median and the price of TSLA is older than its ttl
+    price_file = tmp_path / "prices.csv"
+    price_file.write_text("\n".join([
+        f"{BTC_USD_ID},1000,{now - 5}",
+        f"{ETH_USD_ID},99,{now - 4}",
+        f"{BTC_USD_ID},1002,{now - 3}",
+        f"{BTC_USD_ID},5000,{now - 2}",
+        f"{ETH_USD_ID},101,{now - 2}",
+        f"{BTC_USD_ID},1001,{now - 1}",
+        f"{TSLA_USD_ID},20,{now - 11}",
+    ]))
+
+    updates = []
+
+    async def emit(calldata):
+        updates.append(calldata)
+        await admin1_signer.send_transaction(admin1, market_prices.contract_address, 'update_multiple_market_prices', calldata)
+
+    aggregator = OraclePriceAggregator(ttls, clock=lambda: now)
+    pipeline = OraclePricePipeline(aggregator, emit, cadence=60, max_queue_size=2)
+    await pipeline.run([file_price_source(str(price_file))])
+
+    assert updates == [[2, BTC_USD_ID, to64x61(1001.5), ETH_USD_ID, to64x61(100)]]
+    assert aggregator.get_oracle_price(TSLA_USD_ID) == 0
+
+    fetched_market_prices = await market_prices.get_market_price(BTC_USD_ID).call()
+    assert fetched_market_prices.result.market_price == to64x61(1001.5)
+
+    # Nothing is sent again while the prices are unchanged
+    assert aggregator.build_update_calldata() == []
+
+
+@pytest.mark.asyncio
+async def test_price_feed_expires_interleaved_sources(tmp_path):
+    now = 1000
+    ttls = {BTC_USD_ID: 10}
+
+    # The second oracle lags behind, so its stale samples arrive after fresher ones of the first
+    fresh_file = tmp_path / "fresh_prices.csv"
+    fresh_file.write_text("\n".join([
+        f"{BTC_USD_ID},1000,{now - 1}",
+        f"{BTC_USD_ID},1001,{now - 2}",
+    ]))
+    lagging_file = tmp_path / "lagging_prices.csv"
+    lagging_file.write_text("\n".join([
+        f"{BTC_USD_ID},5000,{now - 20}",
+        f"{BTC_USD_ID},5001,{now - 15}",
+        f"{BTC_USD_ID},1002,{now - 3}",
+    ]))
+
+    updates = []
+
+    async def emit(calldata):
+        updates.append(calldata)
+
+    aggregator = OraclePriceAggregator(ttls, clock=lambda: now)
+    pipeline = OraclePricePipeline(aggregator, emit, cadence=60, max_queue_size=2)
+    await pipeline.run([file_price_source(str(fresh_file), 0), file_price_source(str(lagging_file), 1)])
+
+    # Both stale samples expire wherever they sit in the window
+    assert updates == [[1, BTC_USD_ID, to64x61(1001)]]
+    window = aggregator.windows[BTC_USD_ID]
+    assert (len(window), window.sorted_prices) == (3, [1000, 1001, 1002])
+
+    # Later, only the freshest sample is still within the ttl
+    assert aggregator.get_price(BTC_USD_ID, now + 9) == 1000
+
+    # A full window keeps the freshest samples, whatever order they arrive in
+    window = PriceWindow(2)
+    window.add(PriceSample(BTC_USD_ID, 10, now))
+    window.add(PriceSample(BTC_USD_ID, 20, now - 5))
+    window.add(PriceSample(BTC_USD_ID, 30, now - 8))
+    window.add(PriceSample(BTC_USD_ID, 40, now - 1))
+    assert window.sorted_prices == [10, 40]
@@ -504,3 +504,38 @@ async def test_update_metadata_link_by_unauthorized_user(adminAuth_factory):
             [market_id] + prepare_starknet_string(NEW_LINK)
         )
     )
+
+
+async def assert_markets_by_state_consistent(market):
+    markets = await market.get_all_markets().call()
+    for is_tradable in [0, 1]:
+        for is_archived in [0, 1]:
+            markets_by_state = await market.get_all_markets_by_state(is_tradable, is_archived).call()
+            expected = [
+                m.id for m in markets.result.array_list
+                if m.is_tradable == is_tradable and m.is_archived == is_archived
+            ]
+            assert sorted([m.id for m in markets_by_state.result.array_list]) == sorted(expected)
+
+
+@pytest.mark.asyncio
+async def test_market_state_index_follows_state_changes(adminAuth_factory):
+    adminAuth, asset, market, admin1, admin2, user1 = adminAuth_factory
+
+    market_id = str_to_felt("2dsyfdj289fdw")
+    await assert_markets_by_state_consistent(market)
+
+    await signer1.send_transaction(admin1, market.contract_address, 'modify_archived_state', [market_id, 1])
+    await assert_markets_by_state_consistent(market)
+    archived_tradable = await market.get_all_markets_by_state(1, 1).call()
+    assert market_id in [m.id for m in archived_tradable.result.array_list]
+
+    await signer1.send_transaction(admin1, market.contract_address, 'modify_tradable', [market_id, 0])
+    await assert_markets_by_state_consistent(market)
+    archived_untradable = await market.get_all_markets_by_state(0, 1).call()
+    assert market_id in [m.id for m in archived_untradable.result.array_list]
+
+    await signer1.send_transaction(admin1, market.contract_address, 'remove_market', [market_id])
+    await assert_markets_by_state_consistent(market)
+    archived_untradable_new = await market.get_all_markets_by_state(0, 1).call()
+    assert len(archived_untradable_new.result.array_list) == len(archived_untradable.result.array_list) - 1
@@ -848,11 +848,12 @@ async def test_view_functions_state_2(abr_factory):
     next_timestamp_query = await relay_abr.get_next_abr_timestamp().call()
     assert next_timestamp_query.result.res == timestamp_1 + 28800
 
+    # Only alice and bob hold open positions so far, so a single batch of 2 is required
     remaining_pay_abr_query = await relay_abr.get_remaining_pay_abr_calls().call()
-    assert remaining_pay_abr_query.result.res == 2
+    assert remaining_pay_abr_query.result.res == 1
 
     no_of_batches_query = await relay_abr.get_no_of_batches_for_current_epoch().call()
-    assert no_of_batches_query.result.res == 2
+    assert no_of_batches_query.result.res == 1
 
     remaining_markets_query = await relay_abr.get_markets_remaining().call()
     assert remaining_markets_query.result.remaining_markets_list == []
@@ -7,7 +7,7 @@ from starkware.starkware_utils.error_handling import StarkException
 from starkware.starknet.definitions.error_codes import StarknetErrorCode
 from starkware.cairo.lang.version import __version__ as STARKNET_VERSION
 from starkware.starknet.business_logic.state.state import BlockInfo
-from utils import ContractIndex, ManagerAction, Signer, str_to_felt, to64x61, from64x61, assert_revert, assert_event_with_custom_keys_emitted, PRIME, PRIME_HALF
+from utils import ContractIndex, ManagerAction, Signer, str_to_felt, to64x61, from64x61, assert_revert, assert_event_emitted, assert_event_with_custom_keys_emitted, get_accessed_storage_keys, compute_hash_commitment, PRIME, PRIME_HALF
 from utils_trading import User, order_direction, order_types, order_time_in_force, side, OrderExecutor, fund_mapping, set_balance, execute_and_compare, compare_fund_balances, compare_user_balances, compare_user_positions, check_batch_status, compare_margin_info, compare_markets_array
 from utils_asset import AssetID, build_asset_properties
 from utils_markets import MarketProperties
@@ -445,19 +445,19 @@ async def trading_test_initializer(starknet_service: StarknetService):
     await admin1_signer.send_transaction(admin1, liquidity.contract_address, 'fund', [AssetID.USDC, to64x61(1000000)])
     await admin1_signer.send_transaction(admin1, liquidity.contract_address, 'fund', [AssetID.UST, to64x61(1000000)])
 
-    return starknet_service.starknet, python_executor, admin1, admin2, alice, bob, charlie, dave, eduard, felix, gary, alice_test, bob_test, charlie_test, eduard_test, felix_test, gary_test, adminAuth, fees, asset, trading, marketPrices, fixed_math, holding, feeBalance, liquidity, insurance, trading_stats, non_admin, jake, jake_test, ian, ian_test
+    return starknet_service.starknet, python_executor, admin1, admin2, alice, bob, charlie, dave, eduard, felix, gary, alice_test, bob_test, charlie_test, eduard_test, felix_test, gary_test, adminAuth, fees, asset, trading, marketPrices, fixed_math, holding, feeBalance, liquidity, insurance, trading_stats, non_admin, jake, jake_test, ian, ian_test, relay_trading
 
 
 @pytest.mark.asyncio
 async def test_set_balance_by_non_admin(trading_test_initializer):
-    _, _, _, _, _, _, _, _, _, _, gary, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, non_admin, _, _, _, _ = trading_test_initializer
+    _, _, _, _, _, _, _, _, _, _, gary, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, non_admin, _, _, _, _, _ = trading_test_initializer
 
     await assert_revert(non_admin_signer.send_transaction(non_admin, gary.contract_address, "set_balance", [AssetID.USDC, to64x61(1000000)]), reverted_with="TestAccountManager: Unauthorized Call")
 
 
 @pytest.mark.asyncio
 async def test_for_extremely_low_price_revert(trading_test_initializer):
-    starknet_service, python_executor, admin1, _, _, _, _, _, _, felix, gary, _, _, _, _, felix_test, gary_test, _, _, _, trading, marketPrices, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _ = trading_test_initializer
+    starknet_service, python_executor, admin1, _, _, _, _, _, _, felix, gary, _, _, _, _, felix_test, gary_test, _, _, _, trading, marketPrices, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -500,7 +500,7 @@ async def test_for_extremely_low_price_revert(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_for_risk_while_opening_order(trading_test_initializer):
-    starknet_service, python_executor, admin1, _, _, _, _, _, _, felix, gary, _, _, _, _, felix_test, gary_test, _, _, _, trading, marketPrices, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _ = trading_test_initializer
+    starknet_service, python_executor, admin1, _, _, _, _, _, _, felix, gary, _, _, _, _, felix_test, gary_test, _, _, _, trading, marketPrices, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -663,7 +663,7 @@ async def test_for_risk_while_opening_order(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_balance_low_user_1(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -702,7 +702,7 @@ async def test_revert_balance_low_user_1(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_balance_low_user_2(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -741,7 +741,7 @@ async def test_revert_balance_low_user_2(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_leverage_more_than_allowed_user_1(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -780,7 +780,7 @@ async def test_revert_if_leverage_more_than_allowed_user_1(trading_test_initiali
 
 @pytest.mark.asyncio
 async def test_revert_if_leverage_more_than_allowed_user_2(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -819,7 +819,7 @@ async def test_revert_if_leverage_more_than_allowed_user_2(trading_test_initiali
 
 @pytest.mark.asyncio
 async def test_revert_if_leverage_below_1(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -858,7 +858,7 @@ async def test_revert_if_leverage_below_1(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_wrong_market_passed(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -897,7 +897,7 @@ async def test_revert_if_wrong_market_passed(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_quantity_low_user_1(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -935,7 +935,7 @@ async def test_revert_if_quantity_low_user_1(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_quantity_low_user_2(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -973,7 +973,7 @@ async def test_revert_if_quantity_low_user_2(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_invalid_slippage_1(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -1013,7 +1013,7 @@ async def test_revert_if_invalid_slippage_1(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_invalid_slippage_2(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -1053,7 +1053,7 @@ async def test_revert_if_invalid_slippage_2(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_limit_order_bad_short_limit_price(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -1094,7 +1094,7 @@ async def test_revert_if_limit_order_bad_short_limit_price(trading_test_initiali
 
 @pytest.mark.asyncio
 async def test_revert_if_limit_order_bad_long_limit_price(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -1135,7 +1135,7 @@ async def test_revert_if_limit_order_bad_long_limit_price(trading_test_initializ
 
 @pytest.mark.asyncio
 async def test_revert_if_market_untradable(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -1175,7 +1175,7 @@ async def test_revert_if_market_untradable(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_unregistered_user(trading_test_initializer):
-    _, python_executor, admin1, _, alice, _, _, _, eduard, _, _, alice_test, _, _, eduard_test, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, _, _, _, eduard, _, _, alice_test, _, _, eduard_test, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -1216,7 +1216,7 @@ async def test_revert_if_unregistered_user(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_taker_direction_wrong(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -1255,7 +1255,7 @@ async def test_revert_if_taker_direction_wrong(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_taker_post_only_order(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -1295,7 +1295,7 @@ async def test_revert_if_taker_post_only_order(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_taker_fk_partial_order(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -1335,7 +1335,7 @@ async def test_revert_if_taker_fk_partial_order(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_revert_if_maker_order_is_market(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -1374,7 +1374,7 @@ async def test_revert_if_maker_order_is_market(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_opening_and_closing_full_orders(trading_test_initializer):
-    starknet_service, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _ = trading_test_initializer
+    starknet_service, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -1471,7 +1471,7 @@ async def test_opening_and_closing_full_orders(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_opening_partial_orders(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -1561,7 +1561,7 @@ async def test_opening_partial_orders(trading_test_initializer):
 
 @ pytest.mark.asyncio
 async def test_closing_partial_orders(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, marketPrices, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, marketPrices, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _, _ = trading_test_initializer
 
     ##############################
     ### Close orders partially ###
@@ -1652,7 +1652,7 @@ async def test_closing_partial_orders(trading_test_initializer):
 
 @ pytest.mark.asyncio
 async def test_opening_and_closing_full_orders_different_market(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -1750,7 +1750,7 @@ async def test_opening_and_closing_full_orders_different_market(trading_test_ini
 
 @ pytest.mark.asyncio
 async def test_placing_order_directly(trading_test_initializer):
-    _, _, admin1, _, alice, bob, _, dave, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, _, admin1, _, alice, bob, _, dave, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -1851,7 +1851,7 @@ async def test_placing_order_directly(trading_test_initializer):
 
 @ pytest.mark.asyncio
 async def test_invalid_liquidation(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -1930,7 +1930,7 @@ async def test_invalid_liquidation(trading_test_initializer):
 
 @ pytest.mark.asyncio
 async def test_invalid_deleverage(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -2013,7 +2013,7 @@ async def test_invalid_deleverage(trading_test_initializer):
 
 @ pytest.mark.asyncio
 async def test_opening_partial_orders_multiple(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -2115,7 +2115,7 @@ async def test_opening_partial_orders_multiple(trading_test_initializer):
 
 @ pytest.mark.asyncio
 async def test_opening_and_closing_full_orders_new_collateral(trading_test_initializer):
-    starknet_service, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, _, _, _, _ = trading_test_initializer
+    starknet_service, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -2191,7 +2191,7 @@ async def test_opening_and_closing_full_orders_new_collateral(trading_test_initi
 
 @pytest.mark.asyncio
 async def test_revert_if_market_order_slippage_error_lower_limit(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -2231,7 +2231,7 @@ async def test_revert_if_market_order_slippage_error_lower_limit(trading_test_in
 
 @pytest.mark.asyncio
 async def test_revert_if_market_order_slippage_error_upper_limit(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -2273,7 +2273,7 @@ async def test_revert_if_market_order_slippage_error_upper_limit(trading_test_in
 
 @pytest.mark.asyncio
 async def test_execute_market_order_slippage_lower_limit(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -2320,7 +2320,7 @@ async def test_execute_market_order_slippage_lower_limit(trading_test_initialize
 
 @pytest.mark.asyncio
 async def test_short_actual_execution_price_doubled(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, gary, alice_test, bob_test, charlie_test, _, _, gary_test, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _ = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, gary, alice_test, bob_test, charlie_test, _, _, gary_test, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, trading_stats, _, _, _, _, _, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -2444,7 +2444,7 @@ async def test_short_actual_execution_price_doubled(trading_test_initializer):
 
 @ pytest.mark.asyncio
 async def test_revert_if_maker_sell_order_is_empty(trading_test_initializer):
-    starknet_service, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, ian, ian_test, jake, jake_test = trading_test_initializer
+    starknet_service, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, ian, ian_test, jake, jake_test, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -2486,7 +2486,7 @@ async def test_revert_if_maker_sell_order_is_empty(trading_test_initializer):
 
 @ pytest.mark.asyncio
 async def test_revert_if_taker_sell_order_is_empty(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, ian, ian_test, jake, jake_test = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, ian, ian_test, jake, jake_test, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -2528,7 +2528,7 @@ async def test_revert_if_taker_sell_order_is_empty(trading_test_initializer):
 
 @ pytest.mark.asyncio
 async def test_closing_more_than_parent_size_should_pass(trading_test_initializer):
-    starknet_service, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, ian, ian_test, jake, jake_test = trading_test_initializer
+    starknet_service, python_executor, admin1, _, alice, bob, _, _, _, _, _, alice_test, bob_test, _, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, ian, ian_test, jake, jake_test, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -2603,7 +2603,7 @@ async def test_closing_more_than_parent_size_should_pass(trading_test_initialize
 
 @pytest.mark.asyncio
 async def test_skipping_invalid_close_order(trading_test_initializer):
-    _, python_executor, admin1, _, _, _, charlie, _, _, _, _, _, _, charlie_test, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, ian, ian_test, jake, jake_test = trading_test_initializer
+    _, python_executor, admin1, _, _, _, charlie, _, _, _, _, _, _, charlie_test, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, ian, ian_test, jake, jake_test, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -2656,7 +2656,7 @@ async def test_skipping_invalid_close_order(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_skipping_fully_executed_order(trading_test_initializer):
-    _, python_executor, admin1, _, _, _, charlie, _, _, _, _, _, _, charlie_test, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, ian, ian_test, jake, jake_test = trading_test_initializer
+    _, python_executor, admin1, _, _, _, charlie, _, _, _, _, _, _, charlie_test, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, ian, ian_test, jake, jake_test, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -2738,7 +2738,7 @@ async def test_skipping_fully_executed_order(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_skipping_wrong_maker_order_type(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, ian, ian_test, jake, jake_test = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, ian, ian_test, jake, jake_test, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -2787,7 +2787,7 @@ async def test_skipping_wrong_maker_order_type(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_skipping_unregistered_user(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, eduard, _, _, alice_test, bob_test, charlie_test, eduard_test, _, _, _, _, _, trading, _, _, _, _, _, _, _, non_admin, ian, ian_test, jake, jake_test = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, eduard, _, _, alice_test, bob_test, charlie_test, eduard_test, _, _, _, _, _, trading, _, _, _, _, _, _, _, non_admin, ian, ian_test, jake, jake_test, _ = trading_test_initializer
 
     ###################
     ### Open orders ##
@@ -2838,7 +2838,7 @@ async def test_skipping_unregistered_user(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_skipping_invalid_size_order(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, eduard, _, gary, alice_test, bob_test, charlie_test, eduard_test, _, gary_test, _, _, _, trading, _, _, _, _, _, _, _, non_admin, ian, ian_test, jake, jake_test = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, eduard, _, gary, alice_test, bob_test, charlie_test, eduard_test, _, gary_test, _, _, _, trading, _, _, _, _, _, _, _, non_admin, ian, ian_test, jake, jake_test, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -2888,7 +2888,7 @@ async def test_skipping_invalid_size_order(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_skipping_invalid_market_id(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, eduard, _, gary, alice_test, bob_test, charlie_test, _, _, gary_test, _, _, _, trading, _, _, _, _, _, _, _, non_admin, ian, ian_test, jake, jake_test = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, eduard, _, gary, alice_test, bob_test, charlie_test, _, _, gary_test, _, _, _, trading, _, _, _, _, _, _, _, non_admin, ian, ian_test, jake, jake_test, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -2939,7 +2939,7 @@ async def test_skipping_invalid_market_id(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_skipping_invalid_leverage_1(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, eduard, _, gary, alice_test, bob_test, charlie_test, eduard_test, _, gary_test, _, _, _, trading, _, _, _, _, _, _, _, non_admin, ian, ian_test, jake, jake_test = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, eduard, _, gary, alice_test, bob_test, charlie_test, eduard_test, _, gary_test, _, _, _, trading, _, _, _, _, _, _, _, non_admin, ian, ian_test, jake, jake_test, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -2990,7 +2990,7 @@ async def test_skipping_invalid_leverage_1(trading_test_initializer):
 
 @pytest.mark.asyncio
 async def test_skipping_invalid_leverage_2(trading_test_initializer):
-    _, python_executor, admin1, _, alice, bob, charlie, _, eduard, _, gary, alice_test, bob_test, charlie_test, eduard_test, _, gary_test, _, _, _, trading, _, _, _, _, _, _, _, non_admin, ian, ian_test, jake, jake_test = trading_test_initializer
+    _, python_executor, admin1, _, alice, bob, charlie, _, eduard, _, gary, alice_test, bob_test, charlie_test, eduard_test, _, gary_test, _, _, _, trading, _, _, _, _, _, _, _, non_admin, ian, ian_test, jake, jake_test, _ = trading_test_initializer
     ###################
     ### Open orders ##
     ###################
@@ -3037,3 +3037,86 @@ async def test_skipping_invalid_leverage_2(trading_test_initializer):
     await compare_margin_info(user=jake, user_test=jake_test, order_executor=python_executor, collateral_id=asset_id_1, timestamp=timestamp1)
     await compare_margin_info(user=ian, user_test=ian_test, order_executor=python_executor, collateral_id=asset_id_1, timestamp=timestamp1)
     await compare_margin_info(user=gary, user_test=gary_test, order_executor=python_executor, collateral_id=asset_id_1, timestamp=timestamp1)
+
+
+@pytest.mark.asyncio
+async def test_relay_accounting_storage_benchmark(trading_test_initializer):
+    _, python_executor, admin1, _, _, _, charlie, _, eduard, _, _, _, _, charlie_test, eduard_test, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, _, relay_trading = trading_test_initializer
+
+    users = [charlie, eduard]
+    users_test = [charlie_test, eduard_test]
+    balance_array = [10000, 10000]
+    market_id_1 = BTC_USD_ID
+    asset_id_1 = AssetID.USDC
+    await set_balance(admin_signer=admin1_signer, admin=admin1, users=users, users_test=users_test, balance_array=balance_array, asset_id=asset_id_1)
+
+    orders = [{
+        "quantity": 1,
+        "price": 1000,
+        "order_type": order_types["limit"],
+    }, {
+        "quantity": 1,
+        "price": 1000,
+        "direction": order_direction["short"],
+    }]
+
+    # Runs relayed batches and returns the number of relay storage slots touched for the first time by each batch
+    async def run_relayed_batches(num_batches):
+        touched_keys = set()
+        new_keys_per_batch = []
+        transaction_hashes = []
+        for _ in range(num_batches):
+            (_, _, info) = await execute_and_compare(zkx_node_signer=admin1_signer, zkx_node=admin1, executor=python_executor, orders=orders, users_test=users_test, quantity_locked=1, market_id=market_id_1, oracle_price=1000, trading=relay_trading, timestamp=timestamp1, is_reverted=0)
+            keys = get_accessed_storage_keys(info, relay_trading.contract_address)
+            new_keys_per_batch.append(len(keys - touched_keys))
+            touched_keys |= keys
+            transaction_hashes.append(admin1_signer.current_hash)
+        return (new_keys_per_batch, transaction_hashes, info)
+
+    # Per call accounting allocates a hash list entry and a hash status slot for every relayed batch
+    (per_call_new_keys, _, _) = await run_relayed_batches(2)
+    hash_list = await relay_trading.get_caller_hash_list(admin1.contract_address).call()
+    assert len(hash_list.result.hash_list) == 2
+
+    await admin1_signer.send_transaction(admin1, relay_trading.contract_address, 'set_accounting_mode', [1])
+    accounting_mode = await relay_trading.get_accounting_mode().call()
+    assert accounting_mode.result.mode == 1
+
+    # Aggregated accounting only overwrites the epoch counter and the running hash
+    (aggregated_new_keys, transaction_hashes, info) = await run_relayed_batches(2)
+    assert per_call_new_keys[1] == 2
+    assert aggregated_new_keys[1] == 0
+    # Aggregated accounting allocates fewer relay slots over the same batches
+    assert sum(aggregated_new_keys) < sum(per_call_new_keys)
+
+    # The hash list is no longer extended, the running hash commits to the new transaction hashes instead
+    hash_list = await relay_trading.get_caller_hash_list(admin1.contract_address).call()
+    assert len(hash_list.result.hash_list) == 2
+    epoch = await relay_trading.get_current_epoch().call()
+    epoch_call_counter = await relay_trading.get_epoch_call_counter(epoch.result.epoch, admin1.contract_address, str_to_felt('execute_batch')).call()
+    assert epoch_call_counter.result.count == 2
+    commitment = await relay_trading.get_caller_hash_commitment(admin1.contract_address).call()
+    assert commitment.result.commitment == compute_hash_commitment(transaction_hashes)
+    assert commitment.result.paid_commitment == 0
+
+    assert_event_emitted(
+        info,
+        from_address=relay_trading.contract_address,
+        name='relay_call_recorded',
+        data=[admin1.contract_address, str_to_felt('execute_batch'), transaction_hashes[1], epoch.result.epoch, commitment.result.commitment]
+    )
+
+    # Once the calls of the epoch are paid, the next epoch counts from zero
+    await admin1_signer.send_transaction(admin1, relay_trading.contract_address, 'mark_caller_commitment_paid', [admin1.contract_address, commitment.result.commitment])
+    await admin1_signer.send_transaction(admin1, relay_trading.contract_address, 'advance_epoch', [])
+    next_epoch = await relay_trading.get_current_epoch().call()
+    assert next_epoch.result.epoch == epoch.result.epoch + 1
+
+    (_, transaction_hashes, _) = await run_relayed_batches(1)
+    epoch_call_counter = await relay_trading.get_epoch_call_counter(next_epoch.result.epoch, admin1.contract_address, str_to_felt('execute_batch')).call()
+    assert epoch_call_counter.result.count == 1
+    paid_commitment = await relay_trading.get_caller_hash_commitment(admin1.contract_address).call()
+    assert paid_commitment.result.paid_commitment == commitment.result.commitment
+    assert paid_commitment.result.commitment == compute_hash_commitment(transaction_hashes, commitment.result.commitment)
+
+    await admin1_signer.send_transaction(admin1, relay_trading.contract_address, 'set_accounting_mode', [0])
@@ -7,7 +7,7 @@ from starkware.starknet.testing.contract_utils import get_contract_class
 from starkware.starknet.testing.contract import DeclaredClass
 from starkware.starknet.core.os.class_hash import compute_class_hash
 from starkware.starknet.public.abi import get_selector_from_name
-from utils import Signer, uint, str_to_felt, MAX_UINT256, assert_revert
+from utils import Signer, uint, str_to_felt, MAX_UINT256, assert_revert, build_core_function_calls
 from starkware.starknet.services.api.contract_class import ContractClass
 from starkware.starknet.testing.contract import StarknetContract
 from starkware.cairo.common.hash_state import compute_hash_on_elements
@@ -999,3 +999,256 @@ async def test_with_deregistered_func(adminAuth_factory):
         ),
         reverted_with="SigRequirementsManager: Function not registered"
     )
+
+
+@pytest.mark.asyncio
+async def test_batched_whitelist_and_cached_addresses(adminAuth_factory):
+
+    (
+        admin1,
+        admin2,
+        user3,
+        user4,
+        registry,
+        test_asset,
+        validator_router,
+        sig_req_manager,
+        pubkey_whitelister,
+    ) = adminAuth_factory
+
+    await signer1.send_transaction(
+        admin1,
+        pubkey_whitelister.contract_address,
+        "whitelist_pubkey",
+        [signer3.public_key],
+    )
+
+    await signer1.send_transaction(
+        admin1,
+        pubkey_whitelister.contract_address,
+        "delist_pubkey",
+        [signer4.public_key],
+    )
+
+    whitelist_status = await pubkey_whitelister.are_whitelisted(
+        [signer3.public_key, signer4.public_key]
+    ).call()
+    assert whitelist_status.result.res == [1, 0]
+
+    await signer1.send_transaction(
+        admin1,
+        sig_req_manager.contract_address,
+        "set_sig_requirement",
+        [1, 1, get_selector_from_name("set_asset_value"), 1],
+    )
+
+    sig_req = await sig_req_manager.get_handled_sig_requirement(
+        (1, 1, get_selector_from_name("set_asset_value"))
+    ).call()
+    assert sig_req.result.num_req == 1
+
+    # addresses are fetched from the registry and cached by the previous calls through the router
+    cached_address = await validator_router.get_cached_contract_address(1, 1).call()
+    assert cached_address.result.address == test_asset.contract_address
+
+    cached_address = await validator_router.get_cached_contract_address(22, 1).call()
+    assert cached_address.result.address == pubkey_whitelister.contract_address
+
+    await signer1.send_transaction(
+        admin1,
+        validator_router.contract_address,
+        "clear_cached_contract_address",
+        [1, 1],
+    )
+
+    cached_address = await validator_router.get_cached_contract_address(1, 1).call()
+    assert cached_address.result.address == 0
+
+    await assert_revert(
+        signer3.send_transaction(
+            user3,
+            validator_router.contract_address,
+            "clear_cached_contract_address",
+            [22, 1],
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_duplicate_pubkeys_and_early_stop(adminAuth_factory):
+
+    (
+        admin1,
+        admin2,
+        user3,
+        user4,
+        registry,
+        test_asset,
+        validator_router,
+        sig_req_manager,
+        pubkey_whitelister,
+    ) = adminAuth_factory
+
+    await signer1.send_transaction(
+        admin1,
+        sig_req_manager.contract_address,
+        "set_sig_requirement",
+        [1, 1, get_selector_from_name("set_asset_value"), 2],
+    )
+
+    await signer1.send_transaction(
+        admin1,
+        pubkey_whitelister.contract_address,
+        "whitelist_pubkey",
+        [signer4.public_key],
+    )
+
+    current_nonce = await validator_router.get_nonce().call()
+    current_nonce = current_nonce.result.current_nonce
+
+    # the same signer twice only counts as one valid signature
+    [duplicate_payload] = build_core_function_calls(
+        [signer3, signer3], [(1, 1, "set_asset_value", [40])], current_nonce
+    )
+    await assert_revert(
+        signer1.send_transaction(
+            admin1,
+            validator_router.contract_address,
+            "call_core_function",
+            duplicate_payload,
+        ),
+        reverted_with="SigRequirementsManager: Insufficient no. of valid signatures"
+    )
+
+    # signatures after the required number has been reached are not verified
+    [payload] = build_core_function_calls(
+        [signer3, signer4, signer3], [(1, 1, "set_asset_value", [40])], current_nonce
+    )
+    # tamper with the signature of the third signer, payload is [..., sig_len, sigs..., pubkey_len, pubkeys...]
+    payload[-5] = payload[-5] + 1
+
+    await signer1.send_transaction(
+        admin1,
+        validator_router.contract_address,
+        "call_core_function",
+        payload,
+    )
+
+    current_asset_value = await test_asset.get_asset_value().call()
+    assert current_asset_value.result.res == 40
+
+
+@pytest.mark.asyncio
+async def test_cached_addresses_follow_registry_updates(adminAuth_factory, starknet_service: StarknetService):
+
+    (
+        admin1,
+        admin2,
+        user3,
+        user4,
+        registry,
+        test_asset,
+        validator_router,
+        sig_req_manager,
+        pubkey_whitelister,
+    ) = adminAuth_factory
+
+    new_test_asset = await starknet_service.deploy(ContractType.TestAsset, [])
+    new_pubkey_whitelister = await starknet_service.deploy(
+        ContractType.PubkeyWhitelister,
+        [registry.contract_address, 1],
+    )
+
+    await signer1.send_transaction(
+        admin1,
+        new_pubkey_whitelister.contract_address,
+        "whitelist_pubkey",
+        [signer3.public_key],
+    )
+
+    await signer1.send_transaction(
+        admin1,
+        sig_req_manager.contract_address,
+        "set_sig_requirement",
+        [1, 1, get_selector_from_name("set_asset_value"), 2],
+    )
+
+    old_asset_value = await test_asset.get_asset_value().call()
+
+    # addresses cached by the previous calls are stale once the registry is updated
+    await signer1.send_transaction(
+        admin1,
+        registry.contract_address,
+        "update_contract_registry",
+        [1, 1, new_test_asset.contract_address],
+    )
+    await signer1.send_transaction(
+        admin1,
+        registry.contract_address,
+        "update_contract_registry",
+        [22, 1, new_pubkey_whitelister.contract_address],
+    )
+
+    cached_address = await validator_router.get_cached_contract_address(1, 1).call()
+    assert cached_address.result.address == 0
+
+    cached_address = await validator_router.get_cached_contract_address(22, 1).call()
+    assert cached_address.result.address == 0
+
+    current_nonce = await validator_router.get_nonce().call()
+    current_nonce = current_nonce.result.current_nonce
+
+    [payload] = build_core_function_calls(
+        [signer3, signer4], [(1, 1, "set_asset_value", [60])], current_nonce
+    )
+
+    # signer4 is whitelisted on the old PubkeyWhitelister only
+    await assert_revert(
+        signer1.send_transaction(
+            admin1,
+            validator_router.contract_address,
+            "call_core_function",
+            payload,
+        ),
+        reverted_with="SigRequirementsManager: Insufficient no. of valid signatures"
+    )
+
+    await signer1.send_transaction(
+        admin1,
+        new_pubkey_whitelister.contract_address,
+        "whitelist_pubkey",
+        [signer4.public_key],
+    )
+
+    await signer1.send_transaction(
+        admin1,
+        validator_router.contract_address,
+        "call_core_function",
+        payload,
+    )
+
+    # the call is forwarded to the new contract
+    new_asset_value = await new_test_asset.get_asset_value().call()
+    assert new_asset_value.result.res == 60
+
+    current_asset_value = await test_asset.get_asset_value().call()
+    assert current_asset_value.result.res == old_asset_value.result.res
+
+    cached_address = await validator_router.get_cached_contract_address(1, 1).call()
+    assert cached_address.result.address == new_test_asset.contract_address
+
+    cached_address = await validator_router.get_cached_contract_address(22, 1).call()
+    assert cached_address.result.address == new_pubkey_whitelister.contract_address
+
+    await signer1.send_transaction(
+        admin1,
+        registry.contract_address,
+        "update_contract_registry",
+        [1, 1, test_asset.contract_address],
+    )
+    await signer1.send_transaction(
+        admin1,
+        registry.contract_address,
+        "update_contract_registry",
+        [22, 1, pubkey_whitelister.contract_address],
+    )
@@ -0,0 +1,99 @@
+import pytest
+import asyncio
+from utils import Signer, str_to_felt, assert_revert
+from utils_links import DEFAULT_LINK_1, DEFAULT_LINK_2, encode_characters, decode_characters, encode_packed_string, decode_packed_string, get_packed_len
+from helpers import StarknetService, ContractType, AccountFactory
+from dummy_addresses import L1_dummy_address
+
+signer1 = Signer(123456789987654321)
+
+LINK_TYPE = str_to_felt("TEST_LINK")
+
+
+@pytest.fixture(scope='module')
+def event_loop():
+    return asyncio.new_event_loop()
+
+
+@pytest.fixture(scope='module')
+async def string_factory(starknet_service: StarknetService):
+    account_factory = AccountFactory(starknet_service, L1_dummy_address, 0, 1)
+    admin1 = await account_factory.deploy_account(signer1.public_key)
+    string_lib = await starknet_service.deploy(ContractType.TestStringLib, [])
+    return string_lib, admin1
+
+
+@pytest.mark.asyncio
+async def test_save_string_packed(string_factory):
+    string_lib, admin1 = string_factory
+
+    for (id, link) in enumerate(["", "a", "x" * 31, "y" * 32, DEFAULT_LINK_1], start=1):
+        await signer1.send_transaction(admin1, string_lib.contract_address, "save_string",
+                                       [LINK_TYPE, id, len(link)] + encode_characters(link))
+
+        # Characters are stored 31 per slot
+        packed_link = encode_packed_string(link)
+        for index in range(len(packed_link) + 1):
+            slot = await string_lib.read_slot(LINK_TYPE, id, index).call()
+            expected = packed_link[index] if index < len(packed_link) else 0
+            assert slot.result.res == expected
+
+        string_call = await string_lib.read_string(LINK_TYPE, id).call()
+        assert string_call.result.string_len == len(link)
+        assert decode_characters(string_call.result.string) == link
+
+        packed_call = await string_lib.read_packed_string(LINK_TYPE, id).call()
+        assert packed_call.result.packed_string_len == get_packed_len(len(link))
+        assert packed_call.result.packed_string == packed_link
+        assert decode_packed_string(packed_call.result.string_len, packed_call.result.packed_string) == link
+
+
+@pytest.mark.asyncio
+async def test_save_string_invalid_character(string_factory):
+    string_lib, admin1 = string_factory
+
+    await assert_revert(
+        signer1.send_transaction(admin1, string_lib.contract_address, "save_string",
+                                 [LINK_TYPE, 10, 2, str_to_felt("a"), 256]),
+        "StringLib: Invalid character"
+    )
+
+
+@pytest.mark.asyncio
+async def test_migrate_legacy_string(string_factory):
+    string_lib, admin1 = string_factory
+    id = 20
+
+    await signer1.send_transaction(admin1, string_lib.contract_address, "save_legacy_string",
+                                   [LINK_TYPE, id, len(DEFAULT_LINK_1)] + encode_characters(DEFAULT_LINK_1))
+
+    # Legacy strings are readable in both encodings
+    string_call = await string_lib.read_string(LINK_TYPE, id).call()
+    assert decode_characters(string_call.result.string) == DEFAULT_LINK_1
+    packed_call = await string_lib.read_packed_string(LINK_TYPE, id).call()
+    assert packed_call.result.packed_string == encode_packed_string(DEFAULT_LINK_1)
+
+    await signer1.send_transaction(admin1, string_lib.contract_address, "migrate_string", [LINK_TYPE, id])
+
+    # The character slots beyond the packed ones are cleared
+    packed_link = encode_packed_string(DEFAULT_LINK_1)
+    for index in range(len(DEFAULT_LINK_1)):
+        slot = await string_lib.read_slot(LINK_TYPE, id, index).call()
+        expected = packed_link[index] if index < len(packed_link) else 0
+        assert slot.result.res == expected
+
+    string_call = await string_lib.read_string(LINK_TYPE, id).call()
+    assert decode_characters(string_call.result.string) == DEFAULT_LINK_1
+
+    # Saving over a migrated string only touches the packed slots
+    await signer1.send_transaction(admin1, string_lib.contract_address, "save_string",
+                                   [LINK_TYPE, id, len(DEFAULT_LINK_2)] + encode_characters(DEFAULT_LINK_2))
+    string_call = await string_lib.read_string(LINK_TYPE, id).call()
+    assert decode_characters(string_call.result.string) == DEFAULT_LINK_2
+
+    await signer1.send_transaction(admin1, string_lib.contract_address, "remove_existing_string", [LINK_TYPE, id])
+    string_call = await string_lib.read_string(LINK_TYPE, id).call()
+    assert string_call.result.string_len == 0
+    for index in range(get_packed_len(len(DEFAULT_LINK_2))):
+        slot = await string_lib.read_slot(LINK_TYPE, id, index).call()
+        assert slot.result.res == 0
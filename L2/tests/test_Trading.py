@@ -11,7 +11,10 @@ from starkware.starknet.business_logic.execution.objects import OrderedEvent
 from starkware.starknet.public.abi import get_selector_from_name
 
 from utils import ContractIndex, ManagerAction, Signer, str_to_felt, from64x61, to64x61, assert_revert, assert_event_with_custom_keys_emitted, PRIME, PRIME_HALF
-from utils_trading import User, order_direction, order_side, order_types, order_time_in_force, side, OrderExecutor, fund_mapping, set_balance, execute_and_compare, compare_fund_balances, compare_user_balances, compare_user_positions, compare_margin_info, check_batch_status, compare_markets_array
+from utils_trading import User, order_direction, order_side, order_types, order_time_in_force, side, OrderExecutor, fund_mapping, set_balance, execute_and_compare, compare_fund_balances, compare_user_balances, compare_user_positions, compare_margin_info, check_batch_status, execute_batch_reverted, random_string, compare_markets_array, count_position_storage_writes, PACKED_POSITION_SIZE, UNPACKED_POSITION_SIZE, get_user_position, get_user_balance, get_fund_balance
+from utils_state import read_user_balances, read_user_positions, read_fund_balances
+from utils_order_book import OrderBook, Batch
+from utils_batch_validator import BatchValidator
 from utils_asset import AssetID, build_asset_properties
 from utils_markets import MarketProperties
 from helpers import StarknetService, ContractType, AccountFactory
@@ -1390,11 +1393,29 @@ async def test_opening_and_closing_full_orders(trading_test_initializer):
         order=5
     )
 
+    # A fill writes the 4 slots of the packed position instead of the 8 of an unpacked PositionDetails
+    storage_writes = alice.state.last_storage_writes
+    for (user, direction) in [(alice, order_direction["long"]), (bob, order_direction["short"])]:
+        assert count_position_storage_writes(
+            storage_writes=storage_writes, user_address=user.contract_address, market_id=market_id_1, direction=direction) == PACKED_POSITION_SIZE
+        assert count_position_storage_writes(
+            storage_writes=storage_writes, user_address=user.contract_address, market_id=market_id_1, direction=direction, storage_var='position_mapping') == 0
+
     # # check balances
     await compare_user_balances(users=users, user_tests=users_test, asset_id=asset_id_1)
     await compare_fund_balances(executor=python_executor, holding=holding, liquidity=liquidity, fee_balance=fee_balance, insurance=insurance, asset_id=asset_id_1)
     await compare_user_positions(users=users, users_test=users_test, market_id=market_id_1)
 
+    # The storage reader decodes the same values as the view functions
+    alice_balances = await read_user_balances(state=alice.state, user_addresses=[alice.contract_address], asset_id=asset_id_1)
+    assert alice_balances[0]["balance"] == await get_user_balance(user=alice, asset_id=asset_id_1)
+    alice_positions = await read_user_positions(state=alice.state, user_addresses=[alice.contract_address], market_id=market_id_1, directions=[order_direction["long"]])
+    alice_position = await get_user_position(user=alice, market_id=market_id_1, direction=order_direction["long"])
+    assert list(alice_positions[0][order_direction["long"]].values()) == alice_position
+    fund_balances = await read_fund_balances(state=holding.state, fund_addresses={"holding_fund": holding.contract_address, "fee_balance": fee_balance.contract_address}, asset_id=asset_id_1, fee_balance_key="fee_balance")
+    assert fund_balances["holding_fund"] == await get_fund_balance(fund=holding, asset_id=asset_id_1, is_fee_balance=0)
+    assert fund_balances["fee_balance"] == await get_fund_balance(fund=fee_balance, asset_id=asset_id_1, is_fee_balance=1)
+
     # compare margins
     await compare_margin_info(user=alice, user_test=alice_test, order_executor=python_executor, collateral_id=asset_id_1, timestamp=timestamp1)
     await compare_margin_info(user=bob, user_test=bob_test, order_executor=python_executor, collateral_id=asset_id_1, timestamp=timestamp1)
@@ -3025,3 +3046,102 @@ async def test_skipping_invalid_leverage_2(trading_test_initializer):
     await compare_margin_info(user=jake, user_test=jake_test, order_executor=python_executor, collateral_id=asset_id_1, timestamp=timestamp1)
     await compare_margin_info(user=ian, user_test=ian_test, order_executor=python_executor, collateral_id=asset_id_1, timestamp=timestamp1)
     await compare_margin_info(user=gary, user_test=gary_test, order_executor=python_executor, collateral_id=asset_id_1, timestamp=timestamp1)
+
+
+@pytest.mark.asyncio
+async def test_executing_batches_from_order_book(trading_test_initializer):
+    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, holding, fee_balance, liquidity, insurance, _, _, _, _, _, _ = trading_test_initializer
+
+    users = [alice, bob, charlie]
+    users_test = [alice_test, bob_test, charlie_test]
+    balance_array = [10000, 10000, 10000]
+    market_id_1 = BTC_USD_ID
+    asset_id_1 = AssetID.USDC
+    oracle_price_1 = 1000
+
+    await set_balance(admin_signer=admin1_signer, admin=admin1, users=users, users_test=users_test, balance_array=balance_array, asset_id=asset_id_1)
+
+    # One maker per batch, so the taker is split over two batches
+    book = OrderBook(market_id=market_id_1, tick_precision=0, step_precision=0,
+                     minimum_order_size=0.0001, max_makers_per_batch=1)
+
+    # Limit long orders rest on the bid side
+    assert book.submit(alice_test, alice_test.create_order(
+        quantity=1, price=1000, order_type=order_types["limit"]), oracle_price_1) == []
+    assert book.submit(bob_test, bob_test.create_order(
+        quantity=1, price=999, order_type=order_types["limit"]), oracle_price_1) == []
+    assert book.best_bid() == 1000
+
+    # A post only order that would cross is rejected
+    assert book.submit(charlie_test, charlie_test.create_order(
+        quantity=1, price=999, direction=order_direction["short"], order_type=order_types["limit"], post_only=1), oracle_price_1) == []
+
+    # A market short order takes both makers in price-time priority
+    batches = book.submit(charlie_test, charlie_test.create_order(
+        quantity=2, direction=order_direction["short"]), oracle_price_1)
+    assert [batch.users for batch in batches] == [[alice_test, charlie_test], [bob_test, charlie_test]]
+    assert book.best_bid() == 0
+
+    for batch in batches:
+        await batch.execute(zkx_node_signer=admin1_signer, zkx_node=admin1, trading=trading, executor=python_executor, timestamp=timestamp1)
+        await check_batch_status(batch_id=batch.batch_id, trading=trading, is_executed=1)
+
+    await compare_user_balances(users=users, user_tests=users_test, asset_id=asset_id_1)
+    await compare_fund_balances(executor=python_executor, holding=holding, liquidity=liquidity, fee_balance=fee_balance, insurance=insurance, asset_id=asset_id_1)
+    await compare_user_positions(users=users, users_test=users_test, market_id=market_id_1)
+
+
+@pytest.mark.asyncio
+async def test_batch_validator_predicts_reverts(trading_test_initializer):
+    _, python_executor, admin1, _, alice, bob, charlie, _, _, _, _, alice_test, bob_test, charlie_test, _, _, _, _, _, _, trading, _, _, _, _, _, _, _, _, _, _, _, _ = trading_test_initializer
+
+    users = [alice, bob, charlie]
+    users_test = [alice_test, bob_test, charlie_test]
+    balance_array = [10000, 10000, 10000]
+    market_id_1 = BTC_USD_ID
+    asset_id_1 = AssetID.USDC
+    oracle_price_1 = 1000
+
+    await set_balance(admin_signer=admin1_signer, admin=admin1, users=users, users_test=users_test, balance_array=balance_array, asset_id=asset_id_1)
+    validator = BatchValidator(python_executor)
+
+    # The only maker is over the leverage limit, so the batch reverts with its error
+    batch_1 = Batch(batch_id=random_string(10), market_id=market_id_1, quantity_locked=1, oracle_price=oracle_price_1, orders=[
+        alice_test.create_order(quantity=1, leverage=10.1, order_type=order_types["limit"]),
+        bob_test.create_order(quantity=1, direction=order_direction["short"]),
+    ], users=[alice_test, bob_test])
+
+    prediction_1 = validator.validate(batch_1, timestamp1)
+    assert prediction_1.failed_index == 0
+    assert prediction_1.error.to_message() == f"502: {batch_1.orders[0][0]['order_id']} {to64x61(10.1)}"
+    await execute_batch_reverted(zkx_node_signer=admin1_signer, zkx_node=admin1, trading=trading, execute_batch_params=batch_1.to_calldata(), error_message=prediction_1.error.to_message())
+    assert validator.trim(batch_1, timestamp1) is None
+
+    # The average price of both makers is below the limit price of the taker
+    batch_2 = Batch(batch_id=random_string(10), market_id=market_id_1, quantity_locked=2, oracle_price=oracle_price_1, orders=[
+        alice_test.create_order(quantity=1, price=1000, order_type=order_types["limit"]),
+        bob_test.create_order(quantity=1, price=990, order_type=order_types["limit"]),
+        charlie_test.create_order(quantity=2, price=996, direction=order_direction["short"], order_type=order_types["limit"]),
+    ], users=users_test)
+
+    prediction_2 = validator.validate(batch_2, timestamp1)
+    assert prediction_2.failed_index == 2
+    assert prediction_2.error.to_message() == f"507: {batch_2.orders[2][0]['order_id']} {to64x61(995)}"
+    await execute_batch_reverted(zkx_node_signer=admin1_signer, zkx_node=admin1, trading=trading, execute_batch_params=batch_2.to_calldata(), error_message=prediction_2.error.to_message())
+
+    # Removing the maker with the lowest price lets the taker execute
+    trimmed_batch = validator.trim(batch_2, timestamp1)
+    assert trimmed_batch.users == [alice_test, charlie_test]
+    assert trimmed_batch.quantity_locked == 1
+    assert not validator.validate(trimmed_batch, timestamp1).reverts
+
+    await trimmed_batch.execute(zkx_node_signer=admin1_signer, zkx_node=admin1, trading=trading, executor=python_executor, timestamp=timestamp1)
+    await check_batch_status(batch_id=trimmed_batch.batch_id, trading=trading, is_executed=1)
+    validator.record_order_hashes(trimmed_batch)
+    await compare_user_balances(users=users, user_tests=users_test, asset_id=asset_id_1)
+    await compare_user_positions(users=users, users_test=users_test, market_id=market_id_1)
+
+    # A batch id cannot be executed twice
+    prediction_3 = validator.validate(trimmed_batch, timestamp1)
+    assert prediction_3.error.to_message() == f"525: {trimmed_batch.batch_id} 0"
+    await execute_batch_reverted(zkx_node_signer=admin1_signer, zkx_node=admin1, trading=trading, execute_batch_params=trimmed_batch.to_calldata(), error_message=prediction_3.error.to_message())
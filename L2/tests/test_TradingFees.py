@@ -198,6 +198,45 @@ async def test_get_fee2(adminAuth_factory):
     assert result.discount_tier == 2
 
 
+@pytest.mark.asyncio
+async def test_get_fee_schedule(adminAuth_factory):
+    adminAuth, fees, admin1, admin2, user1, feeDiscount = adminAuth_factory
+
+    execution_info = await fees.get_fee_schedule().call()
+    result = execution_info.result
+
+    # 3 base fee updates and 3 discount updates so far
+    assert result.version == 6
+    assert [tier.numberOfTokens for tier in result.fee_tiers] == [0, 1000, 5000]
+    assert [tier.takerFee for tier in result.fee_tiers] == [
+        to64x61(0.0005), to64x61(0.0004), to64x61(0.00035)]
+    assert [tier.numberOfTokens for tier in result.discount_tiers] == [0, 1000, 5000]
+    assert [tier.discount for tier in result.discount_tiers] == [
+        to64x61(0.03), to64x61(0.05), to64x61(0.1)]
+
+
+@pytest.mark.asyncio
+async def test_get_discounted_fee_rates(adminAuth_factory):
+    adminAuth, fees, admin1, admin2, user1, feeDiscount = adminAuth_factory
+
+    await signer1.send_transaction(admin1, feeDiscount.contract_address, 'increment_governance_tokens', [admin1.contract_address, 5000])
+    users = [user1.contract_address, admin1.contract_address, admin2.contract_address]
+
+    for side in [1, 2]:
+        execution_info = await fees.get_discounted_fee_rates(side, users).call()
+        fee_rates = execution_info.result.fee_rates
+        assert len(fee_rates) == 3
+
+        # Rates resolved from the fee schedule must match the per-user view
+        for user, fee_rate in zip(users, fee_rates):
+            execution_info = await fees.get_discounted_fee_rate_for_user(user, side).call()
+            assert fee_rate == execution_info.result.discounted_base_fee_percent
+
+    execution_info = await fees.get_discounted_fee_rates(2, users).call()
+    fee_rates = execution_info.result.fee_rates
+    assert fee_rates[2] == to64x61(0.0005 * 0.97)
+
+
 @pytest.mark.asyncio
 async def test_update_base_fee_tier_to_higher_value(adminAuth_factory):
     adminAuth, fees, admin1, admin2, user1, feeDiscount = adminAuth_factory
@@ -1,7 +1,9 @@
 import pytest
 import asyncio
 from starkware.starknet.testing.starknet import Starknet
-from utils import Signer, uint, str_to_felt, MAX_UINT256, assert_revert, to64x61, from64x61
+import numpy as np
+from array import array
+from utils import Signer, uint, str_to_felt, MAX_UINT256, assert_revert, to64x61, from64x61, to64x61_array, from64x61_array, PRIME
 from starkware.starknet.compiler.compile import get_selector_from_name
 
 @pytest.mark.asyncio
@@ -19,3 +21,26 @@ async def test_str_to_felt():
     print("\n borrowed", borrowed)
     print("\n leverage", leverage)
     print("\n selector",get_selector_from_name('activate_high_tide'))
+
+
+def test_bulk_64x61_codec():
+    # Values small enough for int64 in 64x61, prices, negatives, and values at the edge of the range
+    nums = [0, 0.5555555555555553, 1.222, -1.222, 3.99, 1000.5, -2536.42, 16232806235.12, -2**63 + 2.5, 2**64]
+    nums_64x61 = [to64x61(n) for n in nums]
+    assert to64x61_array(nums) == nums_64x61
+    assert to64x61_array(np.array(nums)) == nums_64x61
+    assert to64x61_array(memoryview(array('d', nums))) == nums_64x61
+    assert to64x61_array([1, 2**60 + 1, 0.5]) == [to64x61(1), to64x61(2**60 + 1), to64x61(0.5)]
+    assert to64x61_array(np.arange(-3, 3)) == [to64x61(n) for n in range(-3, 3)]
+    assert to64x61_array([]) == []
+
+    felts = [n % PRIME for n in nums_64x61]
+    assert from64x61_array(felts).tolist() == [from64x61(felt) for felt in felts]
+    assert from64x61_array(np.array([0, 2**61, 2**62 + 1], dtype=np.uint64)).tolist() == [0, 1, from64x61(2**62 + 1)]
+
+    with pytest.raises(Exception, match="out of valid range"):
+        to64x61_array([1.5, 2**64 + 1])
+    with pytest.raises(Exception, match="out of valid range"):
+        to64x61_array(np.array([float("nan")]))
+    with pytest.raises(Exception, match="out of valid range"):
+        from64x61_array([2**61, PRIME // 2])
@@ -5,6 +5,8 @@
 from starkware.cairo.common.cairo_builtins import HashBuiltin
 from starkware.starknet.common.syscalls import get_caller_address
 
+from contracts.DataTypes import UserFee
+
 // //////////
 // Storage //
 // //////////
@@ -47,9 +49,31 @@ func update{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
     return ();
 }
 
+// @notice Function to call update_fee_mapping_bulk of FeeBalance contract
+// @param _assetID - asset ID of the collateral
+// @param _user_fees_len - Length of the user fees array
+// @param _user_fees - Array of users and the fee to be added for each of them
+@external
+func update_bulk{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    _assetID: felt, _user_fees_len: felt, _user_fees: UserFee*
+) {
+    alloc_locals;
+    let (fee_addr) = fee_address.read();
+    IFeeBalance.update_fee_mapping_bulk(
+        contract_address=fee_addr,
+        assetID_=_assetID,
+        user_fees_len=_user_fees_len,
+        user_fees=_user_fees,
+    );
+    return ();
+}
+
 // @notice FeeBalance interface
 @contract_interface
 namespace IFeeBalance {
     func update_fee_mapping(address: felt, assetID_: felt, fee_to_add: felt) {
     }
+
+    func update_fee_mapping_bulk(assetID_: felt, user_fees_len: felt, user_fees: UserFee*) {
+    }
 }
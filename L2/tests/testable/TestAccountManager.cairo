@@ -21,6 +21,11 @@ from contracts.AccountManager import (
     return_array_collaterals,
     get_withdrawal_history,
     get_withdrawal_history_by_status,
+    get_withdrawal_history_paginated,
+    get_withdrawal_history_by_status_paginated,
+    get_modification_info,
+    get_positions_paginated,
+    return_array_collaterals_paginated,
     deposit,
     transfer_from,
     transfer_from_abr,
@@ -41,8 +46,6 @@ from contracts.AccountManager import (
     add_to_market_array,
     remove_from_market_array,
     add_collateral,
-    find_index_to_be_updated_recurse,
-    check_for_withdrawal_replay,
     balance,
     collateral_array_len,
     deleveragable_or_liquidatable_position,
@@ -0,0 +1,89 @@
+%lang starknet
+
+from starkware.cairo.common.cairo_builtins import HashBuiltin
+
+from contracts.libraries.StringLib import StringLib, string_chars_mapping, string_len_mapping
+
+// ///////
+// View //
+// ///////
+
+@view
+func read_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    type: felt, id: felt
+) -> (string_len: felt, string: felt*) {
+    let (string_len, string) = StringLib.read_string(type=type, id=id);
+    return (string_len, string);
+}
+
+@view
+func read_packed_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    type: felt, id: felt
+) -> (string_len: felt, packed_string_len: felt, packed_string: felt*) {
+    let (string_len, packed_string_len, packed_string) = StringLib.read_packed_string(
+        type=type, id=id
+    );
+    return (string_len, packed_string_len, packed_string);
+}
+
+@view
+func read_slot{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    type: felt, id: felt, index: felt
+) -> (res: felt) {
+    let (res) = string_chars_mapping.read(type=type, id=id, index=index);
+    return (res,);
+}
+
+// ///////////
+// External //
+// ///////////
+
+@external
+func save_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    type: felt, id: felt, string_len: felt, string: felt*
+) {
+    StringLib.remove_existing_string(type=type, id=id);
+    StringLib.save_string(type=type, id=id, string_len=string_len, string=string);
+    return ();
+}
+
+// Saves a string one character per index, as done before packing was supported
+@external
+func save_legacy_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    type: felt, id: felt, string_len: felt, string: felt*
+) {
+    string_len_mapping.write(type=type, id=id, value=string_len);
+    return save_legacy_string_recurse(
+        type=type, id=id, iterator=0, string_len=string_len, string=string
+    );
+}
+
+@external
+func migrate_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    type: felt, id: felt
+) {
+    StringLib.migrate_string(type=type, id=id);
+    return ();
+}
+
+@external
+func remove_existing_string{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    type: felt, id: felt
+) {
+    StringLib.remove_existing_string(type=type, id=id);
+    return ();
+}
+
+// ///////////
+// Internal //
+// ///////////
+
+func save_legacy_string_recurse{syscall_ptr: felt*, pedersen_ptr: HashBuiltin*, range_check_ptr}(
+    type: felt, id: felt, iterator: felt, string_len: felt, string: felt*
+) {
+    if (iterator == string_len) {
+        return ();
+    }
+    string_chars_mapping.write(type=type, id=id, index=iterator, value=string[iterator]);
+    return save_legacy_string_recurse(type, id, iterator + 1, string_len, string);
+}
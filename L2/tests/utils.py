@@ -2,6 +2,7 @@
 
 from starkware.cairo.common.hash_state import compute_hash_on_elements
 from starkware.crypto.signature.signature import private_to_stark_key, sign
+from starkware.crypto.signature.fast_pedersen_hash import pedersen_hash
 from starkware.starknet.definitions.error_codes import StarknetErrorCode
 from starkware.starkware_utils.error_handling import StarkException
 from starkware.starknet.public.abi import get_selector_from_name
@@ -9,7 +10,10 @@ from starkware.starknet.definitions.general_config import StarknetChainId
 from starkware.starknet.public.abi import get_selector_from_name
 from starkware.starknet.services.api.gateway.transaction import InvokeFunction
 from starkware.starknet.business_logic.transaction.objects import InternalTransaction, TransactionExecutionInfo, InternalDeclare
+import numpy as np
 from math import trunc
+from functools import lru_cache
+from typing import List
 from starkware.starknet.core.os.transaction_hash.transaction_hash import (
     TransactionHashPrefix,
     calculate_transaction_hash_common,
@@ -88,10 +92,57 @@ def to64x61(num: int) -> int:
 
 
 def convertTo64x61(nums):
-    result = []
-    for n in nums:
-        result.append(to64x61(n))
-    return result
+    return to64x61_array(nums)
+
+
+# Bounds of the values for which the bulk codec takes its fast paths
+INT64_BOUND = 2**63
+FLOAT64_EXACT_INT_BOUND = 2**53
+MAX_64x61 = 2**125
+
+
+# Convert numbers, or a NumPy array or buffer of them, to 64x61 with the result of to64x61
+def to64x61_array(nums) -> List[int]:
+    if not hasattr(nums, "__len__"):
+        nums = list(nums)
+    values = np.asarray(nums)
+    if values.dtype.kind in "biu":
+        # Integers are scaled exactly as Python ints
+        scaled = [n * SCALE for n in values.ravel().tolist()]
+        if any(res > MAX_64x61 or res <= -MAX_64x61 for res in scaled):
+            raise Exception("Number is out of valid range")
+        return scaled
+    if values.dtype.kind != "f":
+        # Big ints, decimals and mixed lists are converted one at a time
+        return [to64x61(n) for n in values.ravel().tolist()]
+
+    # Scaling by a power of 2 is exact in float64, so truncating it matches to64x61
+    scaled = values.ravel().astype(np.float64) * SCALE
+    if not np.all(np.isfinite(scaled)) or np.any(scaled > MAX_64x61) or np.any(scaled <= -MAX_64x61):
+        raise Exception("Number is out of valid range")
+    if not isinstance(nums, np.ndarray) and np.any(np.abs(scaled) >= FLOAT64_EXACT_INT_BOUND * SCALE):
+        # Large ints in a list mixed with floats would have been rounded by the float64 cast
+        return [to64x61(n) for n in nums]
+    truncated = np.trunc(scaled)
+    if np.all(np.abs(truncated) < INT64_BOUND):
+        return truncated.astype(np.int64).tolist()
+    return list(map(int, truncated.tolist()))
+
+
+# Convert 64x61 felts, or a NumPy array of them, to a float64 array with the values of from64x61
+def from64x61_array(felts) -> np.ndarray:
+    if isinstance(felts, np.ndarray) and felts.dtype.kind in "iu":
+        # Machine integers are never above PRIME_HALF, so they only need scaling
+        return felts.astype(np.float64) / SCALE
+
+    felts = list(felts)
+    values = np.array(felts, dtype=np.float64)
+    # Negative values are subtracted from PRIME exactly; in float64 the difference would be lost
+    for i in np.flatnonzero(values > PRIME_HALF).tolist():
+        values[i] = felts[i] - PRIME
+    if np.any(np.abs(values) > MAX_64x61):
+        raise Exception("Number is out of valid range")
+    return values / SCALE
 
 
 def str_to_felt(text: str) -> int:
@@ -119,6 +170,12 @@ async def assert_revert(fun, reverted_with=None):
                 'message'], f"Error mismatch, expected: {reverted_with}, actual: {error['message']}"
 
 
+# Deriving a public key is an EC multiplication; cache it for tests that create many signers
+@lru_cache(maxsize=None)
+def get_public_key(private_key: int) -> int:
+    return private_to_stark_key(private_key)
+
+
 class Signer():
     """
     Utility for sending signed transactions to an Account on Starknet.
@@ -146,7 +203,7 @@ class Signer():
 
     def __init__(self, private_key):
         self.private_key = private_key
-        self.public_key = private_to_stark_key(private_key)
+        self.public_key = get_public_key(private_key)
         self.current_hash = 0
 
     def sign(self, message_hash):
@@ -226,6 +283,38 @@ def hash_order(order_details):
     return compute_hash_on_elements(order_details)
 
 
+def hash_core_function_call(index, version, nonce, function_selector, calldata):
+    """Hash of a CoreFunctionCall as computed by SignatureVerification.calc_call_hash."""
+    return compute_hash_on_elements([index, version, nonce, function_selector, compute_hash_on_elements(calldata)])
+
+
+def build_core_function_calls(signers, calls, starting_nonce):
+    """Build the calldata of ValidatorRouter.call_core_function for a list of calls signed by every signer.
+
+    calls is a list of (index, version, function_name, calldata) tuples, each call uses the next nonce.
+    """
+    payloads = []
+    for offset, (index, version, function_name, calldata) in enumerate(calls):
+        nonce = starting_nonce + offset
+        function_selector = get_selector_from_name(function_name)
+        call_hash = hash_core_function_call(index, version, nonce, function_selector, calldata)
+        signatures = [value for signer in signers for value in signer.sign(call_hash)]
+        pubkeys = [signer.public_key for signer in signers]
+        payloads.append([
+            index,
+            version,
+            nonce,
+            function_selector,
+            len(calldata),
+            *calldata,
+            len(signers),
+            *signatures,
+            len(pubkeys),
+            *pubkeys
+        ])
+    return payloads
+
+
 # following event assertion functions directly from oz test utils
 
 
@@ -287,6 +376,25 @@ def assert_events_with_custom_keys_emitted(tx_exec_info, events):
         raise BaseException("Event not fired or not fired correctly")
 
 
+def get_accessed_storage_keys(tx_exec_info, contract_address):
+    """Collect the storage keys accessed by a contract during a transaction."""
+    keys = set()
+    calls = [tx_exec_info.call_info]
+    while calls:
+        call = calls.pop()
+        if call.contract_address == contract_address:
+            keys.update(call.accessed_storage_keys)
+        calls.extend(call.internal_calls)
+    return keys
+
+
+def compute_hash_commitment(transaction_hashes, commitment=0):
+    """Rebuild the running hash of a relay caller from its transaction hashes."""
+    for transaction_hash in transaction_hashes:
+        commitment = pedersen_hash(commitment, transaction_hash)
+    return commitment
+
+
 def from_call_to_call_array(calls):
     """Transform from Call to CallArray."""
     call_array = []
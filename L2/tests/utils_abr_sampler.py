@@ -0,0 +1,127 @@
+"""Samples the index and mark prices of every market for ABRCore.set_abr_value.
+
+ABRCore takes 480 index and mark prices per market for an epoch of abr_interval seconds, which
+ABRCalculations.reduce_values averages in windows of 8, so prices are sampled once every
+abr_interval / 480 seconds. Each market keeps its samples in fixed size array('d') ring
+buffers, so the memory of the sampler does not grow with the number of ticks, and the
+submission arrays are converted to 64x61 straight from memoryviews of the buffers.
+"""
+
+from array import array
+from typing import Dict, Iterator, List, Tuple
+from utils import to64x61_array
+
+# Default abr_interval of ABRCore, in seconds
+ABR_INTERVAL = 28800
+# Number of index and mark prices set_abr_value takes for a market
+SAMPLES_PER_EPOCH = 480
+
+
+class PriceRing:
+    """Fixed size ring buffer of prices"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.prices = array('d', bytes(8 * capacity))
+        self.next_index = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, price: float):
+        self.prices[self.next_index] = price
+        self.next_index = (self.next_index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self) -> float:
+        return self.prices[self.next_index - 1]
+
+    def clear(self):
+        self.next_index = 0
+        self.count = 0
+
+    def views(self) -> Tuple[memoryview, memoryview]:
+        """Returns the prices from the oldest to the latest as two views of the buffer"""
+        buffer = memoryview(self.prices)
+        if self.count < self.capacity:
+            return (buffer[:self.count], buffer[:0])
+        return (buffer[self.next_index:], buffer[:self.next_index])
+
+    def __iter__(self) -> Iterator[float]:
+        for view in self.views():
+            yield from view
+
+
+class ABRSampler:
+    """
+    Records one index and mark price per market in every sampling slot of an epoch.
+
+    The first tick of a slot is recorded. Slots without a tick repeat the previous sample, so
+    every window reduced by ABRCalculations still covers the same length of time.
+    """
+
+    def __init__(self, market_ids: List[int], epoch_start: int, abr_interval: int = ABR_INTERVAL, samples_per_epoch: int = SAMPLES_PER_EPOCH):
+        self.samples_per_epoch = samples_per_epoch
+        self.sample_interval = abr_interval // samples_per_epoch
+        self.epoch_start = epoch_start
+        self.index_prices = {market_id: PriceRing(samples_per_epoch) for market_id in market_ids}
+        self.mark_prices = {market_id: PriceRing(samples_per_epoch) for market_id in market_ids}
+        # Slot of the latest sample of every market
+        self.last_slot = {}
+
+    def record(self, market_id: int, index_price: float, mark_price: float, timestamp: int) -> bool:
+        """Records a tick; returns False if its slot already has a sample"""
+        slot = (timestamp - self.epoch_start) // self.sample_interval
+        last_slot = self.last_slot.get(market_id)
+        if slot < 0 or (last_slot is not None and slot <= last_slot):
+            return False
+
+        index_ring = self.index_prices[market_id]
+        mark_ring = self.mark_prices[market_id]
+        if last_slot is not None:
+            # Fill the skipped slots, at most a whole ring
+            missed_slots = min(slot - last_slot - 1, self.samples_per_epoch)
+            (last_index_price, last_mark_price) = (index_ring.last(), mark_ring.last())
+            for _ in range(missed_slots):
+                index_ring.append(last_index_price)
+                mark_ring.append(last_mark_price)
+
+        index_ring.append(index_price)
+        mark_ring.append(mark_price)
+        self.last_slot[market_id] = slot
+        return True
+
+    def is_ready(self, market_id: int) -> bool:
+        return len(self.mark_prices[market_id]) == self.samples_per_epoch
+
+    def get_prices(self, market_id: int) -> Tuple[List[float], List[float]]:
+        """Returns the (index, mark) prices of a market, as passed to calculate_abr"""
+        return (list(self.index_prices[market_id]), list(self.mark_prices[market_id]))
+
+    def get_prices_64x61(self, market_id: int) -> Tuple[List[int], List[int]]:
+        """Returns the (index, mark) prices of a market in 64x61, converted straight from the buffers"""
+        return (self.__convert_ring(self.index_prices[market_id]), self.__convert_ring(self.mark_prices[market_id]))
+
+    def build_set_abr_value_calldata(self, market_id: int) -> List[int]:
+        """Returns the calldata of ABRCore.set_abr_value for a market"""
+        (index_64x61, mark_64x61) = self.get_prices_64x61(market_id)
+        return [market_id, len(index_64x61), *index_64x61, len(mark_64x61), *mark_64x61]
+
+    def close_epoch(self, next_epoch_start: int) -> Dict[int, List[int]]:
+        """Returns the set_abr_value calldata of every market with a full epoch and starts the next epoch"""
+        calldata = {
+            market_id: self.build_set_abr_value_calldata(market_id)
+            for market_id in self.mark_prices if self.is_ready(market_id)
+        }
+        for market_id in self.mark_prices:
+            self.index_prices[market_id].clear()
+            self.mark_prices[market_id].clear()
+        self.last_slot = {}
+        self.epoch_start = next_epoch_start
+        return calldata
+
+    @staticmethod
+    def __convert_ring(ring: PriceRing) -> List[int]:
+        (oldest, latest) = ring.views()
+        return to64x61_array(oldest) + to64x61_array(latest)
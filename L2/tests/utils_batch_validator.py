@@ -0,0 +1,355 @@
+"""Predicts the error Trading.execute_batch reverts with before a batch is submitted.
+
+The checks of Trading are run in the same order against the python User and OrderExecutor,
+which act as a cached view of the accounts and markets, so a node can drop the orders that
+would revert a batch without sending a transaction. Error codes and order ids match the
+contract; params computed on-chain (execution price, balances) are rounded 64x61 values.
+Orders of a user that appears more than once in a batch are checked against the same state.
+"""
+
+import copy
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from utils import PRIME, to64x61, hash_order
+from utils_markets import calculate_tick_and_step_precision
+from utils_order_book import Batch, MAX_SLIPPAGE
+from utils_trading import User, OrderExecutor, order_types, order_direction, order_time_in_force, order_side, side, market_to_collateral_mapping
+
+# Errors of the taker that can be fixed by removing makers from the batch
+TRIMMABLE_TAKER_ERRORS = (501, 506, 507, 508, 531, 532)
+
+# Fields of an order hashed by Trading to detect order_id collisions
+ORDER_HASH_FIELDS = ["order_id", "market_id", "direction", "price", "quantity", "leverage",
+                     "slippage", "order_type", "time_in_force", "post_only", "side", "liquidator_address"]
+
+
+@dataclass
+class BatchError:
+    code: int
+    order_id: int
+    param: int = 0
+
+    def to_message(self) -> str:
+        """Returns the error message of the revert, in the format of Trading"""
+        return f"{self.code}: {self.order_id} {self.param % PRIME}"
+
+
+@dataclass
+class Prediction:
+    # Error the batch reverts with; None if it is executed
+    error: Optional[BatchError] = None
+    # Index of the order the error was raised for, -1 for errors of the batch
+    failed_index: int = -1
+    # Makers rejected by Trading without reverting the batch, by index
+    skipped: Dict[int, BatchError] = field(default_factory=dict)
+    # Quantity executed by every maker that is filled, by index
+    fills: Dict[int, float] = field(default_factory=dict)
+    execution_price: float = 0
+
+    @property
+    def reverts(self) -> bool:
+        return self.error is not None
+
+    @property
+    def quantity_executed(self) -> float:
+        return sum(self.fills.values())
+
+
+class BatchValidator:
+    """
+    Validates batches against the state held by an OrderExecutor and the Users of the batch.
+
+    order_hashes maps the order ids already seen by Trading to their hash; orders are added
+    with record_order_hashes once their batch is executed.
+    """
+
+    def __init__(self, executor: OrderExecutor, order_hashes: Dict[int, int] = None, collateral_precision: int = 6):
+        self.executor = executor
+        self.order_hashes = order_hashes if order_hashes is not None else {}
+        self.collateral_precision = collateral_precision
+
+    def validate(self, batch: Batch, timestamp: int = 0) -> Prediction:
+        """Returns the outcome of Trading.execute_batch for the batch"""
+        prediction = Prediction()
+        taker_index = len(batch.orders) - 1
+        market = self.__get_market(batch.market_id)
+        step_precision = market.get("step_precision", 0)
+
+        if self.executor.get_batch_id_status(batch.batch_id):
+            return self.__revert(prediction, BatchError(525, batch.batch_id))
+        if not market.get("is_tradable"):
+            return self.__revert(prediction, BatchError(509, batch.market_id))
+        if round(batch.quantity_locked, step_precision) == 0:
+            return self.__revert(prediction, BatchError(522, batch.market_id))
+
+        (taker, _) = batch.orders[taker_index]
+        (taker_locked, error_code, error_param) = self.__get_quantity_to_execute(
+            taker, batch.users[taker_index], batch.quantity_locked, batch.market_id, market)
+        if error_code:
+            return self.__revert(prediction, BatchError(error_code, taker["order_id"], error_param), taker_index)
+
+        # Trading sets the oracle price of the market before the margin of any order is checked
+        prices = copy.copy(self.executor)
+        prices.market_prices = dict(self.executor.market_prices)
+        prices.set_market_price(batch.market_id, batch.oracle_price, timestamp)
+
+        (maker1, _) = batch.orders[0]
+        first_error = None
+        quantity_executed = 0
+        total_order_volume = 0
+
+        for (index, ((order, order_64x61), user)) in enumerate(zip(batch.orders, batch.users)):
+            is_taker = index == taker_index
+            error = self.__check_order(order, order_64x61, user, batch.market_id, market)
+
+            if error is not None and is_taker:
+                # The first error of a maker is reported if none of the makers were executed
+                if first_error is not None and (error.code == 510 or round(quantity_executed, step_precision) == 0):
+                    return self.__revert(prediction, first_error, min(prediction.skipped))
+                return self.__revert(prediction, error, index)
+
+            if error is None and is_taker:
+                if round(quantity_executed, step_precision) == 0:
+                    if first_error is None:
+                        return self.__revert(prediction, BatchError(0, 0), index)
+                    return self.__revert(prediction, first_error, min(prediction.skipped))
+                execution_price = total_order_volume / quantity_executed
+                prediction.execution_price = execution_price
+                error = self.__check_taker(order, order_64x61, index, maker1, quantity_executed,
+                                           execution_price, batch.oracle_price, market)
+                if error is None:
+                    error = self.__check_execution(order, user, quantity_executed, execution_price,
+                                                   batch.oracle_price, order_side["taker"], market, prices, timestamp)
+                if error is not None:
+                    return self.__revert(prediction, error, index)
+                continue
+
+            if error is None:
+                (quantity, error_code, error_param) = self.__get_quantity_to_execute(
+                    order, user, taker_locked - quantity_executed, batch.market_id, market)
+                if error_code:
+                    error = BatchError(error_code, order["order_id"], error_param)
+                elif not self.__is_valid_maker(maker1, order):
+                    error = BatchError(512, order["order_id"], order["direction"])
+                elif order["order_type"] != order_types["limit"]:
+                    error = BatchError(518, order["order_id"], index)
+                else:
+                    error = self.__check_execution(order, user, quantity, order["price"], batch.oracle_price,
+                                                   order_side["maker"], market, prices, timestamp)
+
+            if error is not None:
+                prediction.skipped[index] = error
+                if first_error is None:
+                    first_error = error
+                continue
+
+            prediction.fills[index] = quantity
+            quantity_executed += quantity
+            total_order_volume += quantity * order["price"]
+
+        return prediction
+
+    def trim(self, batch: Batch, timestamp: int = 0) -> Optional[Batch]:
+        """
+        Returns a batch without the makers Trading would skip, with the makers that cause a revert
+        of the taker removed, worst price first. Returns None if the taker cannot be executed.
+        """
+        candidate = batch
+        while True:
+            prediction = self.validate(candidate, timestamp)
+            taker_index = len(candidate.orders) - 1
+            if not prediction.reverts:
+                return self.__keep_makers(candidate, prediction.fills)
+
+            if prediction.failed_index != taker_index or prediction.error.code not in TRIMMABLE_TAKER_ERRORS:
+                return None
+            if len(prediction.fills) <= 1:
+                return None
+
+            (taker, _) = candidate.orders[taker_index]
+            fills = dict(prediction.fills)
+            del fills[self.__worst_maker(candidate, fills, taker)]
+            candidate = self.__keep_makers(candidate, fills)
+
+    def record_order_hashes(self, batch: Batch):
+        """Stores the hash of every order of an executed batch, as Trading does"""
+        for (_, order_64x61) in batch.orders:
+            self.order_hashes.setdefault(order_64x61["order_id"], self.__get_order_hash(order_64x61))
+
+    def __revert(self, prediction: Prediction, error: BatchError, failed_index: int = -1) -> Prediction:
+        prediction.error = error
+        prediction.failed_index = failed_index
+        return prediction
+
+    def __get_market(self, market_id: int) -> Dict:
+        # Trading compares prices and sizes at the precisions Markets derives from the tick and step sizes
+        market = dict(self.executor.get_market_details(market_id))
+        if market:
+            (market["tick_precision"], market["step_precision"]) = calculate_tick_and_step_precision(
+                market["tick_size"], market["step_size"])
+        return market
+
+    def __get_order_hash(self, order_64x61: Dict) -> int:
+        return hash_order([order_64x61[key] for key in ORDER_HASH_FIELDS])
+
+    def __get_collateral_id(self, market_id: int, market: Dict) -> int:
+        return market.get("asset_collateral", market_to_collateral_mapping.get(market_id))
+
+    def __check_order(self, order: Dict, order_64x61: Dict, user: User, market_id: int, market: Dict) -> Optional[BatchError]:
+        # Checks run by Trading for every order of the batch, in the same order
+        step_precision = market.get("step_precision", 0)
+        order_id = order["order_id"]
+
+        if not user.is_registered:
+            return BatchError(510, order_id, order["user_address"])
+        if round(order["quantity"], step_precision) < round(market["minimum_order_size"], step_precision):
+            return BatchError(505, order_id, order_64x61["quantity"])
+        if order["market_id"] != market_id:
+            return BatchError(504, order_id, order["market_id"])
+        if round(order["leverage"], step_precision) < 1:
+            return BatchError(503, order_id, order_64x61["leverage"])
+        if round(order["leverage"], step_precision) > round(market["currently_allowed_leverage"], step_precision):
+            return BatchError(502, order_id, order_64x61["leverage"])
+
+        # Hashing is slow, so only orders that were seen before are hashed
+        if order_id in self.order_hashes:
+            order_hash = self.__get_order_hash(order_64x61)
+            if order_hash != self.order_hashes[order_id]:
+                return BatchError(525, order_id, order_hash)
+        return None
+
+    def __get_quantity_to_execute(self, order: Dict, user: User, quantity_remaining: float, market_id: int, market: Dict) -> Tuple[float, int, int]:
+        # Returns (quantity_to_execute, error_code, error_param) like get_quantity_to_execute in Trading
+        step_precision = market.get("step_precision", 0)
+        executable_quantity = order["quantity"] - user.get_portion_executed(order["order_id"])
+        if round(executable_quantity, step_precision) == 0:
+            return (0, 533, 0)
+
+        quantity_to_execute = min(executable_quantity, quantity_remaining)
+        if round(quantity_to_execute, step_precision) == 0:
+            return (0, 523, 0)
+        if order["side"] == side["buy"]:
+            return (quantity_to_execute, 0, 0)
+
+        if order["order_type"] >= order_types["liquidation"]:
+            liquidatable_position = user.get_deleveragable_or_liquidatable_position(
+                collateral_id=self.__get_collateral_id(market_id, market))
+            if liquidatable_position["market_id"] != market_id:
+                return (0, 528, market_id)
+            if liquidatable_position["direction"] != order["direction"]:
+                return (0, 529, order["direction"])
+            quantity_to_execute = min(quantity_to_execute, liquidatable_position["amount_to_be_sold"])
+        else:
+            position = user.get_position(market_id=market_id, direction=order["direction"])
+            quantity_to_execute = min(quantity_to_execute, position["position_size"])
+
+        if round(quantity_to_execute, step_precision) == 0:
+            return (0, 524, 0)
+        return (quantity_to_execute, 0, 0)
+
+    def __is_valid_maker(self, maker1: Dict, order: Dict) -> bool:
+        same_direction = order["direction"] == maker1["direction"]
+        same_side = order["side"] == maker1["side"]
+        return same_direction == same_side
+
+    def __check_taker(self, order: Dict, order_64x61: Dict, index: int, maker1: Dict, quantity_executed: float, execution_price: float, oracle_price: float, market: Dict) -> Optional[BatchError]:
+        order_id = order["order_id"]
+        tick_precision = market.get("tick_precision", 0)
+
+        if self.__is_valid_maker(maker1, order):
+            return BatchError(511, order_id, order["direction"])
+        if order["post_only"]:
+            return BatchError(515, order_id, index)
+        if order["time_in_force"] == order_time_in_force["fill_or_kill"]:
+            is_filled = round(order["quantity"] - quantity_executed, market.get("step_precision", 0)) == 0
+            if not is_filled or order["order_type"] != order_types["limit"]:
+                return BatchError(516, order_id, to64x61(quantity_executed))
+
+        is_bid = order["direction"] == order["side"]
+        if order["order_type"] == order_types["limit"]:
+            execution_price_rounded = round(execution_price, tick_precision)
+            price = round(order["price"], tick_precision)
+            if is_bid and execution_price_rounded > price:
+                return BatchError(508, order_id, to64x61(execution_price))
+            if not is_bid and execution_price_rounded < price:
+                return BatchError(507, order_id, to64x61(execution_price))
+            return None
+
+        if not 0 < order["slippage"] <= MAX_SLIPPAGE:
+            return BatchError(521, order_id, order_64x61["slippage"])
+        threshold = order["slippage"] / 100.0 * oracle_price
+        if is_bid:
+            is_error = round(execution_price, tick_precision) > round(oracle_price + threshold, tick_precision)
+        else:
+            is_error = round(oracle_price - threshold, tick_precision) > round(execution_price, tick_precision)
+        if is_error:
+            return BatchError(506, order_id, to64x61(execution_price))
+        return None
+
+    def __check_execution(self, order: Dict, user: User, quantity: float, execution_price: float, oracle_price: float, trade_side: int, market: Dict, prices: OrderExecutor, timestamp: int) -> Optional[BatchError]:
+        # Margin checks of process_open_orders and process_close_orders
+        precision = self.collateral_precision
+        collateral_id = self.__get_collateral_id(order["market_id"], market)
+        order_id = order["order_id"]
+
+        if order["side"] == side["buy"]:
+            leveraged_order_value = quantity * execution_price
+            margin_order_value = leveraged_order_value / order["leverage"]
+            fee_rate = self.executor.maker_trading_fees if trade_side == order_side["maker"] else self.executor.taker_trading_fees
+            fees = fee_rate * leveraged_order_value
+            maintenance_requirement = market.get("maintenance_margin_fraction", 0) * leveraged_order_value
+
+            (is_liquidation, _, available_margin, _, _, _, _, _) = user.get_margin_info(
+                order_executor=prices, timestamp=timestamp, asset_id=collateral_id,
+                new_position_maintanence_requirement=maintenance_requirement, new_position_margin=margin_order_value)
+
+            # A short limit order opened below the oracle price starts with a loss
+            if not is_liquidation and order["direction"] == order_direction["short"] and order["order_type"] == order_types["limit"]:
+                opposite_order_pnl = (oracle_price - execution_price) * quantity
+                is_liquidation = round(available_margin, precision) <= round(opposite_order_pnl, precision)
+            if is_liquidation:
+                return BatchError(531, order_id, order["market_id"])
+            if round(fees, precision) > round(available_margin, precision):
+                return BatchError(501, order_id, order["market_id"])
+            return None
+
+        position = user.get_position(market_id=order["market_id"], direction=order["direction"])
+        if position["position_size"] == 0:
+            return None
+        if order["direction"] == order_direction["long"]:
+            diff = execution_price - position["avg_execution_price"]
+        else:
+            diff = position["avg_execution_price"] - execution_price
+        margin_plus_pnl = position["margin_amount"] * quantity / position["position_size"] + quantity * diff
+
+        unused_balance = user.get_unused_balance(collateral_id)
+        if round(margin_plus_pnl, precision) <= 0 and order["order_type"] == order_types["limit"]:
+            if round(-margin_plus_pnl, precision) > round(unused_balance, precision):
+                return BatchError(532, order_id, to64x61(unused_balance))
+
+        if order["order_type"] >= order_types["liquidation"]:
+            liquidatable_position = user.get_deleveragable_or_liquidatable_position(collateral_id=collateral_id)
+            if order["order_type"] == order_types["deleverage"] and liquidatable_position["liquidatable"]:
+                return BatchError(526, order_id, to64x61(quantity))
+            if order["order_type"] == order_types["liquidation"] and not liquidatable_position["liquidatable"]:
+                return BatchError(527, order_id, to64x61(quantity))
+        return None
+
+    def __worst_maker(self, batch: Batch, fills: Dict[int, float], taker: Dict) -> int:
+        # The maker with the highest price for a bid taker, the lowest for an ask taker
+        sign = 1 if taker["direction"] == taker["side"] else -1
+        return max(fills, key=lambda index: (sign * batch.orders[index][0]["price"], index))
+
+    def __keep_makers(self, batch: Batch, fills: Dict[int, float]) -> Batch:
+        # Keeps the given makers and the taker, locking the quantity the makers fill
+        taker_index = len(batch.orders) - 1
+        indexes = sorted(fills) + [taker_index]
+        step_precision = self.__get_market(batch.market_id).get("step_precision", 0)
+        return Batch(
+            batch_id=batch.batch_id,
+            market_id=batch.market_id,
+            quantity_locked=round(sum(fills.values()), step_precision),
+            oracle_price=batch.oracle_price,
+            orders=[batch.orders[index] for index in indexes],
+            users=[batch.users[index] for index in indexes],
+        )
@@ -0,0 +1,25 @@
+"""Utilities for dealing with leaderboards in tests."""
+
+
+def compute_leaderboard_delta(previous, current):
+    """Computes the rows to pass to Leaderboard.set_leaderboard_delta.
+
+    previous and current are lists of (user_address, reward) tuples of the same length, ordered
+    by rank. Returns the (index, user_address, reward) tuples of the rows that changed.
+    """
+    if len(previous) != len(current):
+        raise ValueError("A full leaderboard is required when the number of rows changes")
+
+    return [
+        (index, row[0], row[1])
+        for index, row in enumerate(current)
+        if tuple(row) != tuple(previous[index])
+    ]
+
+
+def flatten_leaderboard_delta(delta):
+    """Converts a delta from compute_leaderboard_delta into LeaderboardDelta* calldata."""
+    calldata = [len(delta)]
+    for row in delta:
+        calldata.extend(row)
+    return calldata
@@ -5,6 +5,9 @@ from utils import str_to_felt;
 DEFAULT_LINK_1 = "https://ipfs.io/ipfs/Qme7ss3ARVgxv6rXqVPiikMJ8u2NLgmgszg13pYrDKEoiu"
 DEFAULT_LINK_2 = "https://ipfs.io/ipfs/Qme7ss3ARVgxv6rXqVPZkxBrandNewMetadataLinksfaf"
 
+# Number of characters StringLib packs in a felt
+SHORT_STRING_MAX_LEN = 31
+
 def prepare_starknet_string(string):
     return [len(string)] + encode_characters(string)
 
@@ -12,4 +15,26 @@ def encode_characters(string):
     result = []
     for c in string:
         result.append(str_to_felt(c))
-    return result
\ No newline at end of file
+    return result
+
+def decode_characters(chars):
+    return bytes(chars).decode('utf8', 'strict')
+
+def encode_packed_string(string):
+    """Packs a string in felts of 31 characters, the way StringLib stores it"""
+    b_string = string.encode('utf8', 'strict')
+    return [
+        int.from_bytes(b_string[i:i + SHORT_STRING_MAX_LEN], "big")
+        for i in range(0, len(b_string), SHORT_STRING_MAX_LEN)
+    ]
+
+def decode_packed_string(string_len, packed_string):
+    """Inverse of encode_packed_string, string_len being the number of characters"""
+    b_string = b""
+    for i, word in enumerate(packed_string):
+        word_len = min(SHORT_STRING_MAX_LEN, string_len - i * SHORT_STRING_MAX_LEN)
+        b_string += word.to_bytes(word_len, "big")
+    return b_string.decode('utf8', 'strict')
+
+def get_packed_len(string_len):
+    return (string_len + SHORT_STRING_MAX_LEN - 1) // SHORT_STRING_MAX_LEN
@@ -1,10 +1,20 @@
 """Utilities for dealing with markets in tests."""
 
+import math
 from utils_links import prepare_starknet_string
 from dataclasses import dataclass
+from typing import Tuple
 from utils import from64x61
 
 
+# Precisions of the tick and step sizes in 64x61, as computed by the Markets contract
+def calculate_tick_and_step_precision(tick_size: int, step_size: int) -> Tuple[int, int]:
+    def precision(size: int) -> int:
+        return math.floor(abs(math.log10(from64x61(size))) + 0.5)
+
+    return (precision(tick_size), precision(step_size))
+
+
 @dataclass
 class MarketProperties:
     id: int
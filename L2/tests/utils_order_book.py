@@ -0,0 +1,234 @@
+"""Price-time priority order book that matches User.create_order orders into execute_batch batches.
+
+Resting orders are makers and every incoming order that crosses the book is the taker of the
+batches it produces, following the rules Trading.execute_batch applies to a batch.
+"""
+
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from starkware.starknet.testing.contract import StarknetContract
+from utils import Signer, to64x61, from64x61
+from utils_markets import MarketProperties, calculate_tick_and_step_precision
+from utils_trading import User, OrderExecutor, order_types, order_time_in_force, random_string, execute_batch
+
+# Trading rejects takers with a higher slippage
+MAX_SLIPPAGE = 15
+
+
+@dataclass
+class Batch:
+    batch_id: int
+    market_id: int
+    quantity_locked: float
+    oracle_price: float
+    # Orders in the format of User.create_order, makers first and the taker last
+    orders: List[Tuple[Dict, Dict]] = field(default_factory=list)
+    users: List[User] = field(default_factory=list)
+
+    def to_calldata(self) -> List[int]:
+        """Returns the calldata of Trading.execute_batch"""
+        calldata = [
+            self.batch_id,
+            to64x61(self.quantity_locked),
+            self.market_id,
+            to64x61(self.oracle_price),
+            len(self.orders),
+        ]
+        for (_, order_64x61) in self.orders:
+            calldata += order_64x61.values()
+        return calldata
+
+    def to_executor_params(self, timestamp: int = 0) -> List:
+        """Returns the arguments of OrderExecutor.execute_batch"""
+        return [
+            self.batch_id,
+            [order for (order, _) in self.orders],
+            self.users,
+            self.quantity_locked,
+            self.market_id,
+            self.oracle_price,
+            timestamp,
+        ]
+
+    async def execute(self, zkx_node_signer: Signer, zkx_node: StarknetContract, trading: StarknetContract, executor: OrderExecutor, timestamp: int = 0):
+        execution_info = await execute_batch(zkx_node_signer=zkx_node_signer, zkx_node=zkx_node, trading=trading, execute_batch_params=self.to_calldata())
+        executor.execute_batch(*self.to_executor_params(timestamp))
+        return execution_info
+
+
+@dataclass
+class RestingOrder:
+    user: User
+    order: Dict
+    order_64x61: Dict
+    remaining: float
+    sequence: int
+
+
+class OrderBook:
+    """
+    Order book of a single market.
+
+    Long buy and short sell orders are bids and pay at most their price; short buy and long sell
+    orders are asks and receive at least their price, matching check_limit_price in Trading.
+    Every resting order is a heap entry, so the best order is found in O(log n).
+    """
+
+    def __init__(self, market_id: int, tick_precision: int = 0, step_precision: int = 0, minimum_order_size: float = 0, max_makers_per_batch: int = 10):
+        self.market_id = market_id
+        self.tick_precision = tick_precision
+        self.step_precision = step_precision
+        self.minimum_order_size = minimum_order_size
+        self.max_makers_per_batch = max_makers_per_batch
+        # (price key, sequence, order_id); the price key of bids is negated
+        self.bids = []
+        self.asks = []
+        self.resting = {}
+        self.sequence = itertools.count()
+
+    @classmethod
+    def from_market_properties(cls, market: MarketProperties, max_makers_per_batch: int = 10) -> "OrderBook":
+        (tick_precision, step_precision) = calculate_tick_and_step_precision(market.tick_size, market.step_size)
+        return cls(market.id, tick_precision, step_precision,
+                   from64x61(market.minimum_order_size), max_makers_per_batch)
+
+    @staticmethod
+    def is_bid(order: Dict) -> bool:
+        return order["direction"] == order["side"]
+
+    def best_bid(self) -> float:
+        return self.__best(self.bids, -1)
+
+    def best_ask(self) -> float:
+        return self.__best(self.asks, 1)
+
+    def cancel(self, order_id: int):
+        # Heap entries of cancelled orders are dropped when they reach the top
+        self.resting.pop(order_id, None)
+
+    def submit(self, user: User, order: Tuple[Dict, Dict], oracle_price: float) -> List[Batch]:
+        """
+        Matches an order returned by User.create_order against the book.
+        Returns the batches it fills, which are empty if the order rests or is rejected.
+        """
+        (order_python, order_64x61) = order
+        quantity = round(order_python["quantity"], self.step_precision)
+        if order_python["market_id"] != self.market_id or quantity < self.minimum_order_size:
+            return []
+
+        is_bid = self.is_bid(order_python)
+        limit_price = self.__get_limit_price(order_python, oracle_price)
+        if limit_price is None:
+            return []
+
+        opposite = self.asks if is_bid else self.bids
+        crosses = self.__crosses(opposite, is_bid, limit_price)
+        if order_python["post_only"]:
+            if crosses:
+                return []
+            self.__rest(user, order_python, order_64x61, quantity)
+            return []
+
+        fills = self.__match(opposite, is_bid, limit_price, quantity)
+        filled = round(sum(fill for (_, fill) in fills), self.step_precision)
+        if order_python["time_in_force"] == order_time_in_force["fill_or_kill"]:
+            # Trading checks a fill or kill taker is filled completely within a single batch
+            if filled != quantity or len(fills) > self.max_makers_per_batch:
+                self.__restore(opposite, [resting for (resting, _) in fills])
+                return []
+
+        batches = self.__create_batches(user, order, fills, oracle_price)
+        self.__apply_fills(opposite, fills)
+
+        remaining = round(quantity - filled, self.step_precision)
+        if remaining > 0 and order_python["order_type"] == order_types["limit"] and order_python["time_in_force"] == order_time_in_force["good_till_time"]:
+            self.__rest(user, order_python, order_64x61, remaining)
+        return batches
+
+    def __best(self, heap: List, sign: int) -> float:
+        self.__drop_cancelled(heap)
+        if not heap:
+            return 0
+        return sign * heap[0][0]
+
+    def __drop_cancelled(self, heap: List):
+        while heap and heap[0][2] not in self.resting:
+            heapq.heappop(heap)
+
+    def __get_limit_price(self, order: Dict, oracle_price: float) -> float:
+        if order["order_type"] == order_types["limit"]:
+            return round(order["price"], self.tick_precision)
+        if order["order_type"] != order_types["market"] or not 0 < order["slippage"] <= MAX_SLIPPAGE:
+            return None
+        # Trading only accepts fill or kill takers that are limit orders
+        if order["time_in_force"] == order_time_in_force["fill_or_kill"]:
+            return None
+
+        # Bounding every fill keeps the average execution price within the slippage too
+        threshold = order["slippage"] / 100.0 * oracle_price
+        if self.is_bid(order):
+            return oracle_price + threshold
+        return oracle_price - threshold
+
+    def __crosses(self, opposite: List, is_bid: bool, limit_price: float) -> bool:
+        best_price = self.__best(opposite, 1 if is_bid else -1)
+        if not opposite:
+            return False
+        if is_bid:
+            return best_price <= limit_price
+        return best_price >= limit_price
+
+    def __match(self, opposite: List, is_bid: bool, limit_price: float, quantity: float) -> List[Tuple[RestingOrder, float]]:
+        # Pops the makers that fill the order in price-time priority
+        fills = []
+        remaining = quantity
+        while remaining > 0 and self.__crosses(opposite, is_bid, limit_price):
+            (_, _, order_id) = heapq.heappop(opposite)
+            resting = self.resting[order_id]
+            fill = round(min(remaining, resting.remaining), self.step_precision)
+            fills.append((resting, fill))
+            remaining = round(remaining - fill, self.step_precision)
+        return fills
+
+    def __restore(self, opposite: List, resting_orders: List[RestingOrder]):
+        for resting in resting_orders:
+            heapq.heappush(opposite, self.__heap_entry(resting))
+
+    def __apply_fills(self, opposite: List, fills: List[Tuple[RestingOrder, float]]):
+        for (resting, fill) in fills:
+            resting.remaining = round(resting.remaining - fill, self.step_precision)
+            if resting.remaining > 0:
+                # A partially filled maker keeps its time priority
+                heapq.heappush(opposite, self.__heap_entry(resting))
+            else:
+                del self.resting[resting.order["order_id"]]
+
+    def __create_batches(self, user: User, order: Tuple[Dict, Dict], fills: List[Tuple[RestingOrder, float]], oracle_price: float) -> List[Batch]:
+        # The taker is repeated in every batch; Trading tracks the portion of it already executed
+        batches = []
+        for start in range(0, len(fills), self.max_makers_per_batch):
+            batch_fills = fills[start:start + self.max_makers_per_batch]
+            batch = Batch(
+                batch_id=random_string(10),
+                market_id=self.market_id,
+                quantity_locked=round(sum(fill for (_, fill) in batch_fills), self.step_precision),
+                oracle_price=oracle_price,
+            )
+            for (resting, _) in batch_fills:
+                batch.orders.append((resting.order, resting.order_64x61))
+                batch.users.append(resting.user)
+            batch.orders.append(order)
+            batch.users.append(user)
+            batches.append(batch)
+        return batches
+
+    def __rest(self, user: User, order: Dict, order_64x61: Dict, remaining: float):
+        resting = RestingOrder(user, order, order_64x61, remaining, next(self.sequence))
+        self.resting[order["order_id"]] = resting
+        heapq.heappush(self.bids if self.is_bid(order) else self.asks, self.__heap_entry(resting))
+
+    def __heap_entry(self, resting: RestingOrder) -> Tuple[float, int, int]:
+        price = round(resting.order["price"], self.tick_precision)
+        return (-price if self.is_bid(resting.order) else price, resting.sequence, resting.order["order_id"])
@@ -0,0 +1,244 @@
+"""Aggregates streamed oracle prices into MarketPrices updates and execute_batch oracle prices.
+
+Price sources (a file or a socket standing in for the oracles of the ZKX Nodes) push samples
+into a bounded queue, so a slow consumer makes the sources wait instead of buffering without
+limit. Every market keeps a bounded window of samples sorted by price, from which the median
+and trimmed mean are read without sorting again, and samples older than the ttl of the market
+are dropped as MarketPrices would ignore them, whichever source they came from.
+"""
+
+import asyncio
+import bisect
+import heapq
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from starkware.starknet.testing.contract import StarknetContract
+from utils import to64x61_array
+
+AGGREGATES = ("median", "trimmed_mean")
+
+
+@dataclass
+class PriceSample:
+    market_id: int
+    price: float
+    timestamp: int
+    source: int = 0
+
+
+class PriceWindow:
+    """The latest samples of a market, kept both in a heap by timestamp and sorted by price"""
+
+    def __init__(self, max_samples: int):
+        self.max_samples = max_samples
+        # (timestamp, arrival, price) of every sample; sources interleave, so arrival order is not timestamp order
+        self.samples = []
+        self.arrivals = 0
+        self.sorted_prices = []
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add(self, sample: PriceSample):
+        entry = (sample.timestamp, self.arrivals, sample.price)
+        self.arrivals += 1
+        if len(self.samples) == self.max_samples:
+            # A full window keeps the freshest samples, so a sample older than all of them is dropped
+            if entry < self.samples[0]:
+                return
+            self.__remove_price(heapq.heapreplace(self.samples, entry)[2])
+        else:
+            heapq.heappush(self.samples, entry)
+        bisect.insort(self.sorted_prices, sample.price)
+        self.total += sample.price
+
+    def expire(self, oldest_timestamp: int):
+        while self.samples and self.samples[0][0] < oldest_timestamp:
+            self.__remove_price(heapq.heappop(self.samples)[2])
+
+    def median(self) -> Optional[float]:
+        count = len(self.sorted_prices)
+        if count == 0:
+            return None
+        middle = count // 2
+        if count % 2:
+            return self.sorted_prices[middle]
+        return (self.sorted_prices[middle - 1] + self.sorted_prices[middle]) / 2
+
+    def trimmed_mean(self, trim_fraction: float) -> Optional[float]:
+        count = len(self.sorted_prices)
+        trimmed = int(count * trim_fraction)
+        if count - 2 * trimmed <= 0:
+            return self.median()
+        # Only the trimmed ends are summed; the total of the window is kept up to date
+        total = self.total - sum(self.sorted_prices[:trimmed]) - sum(self.sorted_prices[count - trimmed:])
+        return total / (count - 2 * trimmed)
+
+    def __remove_price(self, price: float):
+        del self.sorted_prices[bisect.bisect_left(self.sorted_prices, price)]
+        self.total -= price
+
+
+class OraclePriceAggregator:
+    """
+    Aggregates the samples of every market within its ttl.
+
+    ttls maps market ids to the ttl returned by Markets.get_ttl_from_market; samples of other
+    markets are ignored. clock returns the current time in seconds.
+    """
+
+    def __init__(self, ttls: Dict[int, int], max_samples: int = 64, aggregate: str = "median", trim_fraction: float = 0.1, min_samples: int = 1, clock: Callable[[], int] = lambda: int(time.time())):
+        assert aggregate in AGGREGATES, "Invalid aggregate"
+        assert 0 <= trim_fraction < 0.5, "Invalid trim_fraction"
+        self.ttls = ttls
+        self.aggregate = aggregate
+        self.trim_fraction = trim_fraction
+        self.min_samples = min_samples
+        self.clock = clock
+        self.windows = {market_id: PriceWindow(max_samples) for market_id in ttls}
+        # (price, timestamp) last sent to MarketPrices for every market
+        self.published = {}
+
+    def add(self, sample: PriceSample):
+        window = self.windows.get(sample.market_id)
+        if window is not None and sample.price > 0:
+            window.add(sample)
+
+    def get_price(self, market_id: int, now: int = None) -> Optional[float]:
+        """Returns the aggregated price of a market, None if it has too few samples within its ttl"""
+        now = self.clock() if now is None else now
+        window = self.windows[market_id]
+        window.expire(now - self.ttls[market_id])
+        if len(window) < self.min_samples:
+            return None
+        if self.aggregate == "median":
+            return window.median()
+        return window.trimmed_mean(self.trim_fraction)
+
+    def get_oracle_price(self, market_id: int, now: int = None) -> float:
+        """Returns the oracle_price of execute_batch for a market, 0 if it has no fresh price"""
+        price = self.get_price(market_id, now)
+        return 0 if price is None else price
+
+    def build_update_calldata(self, now: int = None, max_markets: int = None) -> List[int]:
+        """
+        Returns the calldata of MarketPrices.update_multiple_market_prices for the markets whose
+        price changed or is about to expire; an empty list if there is nothing to update.
+        """
+        now = self.clock() if now is None else now
+        prices = {market_id: self.get_price(market_id, now) for market_id in self.windows}
+        market_ids = [market_id for (market_id, price) in prices.items() if price is not None]
+        prices_64x61 = to64x61_array([prices[market_id] for market_id in market_ids])
+
+        updates = []
+        for (market_id, price_64x61) in zip(market_ids, prices_64x61):
+            (published_price, published_at) = self.published.get(market_id, (0, 0))
+            # An unchanged price is sent again before it expires in MarketPrices
+            if published_price == price_64x61 and now - published_at < self.ttls[market_id] // 2:
+                continue
+            updates.append((market_id, price_64x61))
+            if max_markets is not None and len(updates) == max_markets:
+                break
+
+        if not updates:
+            return []
+        calldata = [len(updates)]
+        for (market_id, price_64x61) in updates:
+            self.published[market_id] = (price_64x61, now)
+            calldata += [market_id, price_64x61]
+        return calldata
+
+
+class OraclePricePipeline:
+    """
+    Consumes price sources through a bounded queue and emits MarketPrices updates at a cadence.
+
+    emit is awaited with the calldata of every update; the next update is built only once it
+    returns, and the sources wait while the queue is full.
+    """
+
+    def __init__(self, aggregator: OraclePriceAggregator, emit: Callable[[List[int]], Awaitable], cadence: float = 1.0, max_queue_size: int = 1024, max_markets_per_update: int = None):
+        self.aggregator = aggregator
+        self.emit = emit
+        self.cadence = cadence
+        self.max_markets_per_update = max_markets_per_update
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self.updates_emitted = 0
+
+    async def feed(self, source: AsyncIterator[PriceSample]):
+        async for sample in source:
+            await self.queue.put(sample)
+
+    async def consume(self):
+        while True:
+            sample = await self.queue.get()
+            self.aggregator.add(sample)
+            self.queue.task_done()
+
+    async def publish(self, stopped: asyncio.Event):
+        # An update being emitted is never interrupted; the loop only stops between updates
+        while not stopped.is_set():
+            try:
+                await asyncio.wait_for(stopped.wait(), self.cadence)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    async def flush(self):
+        """Emits an update with the samples received so far"""
+        calldata = self.aggregator.build_update_calldata(max_markets=self.max_markets_per_update)
+        if calldata:
+            await self.emit(calldata)
+            self.updates_emitted += 1
+
+    async def run(self, sources: List[AsyncIterator[PriceSample]]):
+        """Runs until every source is exhausted, then emits a last update"""
+        stopped = asyncio.Event()
+        consumer = asyncio.ensure_future(self.consume())
+        publisher = asyncio.ensure_future(self.publish(stopped))
+        try:
+            await asyncio.gather(*[self.feed(source) for source in sources])
+            await self.queue.join()
+        finally:
+            stopped.set()
+            await publisher
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+        await self.flush()
+
+
+# Parse a "market_id,price,timestamp" line
+def parse_price_line(line: str, source: int = 0) -> Optional[PriceSample]:
+    fields = line.strip().split(",")
+    if len(fields) != 3:
+        return None
+    return PriceSample(int(fields[0]), float(fields[1]), int(fields[2]), source)
+
+
+# Stream the samples of a price file, one "market_id,price,timestamp" line each
+async def file_price_source(path: str, source: int = 0) -> AsyncIterator[PriceSample]:
+    with open(path) as price_file:
+        for line in price_file:
+            sample = parse_price_line(line, source)
+            if sample is not None:
+                yield sample
+            # Let the consumer run between lines
+            await asyncio.sleep(0)
+
+
+# Stream the samples sent over a socket in the format of file_price_source
+async def stream_price_source(reader: asyncio.StreamReader, source: int = 0) -> AsyncIterator[PriceSample]:
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        sample = parse_price_line(line.decode(), source)
+        if sample is not None:
+            yield sample
+
+
+# Get the ttl of every market from the Markets contract
+async def fetch_market_ttls(market: StarknetContract, market_ids: List[int]) -> Dict[int, int]:
+    results = await asyncio.gather(*[market.get_ttl_from_market(market_id).call() for market_id in market_ids])
+    return {market_id: result.result.ttl for (market_id, result) in zip(market_ids, results)}
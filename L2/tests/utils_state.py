@@ -0,0 +1,146 @@
+"""Reads and writes contract storage directly in the test StarknetState.
+
+Storage addresses are computed with get_storage_var_address and read in bulk, so comparing
+the python implementation with starknet does not need a view call per account, market or fund.
+"""
+
+import asyncio
+from typing import Dict, List, Tuple
+from starkware.starknet.public.abi import get_storage_var_address
+from starkware.starknet.testing.state import StarknetState
+from utils import from64x61, from64x61_array, to64x61, SCALE, PRIME
+
+# Layout of PackedPositionDetails; see contracts/libraries/PositionPacking.cairo
+HIGH_FIELD_BOUND = 2**121
+HIGH_FIELD_MODULUS = 2**122
+LOW_FIELD_BOUND = 2**127
+LOW_FIELD_MODULUS = 2**128
+LOW_FIELD_SHIFT = 2**128
+TIMESTAMP_SHIFT = 2**64
+
+# Storage vars of the fund contracts; FeeBalance keeps its own total per asset
+FUND_BALANCE_VAR = "FundLib_balance_by_id"
+FEE_BALANCE_VAR = "total_fee_per_asset"
+
+
+# Read a list of (contract_address, storage_address) pairs from the state
+async def read_storage(state: StarknetState, reads: List[Tuple[int, int]]) -> List[int]:
+    return await asyncio.gather(*[
+        state.state.get_storage_at(contract_address, key) for (contract_address, key) in reads
+    ])
+
+
+# Write values to consecutive slots of a storage var, starting at the slot of the given keys
+async def write_storage(state: StarknetState, contract_address: int, var_name: str, keys: List[int], values: List[int]):
+    base_key = get_storage_var_address(var_name, *keys)
+    for (offset, value) in enumerate(values):
+        await state.state.set_storage_at(contract_address, base_key + offset, value)
+
+
+# Decode a signed value stored in two's complement in a packed field
+def decode_field(value: int, bound: int, modulus: int) -> int:
+    if value >= bound:
+        return value - modulus
+    return value
+
+
+# Split a packed felt into its high and low 64x61 values
+def unpack_pair(packed: int) -> Tuple[int, int]:
+    high = decode_field(packed // LOW_FIELD_SHIFT, HIGH_FIELD_BOUND, HIGH_FIELD_MODULUS)
+    low = decode_field(packed % LOW_FIELD_SHIFT, LOW_FIELD_BOUND, LOW_FIELD_MODULUS)
+    return (high, low)
+
+
+# Encode a signed value in two's complement in a packed field
+def encode_field(value: int, modulus: int) -> int:
+    if value < 0:
+        return value + modulus
+    return value
+
+
+# Encode a position dict in decimals to the 4 felts of a PackedPositionDetails
+def pack_position(position: Dict) -> List[int]:
+    def pack_pair(high: float, low: float) -> int:
+        return encode_field(to64x61(high), HIGH_FIELD_MODULUS) * LOW_FIELD_SHIFT + \
+            encode_field(to64x61(low), LOW_FIELD_MODULUS)
+
+    timestamps = position["created_timestamp"] * TIMESTAMP_SHIFT + position["modified_timestamp"]
+    realized_pnl = to64x61(position.get("realized_pnl", 0))
+    return [
+        pack_pair(position["position_size"], position["avg_execution_price"]),
+        pack_pair(position["borrowed_amount"], position["margin_amount"]),
+        encode_field(to64x61(position["leverage"]), HIGH_FIELD_MODULUS) * LOW_FIELD_SHIFT + timestamps,
+        realized_pnl % PRIME,
+    ]
+
+
+# Decode the 4 felts of a PackedPositionDetails to a position dict in decimals
+def unpack_position(packed: List[int]) -> Dict:
+    price_and_size, margin_and_borrowed, leverage_and_timestamps, realized_pnl = packed
+    position_size, avg_execution_price = unpack_pair(price_and_size)
+    borrowed_amount, margin_amount = unpack_pair(margin_and_borrowed)
+    leverage = decode_field(
+        leverage_and_timestamps // LOW_FIELD_SHIFT, HIGH_FIELD_BOUND, HIGH_FIELD_MODULUS)
+    timestamps = leverage_and_timestamps % LOW_FIELD_SHIFT
+
+    return {
+        "avg_execution_price": avg_execution_price / SCALE,
+        "position_size": position_size / SCALE,
+        "margin_amount": margin_amount / SCALE,
+        "borrowed_amount": borrowed_amount / SCALE,
+        "leverage": leverage / SCALE,
+        "created_timestamp": timestamps // TIMESTAMP_SHIFT,
+        "modified_timestamp": timestamps % TIMESTAMP_SHIFT,
+        "realized_pnl": from64x61(realized_pnl),
+    }
+
+
+# Get the balance and locked margin of every user in decimals
+async def read_user_balances(state: StarknetState, user_addresses: List[int], asset_id: int) -> List[Dict]:
+    balance_key = get_storage_var_address("balance", asset_id)
+    margin_locked_key = get_storage_var_address("margin_locked", asset_id)
+
+    reads = []
+    for user_address in user_addresses:
+        reads += [(user_address, balance_key), (user_address, margin_locked_key)]
+    values = from64x61_array(await read_storage(state, reads)).tolist()
+
+    return [{
+        "balance": values[2 * i],
+        "margin_locked": values[2 * i + 1],
+    } for i in range(len(user_addresses))]
+
+
+# Get the positions of every user in a market, keyed by direction
+async def read_user_positions(state: StarknetState, user_addresses: List[int], market_id: int, directions: List[int]) -> List[Dict[int, Dict]]:
+    # A PackedPositionDetails struct occupies 4 consecutive slots
+    base_keys = [get_storage_var_address("packed_position_mapping", market_id, direction)
+                 for direction in directions]
+
+    reads = []
+    for user_address in user_addresses:
+        for base_key in base_keys:
+            reads += [(user_address, base_key + i) for i in range(4)]
+    values = await read_storage(state, reads)
+
+    positions = []
+    for i in range(len(user_addresses)):
+        user_positions = {}
+        for j, direction in enumerate(directions):
+            offset = 4 * (i * len(directions) + j)
+            user_positions[direction] = unpack_position(values[offset:offset + 4])
+        positions.append(user_positions)
+    return positions
+
+
+# Get the balance of every fund in decimals; fee_balance_key names the FeeBalance contract
+async def read_fund_balances(state: StarknetState, fund_addresses: Dict, asset_id: int, fee_balance_key=None) -> Dict:
+    fund_balance_key = get_storage_var_address(FUND_BALANCE_VAR, asset_id)
+    fee_balance_storage_key = get_storage_var_address(FEE_BALANCE_VAR, asset_id)
+
+    funds = list(fund_addresses.keys())
+    reads = [(fund_addresses[fund], fee_balance_storage_key if fund == fee_balance_key else fund_balance_key)
+             for fund in funds]
+    values = from64x61_array(await read_storage(state, reads)).tolist()
+
+    return dict(zip(funds, values))
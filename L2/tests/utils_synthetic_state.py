@@ -0,0 +1,326 @@
+"""Seeded generator of production sized exchange state for benchmarks.
+
+The generated accounts, positions, market prices and trading season statistics are plain
+python records, so a state can be pickled to a snapshot once and applied to a fresh
+StarknetState on every benchmark run, together with the matching User and OrderExecutor.
+"""
+
+import pickle
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List
+from starkware.starknet.testing.contract import StarknetContract
+from starkware.starknet.public.abi import get_storage_var_address
+from helpers import AccountFactory
+from utils import to64x61, PRIME
+from utils_state import pack_position, write_storage
+from utils_trading import User, OrderExecutor, order_direction, market_to_collateral_mapping, BTC_USD_ID, ETH_USD_ID, TSLA_USD_ID
+from calculate_hightide import MarketStats, MarketUserStats
+
+OPEN = 1
+CLOSE = 2
+
+
+@dataclass
+class SyntheticStateConfig:
+    seed: int = 0
+    num_accounts: int = 1000
+    market_ids: List[int] = field(default_factory=lambda: [BTC_USD_ID, ETH_USD_ID, TSLA_USD_ID])
+    positions_per_account: int = 2
+    first_private_key: int = 10**12
+    season_id: int = 1
+    num_trading_days: int = 30
+    timestamp: int = 1_700_000_000
+    min_balance: float = 1000
+    max_balance: float = 100000
+    min_price: float = 10
+    max_price: float = 50000
+    max_leverage: int = 5
+
+
+@dataclass
+class SyntheticAccount:
+    private_key: int
+    # collateral_id -> balance in decimals
+    balances: Dict[int, float]
+    # collateral_id -> locked margin in decimals
+    locked_margin: Dict[int, float]
+    # market_id -> direction -> position dict, as in User.positions
+    positions: Dict[int, Dict[int, Dict]]
+
+
+@dataclass
+class SyntheticTraderStats:
+    fee: float
+    num_orders_open: int
+    volume_open: float
+    num_orders_close: int
+    volume_close: float
+    pnl: float
+    margin_amount: float
+
+
+@dataclass
+class SyntheticState:
+    config: SyntheticStateConfig
+    accounts: List[SyntheticAccount]
+    # market_id -> price in decimals
+    market_prices: Dict[int, float]
+    # market_id -> day -> number of trades
+    trade_frequency: Dict[int, Dict[int, int]]
+    # market_id -> account index -> stats
+    trader_stats: Dict[int, Dict[int, SyntheticTraderStats]]
+
+    def save(self, path: str):
+        with open(path, "wb") as snapshot:
+            pickle.dump(self, snapshot)
+
+    @staticmethod
+    def load(path: str) -> "SyntheticState":
+        with open(path, "rb") as snapshot:
+            return pickle.load(snapshot)
+
+    def market_stats(self) -> List[MarketStats]:
+        """Returns the TradingStats of every market, as read by HighTideCalc"""
+        stats = []
+        for market_id in self.config.market_ids:
+            traders = self.trader_stats[market_id].values()
+            total_orders = sum(t.num_orders_open + t.num_orders_close for t in traders)
+            total_volume = sum(t.volume_open + t.volume_close for t in traders)
+            frequency = self.trade_frequency[market_id]
+            stats.append(MarketStats(
+                market_id=market_id,
+                average_order_volume=total_volume / total_orders if total_orders else 0,
+                max_trades_in_day=max(frequency.values(), default=0),
+                total_days_traded=sum(1 for count in frequency.values() if count > 0),
+                num_active_traders=len(self.trader_stats[market_id]),
+            ))
+        return stats
+
+    def market_user_stats(self, market_id: int, addresses: List[int]) -> MarketUserStats:
+        """Returns the UserStats of the traders of a market; addresses are the account addresses"""
+        traders = self.trader_stats[market_id]
+        rows = [{
+            "trader_address": addresses[index],
+            "fee": stats.fee,
+            "num_orders_open": stats.num_orders_open,
+            "volume_open": stats.volume_open,
+            "num_orders_close": stats.num_orders_close,
+            "volume_close": stats.volume_close,
+            "pnl": stats.pnl,
+            "margin_amount": stats.margin_amount,
+        } for (index, stats) in traders.items()]
+        total_fee = sum(stats.fee for stats in traders.values())
+        return MarketUserStats.from_rows(market_id, total_fee, rows)
+
+
+# Generate a state from the config; the same seed always gives the same state
+def generate_synthetic_state(config: SyntheticStateConfig) -> SyntheticState:
+    rng = random.Random(config.seed)
+    market_prices = {
+        market_id: round(rng.uniform(config.min_price, config.max_price), 2) for market_id in config.market_ids
+    }
+
+    accounts = []
+    trader_stats = {market_id: {} for market_id in config.market_ids}
+    positions_per_account = min(config.positions_per_account, len(config.market_ids))
+    for index in range(config.num_accounts):
+        balances = {}
+        locked_margin = {}
+        positions = {}
+        for market_id in rng.sample(config.market_ids, positions_per_account):
+            collateral_id = market_to_collateral_mapping[market_id]
+            direction = rng.choice([order_direction["long"], order_direction["short"]])
+            price = round(market_prices[market_id] * rng.uniform(0.95, 1.05), 2)
+            position_size = round(rng.uniform(0.01, 10), 4)
+            leverage = rng.randint(1, config.max_leverage)
+            margin_amount = position_size * price / leverage
+            created_timestamp = config.timestamp - rng.randint(0, config.num_trading_days * 86400)
+
+            positions[market_id] = {direction: {
+                "avg_execution_price": price,
+                "position_size": position_size,
+                "margin_amount": margin_amount,
+                "borrowed_amount": position_size * price - margin_amount,
+                "leverage": leverage,
+                "created_timestamp": created_timestamp,
+                "modified_timestamp": created_timestamp,
+                "realized_pnl": 0,
+            }}
+            locked_margin[collateral_id] = locked_margin.get(collateral_id, 0) + margin_amount
+            balances.setdefault(collateral_id, round(
+                rng.uniform(config.min_balance, config.max_balance), 2))
+
+            num_orders_open = rng.randint(1, 20)
+            num_orders_close = rng.randint(0, num_orders_open)
+            trader_stats[market_id][index] = SyntheticTraderStats(
+                fee=round(rng.uniform(0, 50), 4),
+                num_orders_open=num_orders_open,
+                volume_open=round(position_size * price * num_orders_open, 4),
+                num_orders_close=num_orders_close,
+                volume_close=round(position_size * price * num_orders_close / 2, 4),
+                pnl=round(rng.uniform(-margin_amount, margin_amount), 4),
+                margin_amount=margin_amount,
+            )
+
+        # Make sure the margin locked never exceeds the balance
+        for (collateral_id, margin) in locked_margin.items():
+            balances[collateral_id] = max(balances[collateral_id], round(margin * 2, 2))
+        accounts.append(SyntheticAccount(config.first_private_key + index, balances, locked_margin, positions))
+
+    trade_frequency = {
+        market_id: {day: rng.randint(0, 10 * len(trader_stats[market_id]) + 1)
+                    for day in range(config.num_trading_days)}
+        for market_id in config.market_ids
+    }
+    return SyntheticState(config, accounts, market_prices, trade_frequency, trader_stats)
+
+
+# Write the state into the test StarknetState and return the accounts with the matching python model
+async def apply_synthetic_state(synthetic_state: SyntheticState, account_factory: AccountFactory, account_registry: StarknetContract = None, market_prices: StarknetContract = None, trading_stats: StarknetContract = None, user_stats: StarknetContract = None):
+    """
+    Provisions the accounts of the state with their balances, locked margin and positions, and
+    registers the ones with positions as active traders when account_registry is passed. Market
+    prices and season statistics are written to the contracts that are passed.
+    Returns (accounts, users_test, executor), accounts being the AccountManager contracts.
+    """
+    config = synthetic_state.config
+    provisioned = await account_factory.provision_ZKX_accounts(
+        count=len(synthetic_state.accounts), first_private_key=config.first_private_key, account_registry=account_registry)
+    accounts = [account for (_, account) in provisioned]
+    addresses = [account.contract_address for account in accounts]
+    starknet_state = account_factory.starknet_service.starknet.state
+
+    users_test = []
+    for (synthetic_account, address) in zip(synthetic_state.accounts, addresses):
+        await write_account(starknet_state, synthetic_account, address, account_factory.collateral_id)
+        users_test.append(build_user(synthetic_account, address))
+
+    if account_registry is not None:
+        active_traders = [address for (synthetic_account, address) in zip(
+            synthetic_state.accounts, addresses) if synthetic_account.positions]
+        await register_active_traders(starknet_state, account_registry.contract_address, active_traders)
+
+    executor = OrderExecutor()
+    for (market_id, price) in synthetic_state.market_prices.items():
+        executor.set_market_price(market_id, price, config.timestamp)
+        if market_prices is not None:
+            await write_storage(starknet_state, market_prices.contract_address, "packed_market_prices", [market_id], [
+                config.timestamp * 2**128 + to64x61(price)])
+
+    if trading_stats is not None:
+        await write_trading_stats(starknet_state, synthetic_state, trading_stats.contract_address, addresses)
+    if user_stats is not None:
+        await write_user_stats(starknet_state, synthetic_state, user_stats.contract_address, addresses)
+
+    return (accounts, users_test, executor)
+
+
+# Write the balances, locked margin and positions of an account the way AccountManager stores them
+async def write_account(starknet_state, synthetic_account: SyntheticAccount, address: int, default_collateral_id: int):
+    collateral_ids = [default_collateral_id] + [
+        collateral_id for collateral_id in synthetic_account.balances if collateral_id != default_collateral_id]
+    await write_storage(starknet_state, address, "collateral_array_len", [], [len(collateral_ids)])
+    for (index, collateral_id) in enumerate(collateral_ids):
+        await write_storage(starknet_state, address, "collateral_array", [index], [collateral_id])
+
+    for (collateral_id, balance) in synthetic_account.balances.items():
+        await write_storage(starknet_state, address, "balance", [collateral_id], [to64x61(balance)])
+    for (collateral_id, margin) in synthetic_account.locked_margin.items():
+        await write_storage(starknet_state, address, "margin_locked", [collateral_id], [to64x61(margin)])
+
+    markets_len = {}
+    for (market_id, positions) in synthetic_account.positions.items():
+        collateral_id = market_to_collateral_mapping[market_id]
+        index = markets_len.get(collateral_id, 0)
+        await write_storage(starknet_state, address, "collateral_to_market_array", [collateral_id, index], [market_id])
+        await write_storage(starknet_state, address, "market_to_index_mapping", [market_id], [index])
+        await write_storage(starknet_state, address, "market_is_exist", [market_id], [1])
+        markets_len[collateral_id] = index + 1
+
+        for (direction, position) in positions.items():
+            await write_storage(starknet_state, address, "packed_position_mapping", [market_id, direction], pack_position(position))
+
+    for (collateral_id, length) in markets_len.items():
+        await write_storage(starknet_state, address, "collateral_to_market_array_len", [collateral_id], [length])
+
+
+# Build the python model of an account
+def build_user(synthetic_account: SyntheticAccount, address: int) -> User:
+    user = User(synthetic_account.private_key, address)
+    for (collateral_id, balance) in synthetic_account.balances.items():
+        user.set_balance(new_balance=balance, asset_id=collateral_id)
+    for (collateral_id, margin) in synthetic_account.locked_margin.items():
+        user.set_locked_margin(new_locked_margin=margin, asset_id=collateral_id)
+    for (market_id, positions) in synthetic_account.positions.items():
+        user.positions[market_id] = {direction: dict(position) for (direction, position) in positions.items()}
+        user.collateral_to_market_array.setdefault(market_to_collateral_mapping[market_id], []).append(market_id)
+    return user
+
+
+# Append addresses to the active traders of an AccountRegistry the way add_to_active_traders does
+async def register_active_traders(starknet_state, account_registry_address: int, addresses: List[int]):
+    traders_len = await starknet_state.state.get_storage_at(
+        account_registry_address, get_storage_var_address("active_traders_len"))
+    for address in addresses:
+        if await starknet_state.state.get_storage_at(account_registry_address, get_storage_var_address("active_trader_present", address)) == 1:
+            continue
+        await write_storage(starknet_state, account_registry_address, "active_traders", [traders_len], [address])
+        await write_storage(starknet_state, account_registry_address, "active_trader_index", [address], [traders_len])
+        await write_storage(starknet_state, account_registry_address, "active_trader_present", [address], [1])
+        traders_len += 1
+    await write_storage(starknet_state, account_registry_address, "active_traders_len", [], [traders_len])
+
+
+# Write the season statistics TradingStats keeps for every market
+async def write_trading_stats(starknet_state, synthetic_state: SyntheticState, trading_stats_address: int, addresses: List[int]):
+    season_id = synthetic_state.config.season_id
+    season_traders = set()
+    for market_id in synthetic_state.config.market_ids:
+        traders = synthetic_state.trader_stats[market_id]
+        await write_storage(starknet_state, trading_stats_address, "num_traders", [season_id, market_id], [len(traders)])
+        for (index, account_index) in enumerate(traders):
+            await write_storage(starknet_state, trading_stats_address, "traders_in_market", [season_id, market_id, index], [addresses[account_index]])
+            await write_storage(starknet_state, trading_stats_address, "trader_for_market", [season_id, market_id, addresses[account_index]], [1])
+        season_traders.update(traders)
+
+        for (day, count) in synthetic_state.trade_frequency[market_id].items():
+            await write_storage(starknet_state, trading_stats_address, "trade_frequency", [season_id, market_id, day], [count])
+
+        for (side, num_orders, volume) in [
+            (OPEN, sum(t.num_orders_open for t in traders.values()), sum(t.volume_open for t in traders.values())),
+            (CLOSE, sum(t.num_orders_close for t in traders.values()), sum(t.volume_close for t in traders.values())),
+        ]:
+            await write_storage(starknet_state, trading_stats_address, "num_orders", [season_id, market_id, side], [num_orders])
+            await write_storage(starknet_state, trading_stats_address, "order_volume", [season_id, market_id, side], [to64x61(volume)])
+
+        open_interest = sum(
+            position["position_size"] for account in synthetic_state.accounts
+            for position in account.positions.get(market_id, {}).values())
+        await write_storage(starknet_state, trading_stats_address, "open_interest", [market_id], [to64x61(open_interest)])
+
+    for (index, account_index) in enumerate(sorted(season_traders)):
+        await write_storage(starknet_state, trading_stats_address, "traders_in_season", [season_id, index], [addresses[account_index]])
+        await write_storage(starknet_state, trading_stats_address, "trader_for_season", [season_id, addresses[account_index]], [1])
+    await write_storage(starknet_state, trading_stats_address, "num_traders_in_season", [season_id], [len(season_traders)])
+
+
+# Write the season statistics UserStats keeps for every trader of every market
+async def write_user_stats(starknet_state, synthetic_state: SyntheticState, user_stats_address: int, addresses: List[int]):
+    season_id = synthetic_state.config.season_id
+    for market_id in synthetic_state.config.market_ids:
+        traders = synthetic_state.trader_stats[market_id]
+        total_fee = 0
+        for (account_index, stats) in traders.items():
+            address = addresses[account_index]
+            total_fee += stats.fee
+            await write_storage(starknet_state, user_stats_address, "trader_fee_by_market", [season_id, market_id, address], [to64x61(stats.fee)])
+            await write_storage(starknet_state, user_stats_address, "trader_pnl_by_market", [season_id, market_id, address], [to64x61(stats.pnl) % PRIME])
+            await write_storage(starknet_state, user_stats_address, "trader_margin_by_market", [season_id, market_id, address], [to64x61(stats.margin_amount)])
+            for (side, num_orders, volume) in [
+                (OPEN, stats.num_orders_open, stats.volume_open),
+                (CLOSE, stats.num_orders_close, stats.volume_close),
+            ]:
+                await write_storage(starknet_state, user_stats_address, "trader_orders_count_by_market", [address, season_id, market_id, side], [num_orders])
+                await write_storage(starknet_state, user_stats_address, "trader_order_volume_by_market", [address, season_id, market_id, side], [to64x61(volume)])
+        await write_storage(starknet_state, user_stats_address, "total_fee_by_market", [season_id, market_id], [to64x61(total_fee)])
@@ -5,11 +5,13 @@ import string
 import calculate_abr
 from math import isclose
 from utils_asset import AssetID
-from utils import Signer, str_to_felt, assert_revert, hash_order, from64x61, to64x61, felt_to_str
+from utils import Signer, str_to_felt, assert_revert, hash_order, from64x61, to64x61, felt_to_str, from64x61_array
 from utils_markets import MarketProperties
+from utils_state import read_user_balances, read_user_positions, read_fund_balances
 from typing import List, Dict, Tuple
 from calculate_abr import calculate_abr
 from starkware.starknet.testing.contract import StarknetContract
+from starkware.starknet.public.abi import get_storage_var_address
 
 # Market IDs
 BTC_USD_ID = str_to_felt("gecn2j0cm45sz")
@@ -906,6 +908,8 @@ class OrderExecutor:
         self.market_details = {}
         self.position_size_locked = {}
         self.ttl = 60
+        # Net fund transfers of the batch being executed, settled once at the end of the batch
+        self.batch_fund_deltas = None
 
     def set_market_details(self, market_id: int, details: Dict):
         self.market_details[market_id] = details
@@ -930,15 +934,26 @@ class OrderExecutor:
             return
 
     def __modify_fund_balance(self, fund: int, mode: int, asset_id: int, amount: float):
+        signed_amount = amount if mode == fund_mode["fund"] else -amount
+
+        # Within a batch, the transfers are accumulated per fund and collateral
+        if self.batch_fund_deltas is not None:
+            fund_deltas = self.batch_fund_deltas.setdefault(fund, {})
+            fund_deltas[asset_id] = fund_deltas.get(asset_id, 0) + signed_amount
+            return
+
         current_balance = self.get_fund_balance(fund, asset_id,)
-        new_balance = 0
+        self.set_fund_balance(fund, asset_id, current_balance + signed_amount)
 
-        if mode == fund_mode["fund"]:
-            new_balance = current_balance + amount
-        else:
-            new_balance = current_balance - amount
+    def __settle_fund_balances(self):
+        # Apply the net transfer of each fund and collateral once, as Trading does at the end of execute_batch
+        batch_fund_deltas, self.batch_fund_deltas = self.batch_fund_deltas, None
 
-        self.set_fund_balance(fund, asset_id, new_balance)
+        for fund, fund_deltas in batch_fund_deltas.items():
+            for asset_id, net_amount in fund_deltas.items():
+                mode = fund_mode["fund"] if net_amount >= 0 else fund_mode["defund"]
+                self.__modify_fund_balance(
+                    fund=fund, mode=mode, asset_id=asset_id, amount=abs(net_amount))
 
     def __process_open_orders(self, user: User, order: Dict, execution_price: float, order_size: float, side: int, timestamp: int) -> Tuple[float, float, float, float, float]:
         position = user.get_position(
@@ -1252,6 +1267,8 @@ class OrderExecutor:
 
         print("adjusted taker size", taker_adjusted_quantity)
 
+        self.batch_fund_deltas = {}
+
         # Get market details
         market_details = self.get_market_details(market_id)
 
@@ -1295,6 +1312,8 @@ class OrderExecutor:
 
                 if quantity_to_execute == 0:
                     print(f"\n<==> Error: Quantity is 0\n")
+                    # The batch reverts, so none of its transfers are settled
+                    self.batch_fund_deltas = None
                     return
 
                 if request_list[i]["post_only"] != 0:
@@ -1408,6 +1427,7 @@ class OrderExecutor:
             quantity_executed += quantity_to_execute
             print("\n\n")
 
+        self.__settle_fund_balances()
         self.batch_id_status[batch_id] = 1
         return
 
@@ -1615,7 +1635,7 @@ async def get_user_locked_margin(user: StarknetContract, asset_id: int) -> int:
 
 # Convert a 64x61 array to decimals
 def convert_list_from_64x61(fixed_point_list: List[int]) -> List[float]:
-    return [from64x61(x) for x in fixed_point_list]
+    return from64x61_array(fixed_point_list).tolist()
 
 
 # Liquidation check on starknet
@@ -1624,8 +1644,8 @@ async def mark_under_collateralized_position_starknet(zkx_node_signer: Signer, z
     liquidation_return_data = liquidation_result_object.call_info.retdata
     print("liquidation return data:", liquidation_return_data)
     # Convert the quantity to decimals
-    least_collateral_ratio_position = [
-        from64x61(x) for x in liquidation_return_data[4:9]]
+    least_collateral_ratio_position = convert_list_from_64x61(
+        liquidation_return_data[4:9])
     least_collateral_ratio_position.insert(0, liquidation_return_data[2])
     least_collateral_ratio_position.insert(1, liquidation_return_data[3])
 
@@ -1646,9 +1666,8 @@ async def get_liquidatable_position_starknet(user: User, collateral_id: int) ->
 async def get_user_position(user: StarknetContract, market_id: int, direction: int) -> List[float]:
     user_starknet_query = await user.get_position_data(market_id_=market_id, direction_=direction).call()
     user_starknet_query_parsed = list(user_starknet_query.result.res)
-    user_starknet_position = [from64x61(x)
-                              for x in user_starknet_query_parsed[:5]] + user_starknet_query_parsed[5:7] + [from64x61(x)
-                                                                                                            for x in user_starknet_query_parsed[7:]]
+    user_starknet_position = convert_list_from_64x61(
+        user_starknet_query_parsed[:5]) + user_starknet_query_parsed[5:7] + convert_list_from_64x61(user_starknet_query_parsed[7:])
     return user_starknet_position
 
 
@@ -1782,6 +1801,30 @@ async def set_abr_value(market_id: int, node_signer: Signer, node: StarknetContr
 
     return (set_abr_value_tx, abr_value, abr_last_price)
 
+# Reduces raw 64x61 prices to the 8-sample means pushed to ABRCore; mirrors ABRCalculations.reduce_values
+def reduce_abr_samples(spot_64x61: List[int], perp_64x61: List[int], window: int = 8) -> Tuple[List[int], List[int]]:
+    index_prices = []
+    mark_prices = []
+    for i in range(0, len(perp_64x61) - window + 1, window):
+        index_prices.append(sum(spot_64x61[i:i + window]) // window)
+        mark_prices.append(sum(perp_64x61[i:i + window]) // window)
+    return (index_prices, mark_prices)
+
+
+# Pushes the reduced samples of an epoch to ABRCore in transactions of samples_per_tx samples
+async def push_abr_samples(market_id: int, node_signer: Signer, node: StarknetContract, abr_core: StarknetContract, spot_64x61: List[int], perp_64x61: List[int], samples_per_tx: int = 8, window: int = 8) -> List:
+    (index_prices, mark_prices) = reduce_abr_samples(
+        spot_64x61=spot_64x61, perp_64x61=perp_64x61, window=window)
+
+    push_txs = []
+    for i in range(0, len(index_prices), samples_per_tx):
+        index_chunk = index_prices[i:i + samples_per_tx]
+        mark_chunk = mark_prices[i:i + samples_per_tx]
+        last_price = perp_64x61[(i + len(mark_chunk)) * window - 1]
+        push_tx = await node_signer.send_transaction(node, abr_core.contract_address, 'push_abr_samples', [market_id, len(index_chunk), *index_chunk, len(mark_chunk), *mark_chunk, last_price])
+        push_txs.append(push_tx)
+    return push_txs
+
 # Function to assert that the reverted tx has the required error_message
 
 
@@ -1916,8 +1959,8 @@ async def get_user_margin_info_starknet(user: StarknetContract, collateral_id: i
     )
 
     starknet_position = list(least_collateral_ratio_position)
-    formatted_starknet_position = starknet_position[:2] + [
-        from64x61(x) for x in starknet_position[2:]]
+    formatted_starknet_position = starknet_position[:2] + \
+        convert_list_from_64x61(starknet_position[2:])
     return (is_liquidation, total_margin, available_margin, unrealized_pnl_sum, maintenance_margin_requirement, least_collateral_ratio, formatted_starknet_position, least_collateral_ratio_position_asset_price)
 
 
@@ -1982,13 +2025,16 @@ async def check_batch_status(batch_id: int, trading: StarknetContract, is_execut
 
 # Compare user balance in starknet and python
 async def compare_user_balances(users: List[StarknetContract], user_tests: List[User], asset_id: int):
+    # Read every user's storage in one pass instead of two view calls per user
+    user_balances = await read_user_balances(
+        state=users[0].state, user_addresses=[user.contract_address for user in users], asset_id=asset_id)
     for i in range(len(users)):
         print("\n\nuser:", i)
-        user_balance = await get_user_balance(user=users[i], asset_id=asset_id)
+        user_balance = user_balances[i]["balance"]
         user_balance_python = get_user_balance_python(
             user=user_tests[i], asset_id=asset_id)
 
-        user_locked_margin = await get_user_locked_margin(user=users[i], asset_id=asset_id)
+        user_locked_margin = user_balances[i]["margin_locked"]
         user_locked_margin_python = get_user_locked_margin_python(
             user=user_tests[i], asset_id=asset_id)
 
@@ -2003,8 +2049,24 @@ async def compare_user_balances(users: List[StarknetContract], user_tests: List[
             user_locked_margin, abs=1e-6)
 
 
+# Number of storage slots of a PackedPositionDetails struct
+PACKED_POSITION_SIZE = 4
+# Number of storage slots of the PositionDetails struct every fill wrote before positions were packed
+UNPACKED_POSITION_SIZE = 8
+
+
+# Count the position storage slots of a user written by a transaction
+# storage_writes is the last_storage_writes of the OptimizedStarknetState the transaction ran on
+def count_position_storage_writes(storage_writes: Dict[Tuple[int, int], int], user_address: int, market_id: int, direction: int, storage_var: str = 'packed_position_mapping') -> int:
+    base_address = get_storage_var_address(storage_var, market_id, direction)
+    return sum(1 for i in range(UNPACKED_POSITION_SIZE) if (user_address, base_address + i) in storage_writes)
+
+
 # Compare user positions on starknet and python
 async def compare_user_positions(users: List[StarknetContract], users_test: List[User], market_id: int):
+    directions = [order_direction["long"], order_direction["short"]]
+    user_positions = await read_user_positions(
+        state=users[0].state, user_addresses=[user.contract_address for user in users], market_id=market_id, directions=directions)
     for i in range(len(users)):
         print("\n\nuser:", i)
         user_position_python_long = get_user_position_python(
@@ -2012,10 +2074,10 @@ async def compare_user_positions(users: List[StarknetContract], users_test: List
         user_position_python_short = get_user_position_python(
             user=users_test[i], market_id=market_id, direction=order_direction["short"])
 
-        user_position_starknet_long = await get_user_position(
-            user=users[i], market_id=market_id, direction=order_direction["long"])
-        user_position_starknet_short = await get_user_position(
-            user=users[i], market_id=market_id, direction=order_direction["short"])
+        user_position_starknet_long = list(
+            user_positions[i][order_direction["long"]].values())
+        user_position_starknet_short = list(
+            user_positions[i][order_direction["short"]].values())
 
         print("user_position_python_long", user_position_python_long)
         print("user_position_starknet_long", user_position_starknet_long)
@@ -2032,38 +2094,25 @@ async def compare_user_positions(users: List[StarknetContract], users_test: List
 
 # Compare fund balances of starknet and python
 async def compare_fund_balances(executor: OrderExecutor, holding: StarknetContract, liquidity: StarknetContract, fee_balance: StarknetContract, insurance: StarknetContract, asset_id: int):
-    holding_fund_balance = await get_fund_balance(fund=holding, asset_id=asset_id, is_fee_balance=0)
-    holding_fund_balance_python = get_fund_balance_python(
-        executor=executor, fund=fund_mapping["holding_fund"], asset_id=asset_id)
-    print("holding_fund_balance", holding_fund_balance)
-    print("holding_fund_balance_python", holding_fund_balance_python)
-    assert holding_fund_balance_python == pytest.approx(
-        holding_fund_balance, abs=1e-6)
-
-    liquidity_fund_balance = await get_fund_balance(fund=liquidity, asset_id=asset_id, is_fee_balance=0)
-    liquidity_fund_balance_python = get_fund_balance_python(
-        executor=executor, fund=fund_mapping["liquidity_fund"], asset_id=asset_id)
-    print("liquidity_fund_balance", liquidity_fund_balance)
-    print("liquidity_fund_balance_python", liquidity_fund_balance_python)
-    assert liquidity_fund_balance_python == pytest.approx(
-        liquidity_fund_balance, abs=1e-6)
-
-    fee_balance_balance = await get_fund_balance(fund=fee_balance, asset_id=asset_id, is_fee_balance=1)
-    fee_balance_python = get_fund_balance_python(
-        executor=executor, fund=fund_mapping["fee_balance"], asset_id=asset_id)
-    print("fee_balance_balance", fee_balance_balance)
-    print("fee_balance_python", fee_balance_python)
-    assert fee_balance_python == pytest.approx(
-        fee_balance_balance, abs=1e-6)
-
-    insurance_balance = await get_fund_balance(fund=insurance, asset_id=asset_id, is_fee_balance=0)
-    insurance_balance_python = get_fund_balance_python(
-        executor=executor, fund=fund_mapping["insurance_fund"], asset_id=asset_id)
-
-    print("insurance_balance", insurance_balance)
-    print("insurance_balance_python", insurance_balance_python)
-    assert insurance_balance_python == pytest.approx(
-        insurance_balance, abs=1e-6)
+    fund_balances = await read_fund_balances(
+        state=holding.state,
+        fund_addresses={
+            "holding_fund": holding.contract_address,
+            "liquidity_fund": liquidity.contract_address,
+            "fee_balance": fee_balance.contract_address,
+            "insurance_fund": insurance.contract_address,
+        },
+        asset_id=asset_id,
+        fee_balance_key="fee_balance")
+
+    for fund in ["holding_fund", "liquidity_fund", "fee_balance", "insurance_fund"]:
+        fund_balance = fund_balances[fund]
+        fund_balance_python = get_fund_balance_python(
+            executor=executor, fund=fund_mapping[fund], asset_id=asset_id)
+        print(fund, fund_balance)
+        print(fund + "_python", fund_balance_python)
+        assert fund_balance_python == pytest.approx(
+            fund_balance, abs=1e-6)
 
 
 # Assert that the liquidatable position on starknet and python class are the same